@@ -14,8 +14,18 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+from blue_krill.data_types.enum import EnumField, StrStructuredEnum
+from django.utils.translation import gettext_lazy as _
+
 REDIRECT_FIELD_NAME = "c_url"
 
 SIGN_IN_TENANT_ID_SESSION_KEY = "sign_in_tenant_id"
 
 ALLOWED_SIGN_IN_TENANT_USERS_SESSION_KEY = "allowed_sign_in_tenant_users"
+
+
+class BkTokenStoreBackendEnum(StrStructuredEnum):
+    """登录票据存储方式"""
+
+    DATABASE = EnumField("database", label=_("数据库"))
+    REDIS = EnumField("redis", label=_("Redis"))
@@ -27,7 +27,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from .models import BkToken
+from .stores import get_bk_token_store
 
 logger = logging.getLogger(__name__)
 
@@ -96,6 +96,10 @@ class BkTokenManager:
         self.inactive_age = settings.BK_TOKEN_INACTIVE_AGE
         # Token 校验时间允许误差
         self.offset_error_age = settings.BK_TOKEN_OFFSET_ERROR_AGE
+        # Token 无操作失效时间刷新阈值
+        self.inactive_refresh_threshold = settings.BK_TOKEN_INACTIVE_REFRESH_THRESHOLD
+        # Token 存储
+        self.store = get_bk_token_store()
 
         # Token生成失败的重试次数
         self.allowed_retry_count = 5
@@ -117,9 +121,9 @@ class BkTokenManager:
             inactive_expires_at = now_time + self.inactive_age
             # 生成bk_token
             bk_token = self.bk_token_processor.generate(username, expires_at)
-            # DB记录
+            # 存储记录
             try:
-                BkToken.objects.create(token=bk_token, inactive_expires_at=inactive_expires_at)
+                self.store.create(bk_token, expires_at, inactive_expires_at)
             except Exception:  # noqa: PERF203
                 logger.exception("Login ticket failed to be saved during ticket generation")
                 # 循环结束前将bk_token置空后重新生成
@@ -144,14 +148,19 @@ class BkTokenManager:
         except ValueError as error:
             return False, "", str(error)
 
-        # 检查DB是存在
+        # 检查记录是否存在
         try:
-            bk_token_obj = BkToken.objects.get(token=bk_token)
-            is_logout = bk_token_obj.is_logout
-            inactive_expires_at = bk_token_obj.inactive_expires_at
+            bk_token_info = self.store.get(bk_token, expires_at)
         except Exception:
+            logger.exception("get bk_token [%s] from store fail", bk_token)
+            bk_token_info = None
+
+        if not bk_token_info:
             return False, "", _("不存在 bk_token[%s] 的记录").format(bk_token)
 
+        is_logout = bk_token_info.is_logout
+        inactive_expires_at = bk_token_info.inactive_expires_at
+
         # token已注销
         if is_logout:
             return False, "", _("登录态已注销")
@@ -170,13 +179,20 @@ class BkTokenManager:
             return False, "", _("长时间无操作，登录态已过期")
 
         # 更新 无操作有效期
+        self._refresh_inactive_expires_at(bk_token, expires_at, inactive_expires_at, now)
+
+        return True, username, ""
+
+    def _refresh_inactive_expires_at(self, bk_token: str, expires_at: int, inactive_expires_at: int, now: int):
+        """只有剩余的无操作有效期低于阈值时才需要刷新，以合并高频校验产生的写操作"""
+        if inactive_expires_at - now >= self.inactive_refresh_threshold:
+            return
+
         try:
-            BkToken.objects.filter(token=bk_token).update(inactive_expires_at=now + self.inactive_age)
+            self.store.refresh_inactive_expires_at(bk_token, expires_at, now + self.inactive_age)
         except Exception:
             logger.exception("update inactive_expires_at fail")
 
-        return True, username, ""
-
     @staticmethod
     def set_invalid(bk_token: str):
         """
@@ -184,4 +200,4 @@ class BkTokenManager:
         """
         # Note: unquote_plus 是为了兼容 2.x 版本， 因为旧版本在设置 bk_token Cookie 时做了 quote_plus 转换编码
         bk_token = unquote_plus(bk_token)
-        BkToken.objects.filter(token=bk_token).update(is_logout=True)
+        get_bk_token_store().set_logout(bk_token)
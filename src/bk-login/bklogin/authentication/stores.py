@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import caches
+from pydantic import BaseModel
+
+from .constants import BkTokenStoreBackendEnum
+from .models import BkToken
+
+logger = logging.getLogger(__name__)
+
+
+class BkTokenInfo(BaseModel):
+    """登录票据状态信息"""
+
+    # 是否已经退出登录
+    is_logout: bool = False
+    # 无操作过期时间戳
+    inactive_expires_at: int = 0
+
+
+class BaseBkTokenStore(ABC):
+    """登录票据存储"""
+
+    @abstractmethod
+    def create(self, bk_token: str, expires_at: int, inactive_expires_at: int) -> None:
+        """记录新生成的登录票据"""
+        ...
+
+    @abstractmethod
+    def get(self, bk_token: str, expires_at: int) -> BkTokenInfo | None:
+        """获取登录票据状态，不存在则返回 None"""
+        ...
+
+    @abstractmethod
+    def refresh_inactive_expires_at(self, bk_token: str, expires_at: int, inactive_expires_at: int) -> None:
+        """刷新登录票据的无操作过期时间"""
+        ...
+
+    @abstractmethod
+    def set_logout(self, bk_token: str) -> None:
+        """将登录票据设置为已退出登录"""
+        ...
+
+
+class DatabaseBkTokenStore(BaseBkTokenStore):
+    """使用 DB 存储登录票据"""
+
+    def create(self, bk_token: str, expires_at: int, inactive_expires_at: int) -> None:
+        BkToken.objects.create(token=bk_token, inactive_expires_at=inactive_expires_at)
+
+    def get(self, bk_token: str, expires_at: int) -> BkTokenInfo | None:
+        bk_token_obj = BkToken.objects.filter(token=bk_token).only("is_logout", "inactive_expires_at").first()
+        if not bk_token_obj:
+            return None
+
+        return BkTokenInfo(is_logout=bk_token_obj.is_logout, inactive_expires_at=bk_token_obj.inactive_expires_at)
+
+    def refresh_inactive_expires_at(self, bk_token: str, expires_at: int, inactive_expires_at: int) -> None:
+        BkToken.objects.filter(token=bk_token).update(inactive_expires_at=inactive_expires_at)
+
+    def set_logout(self, bk_token: str) -> None:
+        BkToken.objects.filter(token=bk_token).update(is_logout=True)
+
+
+class RedisBkTokenStore(DatabaseBkTokenStore):
+    """
+    使用 Redis 存储登录票据，DB 作为持久化兜底
+
+    - 票据按摘要作为 Key 存储，过期时间与票据有效期一致，由 Redis 自动清理
+    - 票据的创建 / 注销 / 无操作有效期刷新都会同步写入 DB
+    - Redis 中不存在的票据（如切换存储方式前签发的）会回源 DB 查询并回填
+    - 退出登录使用单独的标记 Key 记录，避免与并发的回填 / 刷新操作相互覆盖，导致已注销的票据重新生效
+    - Redis 不可用时降级为直接使用 DB
+    """
+
+    key_prefix = "bk_token"
+    # 同一票据的并发刷新操作只需执行一次，锁的过期时间（秒）
+    refresh_lock_timeout = 60
+
+    def __init__(self):
+        self.cache = caches["redis"]
+        # 已注销标记需要保留到票据过期，票据有效期最长为 BK_TOKEN_COOKIE_AGE
+        self.logout_flag_timeout = settings.BK_TOKEN_COOKIE_AGE + settings.BK_TOKEN_OFFSET_ERROR_AGE
+
+    def create(self, bk_token: str, expires_at: int, inactive_expires_at: int) -> None:
+        super().create(bk_token, expires_at, inactive_expires_at)
+        self._set_info(bk_token, expires_at, BkTokenInfo(inactive_expires_at=inactive_expires_at))
+
+    def get(self, bk_token: str, expires_at: int) -> BkTokenInfo | None:
+        info_key, logout_key = self._make_info_key(bk_token), self._make_logout_key(bk_token)
+        try:
+            values = self.cache.get_many([info_key, logout_key])
+        except Exception:
+            logger.exception("failed to get bk_token from redis, fallback to database")
+            return super().get(bk_token, expires_at)
+
+        if values.get(logout_key):
+            return BkTokenInfo(is_logout=True)
+
+        if info := values.get(info_key):
+            return BkTokenInfo(**info)
+
+        # Redis 中不存在，则回源 DB 并回填
+        token_info = super().get(bk_token, expires_at)
+        if token_info:
+            if token_info.is_logout:
+                self._set_logout_flag(bk_token)
+            else:
+                self._set_info(bk_token, expires_at, token_info)
+
+        return token_info
+
+    def refresh_inactive_expires_at(self, bk_token: str, expires_at: int, inactive_expires_at: int) -> None:
+        # 合并同一票据的并发刷新，只有抢到锁的请求才需要执行写操作（Redis 不可用时，直接刷新 DB 中的记录）
+        try:
+            if not self.cache.add(self._make_refresh_lock_key(bk_token), 1, timeout=self.refresh_lock_timeout):
+                return
+        except Exception:
+            logger.exception("failed to acquire bk_token refresh lock from redis")
+
+        super().refresh_inactive_expires_at(bk_token, expires_at, inactive_expires_at)
+        self._set_info(bk_token, expires_at, BkTokenInfo(inactive_expires_at=inactive_expires_at))
+
+    def set_logout(self, bk_token: str) -> None:
+        super().set_logout(bk_token)
+        self._set_logout_flag(bk_token)
+        try:
+            self.cache.delete(self._make_info_key(bk_token))
+        except Exception:
+            logger.exception("failed to delete bk_token from redis")
+
+    def _set_info(self, bk_token: str, expires_at: int, token_info: BkTokenInfo):
+        # 票据过期后，Redis 中的记录也没有保留的必要
+        timeout = expires_at + settings.BK_TOKEN_OFFSET_ERROR_AGE - int(time.time())
+        if timeout <= 0:
+            return
+
+        try:
+            self.cache.set(self._make_info_key(bk_token), token_info.model_dump(), timeout=timeout)
+        except Exception:
+            logger.exception("failed to set bk_token to redis")
+
+    def _set_logout_flag(self, bk_token: str):
+        try:
+            self.cache.set(self._make_logout_key(bk_token), 1, timeout=self.logout_flag_timeout)
+        except Exception:
+            logger.exception("failed to set bk_token logout flag to redis")
+
+    def _make_info_key(self, bk_token: str) -> str:
+        # 票据为加密后的长字符串，使用摘要作为 Key 以减少内存占用
+        return f"{self.key_prefix}:{hashlib.sha256(bk_token.encode()).hexdigest()}"
+
+    def _make_logout_key(self, bk_token: str) -> str:
+        return f"{self._make_info_key(bk_token)}:logout"
+
+    def _make_refresh_lock_key(self, bk_token: str) -> str:
+        return f"{self._make_info_key(bk_token)}:refresh_lock"
+
+
+_STORE_CLASSES: Dict[str, type[BaseBkTokenStore]] = {
+    BkTokenStoreBackendEnum.DATABASE: DatabaseBkTokenStore,
+    BkTokenStoreBackendEnum.REDIS: RedisBkTokenStore,
+}
+
+
+def get_bk_token_store() -> BaseBkTokenStore:
+    """根据配置获取登录票据存储"""
+    backend = settings.BK_TOKEN_STORE_BACKEND
+    if backend not in _STORE_CLASSES:
+        raise ValueError(f"unsupported bk_token store backend: {backend}")
+
+    return _STORE_CLASSES[backend]()
@@ -82,6 +82,8 @@ class ErrorCodes:
 
     # 调用系统API异常
     REMOTE_REQUEST_ERROR = ErrorCode(_("调用系统API异常"))
+    # 被调用的系统不可用（请求失败或 5xx）
+    REMOTE_SERVICE_UNAVAILABLE = ErrorCode(_("被调用的系统不可用"))
 
 
 # 实例化一个全局对象
@@ -16,13 +16,16 @@
 # to the current version of the project delivered to anyone in the future.
 
 import logging
+import time
 from typing import Any, Callable, Dict, List
+from urllib.parse import urlencode
 
 from django.conf import settings
+from django.core.cache import cache
 from requests.auth import HTTPBasicAuth
 
 from bklogin.common.error_codes import error_codes
-from bklogin.component.http import HttpStatusCode, http_get, http_post
+from bklogin.component.http import HttpStatusCode, http_get, http_get_with_headers, http_post
 from bklogin.utils.url import urljoin
 
 from .models import GlobalSetting, IdpDetail, IdpInfo, TenantInfo, TenantUserDetailInfo, TenantUserInfo
@@ -37,12 +40,27 @@ def _call_bk_user_api(http_func, url_path: str, allow_error_status_func: Callabl
     kwargs.setdefault("auth", HTTPBasicAuth(settings.BK_USER_APP_CODE, settings.BK_USER_APP_SECRET))
 
     status, resp_data = http_func(url, **kwargs)
+    return _handle_bk_user_api_response(
+        http_func.__name__, url, url_path, status, resp_data, allow_error_status_func, **kwargs
+    )
+
+
+def _handle_bk_user_api_response(
+    http_func_name: str,
+    url: str,
+    url_path: str,
+    status: HttpStatusCode,
+    resp_data: Dict,
+    allow_error_status_func: Callable[[HttpStatusCode], bool],
+    **kwargs,
+):
+    """处理用户管理接口的响应，非预期的状态码会抛出异常"""
     if status.is_invalid:
         logger.error(
-            "bk_user api failed, %s %s, kwargs: %s, error: %s", http_func.__name__, url, kwargs, resp_data["error"]
+            "bk_user api failed, %s %s, kwargs: %s, error: %s", http_func_name, url, kwargs, resp_data["error"]
         )
         raise error_codes.REMOTE_REQUEST_ERROR.f(
-            f"request bk_user api fail! Request=[{http_func.__name__} {url_path} error={resp_data['error']}"
+            f"request bk_user api fail! Request=[{http_func_name} {url_path} error={resp_data['error']}"
         )
 
     # 对于预期内的状态码，这里不直接抛异常，直接返回
@@ -50,9 +68,9 @@ def _call_bk_user_api(http_func, url_path: str, allow_error_status_func: Callabl
         return resp_data
 
     error = resp_data.get("error")
-    logger.error("bk_user api error,  %s %s, data: %s, error: %s", http_func.__name__, url, kwargs, error)
+    logger.error("bk_user api error,  %s %s, data: %s, error: %s", http_func_name, url, kwargs, error)
     raise error_codes.REMOTE_REQUEST_ERROR.f(
-        f"request bk_user api error! " f"Request=[{http_func.__name__} {url_path} Response[error={error}]"
+        f"request bk_user api error! " f"Request=[{http_func_name} {url_path} Response[error={error}]"
     )
 
 
@@ -61,9 +79,46 @@ def _call_bk_user_api_20x(http_func, url_path: str, **kwargs):
     return _call_bk_user_api(http_func, url_path, allow_error_status_func=lambda s: False, **kwargs)["data"]
 
 
+def _call_bk_user_api_20x_with_cache(url_path: str, params: Dict[str, str] | None = None):
+    """
+    调用用户管理的登录页元数据接口（全局配置 / 租户 / 认证源），数据会缓存在进程内
+
+    缓存在 BK_USER_LOGIN_METADATA_CACHE_TTL 秒内直接使用，过期后携带 ETag 发起条件请求，
+    若用户管理返回 304（数据未变更），则继续使用缓存的数据，否则更新缓存
+    """
+    cache_key = f"bk_user_api:{url_path}?{urlencode(sorted((params or {}).items()))}"
+    cached = cache.get(cache_key)
+    if cached and cached["expires_at"] > time.time():
+        return cached["data"]
+
+    url = urljoin(settings.BK_USER_API_URL, url_path)
+    kwargs: Dict[str, Any] = {
+        "params": params or {},
+        "headers": {"If-None-Match": cached["etag"]} if cached and cached["etag"] else {},
+        # 内部 API 认证
+        "auth": HTTPBasicAuth(settings.BK_USER_APP_CODE, settings.BK_USER_APP_SECRET),
+    }
+    status, resp_data, resp_headers = http_get_with_headers(url, **kwargs)
+    resp_data = _handle_bk_user_api_response(
+        "http_get", url, url_path, status, resp_data, lambda s: bool(cached) and s.is_not_modified, **kwargs
+    )
+
+    if status.is_not_modified:
+        cached["expires_at"] = time.time() + settings.BK_USER_LOGIN_METADATA_CACHE_TTL
+    else:
+        cached = {
+            "etag": resp_headers.get("ETag", ""),
+            "data": resp_data["data"],
+            "expires_at": time.time() + settings.BK_USER_LOGIN_METADATA_CACHE_TTL,
+        }
+
+    cache.set(cache_key, cached)
+    return cached["data"]
+
+
 def get_global_setting() -> GlobalSetting:
     """查询全局配置"""
-    data = _call_bk_user_api_20x(http_get, "/api/v3/login/global-settings/")
+    data = _call_bk_user_api_20x_with_cache("/api/v3/login/global-settings/")
     return GlobalSetting(**data)
 
 
@@ -73,21 +128,21 @@ def list_tenant(tenant_ids: List[str] | None = None) -> List[TenantInfo]:
     if tenant_ids:
         params["tenant_ids"] = ",".join(tenant_ids)
 
-    data = _call_bk_user_api_20x(http_get, "/api/v3/login/tenants/", params=params)
+    data = _call_bk_user_api_20x_with_cache("/api/v3/login/tenants/", params=params)
     return [TenantInfo(**i) for i in data]
 
 
 def list_idp(tenant_id: str, idp_owner_tenant_id: str) -> List[IdpInfo]:
     """获取租户关联的认证源"""
-    data = _call_bk_user_api_20x(
-        http_get, f"/api/v3/login/tenants/{tenant_id}/idp-owner-tenants/{idp_owner_tenant_id}/idps/"
+    data = _call_bk_user_api_20x_with_cache(
+        f"/api/v3/login/tenants/{tenant_id}/idp-owner-tenants/{idp_owner_tenant_id}/idps/"
     )
     return [IdpInfo(**i) for i in data]
 
 
 def get_idp(idp_id: str) -> IdpDetail:
     """获取IDP信息"""
-    data = _call_bk_user_api_20x(http_get, f"/api/v3/login/idps/{idp_id}/")
+    data = _call_bk_user_api_20x_with_cache(f"/api/v3/login/idps/{idp_id}/")
     return IdpDetail(**data)
 
 
@@ -102,6 +157,24 @@ def list_matched_tencent_user(tenant_id: str, idp_id: str, idp_users: List[Dict[
 
 
 def get_tenant_user(tenant_user_id: str) -> TenantUserDetailInfo:
-    """通过租户用户ID获取租户用户信息"""
-    data = _call_bk_user_api_20x(http_get, f"/api/v3/login/tenant-users/{tenant_user_id}/")
-    return TenantUserDetailInfo(**data)
+    """
+    通过租户用户ID获取租户用户信息
+
+    :raises OBJECT_NOT_FOUND: 租户用户不存在（如已被删除）
+    :raises REMOTE_SERVICE_UNAVAILABLE: 用户管理不可用（请求失败或 5xx），调用方可据此降级
+    """
+    url_path = f"/api/v3/login/tenant-users/{tenant_user_id}/"
+    url = urljoin(settings.BK_USER_API_URL, url_path)
+    # 内部 API 认证
+    kwargs: Dict[str, Any] = {"auth": HTTPBasicAuth(settings.BK_USER_APP_CODE, settings.BK_USER_APP_SECRET)}
+
+    status, resp_data = http_get(url, **kwargs)
+    if status.is_not_found:
+        raise error_codes.OBJECT_NOT_FOUND.f(f"tenant user {tenant_user_id} not found")
+
+    if status.is_invalid or status.is_server_error:
+        logger.error("bk_user api unavailable, http_get %s, status: %s, data: %s", url, status.code, resp_data)
+        raise error_codes.REMOTE_SERVICE_UNAVAILABLE.f(f"request bk_user api fail! Request=[http_get {url_path}]")
+
+    data = _handle_bk_user_api_response("http_get", url, url_path, status, resp_data, lambda s: False, **kwargs)
+    return TenantUserDetailInfo(**data["data"])
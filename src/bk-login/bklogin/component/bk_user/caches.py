@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import logging
+import time
+from typing import List
+
+from django.conf import settings
+from django.core.cache import caches
+
+from bklogin.common.error_codes import error_codes
+from bklogin.utils.std_error import APIError
+
+from . import api as bk_user_api
+from .models import TenantUserDetailInfo
+
+logger = logging.getLogger(__name__)
+
+
+class TenantUserInfoCache:
+    """
+    租户用户信息缓存（兼容 API get_user 使用），存储在 Redis 中，多进程共享
+
+    - 缓存的 BK_USER_TENANT_USER_CACHE_TTL 秒内直接使用，不会调用用户管理接口
+    - 过期后的 BK_USER_TENANT_USER_CACHE_STALE_TTL 秒内（stale-while-revalidate），只有抢到刷新锁的请求会
+      调用用户管理接口刷新缓存，其他请求继续使用旧数据；用户管理不可用（请求失败或 5xx）时也会降级使用旧数据，
+      但若用户已不存在（404），则需要删除缓存，避免已删除的用户继续被使用
+    - 用户管理在用户信息变更后，可以主动通知使缓存失效（invalidate）
+    - Redis 不可用时降级为直接调用用户管理接口
+    """
+
+    key_prefix = "bk_user:tenant_user"
+    # 同一用户的并发刷新操作只需执行一次，锁的过期时间（秒）
+    refresh_lock_timeout = 10
+
+    def __init__(self):
+        self.cache = caches["redis"]
+
+    def get(self, tenant_user_id: str) -> TenantUserDetailInfo:
+        try:
+            value = self.cache.get(self._make_key(tenant_user_id))
+        except Exception:
+            logger.exception("failed to get tenant user %s from redis, fallback to bk_user api", tenant_user_id)
+            return bk_user_api.get_tenant_user(tenant_user_id)
+
+        if value is None:
+            return self._refresh(tenant_user_id)
+
+        user = TenantUserDetailInfo(**value["user"])
+        if value["fresh_until"] > time.time():
+            return user
+
+        # 已过期，合并同一用户的并发刷新，没有抢到锁的请求继续使用旧数据
+        if not self.cache.add(self._make_refresh_lock_key(tenant_user_id), 1, timeout=self.refresh_lock_timeout):
+            return user
+
+        try:
+            return self._refresh(tenant_user_id)
+        except APIError as e:
+            if e.code == error_codes.REMOTE_SERVICE_UNAVAILABLE.code:
+                logger.exception("failed to refresh tenant user %s, use stale data", tenant_user_id)
+                return user
+
+            if e.code == error_codes.OBJECT_NOT_FOUND.code:
+                self._evict(tenant_user_id)
+            raise
+
+    def invalidate(self, tenant_user_ids: List[str]) -> None:
+        """使租户用户信息缓存失效"""
+        self.cache.delete_many([self._make_key(i) for i in tenant_user_ids])
+
+    def _evict(self, tenant_user_id: str) -> None:
+        try:
+            self.cache.delete(self._make_key(tenant_user_id))
+        except Exception:
+            logger.exception("failed to delete tenant user %s from redis", tenant_user_id)
+
+    def _refresh(self, tenant_user_id: str) -> TenantUserDetailInfo:
+        user = bk_user_api.get_tenant_user(tenant_user_id)
+        try:
+            self.cache.set(
+                self._make_key(tenant_user_id),
+                {"user": user.model_dump(), "fresh_until": time.time() + settings.BK_USER_TENANT_USER_CACHE_TTL},
+                timeout=settings.BK_USER_TENANT_USER_CACHE_TTL + settings.BK_USER_TENANT_USER_CACHE_STALE_TTL,
+            )
+        except Exception:
+            logger.exception("failed to set tenant user %s to redis", tenant_user_id)
+
+        return user
+
+    def _make_key(self, tenant_user_id: str) -> str:
+        return f"{self.key_prefix}:{tenant_user_id}"
+
+    def _make_refresh_lock_key(self, tenant_user_id: str) -> str:
+        return f"{self.key_prefix}:refresh_lock:{tenant_user_id}"
@@ -17,7 +17,7 @@
 
 import logging
 import time
-from typing import Dict, Tuple
+from typing import Dict, Mapping, Tuple
 from urllib.parse import urlparse
 
 import requests
@@ -49,6 +49,10 @@ class HttpStatusCode:
     def is_success(self) -> bool:
         return 200 <= self.code <= 299  # noqa: PLR2004
 
+    @property
+    def is_not_modified(self) -> bool:
+        return self.code == 304  # noqa: PLR2004
+
     @property
     def is_redirect(self) -> bool:
         return 300 <= self.code <= 399  # noqa: PLR2004
@@ -81,17 +85,23 @@ INVALID_JSON_STATUS_CODE = HttpStatusCode(status_code=-2)
 
 
 def _http_request(method: str, url: str, **kwargs) -> Tuple[HttpStatusCode, Dict]:
+    status, data, _ = _http_request_with_headers(method, url, **kwargs)
+    return status, data
+
+
+def _http_request_with_headers(method: str, url: str, **kwargs) -> Tuple[HttpStatusCode, Dict, Mapping[str, str]]:
     """
     通用的Http接口请求，目前只支持JSON格式的Body数据返回，对于其他格式的返回，都认为是调用失败
     :param method: http请求method，大写，GET/POST/DELETE/PUT/PATCH/HEAD
     :param url: http 请求URL
     :param kwargs: 与Requests库一致的请求参数(params/json/data/headers/auth/verify/timeout等等)
-    :return http_status_code, response_body_data:
+    :return http_status_code, response_body_data, response_headers:
         只要是Response Body为json格式数据，都会返回有效的Http状态码，表示请求发送和接收成功，不关注业务逻辑
         - status_code < 0: 表示非预期请求，无效请求
-        - status_code > 0: 表示正常请求且Response Body为JSON格式的状态码
+        - status_code > 0: 表示正常请求且Response Body为JSON格式的状态码（304 Not Modified 无 Body，data 为空）
         - data: status_code < 0时，包含error字段，描述非预期请求的原因，
             status_code > 0时，则为经JSON解析后的Response Body数据
+        - headers: 响应头，status_code < 0 时为空
     """
     # 添加JSON Header
     headers = kwargs.get("headers") or {}
@@ -106,13 +116,13 @@ def _http_request(method: str, url: str, **kwargs) -> Tuple[HttpStatusCode, Dict
     st = time.time()
 
     if method not in ["GET", "POST", "DELETE", "PUT", "PATCH", "HEAD"]:
-        return INVALID_REQUEST_STATUS_CODE, {"error": f"request method - {method} not supported"}
+        return INVALID_REQUEST_STATUS_CODE, {"error": f"request method - {method} not supported"}, {}
 
     try:
         resp = session.request(method, url, **kwargs)
     except requests.exceptions.RequestException as e:
         logger.exception("http request error! %s %s, kwargs: %s", method, url, kwargs)
-        return INVALID_REQUEST_STATUS_CODE, {"error": str(e)}
+        return INVALID_REQUEST_STATUS_CODE, {"error": str(e)}, {}
 
     # 记录耗时，单位 ms
     latency = int((time.time() - st) * 1000)
@@ -120,9 +130,14 @@ def _http_request(method: str, url: str, **kwargs) -> Tuple[HttpStatusCode, Dict
     if latency > SLOW_REQUEST_LATENCY:
         logger.warning("http slow request! method: %s, url: %s, latency: %dms", method, url, latency)
 
+    # 条件请求（If-None-Match 等）命中时，响应没有 Body
+    status = HttpStatusCode(resp.status_code)
+    if status.is_not_modified:
+        return status, {}, resp.headers
+
     # 只支持JSON格式的Body数据返回
     try:
-        return HttpStatusCode(resp.status_code), resp.json()
+        return status, resp.json(), resp.headers
     except Exception as e:
         content = resp.content[:256] if resp.content else ""
         logger.exception(
@@ -142,6 +157,7 @@ def _http_request(method: str, url: str, **kwargs) -> Tuple[HttpStatusCode, Dict
                     f"{method} {urlparse(url).path}, response.body={content}, error:{e}"
                 )
             },
+            {},
         )
 
 
@@ -174,6 +190,10 @@ def http_get(url, **kwargs):
     return _http_request(method="GET", url=url, **kwargs)
 
 
+def http_get_with_headers(url, **kwargs):
+    return _http_request_with_headers(method="GET", url=url, **kwargs)
+
+
 def http_post(url, **kwargs):
     return _http_request(method="POST", url=url, **kwargs)
 
@@ -15,6 +15,8 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import base64
+import hmac
 from typing import Dict
 
 from django.conf import settings
@@ -37,6 +39,22 @@ class CompatibilityApiMixin:
         x_app_code = request.META.get("HTTP_X_APP_CODE")
         return bool(x_app_code == "esb" and x_app_token == settings.BK_PAAS_APP_SECRET)
 
+    @staticmethod
+    def is_request_from_bk_user(request):
+        """
+        请求是否来自用户管理（Basic 认证，使用用户管理的 AppCode / AppSecret）
+        """
+        auth = request.META.get("HTTP_AUTHORIZATION", "").split()
+        if len(auth) != 2 or auth[0].lower() != "basic":  # noqa: PLR2004
+            return False
+
+        try:
+            app_code, _, app_secret = base64.b64decode(auth[1]).decode("utf-8").partition(":")
+        except (ValueError, UnicodeDecodeError):
+            return False
+
+        return app_code == settings.BK_USER_APP_CODE and hmac.compare_digest(app_secret, settings.BK_USER_APP_SECRET)
+
     def fail_response(self, error_code: CompatibilityApiErrorCodeEnum, message: str) -> JsonResponse:
         code = CompatibilityApiErrorCodeMap[self.api_version][error_code]  # type: ignore
         if self.api_version == "v2":
@@ -17,10 +17,13 @@
 from typing import Dict
 
 from django.conf import settings
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import View
 
 from bklogin.authentication.manager import BkTokenManager
-from bklogin.component.bk_user import api as bk_user_api
+from bklogin.common.request import parse_request_body_json
+from bklogin.component.bk_user.caches import TenantUserInfoCache
 
 from .constants import CompatibilityApiErrorCodeEnum
 from .mixins import CompatibilityApiMixin
@@ -52,8 +55,8 @@ class UserRetrieveCompatibilityApi(View, CompatibilityApiMixin):
             if not (self.is_request_from_esb(request) and username):
                 return self.fail_response(error_code=CompatibilityApiErrorCodeEnum.PARAM_NOT_VALID, message=msg)
 
-        # 通过用户管理查询用户信息
-        user = bk_user_api.get_tenant_user(username)
+        # 通过用户管理查询用户信息（优先使用缓存）
+        user = TenantUserInfoCache().get(username)
 
         # Note: 与 self.username_key 不一样，区别在于 v3 API, 其 is_login 放回 bk_username, get_user 返回 username
         username_key = "bk_username" if self.api_version == "v2" else "username"
@@ -81,3 +84,23 @@ class UserRetrieveCompatibilityApi(View, CompatibilityApiMixin):
         user_info[role_key] = "0" if self.api_version == "v1" else 0
 
         return self.ok_response(data=user_info)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class TenantUserCacheInvalidateApi(View, CompatibilityApiMixin):
+    """用户管理在租户用户信息变更后，通知登录服务使缓存的用户信息失效"""
+
+    def post(self, request, *args, **kwargs):
+        if not self.is_request_from_bk_user(request):
+            return self.fail_response(
+                error_code=CompatibilityApiErrorCodeEnum.PARAM_NOT_VALID, message="invalid app_code/app_secret"
+            )
+
+        tenant_user_ids = parse_request_body_json(request.body).get("tenant_user_ids")
+        if not (isinstance(tenant_user_ids, list) and all(isinstance(i, str) for i in tenant_user_ids)):
+            return self.fail_response(
+                error_code=CompatibilityApiErrorCodeEnum.PARAM_NOT_VALID, message="tenant_user_ids must be str list"
+            )
+
+        TenantUserInfoCache().invalidate(tenant_user_ids)
+        return self.ok_response(data={})
@@ -26,6 +26,11 @@ urlpatterns = [
     path("api/v2/get_user/", compatibility_views.UserRetrieveCompatibilityApi.as_view(api_version="v2")),
     path("api/v3/is_login/", compatibility_views.TokenIntrospectCompatibilityApi.as_view(api_version="v3")),
     path("api/v3/get_user/", compatibility_views.UserRetrieveCompatibilityApi.as_view(api_version="v3")),
+    # 用户管理通知租户用户信息变更，使缓存失效（与 v2 API 的响应格式保持一致）
+    path(
+        "api/v2/invalidate_user_cache/",
+        compatibility_views.TenantUserCacheInvalidateApi.as_view(api_version="v2"),
+    ),
     # TODO: 新的 OpenAPI 后面统一接入 APIGateway，不支持直接调用，
     #  同时只提供给 APIGateway 做用户认证的接口与通用 OpenAPI 区分开
 ]
@@ -109,6 +109,81 @@ DATABASES = {
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# ------------------------------------------ 缓存配置 ------------------------------------------
+
+REDIS_HOST = env.str("REDIS_HOST", "localhost")
+REDIS_PORT = env.int("REDIS_PORT", 6379)
+REDIS_PASSWORD = env.str("REDIS_PASSWORD", "")
+REDIS_MAX_CONNECTIONS = env.int("REDIS_MAX_CONNECTIONS", 100)
+REDIS_DB = env.int("REDIS_DB", 0)
+
+REDIS_USE_SENTINEL = env.bool("REDIS_USE_SENTINEL", False)
+REDIS_SENTINEL_MASTER_NAME = env.str("REDIS_SENTINEL_MASTER_NAME", "master")
+REDIS_SENTINEL_PASSWORD = env.str("REDIS_SENTINEL_PASSWORD", "")
+# env[REDIS_SENTINEL_ADDR] format: "host1:port1,host2:port2"
+# REDIS_SENTINEL_ADDR value: ["host1:port1", "host2:port2"]
+REDIS_SENTINEL_ADDR = env.list("REDIS_SENTINEL_ADDR", default=[])
+
+CACHES: Dict[str, Any] = {
+    # 默认缓存是本地内存，使用最近最少使用（LRU）的淘汰策略，使用 pickle 序列化数据
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        # 多个本地内存缓存时才需要设置
+        "LOCATION": "",
+        # 默认过期时间：30 min
+        "TIMEOUT": 60 * 30,
+        # 缓存的 Key 前缀
+        "KEY_PREFIX": "bklogin",
+        # 内存缓存特有参数
+        "OPTIONS": {
+            # 支持缓存的 key 最多数量，越大将会占用更多内存
+            "MAX_ENTRIES": 1000,
+            # 当达到 MAX_ENTRIES 时被淘汰的部分条目，淘汰率是 1 / CULL_FREQUENCY，默认淘汰 1/3 的缓存 key
+            "CULL_FREQUENCY": 3,
+        },
+    },
+    "redis": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        # 若需要支持主从配置，则 LOCATION 为 List[master_url, slave_url]
+        "LOCATION": f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}",
+        # 默认过期时间：30 min
+        "TIMEOUT": 60 * 30,
+        # 缓存的 Key 前缀
+        "KEY_PREFIX": "bklogin",
+        "OPTIONS": {
+            # Sentinel 模式 django_redis.client.SentinelClient (django-redis>=5.0.0)
+            # 集群模式 django_redis.client.HerdClient
+            # 单实例模式 django_redis.client.DefaultClient
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "PASSWORD": REDIS_PASSWORD,
+            # socket 建立连接超时设置，单位秒
+            "SOCKET_CONNECT_TIMEOUT": 5,
+            # 连接建立后的读写操作超时设置，单位秒
+            "SOCKET_TIMEOUT": 5,
+            "IGNORE_EXCEPTIONS": False,
+            # Redis 连接池配置
+            "CONNECTION_POOL_KWARGS": {
+                # redis-py 默认不会关闭连接, 可能会造成连接过多，导致 Redis 无法服务，因此需要设置最大值连接数
+                "max_connections": REDIS_MAX_CONNECTIONS
+            },
+        },
+    },
+}
+
+# 当 Redis Cache 使用 IGNORE_EXCEPTIONS 时，设置指定的 logger 输出异常
+DJANGO_REDIS_LOGGER = "root"
+
+# redis sentinel
+if REDIS_USE_SENTINEL:
+    # Enable the alternate connection factory.
+    DJANGO_REDIS_CONNECTION_FACTORY = "django_redis.pool.SentinelConnectionFactory"
+    CACHES["redis"]["LOCATION"] = f"redis://{REDIS_SENTINEL_MASTER_NAME}/{REDIS_DB}"
+    CACHES["redis"]["OPTIONS"]["CLIENT_CLASS"] = "django_redis.client.SentinelClient"
+    # parse sentinel address from ["host1:port1", "host2:port2"] to [("host1", port1), ("host2", port2)]
+    CACHES["redis"]["OPTIONS"]["SENTINELS"] = [tuple(addr.split(":")) for addr in REDIS_SENTINEL_ADDR]
+    CACHES["redis"]["OPTIONS"]["SENTINEL_KWARGS"] = {"password": REDIS_SENTINEL_PASSWORD, "socket_timeout": 5}
+    CACHES["redis"]["OPTIONS"]["CONNECTION_POOL_CLASS"] = "redis.sentinel.SentinelConnectionPool"
+
 # Internationalization
 LANGUAGE_CODE = "zh-hans"
 LANGUAGE_COOKIE_NAME = "blueking_language"
@@ -200,11 +275,23 @@ BK_TOKEN_COOKIE_AGE = env.int("BK_LOGIN_COOKIE_AGE", default=60 * 60 * 24)
 BK_TOKEN_OFFSET_ERROR_AGE = env.int("BK_LOGIN_COOKIE_OFFSET_ERROR_AGE", default=60)
 # 无操作的失效期，默认2个小时. 长时间无操作, BkToken自动过期（Note: 调整为）
 BK_TOKEN_INACTIVE_AGE = env.int("BK_TOKEN_INACTIVE_AGE", default=60 * 60 * 2)
+# 无操作失效期的刷新阈值（秒），只有剩余的无操作有效期小于该值时才会刷新，避免每次校验登录态都产生写操作
+BK_TOKEN_INACTIVE_REFRESH_THRESHOLD = env.int("BK_TOKEN_INACTIVE_REFRESH_THRESHOLD", default=60 * 30)
+# 登录票据存储方式，可选值：database（仅 DB 存储）、redis（Redis 存储，DB 作为持久化兜底）
+# Note: redis 模式下，票据的创建 / 注销 / 无操作有效期刷新都会同步写入 DB，Redis 中不存在的票据会回源到 DB 查询，
+# 因此两种存储方式之间可以直接切换，存量的登录态不会失效
+BK_TOKEN_STORE_BACKEND = env.str("BK_TOKEN_STORE_BACKEND", default="database")
 
 # 用户管理相关信息
 BK_USER_APP_CODE = env.str("BK_USER_APP_CODE", default="bk_user")
 BK_USER_APP_SECRET = env.str("BK_USER_APP_SECRET")
 BK_USER_API_URL = env.str("BK_USER_API_URL", default="http://bk-user")
+# 登录页元数据（全局配置 / 租户 / 认证源）在进程内的缓存时间（秒），过期后会基于 ETag 向用户管理确认数据是否有变更
+BK_USER_LOGIN_METADATA_CACHE_TTL = env.int("BK_USER_LOGIN_METADATA_CACHE_TTL", default=30)
+# 租户用户信息（兼容 API get_user 使用）在 Redis 中的缓存时间（秒）
+BK_USER_TENANT_USER_CACHE_TTL = env.int("BK_USER_TENANT_USER_CACHE_TTL", default=60)
+# 租户用户信息缓存过期后，仍可返回旧数据（同时刷新缓存）的时间（秒），用户管理不可用时也会降级使用旧数据
+BK_USER_TENANT_USER_CACHE_STALE_TTL = env.int("BK_USER_TENANT_USER_CACHE_STALE_TTL", default=60 * 10)
 
 # bk apigw url tmpl
 BK_API_URL_TMPL = env.str("BK_API_URL_TMPL", default="")
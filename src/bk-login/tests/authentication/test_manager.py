@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+import time
+from unittest import mock
+from urllib.parse import unquote_plus
+
+import pytest
+from bklogin.authentication.manager import BkTokenManager
+from bklogin.authentication.models import BkToken
+from bklogin.authentication.stores import RedisBkTokenStore
+from django.core.cache import caches
+from django.test.utils import override_settings
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(params=["database", "redis"])
+def _bk_token_store_backend(request):
+    with override_settings(BK_TOKEN_STORE_BACKEND=request.param):
+        yield
+
+
+@pytest.mark.usefixtures("_bk_token_store_backend")
+class TestBkTokenManager:
+    def test_generate_and_valid(self):
+        bk_token, _ = BkTokenManager().generate("admin")
+
+        ok, username, _ = BkTokenManager().is_valid(bk_token)
+        assert ok
+        assert username == "admin"
+
+    def test_not_exists(self):
+        bk_token, _ = BkTokenManager().generate("admin")
+        BkToken.objects.filter(token=unquote_plus(bk_token)).delete()
+        caches["redis"].clear()
+
+        ok, _, _ = BkTokenManager().is_valid(bk_token)
+        assert not ok
+
+    def test_set_invalid(self):
+        bk_token, _ = BkTokenManager().generate("admin")
+        assert BkTokenManager().is_valid(bk_token)[0]
+
+        BkTokenManager.set_invalid(bk_token)
+
+        ok, _, msg = BkTokenManager().is_valid(bk_token)
+        assert not ok
+        assert msg == "登录态已注销"
+        assert BkToken.objects.get(token=unquote_plus(bk_token)).is_logout
+
+    def test_skip_refresh_inactive_expires_at(self):
+        """剩余无操作有效期大于阈值时，不会刷新"""
+        bk_token, _ = BkTokenManager().generate("admin")
+        origin_inactive_expires_at = BkToken.objects.get(token=unquote_plus(bk_token)).inactive_expires_at
+
+        with override_settings(BK_TOKEN_INACTIVE_REFRESH_THRESHOLD=0):
+            assert BkTokenManager().is_valid(bk_token)[0]
+
+        assert BkToken.objects.get(token=unquote_plus(bk_token)).inactive_expires_at == origin_inactive_expires_at
+
+    def test_refresh_inactive_expires_at(self):
+        """剩余无操作有效期小于阈值时，会刷新并持久化到 DB"""
+        bk_token, _ = BkTokenManager().generate("admin")
+        BkToken.objects.filter(token=unquote_plus(bk_token)).update(inactive_expires_at=int(time.time()) - 10)
+        caches["redis"].clear()
+
+        manager = BkTokenManager()
+        assert manager.is_valid(bk_token)[0]
+
+        inactive_expires_at = BkToken.objects.get(token=unquote_plus(bk_token)).inactive_expires_at
+        assert inactive_expires_at >= int(time.time()) + manager.inactive_age - 1
+
+
+class TestRedisBkTokenStore:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        caches["redis"].clear()
+
+    def test_fallback_to_database(self):
+        """切换存储方式前签发（仅在 DB 中存在）的票据，依然有效，且会回填到 Redis 中"""
+        expires_at = int(time.time()) + 60
+        BkToken.objects.create(token="legacy-token", inactive_expires_at=expires_at)
+
+        store = RedisBkTokenStore()
+        token_info = store.get("legacy-token", expires_at)
+        assert token_info
+        assert token_info.inactive_expires_at == expires_at
+
+        # 回填后，不再需要查询 DB
+        BkToken.objects.filter(token="legacy-token").delete()
+        assert store.get("legacy-token", expires_at) == token_info
+
+    def test_logout_not_overwritten_by_refresh(self):
+        """已注销的票据，不会因为并发的刷新操作而重新生效"""
+        expires_at = int(time.time()) + 60
+        store = RedisBkTokenStore()
+        store.create("token", expires_at, expires_at)
+
+        store.set_logout("token")
+        store.refresh_inactive_expires_at("token", expires_at, expires_at + 60)
+
+        token_info = store.get("token", expires_at)
+        assert token_info
+        assert token_info.is_logout
+
+    def test_coalesce_refresh(self, django_assert_num_queries):
+        """同一票据的并发刷新只会写一次 DB"""
+        expires_at = int(time.time()) + 60
+        store = RedisBkTokenStore()
+        store.create("token", expires_at, expires_at)
+
+        with django_assert_num_queries(1):
+            store.refresh_inactive_expires_at("token", expires_at, expires_at + 10)
+            store.refresh_inactive_expires_at("token", expires_at, expires_at + 20)
+
+        assert BkToken.objects.get(token="token").inactive_expires_at == expires_at + 10
+
+    def test_redis_unavailable(self):
+        """Redis 不可用时，票据的签发 / 刷新 / 注销 / 查询均降级为直接使用 DB"""
+        expires_at = int(time.time()) + 60
+        store = RedisBkTokenStore()
+
+        with mock.patch.multiple(
+            store.cache,
+            get_many=mock.Mock(side_effect=RedisConnectionError),
+            set=mock.Mock(side_effect=RedisConnectionError),
+            add=mock.Mock(side_effect=RedisConnectionError),
+            delete=mock.Mock(side_effect=RedisConnectionError),
+        ):
+            store.create("token", expires_at, expires_at)
+            store.refresh_inactive_expires_at("token", expires_at, expires_at + 10)
+            assert BkToken.objects.get(token="token").inactive_expires_at == expires_at + 10
+
+            store.set_logout("token")
+            token_info = store.get("token", expires_at)
+
+        assert token_info
+        assert token_info.is_logout
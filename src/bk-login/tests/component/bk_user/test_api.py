@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+from unittest import mock
+
+import pytest
+from bklogin.common.error_codes import error_codes
+from bklogin.component.bk_user import api as bk_user_api
+from bklogin.component.http import HttpStatusCode
+from bklogin.utils.std_error import APIError
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+TENANTS = [{"id": "default", "name": "Default", "logo": "", "collaboration_tenants": []}]
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def mocked_http_get():
+    with mock.patch.object(bk_user_api, "http_get_with_headers") as mocked:
+        mocked.return_value = (HttpStatusCode(200), {"data": TENANTS}, {"ETag": '"v1"'})
+        yield mocked
+
+
+class TestLoginMetadataCache:
+    def test_use_cache_before_expired(self, mocked_http_get):
+        assert bk_user_api.list_tenant()[0].id == "default"
+        assert bk_user_api.list_tenant()[0].id == "default"
+
+        assert mocked_http_get.call_count == 1
+        assert mocked_http_get.call_args.kwargs["headers"] == {}
+
+    def test_different_params(self, mocked_http_get):
+        bk_user_api.list_tenant()
+        bk_user_api.list_tenant(["default"])
+
+        assert mocked_http_get.call_count == 2  # noqa: PLR2004
+
+    @override_settings(BK_USER_LOGIN_METADATA_CACHE_TTL=0)
+    def test_revalidate_not_modified(self, mocked_http_get):
+        bk_user_api.list_tenant()
+
+        mocked_http_get.return_value = (HttpStatusCode(304), {}, {"ETag": '"v1"'})
+        assert bk_user_api.list_tenant()[0].name == "Default"
+        assert mocked_http_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+    @override_settings(BK_USER_LOGIN_METADATA_CACHE_TTL=0)
+    def test_revalidate_modified(self, mocked_http_get):
+        bk_user_api.list_tenant()
+
+        mocked_http_get.return_value = (
+            HttpStatusCode(200),
+            {"data": [{**TENANTS[0], "name": "New"}]},
+            {"ETag": '"v2"'},
+        )
+        assert bk_user_api.list_tenant()[0].name == "New"
+
+        bk_user_api.list_tenant()
+        assert mocked_http_get.call_args.kwargs["headers"] == {"If-None-Match": '"v2"'}
+
+    def test_error_not_cached(self, mocked_http_get):
+        mocked_http_get.return_value = (HttpStatusCode(500), {"error": "internal error"}, {})
+        with pytest.raises(Exception, match="request bk_user api error"):
+            bk_user_api.list_tenant()
+
+        mocked_http_get.return_value = (HttpStatusCode(200), {"data": TENANTS}, {"ETag": '"v1"'})
+        assert bk_user_api.list_tenant()[0].id == "default"
+
+
+class TestGetTenantUser:
+    @pytest.mark.parametrize(
+        ("status_code", "error_code"),
+        [
+            (404, error_codes.OBJECT_NOT_FOUND.code),
+            (-1, error_codes.REMOTE_SERVICE_UNAVAILABLE.code),
+            (502, error_codes.REMOTE_SERVICE_UNAVAILABLE.code),
+            (403, error_codes.REMOTE_REQUEST_ERROR.code),
+        ],
+    )
+    def test_error(self, status_code, error_code):
+        mocked_resp = (HttpStatusCode(status_code), {"error": "err"})
+        with mock.patch.object(bk_user_api, "http_get", return_value=mocked_resp), pytest.raises(APIError) as exc_info:
+            bk_user_api.get_tenant_user("zhangsan")
+
+        assert exc_info.value.code == error_code
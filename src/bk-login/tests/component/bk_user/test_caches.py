@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+from unittest import mock
+
+import pytest
+from bklogin.common.error_codes import error_codes
+from bklogin.component.bk_user.caches import TenantUserInfoCache
+from bklogin.component.bk_user.models import TenantUserDetailInfo
+from bklogin.utils.std_error import APIError
+from django.core.cache import caches
+from django.test.utils import override_settings
+
+
+def _gen_user(full_name: str = "张三") -> TenantUserDetailInfo:
+    return TenantUserDetailInfo(
+        id="zhangsan",
+        username="zhangsan",
+        full_name=full_name,
+        display_name=full_name,
+        tenant_id="default",
+        language="zh-cn",
+        time_zone="Asia/Shanghai",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    caches["redis"].clear()
+    yield
+    caches["redis"].clear()
+
+
+@pytest.fixture
+def mocked_get_tenant_user():
+    with mock.patch("bklogin.component.bk_user.api.get_tenant_user", return_value=_gen_user()) as mocked:
+        yield mocked
+
+
+class TestTenantUserInfoCache:
+    def test_get_with_cache(self, mocked_get_tenant_user):
+        assert TenantUserInfoCache().get("zhangsan").full_name == "张三"
+        assert TenantUserInfoCache().get("zhangsan").full_name == "张三"
+
+        assert mocked_get_tenant_user.call_count == 1
+
+    @override_settings(BK_USER_TENANT_USER_CACHE_TTL=0)
+    def test_stale_while_revalidate(self, mocked_get_tenant_user):
+        TenantUserInfoCache().get("zhangsan")
+
+        mocked_get_tenant_user.return_value = _gen_user("李四")
+        # 抢到刷新锁的请求刷新缓存
+        assert TenantUserInfoCache().get("zhangsan").full_name == "李四"
+
+        # 刷新锁未释放，其他请求继续使用旧数据
+        mocked_get_tenant_user.return_value = _gen_user("王五")
+        assert TenantUserInfoCache().get("zhangsan").full_name == "李四"
+        assert mocked_get_tenant_user.call_count == 2  # noqa: PLR2004
+
+    @override_settings(BK_USER_TENANT_USER_CACHE_TTL=0)
+    def test_use_stale_when_refresh_failed(self, mocked_get_tenant_user):
+        TenantUserInfoCache().get("zhangsan")
+
+        mocked_get_tenant_user.side_effect = error_codes.REMOTE_SERVICE_UNAVAILABLE
+        assert TenantUserInfoCache().get("zhangsan").full_name == "张三"
+
+    @override_settings(BK_USER_TENANT_USER_CACHE_TTL=0)
+    def test_evict_when_user_not_found(self, mocked_get_tenant_user):
+        TenantUserInfoCache().get("zhangsan")
+
+        # 用户已被删除，不能降级使用旧数据，且需要删除缓存
+        mocked_get_tenant_user.side_effect = error_codes.OBJECT_NOT_FOUND
+        with pytest.raises(APIError):
+            TenantUserInfoCache().get("zhangsan")
+
+        assert caches["redis"].get(TenantUserInfoCache()._make_key("zhangsan")) is None
+
+    @override_settings(BK_USER_TENANT_USER_CACHE_TTL=0)
+    def test_not_use_stale_when_request_error(self, mocked_get_tenant_user):
+        TenantUserInfoCache().get("zhangsan")
+
+        mocked_get_tenant_user.side_effect = error_codes.REMOTE_REQUEST_ERROR
+        with pytest.raises(APIError):
+            TenantUserInfoCache().get("zhangsan")
+
+    def test_invalidate(self, mocked_get_tenant_user):
+        TenantUserInfoCache().get("zhangsan")
+
+        mocked_get_tenant_user.return_value = _gen_user("李四")
+        TenantUserInfoCache().invalidate(["zhangsan"])
+        assert TenantUserInfoCache().get("zhangsan").full_name == "李四"
+
+    def test_fallback_when_redis_unavailable(self, mocked_get_tenant_user):
+        with mock.patch.object(caches["redis"], "get", side_effect=Exception("redis unavailable")):
+            assert TenantUserInfoCache().get("zhangsan").full_name == "张三"
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from bklogin.idp_plugins.exceptions import RequestAPIError
+from bklogin.idp_plugins.wecom.client import WeComAPIClient
+from django.core.cache import caches
+
+
+class WeComStubServer(ThreadingHTTPServer):
+    """本地的企业微信接口桩服务，按顺序签发 AccessToken，并记录 gettoken 调用次数"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), WeComStubHandler)
+        self.gettoken_calls = 0
+        # 当前有效的 AccessToken，为空表示所有 AccessToken 都有效
+        self.valid_access_tokens: List[str] = []
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/cgi-bin"
+
+    def issue_access_token(self) -> str:
+        self.gettoken_calls += 1
+        access_token = f"token_{self.gettoken_calls}"
+        self.valid_access_tokens = [access_token]
+        return access_token
+
+
+class WeComStubHandler(BaseHTTPRequestHandler):
+    server: WeComStubServer
+
+    def do_GET(self):  # noqa: N802
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/cgi-bin/gettoken":
+            data: Dict[str, Any] = {"errcode": 0, "access_token": self.server.issue_access_token(), "expires_in": 7200}
+        elif url.path == "/cgi-bin/auth/getuserinfo":
+            if params["access_token"] not in self.server.valid_access_tokens:
+                data = {"errcode": 40014, "errmsg": "invalid access_token"}
+            else:
+                data = {"errcode": 0, "userid": f"user_of_{params['code']}"}
+        else:
+            data = {"errcode": 404, "errmsg": "not found"}
+
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = WeComStubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    with mock.patch("bklogin.idp_plugins.wecom.client.WECOM_API_BASE_URL", server.base_url):
+        yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    caches["redis"].clear()
+    yield
+    caches["redis"].clear()
+
+
+def _gen_client(secret: str = "secret") -> WeComAPIClient:
+    return WeComAPIClient(corp_id="corp_id", agent_id="agent_id", secret=secret)
+
+
+class TestWeComAPIClient:
+    def test_access_token_cached(self, stub_server):
+        assert _gen_client().access_token == "token_1"
+        # 多个 Client（如：多个请求 / 进程）共享缓存的 AccessToken
+        assert _gen_client().access_token == "token_1"
+        assert stub_server.gettoken_calls == 1
+
+    def test_access_token_cache_timeout(self, stub_server):
+        assert _gen_client().access_token == "token_1"
+
+        ttl = caches["redis"].ttl(_gen_client()._access_token_cache_key)
+        # 缓存过期时间 = 有效期 - 安全时间
+        assert 7200 - 300 - 5 <= ttl <= 7200 - 300
+
+    def test_secret_changed(self, stub_server):
+        assert _gen_client().access_token == "token_1"
+
+        assert _gen_client(secret="new_secret").access_token == "token_2"
+
+    def test_get_user_id_by_code(self, stub_server):
+        client = _gen_client()
+        assert client.get_user_id_by_code("code1") == "user_of_code1"
+        assert client.get_user_id_by_code("code2") == "user_of_code2"
+        assert stub_server.gettoken_calls == 1
+
+    def test_retry_with_invalid_access_token(self, stub_server):
+        client = _gen_client()
+        assert client.access_token == "token_1"
+
+        # AccessToken 被其他服务刷新，缓存中的 AccessToken 失效
+        stub_server.valid_access_tokens = []
+        assert client.get_user_id_by_code("code") == "user_of_code"
+        assert stub_server.gettoken_calls == 2  # noqa: PLR2004
+        assert client.access_token == "token_2"
+
+    def test_concurrent_refresh(self, stub_server):
+        results: List[str] = []
+        threads = [threading.Thread(target=lambda: results.append(_gen_client().access_token)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == ["token_1"] * 8
+        assert stub_server.gettoken_calls == 1
+
+    def test_request_failed(self, stub_server):
+        with mock.patch(
+            "bklogin.idp_plugins.wecom.client.WECOM_API_BASE_URL", "http://127.0.0.1:1/cgi-bin"
+        ), pytest.raises(RequestAPIError):
+            _gen_client().get_user_id_by_code("code")
+
+    @pytest.mark.parametrize("failed_method", ["get", "add", "set", "delete"])
+    def test_cache_unavailable(self, stub_server, failed_method):
+        """缓存不可用时，降级为直接调用接口获取 AccessToken"""
+        with mock.patch.object(caches["redis"], failed_method, side_effect=Exception("redis unavailable")):
+            assert _gen_client().get_user_id_by_code("code") == "user_of_code"
+
+    def test_fetch_directly_when_cache_unavailable(self, stub_server):
+        with mock.patch.object(caches["redis"], "get", side_effect=Exception("redis unavailable")), mock.patch.object(
+            caches["redis"], "add", side_effect=Exception("redis unavailable")
+        ):
+            assert _gen_client().access_token == "token_1"
+            assert _gen_client().access_token == "token_2"
+
+        assert stub_server.gettoken_calls == 2  # noqa: PLR2004
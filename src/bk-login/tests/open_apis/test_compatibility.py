@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import base64
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.test import Client
+
+INVALIDATE_USER_CACHE_URL = "/login/api/v2/invalidate_user_cache/"
+
+
+def _gen_basic_auth(username: str, password: str) -> str:
+    return "Basic " + base64.b64encode(f"{username}:{password}".encode()).decode()
+
+
+@pytest.fixture
+def mocked_invalidate():
+    with mock.patch("bklogin.component.bk_user.caches.TenantUserInfoCache.invalidate") as mocked:
+        yield mocked
+
+
+class TestTenantUserCacheInvalidateApi:
+    def test_standard(self, mocked_invalidate):
+        resp = Client().post(
+            INVALIDATE_USER_CACHE_URL,
+            data={"tenant_user_ids": ["zhangsan", "lisi"]},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=_gen_basic_auth(settings.BK_USER_APP_CODE, settings.BK_USER_APP_SECRET),
+        )
+
+        assert resp.json()["result"]
+        assert resp.json()["bk_error_code"] == 0
+        mocked_invalidate.assert_called_once_with(["zhangsan", "lisi"])
+
+    @pytest.mark.parametrize(
+        "authorization",
+        ["", "Basic invalid", _gen_basic_auth("bk_user", "invalid_secret"), _gen_basic_auth("other", "x")],
+    )
+    def test_invalid_auth(self, mocked_invalidate, authorization):
+        resp = Client().post(
+            INVALIDATE_USER_CACHE_URL,
+            data={"tenant_user_ids": ["zhangsan"]},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=authorization,
+        )
+
+        assert not resp.json()["result"]
+        mocked_invalidate.assert_not_called()
+
+    def test_invalid_tenant_user_ids(self, mocked_invalidate):
+        resp = Client().post(
+            INVALIDATE_USER_CACHE_URL,
+            data={"tenant_user_ids": "zhangsan"},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=_gen_basic_auth(settings.BK_USER_APP_CODE, settings.BK_USER_APP_SECRET),
+        )
+
+        assert not resp.json()["result"]
+        mocked_invalidate.assert_not_called()
@@ -14,8 +14,15 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+from hashlib import md5
+
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from django.utils.translation import get_language
 from rest_framework.permissions import IsAuthenticated
 
+from bkuser.apps.tenant.caches import TenantMetadataCache
+
 from .authentications import BkUserAppAuthentication
 
 
@@ -27,3 +34,29 @@ class LoginApiAccessControlMixin:
 
     authentication_classes = [BkUserAppAuthentication]
     permission_classes = [IsAuthenticated]
+
+
+class LoginMetadataETagMixin:
+    """
+    登录页元数据（全局配置 / 租户 / 认证源）的 ETag 支持
+
+    ETag 基于租户元数据版本号计算（租户 / 数据源 / 协同策略 / 认证源变更后版本号都会更新），
+    调用方携带 If-None-Match 请求且数据未变更时，直接返回 304，无需查询 DB
+    """
+
+    def get(self, request, *args, **kwargs):
+        etag = self._gen_etag(request)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return HttpResponseNotModified(headers={"ETag": etag})
+
+        response = super().get(request, *args, **kwargs)  # type: ignore
+        if response.status_code == 200:  # noqa: PLR2004
+            response["ETag"] = etag
+
+        return response
+
+    @staticmethod
+    def _gen_etag(request) -> str:
+        # 数据中可能包含国际化字段（如：租户名称），因此语言不同，ETag 也需要不同
+        raw = f"{TenantMetadataCache.get_generation()}:{get_language()}:{request.get_full_path()}"
+        return quote_etag(md5(raw.encode()).hexdigest())
@@ -32,7 +32,7 @@ from bkuser.apps.tenant.models import CollaborationStrategy, Tenant, TenantUser
 from bkuser.biz.idp import AuthenticationMatcher
 from bkuser.common.error_codes import error_codes
 
-from .mixins import LoginApiAccessControlMixin
+from .mixins import LoginApiAccessControlMixin, LoginMetadataETagMixin
 from .serializers import (
     GlobalSettingOutputSLZ,
     IdpListOutputSLZ,
@@ -47,7 +47,7 @@ from .serializers import (
 )
 
 
-class GlobalSettingListApi(LoginApiAccessControlMixin, generics.ListAPIView):
+class GlobalSettingListApi(LoginApiAccessControlMixin, LoginMetadataETagMixin, generics.ListAPIView):
     pagination_class = None
 
     @staticmethod
@@ -88,7 +88,7 @@ class GlobalSettingListApi(LoginApiAccessControlMixin, generics.ListAPIView):
 
         return idp
 
-    def get(self, request, *args, **kwargs):
+    def list(self, request, *args, **kwargs):
         return Response(
             GlobalSettingOutputSLZ(
                 {
@@ -131,7 +131,7 @@ class LocalUserCredentialAuthenticateApi(LoginApiAccessControlMixin, generics.Cr
         return Response(LocalUserCredentialAuthenticateOutputSLZ(instance=matched_users, many=True).data)
 
 
-class TenantListApi(LoginApiAccessControlMixin, generics.ListAPIView):
+class TenantListApi(LoginApiAccessControlMixin, LoginMetadataETagMixin, generics.ListAPIView):
     pagination_class = None
     serializer_class = TenantListOutputSLZ
 
@@ -170,13 +170,10 @@ class TenantListApi(LoginApiAccessControlMixin, generics.ListAPIView):
         return queryset
 
 
-class IdpListApi(LoginApiAccessControlMixin, generics.ListAPIView):
+class IdpListApi(LoginApiAccessControlMixin, LoginMetadataETagMixin, generics.ListAPIView):
     pagination_class = None
     serializer_class = IdpListOutputSLZ
 
-    def get_serializer_context(self) -> Dict[str, Any]:
-        return {"data_source_type_map": {ds["id"]: ds["type"] for ds in DataSource.objects.values("id", "type")}}
-
     def get_queryset(self):
         tenant_id = self.kwargs["tenant_id"]
         idp_owner_tenant_id = self.kwargs["idp_owner_tenant_id"]
@@ -204,8 +201,16 @@ class IdpListApi(LoginApiAccessControlMixin, generics.ListAPIView):
 
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        idps = list(self.get_queryset())
+        # 只需要查询认证源关联的数据源，避免全量加载数据源
+        data_source_type_map = dict(
+            DataSource.objects.filter(id__in={idp.data_source_id for idp in idps}).values_list("id", "type")
+        )
+        return Response(IdpListOutputSLZ(idps, many=True, context={"data_source_type_map": data_source_type_map}).data)
+
 
-class IdpRetrieveApi(LoginApiAccessControlMixin, generics.RetrieveAPIView):
+class IdpRetrieveApi(LoginApiAccessControlMixin, LoginMetadataETagMixin, generics.RetrieveAPIView):
     serializer_class = IdpRetrieveOutputSLZ
     queryset = Idp.objects.all()
     lookup_field = "id"
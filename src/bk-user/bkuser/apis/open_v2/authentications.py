@@ -16,24 +16,41 @@
 # to the current version of the project delivered to anyone in the future.
 
 import base64
+import hashlib
 import logging
+import time
 from typing import Any, Dict
 
 import jwt
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from prometheus_client import Counter
 from rest_framework import exceptions
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.request import Request
 
-from bkuser.common.cache import cachedmethod
+from bkuser.common.cache import Cache, CacheEnum, CacheKeyPrefixEnum, cachedmethod
 from bkuser.common.constants import BKNonEntityUser
 from bkuser.component import esb
 
 logger = logging.getLogger(__name__)
 
+# 开放 API 认证缓存的命中情况，cache: jwt / user，result: hit / miss
+open_api_auth_cache_counter = Counter(
+    "bkuser_open_api_auth_cache_total",
+    "Hit / miss count of the open api authentication cache",
+    ["cache", "result"],
+)
+
 
 class ESBAuthentication(BaseAuthentication):
+    # JWT 校验结果 & Django User 缓存在独立的进程内存缓存中（LRU 淘汰，容量有限），避免每次请求都要 RSA 验签 & 查询 DB
+    cache = Cache(CacheEnum.OPEN_API_AUTH, CacheKeyPrefixEnum.OPEN_API_AUTHENTICATION)
+    # JWT 校验结果的最长缓存时间（秒），实际缓存时间不会超过 JWT 本身的过期时间
+    jwt_cache_max_timeout = 60 * 5
+    # Django User 缓存时间（秒）
+    user_cache_timeout = 60 * 10
+
     def authenticate(self, request):
         """
         认证凭证信息，返回认证后的 Django User，同时设置 request.bk_app_code 便于后续鉴权判断请求来源
@@ -68,15 +85,36 @@ class ESBAuthentication(BaseAuthentication):
         return None
 
     def verify_credentials(self, credentials: Dict[str, str]) -> Dict[str, Any] | None:
-        """JWT 校验并解析出调用方信息"""
+        """JWT 校验并解析出调用方信息，校验通过的结果会被缓存直到 JWT 过期"""
+        # 不同来源使用的 Public Key 不同，因此缓存 Key 需要包含来源
+        cache_key = "jwt:" + hashlib.sha256(f"{credentials['from']}:{credentials['jwt']}".encode()).hexdigest()
+        if jwt_payload := self.cache.get(cache_key):
+            open_api_auth_cache_counter.labels(cache="jwt", result="hit").inc()
+            return jwt_payload
+
+        open_api_auth_cache_counter.labels(cache="jwt", result="miss").inc()
+
         public_key = self._get_jwt_public_key(credentials["from"])
         # Note: 不从 jwt header 里取 kid 判断是网关还是 ESB 签发的，在不同环境可能不准确
         jwt_payload = self._decode_jwt(credentials["jwt"], public_key)
         if not jwt_payload:
             return None
 
+        if (timeout := self._get_jwt_cache_timeout(jwt_payload)) > 0:
+            self.cache.set(cache_key, jwt_payload, timeout=timeout)
+
         return jwt_payload
 
+    def _get_jwt_cache_timeout(self, jwt_payload: Dict[str, Any]) -> int:
+        """JWT 校验结果的缓存时间，不能超过 JWT 的过期时间"""
+        if "exp" not in jwt_payload:
+            return self.jwt_cache_max_timeout
+
+        try:
+            return min(int(jwt_payload["exp"]) - int(time.time()), self.jwt_cache_max_timeout)
+        except (TypeError, ValueError):
+            return 0
+
     def _decode_jwt(self, content: str, public_key: str) -> Dict[str, Any] | None:
         """解析 JWT"""
         try:
@@ -122,10 +160,18 @@ class ESBAuthentication(BaseAuthentication):
 
     def _get_or_create_user(self, username):
         """获取或创建标准  Django User，用于通过认证"""
+        cache_key = f"user:{username}"
+        if user := self.cache.get(cache_key):
+            open_api_auth_cache_counter.labels(cache="user", result="hit").inc()
+            return user
+
+        open_api_auth_cache_counter.labels(cache="user", result="miss").inc()
+
         user_model = get_user_model()
         user, _ = user_model.objects.get_or_create(
             username=username, defaults={"is_active": True, "is_staff": False, "is_superuser": False}
         )
+        self.cache.set(cache_key, user, timeout=self.user_cache_timeout)
         return user
 
     def _get_apigw_public_key(self) -> str:
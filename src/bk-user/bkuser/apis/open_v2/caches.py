@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import hashlib
+import json
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, List
+
+from django.conf import settings
+from redis.exceptions import LockNotOwnedError  # type: ignore
+
+from bkuser.apps.data_source.caches import DataSourceRelationGeneration
+from bkuser.common.cache import Cache, CacheEnum, CacheKeyPrefixEnum
+from bkuser.utils.uuid import generate_uuid
+
+
+class RelationListCache:
+    """
+    兼容 v2 OpenAPI 全量（no_page）关系数据缓存
+
+    缓存以租户为单位，Key 中包含租户关联的各数据源的关系数据版本号，
+    关系数据变更（数据源同步 / 租户同步 / 页面编辑）后版本号更新，缓存即失效，不会返回过期的数据
+
+    - 缓存数据按块压缩后存储，避免单个 Redis Value 过大
+    - 缓存到达刷新时间后，仅由获取到锁的单个请求负责重建（single-flight），其他请求继续使用旧数据
+    - 缓存不存在时，同样仅由获取到锁的请求负责构建，其他请求等待构建完成后直接读取缓存
+    """
+
+    # 构建缓存的锁超时时间（秒），避免构建异常导致锁无法释放
+    lock_timeout = 60
+    # 等待其他请求构建缓存的最长时间（秒），超时后自行构建（不写入缓存）
+    blocking_timeout = 30
+
+    def __init__(self, name: str, tenant_id: str, data_source_ids: Iterable[int]):
+        """
+        :param name: 关系数据名称，如：department_profile_relations
+        :param tenant_id: 租户 ID
+        :param data_source_ids: 租户关联的数据源 ID 列表（含协同的数据源）
+        """
+        generations = DataSourceRelationGeneration.get_many(data_source_ids)
+        # 关联的数据源 & 其版本号变化都需要使缓存失效，因此使用摘要作为 Key 的一部分
+        digest = hashlib.md5(json.dumps(sorted(generations.items())).encode(), usedforsecurity=False).hexdigest()
+        self.key = f"{name}:{tenant_id}:{digest}"
+
+    def get_or_build(self, build: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """获取缓存数据，若缓存不存在或需要刷新，则调用 build 构建数据并写入缓存"""
+        meta = _cache.get(self._meta_key)
+        data = self._load(meta) if meta else None
+        # 缓存有效且无需刷新，直接返回
+        if data is not None and meta["refresh_at"] > time.time():
+            return data
+
+        lock = _cache.lock(f"lock:{self.key}", timeout=self.lock_timeout, blocking_timeout=self.blocking_timeout)
+        # 已有旧数据时，非阻塞获取锁，未获取到说明其他请求正在刷新，继续使用旧数据即可；
+        # 没有数据时，则阻塞等待其他请求完成构建，超时则自行构建兜底
+        if not lock.acquire(blocking=data is None):
+            return data if data is not None else build()
+
+        try:
+            # 获取到锁后需要再检查一次，等待期间其他请求可能已经完成了构建
+            if data is None and (meta := _cache.get(self._meta_key)):
+                data = self._load(meta)
+                if data is not None:
+                    return data
+
+            data = build()
+            self._save(data, meta)
+            return data
+        finally:
+            try:
+                lock.release()
+            except LockNotOwnedError:
+                pass
+
+    @property
+    def _meta_key(self) -> str:
+        return f"meta:{self.key}"
+
+    def _gen_chunk_key(self, build_id: str, idx: int) -> str:
+        return f"chunk:{self.key}:{build_id}:{idx}"
+
+    def _load(self, meta: Dict[str, Any]) -> List[Dict[str, Any]] | None:
+        """读取缓存数据，任意数据块缺失都认为缓存不存在"""
+        keys = [self._gen_chunk_key(meta["build_id"], idx) for idx in range(meta["chunk_count"])]
+        chunks = _cache.get_many(keys)
+        if len(chunks) != len(keys):
+            return None
+
+        return [item for key in keys for item in json.loads(zlib.decompress(chunks[key]))]
+
+    def _save(self, data: List[Dict[str, Any]], stale_meta: Dict[str, Any] | None) -> None:
+        """分块压缩写入缓存数据，并清理旧的数据块"""
+        build_id, chunk_size = generate_uuid(), settings.OPEN_V2_RELATION_CACHE_CHUNK_SIZE
+        chunks = {
+            self._gen_chunk_key(build_id, idx): zlib.compress(json.dumps(data[start : start + chunk_size]).encode())
+            for idx, start in enumerate(range(0, len(data), chunk_size))
+        }
+        _cache.set_many(chunks, timeout=settings.OPEN_V2_RELATION_CACHE_TIMEOUT)
+        # 数据块都写入后再写入元数据，避免读取到不完整的数据
+        meta = {
+            "build_id": build_id,
+            "chunk_count": len(chunks),
+            "refresh_at": time.time() + settings.OPEN_V2_RELATION_CACHE_REFRESH_INTERVAL,
+        }
+        _cache.set(self._meta_key, meta, timeout=settings.OPEN_V2_RELATION_CACHE_TIMEOUT)
+
+        if stale_meta:
+            for idx in range(stale_meta["chunk_count"]):
+                _cache.delete(self._gen_chunk_key(stale_meta["build_id"], idx))
+
+
+_cache = Cache(CacheEnum.REDIS, CacheKeyPrefixEnum.V2_API)
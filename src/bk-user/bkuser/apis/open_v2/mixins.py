@@ -15,18 +15,20 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import itertools
 from functools import cached_property
-from typing import Dict, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple, TypeVar
 
 from django.db.models import Q, QuerySet
 from rest_framework.permissions import IsAuthenticated
 
 from bkuser.apis.open_v2.authentications import ESBAuthentication
-from bkuser.apis.open_v2.renderers import BkLegacyApiJSONRenderer
+from bkuser.apis.open_v2.renderers import BkLegacyApiJSONRenderer, BkLegacyApiNDJsonRenderer
 from bkuser.apps.data_source.constants import DataSourceTypeEnum
 from bkuser.apps.data_source.models import DataSource
+from bkuser.apps.tenant.caches import TenantMetadataCache
 from bkuser.apps.tenant.constants import CollaborationStrategyStatus
-from bkuser.apps.tenant.models import CollaborationStrategy, Tenant, TenantUserIDGenerateConfig
+from bkuser.apps.tenant.models import CollaborationStrategy, Tenant
 
 
 class LegacyOpenApiCommonMixin:
@@ -35,6 +37,33 @@ class LegacyOpenApiCommonMixin:
     renderer_classes = [BkLegacyApiJSONRenderer]
 
 
+T = TypeVar("T")
+
+
+class NDJsonStreamingMixin:
+    """
+    支持全量拉取（no_page）时以 NDJSON 格式流式返回数据，通过 Accept: application/x-ndjson 或 ?format=ndjson 启用
+
+    注：需要放在 LegacyOpenApiCommonMixin 之前，以覆盖其 renderer_classes
+    """
+
+    renderer_classes = [BkLegacyApiJSONRenderer, BkLegacyApiNDJsonRenderer]
+    # 流式返回时，每批从 DB 获取 & 写出的数据条数
+    stream_chunk_size = 500
+
+    def is_ndjson_accepted(self) -> bool:
+        return self.request.accepted_renderer.format == BkLegacyApiNDJsonRenderer.format  # type: ignore
+
+    def iter_chunks(self, items: Iterable[T]) -> Iterator[List[T]]:
+        """将数据按 stream_chunk_size 分批，若为 QuerySet 则使用 iterator 分批从 DB 获取，避免一次性加载全部数据"""
+        if isinstance(items, QuerySet):
+            items = items.iterator(chunk_size=self.stream_chunk_size)
+
+        iterator = iter(items)
+        while chunk := list(itertools.islice(iterator, self.stream_chunk_size)):
+            yield chunk
+
+
 class DefaultTenantMixin:
     """默认租户 Mixin"""
 
@@ -60,13 +89,7 @@ class DefaultTenantMixin:
 
         :return: {(collaboration_tenant_id, source_field): target_field}
         """
-        strategies = CollaborationStrategy.objects.filter(target_tenant_id=self.default_tenant.id)
-
-        return {
-            (strategy.source_tenant_id, mp["source_field"]): mp["target_field"]
-            for strategy in strategies
-            for mp in strategy.target_config["field_mapping"]
-        }
+        return TenantMetadataCache.get_collaboration_field_mapping(self.default_tenant.id)
 
 
 class DataSourceDomainMixin:
@@ -74,9 +97,7 @@ class DataSourceDomainMixin:
 
     @cached_property
     def data_source_to_domain_map(self) -> Dict[Tuple[int, str], str]:
-        return {
-            (cfg.data_source_id, cfg.target_tenant.id): cfg.domain for cfg in TenantUserIDGenerateConfig.objects.all()
-        }
+        return TenantMetadataCache.get_data_source_domain_map()
 
     def get_domain(self, data_source_id: int, target_tenant_id: str) -> str:
         return self.data_source_to_domain_map.get((data_source_id, target_tenant_id), "")
@@ -14,12 +14,89 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+from collections import OrderedDict
+from typing import Any, List
+
+from django.core import signing
+from django.db.models import QuerySet
+from rest_framework.response import Response
+
+from bkuser.common.error_codes import error_codes
 from bkuser.common.pagination import CustomPageNumberPagination
 
 
 class LegacyOpenApiPagination(CustomPageNumberPagination):
+    """
+    兼容 v2 OpenAPI 的分页器，默认为页码分页（OFFSET / LIMIT），
+    请求中携带 cursor 参数（首页传空值即可）时，使用基于主键的游标分页（Keyset）：
+
+    - 页码分页：翻页越深，DB 需要扫描并丢弃的数据越多，不适合全量拉取
+    - 游标分页：每页都基于上一页最后一条数据的主键进行查询，耗时与翻页深度无关，推荐用于全量拉取
+
+    游标分页的响应格式为：{"count": 当页数量, "results": [...], "next_cursor": "下一页游标，为 null 表示已是最后一页"}
+    """
+
     # 兼容 API 单页默认返回条数与老版本保持一致
     page_size = 50
     page_size_query_param = "page_size"
     # 兼容 API 单页返回条数上限与老版本默认值保持一致
     max_page_size = 2000
+
+    # 游标分页参数
+    cursor_query_param = "cursor"
+    # 游标签名使用的 salt，游标内容对调用方不透明，且不可伪造
+    cursor_signing_salt = "bkuser.open_v2.pagination.cursor"
+
+    use_cursor = False
+    next_cursor: str | None = None
+
+    def paginate_queryset(self, queryset, request, view=None) -> List[Any] | None:
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        return self._paginate_queryset_by_cursor(queryset, request.query_params[self.cursor_query_param])
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+
+        return Response(OrderedDict([("count", len(data)), ("results", data), ("next_cursor", self.next_cursor)]))
+
+    def _paginate_queryset_by_cursor(self, queryset: QuerySet | List[Any], cursor: str) -> List[Any]:
+        """基于主键的游标分页，多查询一条数据用于判断是否存在下一页"""
+        page_size = self.get_page_size(self.request) or self.page_size
+
+        if isinstance(queryset, QuerySet):
+            queryset = queryset.order_by("pk")
+            if cursor:
+                queryset = queryset.filter(pk__gt=self._decode_cursor(cursor))
+
+            items = list(queryset[: page_size + 1])
+        else:
+            # 部分 API 分页的是内存中组装的数据列表（如 categories），则按列表项的 ID 排序后切片
+            items = sorted(queryset, key=self._get_item_key)
+            if cursor:
+                last_key = self._decode_cursor(cursor)
+                items = [item for item in items if self._get_item_key(item) > last_key]
+
+            items = items[: page_size + 1]
+
+        self.next_cursor = (
+            self._encode_cursor(self._get_item_key(items[page_size - 1])) if len(items) > page_size else None
+        )
+        return items[:page_size]
+
+    @staticmethod
+    def _get_item_key(item: Any) -> Any:
+        return item["id"] if isinstance(item, dict) else item.pk
+
+    def _encode_cursor(self, pk: Any) -> str:
+        return signing.dumps(pk, salt=self.cursor_signing_salt, compress=True)
+
+    def _decode_cursor(self, cursor: str) -> Any:
+        try:
+            return signing.loads(cursor, salt=self.cursor_signing_salt)
+        except signing.BadSignature as exc:
+            raise error_codes.VALIDATION_ERROR.f(f"invalid cursor {cursor}") from exc
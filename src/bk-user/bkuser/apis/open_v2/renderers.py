@@ -33,3 +33,17 @@ class BkLegacyApiJSONRenderer(JSONRenderer):
 
         # For status codes other than (2xx, 4xx, 5xx), do not wrap data
         return super().render(data, accepted_media_type=None, renderer_context=None)
+
+
+class BkLegacyApiNDJsonRenderer(BkLegacyApiJSONRenderer):
+    """
+    NDJSON（每行一个 JSON 对象）格式，用于全量拉取数据时的内容协商（Accept: application/x-ndjson 或 ?format=ndjson）
+
+    注：全量数据由视图以流式响应直接返回，不经过该渲染器；仅当返回普通响应（如：异常）时，才以单行 JSON 的方式渲染
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(data, accepted_media_type, renderer_context) + b"\n"
@@ -17,20 +17,21 @@
 
 import operator
 from functools import reduce
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List
 
 from django.db.models import Q, QuerySet
 from django.http import Http404
 from rest_framework import generics
 from rest_framework.response import Response
 
-from bkuser.apis.open_v2.mixins import DefaultTenantMixin, LegacyOpenApiCommonMixin
+from bkuser.apis.open_v2.mixins import DefaultTenantMixin, LegacyOpenApiCommonMixin, NDJsonStreamingMixin
 from bkuser.apis.open_v2.pagination import LegacyOpenApiPagination
 from bkuser.apis.open_v2.serializers.departments import (
     DepartmentListInputSLZ,
     DepartmentRetrieveInputSLZ,
     ProfileDepartmentListInputSLZ,
 )
+from bkuser.apps.data_source.caches import DataSourceDepartmentPathIndex
 from bkuser.apps.data_source.constants import DataSourceTypeEnum
 from bkuser.apps.data_source.models import (
     DataSourceDepartment,
@@ -39,10 +40,11 @@ from bkuser.apps.data_source.models import (
 )
 from bkuser.apps.tenant.models import TenantDepartment, TenantUser
 from bkuser.common.error_codes import error_codes
+from bkuser.common.response import convert_chunks_to_ndjson_streaming_response
 from bkuser.utils.tree import Tree
 
 
-class DepartmentListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin, generics.ListAPIView):
+class DepartmentListApi(NDJsonStreamingMixin, LegacyOpenApiCommonMixin, DefaultTenantMixin, generics.ListAPIView):
     """查询部门列表"""
 
     pagination_class = LegacyOpenApiPagination
@@ -54,6 +56,18 @@ class DepartmentListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin, generics.L
         no_page = params["no_page"]
 
         tenant_depts = self._filter_queryset(params)
+        # 全量拉取 & 指定 NDJSON 格式，则分批构造部门信息并流式返回
+        if no_page and self.is_ndjson_accepted():
+            return convert_chunks_to_ndjson_streaming_response(
+                self.iter_chunks(
+                    self._iter_dept_infos(
+                        tenant_depts.iterator(chunk_size=self.stream_chunk_size),
+                        params.get("fields", []),
+                        params["with_ancestors"],
+                    )
+                )
+            )
+
         if not no_page:
             tenant_depts = self.paginate_queryset(tenant_depts)
 
@@ -66,6 +80,11 @@ class DepartmentListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin, generics.L
     def _build_dept_infos(
         self, tenant_depts: QuerySet[TenantDepartment], fields: List[str], with_ancestors: bool
     ) -> List[Dict[str, Any]]:
+        return list(self._iter_dept_infos(tenant_depts, fields, with_ancestors))
+
+    def _iter_dept_infos(
+        self, tenant_depts: Iterable[TenantDepartment], fields: List[str], with_ancestors: bool
+    ) -> Iterator[Dict[str, Any]]:
         # 部门 ID 映射：{(数据源部门 ID, 租户 ID)：租户部门 ID}
         tenant_dept_id_map = {
             (data_source_dept_id, tenant_id): dept_id
@@ -77,7 +96,6 @@ class DepartmentListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin, generics.L
         dept_id_name_map = dict(DataSourceDepartment.objects.values_list("id", "name"))
         rel_tree = Tree(DataSourceDepartmentRelation.objects.values_list("department_id", "parent_id"))
 
-        resp_data = []
         for dept in tenant_depts:
             dept_info = {
                 "id": dept.id,
@@ -93,8 +111,7 @@ class DepartmentListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin, generics.L
             }
             # 特殊指定 fields 的情况下仅返回指定的字段
             if fields:
-                dept_info = {k: v for k, v in dept_info.items() if k in fields}
-                resp_data.append(dept_info)
+                yield {k: v for k, v in dept_info.items() if k in fields}
                 continue
 
             # 没有指定 fields 的时候，额外返回 full_name & children 字段
@@ -131,9 +148,7 @@ class DepartmentListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin, generics.L
 
                 dept_info["children"] = children
 
-            resp_data.append(dept_info)
-
-        return resp_data
+            yield dept_info
 
     def _filter_queryset(self, params: Dict[str, Any]) -> QuerySet:
         # 注：兼容 v2 的 OpenAPI 只提供默认租户的数据（包括默认租户本身数据源的数据 & 其他租户协同过来的数据）
@@ -227,36 +242,41 @@ class DepartmentRetrieveApi(LegacyOpenApiCommonMixin, DefaultTenantMixin, generi
         resp_data["parent"] = self._get_dept_parent_id(tenant_dept, dept_relation)
         resp_data["level"] = self._get_dept_tree_level(dept_relation)
 
-        tenant_dept_full_name = self._get_dept_full_name(tenant_dept, dept_relation)
+        # 部门组织路径 & 祖先部门均通过数据源部门路径索引计算，无需逐级查询 MPTT 树
+        dept_path_index = DataSourceDepartmentPathIndex.get(tenant_dept.data_source_department.data_source_id)
+
+        tenant_dept_full_name = self._get_dept_full_name(tenant_dept, dept_path_index)
         children = self._get_dept_children(tenant_dept, tenant_dept_full_name)
         resp_data["full_name"] = tenant_dept_full_name
         resp_data["has_children"] = bool(children)
         resp_data["children"] = children
 
         if params.get("with_ancestors"):
-            resp_data["ancestors"] = self._get_dept_ancestors(tenant_dept, dept_relation)
+            resp_data["ancestors"] = self._get_dept_ancestors(tenant_dept, dept_path_index)
 
         return Response(resp_data)
 
     @staticmethod
-    def _get_dept_full_name(tenant_dept: TenantDepartment, dept_relation: DataSourceDepartmentRelation) -> str:
+    def _get_dept_full_name(tenant_dept: TenantDepartment, dept_path_index: DataSourceDepartmentPathIndex) -> str:
         """获取部门组织路径信息"""
         # TODO 协同后续支持指定组织范围的话，不能直接吐出到根部门的路径
-        if not dept_relation:
-            return tenant_dept.data_source_department.name
-
-        return "/".join(dept_relation.get_ancestors(include_self=True).values_list("department__name", flat=True))
+        return (
+            dept_path_index.get_full_name(tenant_dept.data_source_department_id)
+            or tenant_dept.data_source_department.name
+        )
 
     @staticmethod
-    def _get_dept_ancestors(tenant_dept: TenantDepartment, dept_relation: DataSourceDepartmentRelation) -> List[Dict]:
+    def _get_dept_ancestors(
+        tenant_dept: TenantDepartment, dept_path_index: DataSourceDepartmentPathIndex
+    ) -> List[Dict]:
         """获取租户部门的所有祖先部门信息"""
-        if not dept_relation:
-            return []
-
         ancestors = [
-            {"id": rel.department.id, "name": rel.department.name}
-            for rel in dept_relation.get_ancestors(include_self=False).select_related("department")
+            {"id": dept_id, "name": dept_path_index.get_name(dept_id)}
+            for dept_id in dept_path_index.get_ancestor_ids(tenant_dept.data_source_department_id)
         ]
+        if not ancestors:
+            return []
+
         dept_id_map = dict(
             TenantDepartment.objects.filter(
                 data_source_department_id__in=[dept["id"] for dept in ancestors], tenant_id=tenant_dept.tenant_id
@@ -396,7 +416,7 @@ class ProfileDepartmentListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin, gen
             rel.department
             for rel in DataSourceDepartmentUserRelation.objects.filter(
                 user=tenant_user.data_source_user,
-            )
+            ).select_related("department")
         ]
         if not departments:
             return []
@@ -406,6 +426,9 @@ class ProfileDepartmentListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin, gen
                 data_source_department__in=departments, tenant_id=tenant_user.tenant_id
             ).values_list("data_source_department_id", "id")
         )
+        # 部门组织路径 & 祖先部门均通过数据源部门路径索引计算（用户与其所属部门必定属于同一数据源）
+        dept_path_index = DataSourceDepartmentPathIndex.get(tenant_user.data_source_user.data_source_id)
+
         user_dept_infos = []
         for idx, dept in enumerate(departments, start=1):
             if dept.id not in dept_id_map:
@@ -414,47 +437,38 @@ class ProfileDepartmentListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin, gen
             dept_info = {
                 "id": dept_id_map[dept.id],
                 "name": dept.name,
-                "full_name": self._get_dept_full_name(dept),
+                # TODO 协同后续支持指定组织范围的话，不能直接吐出到根部门的路径
+                "full_name": dept_path_index.get_full_name(dept.id) or dept.name,
                 "order": idx,
             }
             if with_ancestors:
-                dept_info["family"] = self._get_dept_ancestors(dept, dept_info["full_name"], tenant_user.tenant_id)
+                dept_info["family"] = self._get_dept_ancestors(dept, dept_path_index, tenant_user.tenant_id)
 
             user_dept_infos.append(dept_info)
 
         return user_dept_infos
 
     @staticmethod
-    def _get_dept_ancestors(dept: DataSourceDepartment, dept_full_name: str, tenant_id: str) -> List[Dict]:
+    def _get_dept_ancestors(
+        dept: DataSourceDepartment, dept_path_index: DataSourceDepartmentPathIndex, tenant_id: str
+    ) -> List[Dict]:
         """获取某个部门祖先信息"""
-        dept_relation = DataSourceDepartmentRelation.objects.filter(department=dept).first()
-        if not dept_relation:
+        ancestor_ids = dept_path_index.get_ancestor_ids(dept.id)
+        if not ancestor_ids:
             return []
 
-        ancestors = dept_relation.get_ancestors().select_related("department")
         dept_id_map = dict(
             TenantDepartment.objects.filter(
-                data_source_department_id__in=[rel.department_id for rel in ancestors], tenant_id=tenant_id
+                data_source_department_id__in=ancestor_ids, tenant_id=tenant_id
             ).values_list("data_source_department_id", "id")
         )
-        ancestor_count = ancestors.count()
         return [
             {
-                "id": dept_id_map[dept.department_id],
-                "name": dept.department.name,
-                "full_name": dept_full_name.rsplit("/", ancestor_count - idx + 1)[0],
+                "id": dept_id_map[dept_id],
+                "name": dept_path_index.get_name(dept_id),
+                "full_name": dept_path_index.get_full_name(dept_id),
                 "order": idx,
             }
-            for idx, dept in enumerate(ancestors, start=1)
-            if dept.department_id in dept_id_map
+            for idx, dept_id in enumerate(ancestor_ids, start=1)
+            if dept_id in dept_id_map
         ]
-
-    @staticmethod
-    def _get_dept_full_name(dept: DataSourceDepartment) -> str:
-        """获取部门组织路径信息"""
-        dept_relation = DataSourceDepartmentRelation.objects.filter(department=dept).first()
-        if not dept_relation:
-            return dept.name
-
-        # TODO 协同后续支持指定组织范围的话，不能直接吐出到根部门的路径
-        return "/".join(dept_relation.get_ancestors(include_self=True).values_list("department__name", flat=True))
@@ -14,13 +14,14 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
 from django.db.models import QuerySet
 from rest_framework import generics
 from rest_framework.response import Response
 
-from bkuser.apis.open_v2.mixins import DefaultTenantMixin, LegacyOpenApiCommonMixin
+from bkuser.apis.open_v2.caches import RelationListCache
+from bkuser.apis.open_v2.mixins import DefaultTenantMixin, LegacyOpenApiCommonMixin, NDJsonStreamingMixin
 from bkuser.apis.open_v2.pagination import LegacyOpenApiPagination
 from bkuser.apis.open_v2.serializers.edges import (
     DepartmentProfileRelationListInputSLZ,
@@ -30,14 +31,15 @@ from bkuser.apis.open_v2.serializers.edges import (
 )
 from bkuser.apps.data_source.models import DataSourceDepartmentUserRelation, DataSourceUserLeaderRelation
 from bkuser.apps.tenant.models import TenantDepartment
-from bkuser.common.cache import Cache, CacheEnum, CacheKeyPrefixEnum
+from bkuser.common.response import convert_chunks_to_ndjson_streaming_response
 
 
-class DepartmentProfileRelationListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin, generics.ListAPIView):
+class DepartmentProfileRelationListApi(
+    NDJsonStreamingMixin, LegacyOpenApiCommonMixin, DefaultTenantMixin, generics.ListAPIView
+):
     pagination_class = LegacyOpenApiPagination
 
-    cache_key = "list_department_profile_relations"
-    cache_timeout = 60 * 10
+    cache_name = "department_profile_relations"
 
     def get_queryset(self) -> QuerySet[DataSourceDepartmentUserRelation]:
         # 注：兼容 v2 的 OpenAPI 只提供默认租户的数据（包括默认租户本身数据源的数据 & 其他租户协同过来的数据）
@@ -51,6 +53,9 @@ class DepartmentProfileRelationListApi(LegacyOpenApiCommonMixin, DefaultTenantMi
         slz = DepartmentProfileRelationListInputSLZ(data=request.query_params)
         slz.is_valid(raise_exception=True)
         if slz.validated_data["no_page"]:
+            if self.is_ndjson_accepted():
+                return convert_chunks_to_ndjson_streaming_response(self._iter_with_no_page())
+
             return self._get_with_no_page()
 
         return self._get_with_page()
@@ -67,19 +72,26 @@ class DepartmentProfileRelationListApi(LegacyOpenApiCommonMixin, DefaultTenantMi
 
     def _get_with_no_page(self):
         """支持不分页的数据拉取，需要支持 Redis 缓存结果，出于性能考虑，不使用 OutputSLZ"""
-        cache = Cache(CacheEnum.REDIS, CacheKeyPrefixEnum.V2_API)
-        # 如果缓存中存在，则直接返回
-        if relations := cache.get(self.cache_key):
-            return Response(relations)
+        cache = RelationListCache(
+            self.cache_name, self.default_tenant.id, self.get_real_user_data_sources().values_list("id", flat=True)
+        )
+        return Response(cache.get_or_build(self._build_with_no_page))
 
-        relations = self._convert(
+    def _build_with_no_page(self) -> List[Dict]:
+        """获取全量部门用户关系数据"""
+        return self._convert(
             [
                 {"id": rel.id, "department_id": rel.department_id, "profile_id": rel.user_id}
                 for rel in self.get_queryset()
             ]
         )
-        cache.set(self.cache_key, relations, timeout=self.cache_timeout)
-        return Response(relations)
+
+    def _iter_with_no_page(self) -> Iterator[List[Dict]]:
+        """分批获取全量部门用户关系数据（流式返回使用），无缓存"""
+        for rels in self.iter_chunks(self.get_queryset()):
+            yield self._convert(
+                [{"id": rel.id, "department_id": rel.department_id, "profile_id": rel.user_id} for rel in rels]
+            )
 
     def _convert(self, data_source_dept_user_relations: List[Dict]) -> List[Dict]:
         """将数据源部门 ID 转换成租户部门 ID 注：在兼容 v2 的 OpenAPI 中，用户 ID 即为数据源用户 ID，无需转换"""
@@ -95,11 +107,12 @@ class DepartmentProfileRelationListApi(LegacyOpenApiCommonMixin, DefaultTenantMi
         ]
 
 
-class ProfileLeaderRelationListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin, generics.ListAPIView):
+class ProfileLeaderRelationListApi(
+    NDJsonStreamingMixin, LegacyOpenApiCommonMixin, DefaultTenantMixin, generics.ListAPIView
+):
     pagination_class = LegacyOpenApiPagination
 
-    cache_key = "list_profile_leader_relations"
-    cache_timeout = 60 * 10
+    cache_name = "profile_leader_relations"
 
     def get_queryset(self) -> QuerySet[DataSourceUserLeaderRelation]:
         # 注：兼容 v2 的 OpenAPI 只提供默认租户的数据（包括默认租户本身数据源的数据 & 其他租户协同过来的数据）
@@ -113,6 +126,9 @@ class ProfileLeaderRelationListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin,
         slz = ProfileLeaderRelationListInputSLZ(data=request.query_params)
         slz.is_valid(raise_exception=True)
         if slz.validated_data["no_page"]:
+            if self.is_ndjson_accepted():
+                return convert_chunks_to_ndjson_streaming_response(self._iter_with_no_page())
+
             return self._get_with_no_page()
 
         return self._get_with_page()
@@ -128,14 +144,19 @@ class ProfileLeaderRelationListApi(LegacyOpenApiCommonMixin, DefaultTenantMixin,
 
     def _get_with_no_page(self):
         """支持不分页的数据拉取，需要支持 Redis 缓存结果，出于性能考虑，不使用 OutputSLZ"""
-        cache = Cache(CacheEnum.REDIS, CacheKeyPrefixEnum.V2_API)
-        # 如果缓存中存在，则直接返回
-        if relations := cache.get(self.cache_key):
-            return Response(relations)
+        cache = RelationListCache(
+            self.cache_name, self.default_tenant.id, self.get_real_user_data_sources().values_list("id", flat=True)
+        )
+        return Response(cache.get_or_build(self._build_with_no_page))
 
-        relations = [
+    def _build_with_no_page(self) -> List[Dict]:
+        """获取全量用户 - Leader 关系数据"""
+        return [
             {"id": rel.id, "from_profile_id": rel.user_id, "to_profile_id": rel.leader_id}
             for rel in self.get_queryset()
         ]
-        cache.set(self.cache_key, relations, timeout=self.cache_timeout)
-        return Response(relations)
+
+    def _iter_with_no_page(self) -> Iterator[List[Dict]]:
+        """分批获取全量用户 - Leader 关系数据（流式返回使用），无缓存"""
+        for rels in self.iter_chunks(self.get_queryset()):
+            yield [{"id": rel.id, "from_profile_id": rel.user_id, "to_profile_id": rel.leader_id} for rel in rels]
@@ -28,7 +28,12 @@ from django.http import Http404
 from rest_framework import generics
 from rest_framework.response import Response
 
-from bkuser.apis.open_v2.mixins import DataSourceDomainMixin, DefaultTenantMixin, LegacyOpenApiCommonMixin
+from bkuser.apis.open_v2.mixins import (
+    DataSourceDomainMixin,
+    DefaultTenantMixin,
+    LegacyOpenApiCommonMixin,
+    NDJsonStreamingMixin,
+)
 from bkuser.apis.open_v2.pagination import LegacyOpenApiPagination
 from bkuser.apis.open_v2.serializers.profilers import (
     DepartmentProfileListInputSLZ,
@@ -36,6 +41,7 @@ from bkuser.apis.open_v2.serializers.profilers import (
     ProfileListInputSLZ,
     ProfileRetrieveInputSLZ,
 )
+from bkuser.apps.data_source.caches import DataSourceDepartmentPathIndex
 from bkuser.apps.data_source.constants import DataSourceTypeEnum
 from bkuser.apps.data_source.models import (
     DataSourceDepartmentRelation,
@@ -43,10 +49,10 @@ from bkuser.apps.data_source.models import (
     DataSourceUserLeaderRelation,
 )
 from bkuser.apps.tenant.constants import TenantUserStatus
-from bkuser.apps.tenant.models import DataSourceDepartment, TenantDepartment, TenantUser
+from bkuser.apps.tenant.models import TenantDepartment, TenantUser
 from bkuser.common.error_codes import error_codes
+from bkuser.common.response import convert_chunks_to_ndjson_streaming_response
 from bkuser.common.views import ExcludePatchAPIViewMixin
-from bkuser.utils.tree import Tree
 
 
 class ProfileStatusEnum(StrStructuredEnum):
@@ -79,10 +85,12 @@ def _phone_country_code_to_iso_code(phone_country_code: str) -> str:
 class TenantUserListToUserInfosMixin(DefaultTenantMixin, DataSourceDomainMixin):
     """将 TenantUser 列表转换 对外的用户信息"""
 
-    def build_user_infos(self, tenant_users: QuerySet[TenantUser], fields: List[str]) -> List[Dict[str, Any]]:
+    def build_user_infos(
+        self, tenant_users: QuerySet[TenantUser] | List[TenantUser], fields: List[str]
+    ) -> List[Dict[str, Any]]:
         """
         构建对外用户信息列表
-        :param tenant_users: 租户用户 Queryset，即已经经过 filter 等后的 QuerySet
+        :param tenant_users: 租户用户 Queryset（或其分页 / 分批后的列表），即已经经过 filter 等后的 QuerySet
                              且必须保证 select_related("data_source_user")
         :param fields: 对外的用户字段列表，空时表示所有用户字段都对外
         """
@@ -143,19 +151,19 @@ class TenantUserListToUserInfosMixin(DefaultTenantMixin, DataSourceDomainMixin):
                 user_info = {k: v for k, v in user_info.items() if k in fields}
                 # 由于 leader 需要额外计算，因此特殊分支处理
                 if "leader" in fields:
-                    user_info["leader"] = leader_map.get((tenant_user.tenant.id, tenant_user.data_source_user.id))
+                    user_info["leader"] = leader_map.get((tenant_user.tenant_id, tenant_user.data_source_user.id))
                 # 由于 department 需要额外计算，因此特殊分支处理
                 if "departments" in fields:
                     user_info["departments"] = department_map.get(
-                        (tenant_user.tenant.id, tenant_user.data_source_user.id)
+                        (tenant_user.tenant_id, tenant_user.data_source_user.id)
                     )
 
                 user_infos.append(user_info)
                 continue
 
             # 未指定字段，则关联字段也要返回
-            user_info["leader"] = leader_map.get((tenant_user.tenant.id, tenant_user.data_source_user.id))
-            user_info["departments"] = department_map.get((tenant_user.tenant.id, tenant_user.data_source_user.id))
+            user_info["leader"] = leader_map.get((tenant_user.tenant_id, tenant_user.data_source_user.id))
+            user_info["departments"] = department_map.get((tenant_user.tenant_id, tenant_user.data_source_user.id))
 
             user_infos.append(user_info)
 
@@ -222,10 +230,11 @@ class TenantUserListToUserInfosMixin(DefaultTenantMixin, DataSourceDomainMixin):
         for i in tenant_departments:
             tenant_dept_map[i.data_source_department_id].append(i)
 
-        # dept_id_name_map 和 rel_tree 用于计算部门 full_name
-        # {数据源部门 ID: 数据源部门名称}
-        dept_id_name_map = dict(DataSourceDepartment.objects.values_list("id", "name"))
-        rel_tree = Tree(DataSourceDepartmentRelation.objects.values_list("department_id", "parent_id"))
+        # 部门 full_name 通过数据源部门路径索引计算，不同数据源的索引相互独立 {数据源 ID: 部门路径索引}
+        dept_path_indexes = {
+            data_source_id: DataSourceDepartmentPathIndex.get(data_source_id)
+            for data_source_id in {dept.data_source_id for dept in tenant_departments}
+        }
 
         # 基于 部门 必须与用户同一个租户才是有效的，这里以 (tenant_id, data_source_user_id) 作为 key
         dept_map: Dict[Tuple[str, int], List[Dict]] = defaultdict(list)
@@ -237,13 +246,8 @@ class TenantUserListToUserInfosMixin(DefaultTenantMixin, DataSourceDomainMixin):
                         "id": tenant_dept.id,
                         "name": tenant_dept.data_source_department.name,
                         # TODO: 协同支持指定范围后，是以 “伪根” 开始，并不是原始数据源的根，需要调整
-                        "full_name": "/".join(
-                            [
-                                dept_id_name_map[i]
-                                for i in rel_tree.get_ancestors(
-                                    tenant_dept.data_source_department.id, include_self=True
-                                )
-                            ]
+                        "full_name": dept_path_indexes[tenant_dept.data_source_id].get_full_name(
+                            tenant_dept.data_source_department_id
                         ),
                         "order": idx + 1,
                     }
@@ -252,7 +256,9 @@ class TenantUserListToUserInfosMixin(DefaultTenantMixin, DataSourceDomainMixin):
         return dept_map
 
 
-class ProfileListApi(LegacyOpenApiCommonMixin, TenantUserListToUserInfosMixin, generics.ListAPIView):
+class ProfileListApi(
+    NDJsonStreamingMixin, LegacyOpenApiCommonMixin, TenantUserListToUserInfosMixin, generics.ListAPIView
+):
     """用户列表"""
 
     pagination_class = LegacyOpenApiPagination
@@ -265,6 +271,12 @@ class ProfileListApi(LegacyOpenApiCommonMixin, TenantUserListToUserInfosMixin, g
 
         # 根据参数过滤
         tenant_users = self._filter_queryset(params)
+        # 全量拉取 & 指定 NDJSON 格式，则分批构造用户信息并流式返回
+        if no_page and self.is_ndjson_accepted():
+            return convert_chunks_to_ndjson_streaming_response(
+                self.build_user_infos(users, params.get("fields")) for users in self.iter_chunks(tenant_users)
+            )
+
         if not no_page:
             tenant_users = self.paginate_queryset(tenant_users)
 
@@ -583,31 +595,20 @@ class ProfileRetrieveApi(
             tenant_id=tenant_user.tenant_id, data_source_department_id__in=department_ids
         ).select_related("data_source_department")
 
-        # 部门的 full_name
-        full_name_map = self._get_department_full_name_map(department_ids)
+        # 部门的 full_name 通过数据源部门路径索引计算（用户与其所属部门必定属于同一数据源）
+        dept_path_index = DataSourceDepartmentPathIndex.get(tenant_user.data_source_user.data_source_id)
 
         return [
             {
                 "id": dept.id,
                 "name": dept.data_source_department.name,
-                "full_name": full_name_map.get(dept.data_source_department.id) or dept.data_source_department.name,
+                "full_name": dept_path_index.get_full_name(dept.data_source_department_id)
+                or dept.data_source_department.name,
                 "order": idx,
             }
             for idx, dept in enumerate(departments, start=1)
         ]
 
-    @staticmethod
-    def _get_department_full_name_map(department_ids: List[int]) -> Dict[int, str]:
-        """获取部门的 full name"""
-        # 查询每个数据源部门的 MPTT 关系，用于获取祖先，进而便于后面获取部门的 full_name
-        dept_relations = DataSourceDepartmentRelation.objects.filter(department_id__in=department_ids)
-        return {
-            rel.department_id: "/".join(
-                rel.get_ancestors(include_self=True).values_list("department__name", flat=True)
-            )
-            for rel in dept_relations
-        }
-
     def _build_user_info(self, tenant_user: TenantUser, fields: List[str]) -> Dict[str, Any]:
         """生成用户信息"""
         phone, phone_country_code = tenant_user.phone_info
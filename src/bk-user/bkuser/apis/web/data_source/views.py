@@ -74,7 +74,7 @@ from bkuser.biz.exporters import DataSourceUserExporter
 from bkuser.biz.tenant import TenantUserHandler
 from bkuser.common.error_codes import error_codes
 from bkuser.common.passwd import PasswordGenerator
-from bkuser.common.response import convert_workbook_to_response
+from bkuser.common.response import convert_workbook_to_response, convert_workbook_to_streaming_response
 from bkuser.common.views import ExcludePatchAPIViewMixin
 from bkuser.idp_plugins.constants import BuiltinIdpPluginEnum
 from bkuser.plugins.base import get_default_plugin_cfg, get_plugin_cfg_schema_map, get_plugin_cls
@@ -457,7 +457,9 @@ class DataSourceExportApi(CurrentUserTenantDataSourceMixin, generics.ListAPIView
             raise error_codes.DATA_SOURCE_OPERATION_UNSUPPORTED.f(_("仅能导出实体类型的本地数据源数据"))
 
         workbook = DataSourceUserExporter(data_source).export()
-        return convert_workbook_to_response(workbook, f"{settings.EXPORT_EXCEL_FILENAME_PREFIX}_org_data.xlsx")
+        return convert_workbook_to_streaming_response(
+            workbook, f"{settings.EXPORT_EXCEL_FILENAME_PREFIX}_org_data.xlsx"
+        )
 
 
 class DataSourceImportApi(CurrentUserTenantDataSourceMixin, generics.CreateAPIView):
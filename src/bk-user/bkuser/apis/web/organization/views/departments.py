@@ -40,6 +40,7 @@ from bkuser.apis.web.organization.serializers import (
     TenantDepartmentSearchOutputSLZ,
     TenantDepartmentUpdateInputSLZ,
 )
+from bkuser.apps.data_source.caches import DataSourceDepartmentPathIndex, DataSourceRelationGeneration
 from bkuser.apps.data_source.constants import DataSourceTypeEnum
 from bkuser.apps.data_source.models import (
     DataSource,
@@ -258,6 +259,8 @@ class TenantDepartmentListCreateApi(CurrentUserTenantMixin, generics.ListCreateA
             # 【审计】将审计记录保存至数据库
             auditor.record_create(data_after_tenant_depts)
 
+        DataSourceDepartmentPathIndex.bump_generation(data_source.id)
+
         return Response(TenantDepartmentCreateOutputSLZ(tenant_dept).data, status=status.HTTP_201_CREATED)
 
 
@@ -299,6 +302,7 @@ class TenantDepartmentUpdateDestroyApi(
 
         tenant_dept.data_source_department.name = data["name"]
         tenant_dept.data_source_department.save(update_fields=["name", "updated_at"])
+        DataSourceDepartmentPathIndex.bump_generation(tenant_dept.data_source_id)
 
         # 【审计】将审计记录保存至数据库
         auditor.record_update(tenant_dept)
@@ -344,6 +348,10 @@ class TenantDepartmentUpdateDestroyApi(
             DataSourceDepartmentRelation.objects.filter(department_id__in=data_source_dept_ids).delete()
             DataSourceDepartmentRelation.objects.partial_rebuild(dept_relation.tree_id)
 
+        DataSourceDepartmentPathIndex.bump_generation(tenant_dept.data_source_id)
+        # 租户部门被删除，关系数据中的租户部门 ID 映射会有变化
+        DataSourceRelationGeneration.bump(tenant_dept.data_source_id)
+
         # 【审计】将审计记录保存至数据库
         auditor.record_delete()
 
@@ -353,21 +361,16 @@ class TenantDepartmentUpdateDestroyApi(
 class TenantDeptOrgPathMapMixin:
     def _get_dept_organization_path_map(self, tenant_depts: QuerySet[TenantDepartment]) -> Dict[int, str]:
         """获取租户部门的组织路径信息"""
-        data_source_dept_ids = [tenant_dept.data_source_department_id for tenant_dept in tenant_depts]
-
-        # 数据源部门 ID -> 组织路径
-        org_path_map = {}
-        for dept_relation in DataSourceDepartmentRelation.objects.filter(
-            department_id__in=data_source_dept_ids
-        ).select_related("department"):
-            dept_names = list(
-                dept_relation.get_ancestors(include_self=True).values_list("department__name", flat=True)
-            )
-            org_path_map[dept_relation.department_id] = "/".join(dept_names)
+        # 数据源 ID -> 部门路径索引
+        dept_path_indexes = {
+            data_source_id: DataSourceDepartmentPathIndex.get(data_source_id)
+            for data_source_id in {tenant_dept.data_source_id for tenant_dept in tenant_depts}
+        }
 
         # 租户部门 ID -> 组织路径
         return {
-            dept.id: org_path_map.get(dept.data_source_department_id, dept.data_source_department.name)
+            dept.id: dept_path_indexes[dept.data_source_id].get_full_name(dept.data_source_department_id)
+            or dept.data_source_department.name
             for dept in tenant_depts
         }
 
@@ -508,6 +511,7 @@ class TenantDepartmentParentUpdateApi(CurrentUserTenantMixin, ExcludePatchAPIVie
             )
 
         cur_dept_relation.move_to(parent_dept_relation)
+        DataSourceDepartmentPathIndex.bump_generation(data_source.id)
 
         # 【审计】记录变更后的数据
         auditor.record_update_parent_department(tenant_dept)
@@ -31,6 +31,7 @@ from bkuser.apis.web.organization.serializers import (
 )
 from bkuser.apis.web.organization.views.mixins import CurrentUserTenantDataSourceMixin
 from bkuser.apps.audit.constants import OperationEnum
+from bkuser.apps.data_source.caches import DataSourceRelationGeneration
 from bkuser.apps.data_source.models import DataSourceDepartmentUserRelation
 from bkuser.apps.permission.constants import PermAction
 from bkuser.apps.permission.permissions import perm_class
@@ -83,6 +84,7 @@ class TenantDeptUserRelationBatchCreateApi(CurrentUserTenantDataSourceMixin, gen
         ]
         # 由于复制操作不会影响存量的关联边，所以需要忽略冲突，避免出现用户复选的情况
         DataSourceDepartmentUserRelation.objects.bulk_create(relations, ignore_conflicts=True)
+        DataSourceRelationGeneration.bump(data_source.id)
 
         # 【审计】将审计记录保存至数据库
         auditor.record(OperationEnum.CREATE_USER_DEPARTMENT, extras={"department_ids": list(data_source_dept_ids)})
@@ -138,6 +140,7 @@ class TenantDeptUserRelationBatchUpdateApi(CurrentUserTenantDataSourceMixin, gen
                 for dept_id, user_id in itertools.product(data_source_dept_ids, data_source_user_ids)
             ]
             DataSourceDepartmentUserRelation.objects.bulk_create(relations)
+            DataSourceRelationGeneration.bump(data_source.id)
 
         # 【审计】将审计记录保存至数据库
         auditor.record(OperationEnum.MODIFY_USER_DEPARTMENT, extras={"department_ids": list(data_source_dept_ids)})
@@ -191,6 +194,7 @@ class TenantDeptUserRelationBatchUpdateApi(CurrentUserTenantDataSourceMixin, gen
                 for dept_id, user_id in itertools.product(data_source_dept_ids, data_source_user_ids)
             ]
             DataSourceDepartmentUserRelation.objects.bulk_create(relations, ignore_conflicts=True)
+            DataSourceRelationGeneration.bump(data_source.id)
 
         # 【审计】将审计记录保存至数据库
         auditor.record(OperationEnum.MODIFY_USER_DEPARTMENT, extras={"department_id": source_data_source_dept.id})
@@ -237,6 +241,7 @@ class TenantDeptUserRelationBatchDeleteApi(CurrentUserTenantDataSourceMixin, gen
         DataSourceDepartmentUserRelation.objects.filter(
             user_id__in=data_source_user_ids, department=source_data_source_dept
         ).delete()
+        DataSourceRelationGeneration.bump(data_source.id)
 
         # 【审计】将审计记录保存至数据库
         auditor.record(OperationEnum.DELETE_USER_DEPARTMENT, extras={"department_id": source_data_source_dept.id})
@@ -58,6 +58,7 @@ from bkuser.apis.web.organization.serializers import (
     TenantUserUpdateInputSLZ,
 )
 from bkuser.apis.web.organization.views.mixins import CurrentUserTenantDataSourceMixin
+from bkuser.apps.data_source.caches import DataSourceDepartmentPathIndex, DataSourceRelationGeneration
 from bkuser.apps.data_source.constants import DataSourceTypeEnum
 from bkuser.apps.data_source.models import (
     DataSource,
@@ -171,31 +172,28 @@ class TenantUserSearchApi(CurrentUserTenantMixin, generics.ListAPIView):
 
         # 数据源用户 ID -> [数据源部门 ID1， 数据源部门 ID2]
         user_dept_id_map = defaultdict(list)
+        # 数据源 ID 集合，用于获取对应的部门路径索引
+        data_source_ids: Set[int] = set()
         for relation in DataSourceDepartmentUserRelation.objects.filter(user_id__in=data_source_user_ids):
             user_dept_id_map[relation.user_id].append(relation.department_id)
+            data_source_ids.add(relation.data_source_id)
 
-        # 数据源部门 ID 集合
-        data_source_dept_ids: Set[int] = set().union(*user_dept_id_map.values())
-
-        # 数据源部门 ID -> 组织路径
-        org_path_map = {}
-        for dept_relation in DataSourceDepartmentRelation.objects.filter(
-            department_id__in=data_source_dept_ids
-        ).select_related("department"):
-            dept_names = list(
-                dept_relation.get_ancestors(include_self=True).values_list("department__name", flat=True)
-            )
-            org_path_map[dept_relation.department_id] = "/".join(dept_names)
+        # 数据源 ID -> 部门路径索引
+        dept_path_indexes = {
+            data_source_id: DataSourceDepartmentPathIndex.get(data_source_id) for data_source_id in data_source_ids
+        }
 
         # 租户用户 ID -> 组织路径列表
-        return {
-            user.id: [
-                org_path_map[dept_id]
+        org_paths_map: Dict[str, List[str]] = {}
+        for user in tenant_users:
+            dept_path_index = dept_path_indexes.get(user.data_source_id)
+            org_paths_map[user.id] = [
+                full_name
                 for dept_id in user_dept_id_map[user.data_source_user_id]
-                if dept_id in org_path_map
+                if dept_path_index and (full_name := dept_path_index.get_full_name(dept_id))
             ]
-            for user in tenant_users
-        }
+
+        return org_paths_map
 
     @swagger_auto_schema(
         tags=["organization.user"],
@@ -367,6 +365,9 @@ class TenantUserListCreateApi(CurrentUserTenantDataSourceMixin, generics.ListAPI
             if user_leader_relations:
                 DataSourceUserLeaderRelation.objects.bulk_create(user_leader_relations)
 
+            if dept_user_relations or user_leader_relations:
+                DataSourceRelationGeneration.bump(data_source.id)
+
             # 各租户的用户过期时间
             now = timezone.now()
             tenant_user_account_expired_at_map = {
@@ -446,6 +447,9 @@ class TenantUserRetrieveUpdateDestroyApi(
                 user=user, department_id__in=waiting_delete_dept_ids
             ).delete()
 
+        if waiting_create_dept_ids or waiting_delete_dept_ids:
+            DataSourceRelationGeneration.bump(user.data_source_id)
+
     def _update_user_leader_relations(self, user: DataSourceUser, leader_ids: List[int]) -> None:
         exists_leader_ids = DataSourceUserLeaderRelation.objects.filter(user=user).values_list("leader_id", flat=True)
 
@@ -462,6 +466,9 @@ class TenantUserRetrieveUpdateDestroyApi(
         if waiting_delete_leader_ids:
             DataSourceUserLeaderRelation.objects.filter(user=user, leader_id__in=waiting_delete_leader_ids).delete()
 
+        if waiting_create_leader_ids or waiting_delete_leader_ids:
+            DataSourceRelationGeneration.bump(user.data_source_id)
+
     @swagger_auto_schema(
         tags=["organization.user"],
         operation_description="更新租户用户信息",
@@ -567,6 +574,7 @@ class TenantUserRetrieveUpdateDestroyApi(
             DataSourceUserLeaderRelation.objects.filter(user=data_source_user).delete()
             DataSourceUserLeaderRelation.objects.filter(leader=data_source_user).delete()
             data_source_user.delete()
+            DataSourceRelationGeneration.bump(data_source_user.data_source_id)
 
         # 【审计】将审计记录保存至数据库
         auditor.record()
@@ -737,13 +745,11 @@ class TenantUserOrganizationPathListApi(CurrentUserTenantMixin, generics.ListAPI
             user_id=tenant_user.data_source_user.id,
         ).values_list("department_id", flat=True)
 
-        organization_paths: List[str] = []
-        # NOTE: 用户部门数量不会很多，且该 API 调用不频繁，这里的 N+1 问题可以先不处理
-        for dept_relation in DataSourceDepartmentRelation.objects.filter(department_id__in=data_source_dept_ids):
-            dept_names = list(
-                dept_relation.get_ancestors(include_self=True).values_list("department__name", flat=True)
-            )
-            organization_paths.append("/".join(dept_names))
+        # 部门组织路径通过数据源部门路径索引计算（用户与其所属部门必定属于同一数据源）
+        dept_path_index = DataSourceDepartmentPathIndex.get(tenant_user.data_source_id)
+        organization_paths: List[str] = [
+            full_name for dept_id in data_source_dept_ids if (full_name := dept_path_index.get_full_name(dept_id))
+        ]
 
         return Response(
             TenantUserOrganizationPathOutputSLZ({"organization_paths": organization_paths}).data,
@@ -852,6 +858,7 @@ class TenantUserBatchCreateApi(CurrentUserTenantDataSourceMixin, generics.Create
                 for user in data_source_users
             ]
             DataSourceDepartmentUserRelation.objects.bulk_create(relations, batch_size=self.bulk_create_batch_size)
+            DataSourceRelationGeneration.bump(data_source.id)
 
             # 批量创建租户用户（含协同）
             self._bulk_create_tenant_users(cur_tenant_id, tenant_dept, data_source, data_source_users)
@@ -1000,6 +1007,7 @@ class TenantUserBatchDeleteApi(CurrentUserTenantDataSourceMixin, generics.Destro
             DataSourceUserLeaderRelation.objects.filter(leader_id__in=data_source_user_ids).delete()
             # 最后才是批量回收数据源用户
             DataSourceUser.objects.filter(id__in=data_source_user_ids).delete()
+            DataSourceRelationGeneration.bump(data_source.id)
 
         # 【审计】保存记录至数据库
         auditor.record()
@@ -1169,6 +1177,7 @@ class TenantUserLeaderBatchUpdateApi(
 
             # 再添加新的用户 - 上级关系
             DataSourceUserLeaderRelation.objects.bulk_create(relations)
+            DataSourceRelationGeneration.bump(data_source.id)
 
         # 【审计】将审计记录保存至数据库
         auditor.record()
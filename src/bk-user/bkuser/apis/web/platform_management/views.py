@@ -30,6 +30,7 @@ from bkuser.apps.data_source.models import DataSource, DataSourceDepartment, Dat
 from bkuser.apps.idp.data_models import gen_data_source_match_rule_of_local
 from bkuser.apps.idp.models import Idp, IdpSensitiveInfo
 from bkuser.apps.notification.tasks import send_reset_password_to_user
+from bkuser.apps.permission.caches import UserRoleCache
 from bkuser.apps.permission.constants import PermAction
 from bkuser.apps.permission.permissions import perm_class
 from bkuser.apps.sync.tasks import initialize_identity_info_and_send_notification
@@ -192,6 +193,7 @@ class TenantListCreateApi(generics.ListCreateAPIView):
 
         # 添加为租户管理员
         TenantManager.objects.create(tenant=tenant, tenant_user=tenant_user)
+        UserRoleCache.invalidate(tenant.id, [tenant_user.id])
 
     @staticmethod
     def _add_builtin_management_local_idp(tenant_id: str, data_source_id: int):
@@ -28,6 +28,7 @@ from bkuser.apps.data_source.constants import DataSourceTypeEnum
 from bkuser.apps.data_source.models import LocalDataSourceIdentityInfo
 from bkuser.apps.idp.constants import IdpStatus
 from bkuser.apps.idp.models import Idp
+from bkuser.apps.permission.caches import UserRoleCache
 from bkuser.apps.permission.constants import PermAction
 from bkuser.apps.permission.permissions import perm_class
 from bkuser.apps.tenant.models import Tenant, TenantManager, TenantUser
@@ -253,6 +254,7 @@ class TenantRealManagerListCreateDestroyApi(
             TenantManager.objects.bulk_create(
                 [TenantManager(tenant_id=tenant_id, tenant_user_id=i) for i in waiting_create_ids]
             )
+            UserRoleCache.invalidate(tenant_id, waiting_create_ids)
 
         # 【审计】记录变更后的数据
         auditor.record_create()
@@ -280,6 +282,7 @@ class TenantRealManagerListCreateDestroyApi(
                 tenant_user__data_source__type=DataSourceTypeEnum.REAL,
                 tenant_user_id__in=ids,
             ).delete()
+            UserRoleCache.invalidate(self.get_current_tenant_id(), ids)
 
         # 【审计】记录变更后的数据
         auditor.record_delete()
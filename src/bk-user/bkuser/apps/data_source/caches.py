@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import functools
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+
+from bkuser.apps.data_source.models import DataSourceDepartment, DataSourceDepartmentRelation
+from bkuser.common.cache import Cache, CacheEnum, CacheGeneration, CacheKeyPrefixEnum
+
+
+class DataSourceDepartmentPathIndex:
+    """
+    数据源部门路径索引，用于快速计算部门的完整路径（如：公司/部门A/中心AA）
+
+    索引以数据源为单位构建，并通过版本号（generation）控制失效：在数据源同步完成 / 部门发生变更后，
+    需要调用 bump_generation 更新版本号，此后获取到的都是基于最新数据重新构建的索引。
+
+    索引数据存储在 Redis 中（多进程共享），同时进程内会以 LRU 的方式缓存最近使用的若干个索引，
+    因此稳定状态下获取索引只需要一次 Redis 查询（获取版本号），不会查询 DB。
+    """
+
+    # 部门路径分隔符
+    sep = "/"
+
+    def __init__(self, dept_map: Dict[int, Tuple[str, int | None]]):
+        """
+        :param dept_map: {数据源部门 ID: (部门名称, 父部门 ID)}
+        """
+        self.dept_map = dept_map
+        # 已计算过的部门路径 {数据源部门 ID: 部门路径}
+        self._full_name_map: Dict[int, str] = {}
+
+    def get_name(self, dept_id: int) -> str:
+        """获取部门名称，若部门不存在于索引中，则返回空字符串"""
+        return self.dept_map[dept_id][0] if dept_id in self.dept_map else ""
+
+    def get_full_name(self, dept_id: int) -> str:
+        """获取部门完整路径，若部门不存在于索引中，则返回空字符串"""
+        if full_name := self._full_name_map.get(dept_id):
+            return full_name
+
+        full_name = self.sep.join(self.dept_map[i][0] for i in self.get_ancestor_ids(dept_id, include_self=True))
+        self._full_name_map[dept_id] = full_name
+        return full_name
+
+    def get_ancestor_ids(self, dept_id: int, include_self: bool = False) -> List[int]:
+        """获取部门的祖先部门 ID 列表（从根部门开始），若部门不存在于索引中，则返回空列表"""
+        dept_ids, visited = [], set()
+        cur_dept_id: int | None = dept_id
+        # 避免有环导致死循环
+        while cur_dept_id is not None and cur_dept_id in self.dept_map and cur_dept_id not in visited:
+            visited.add(cur_dept_id)
+            dept_ids.append(cur_dept_id)
+            cur_dept_id = self.dept_map[cur_dept_id][1]
+
+        dept_ids.reverse()
+        return dept_ids if include_self else dept_ids[:-1]
+
+    @classmethod
+    def get(cls, data_source_id: int) -> "DataSourceDepartmentPathIndex":
+        """获取数据源当前版本的部门路径索引"""
+        return _get_department_path_index(data_source_id, cls._get_generation(data_source_id))
+
+    @classmethod
+    def bump_generation(cls, data_source_id: int) -> None:
+        """更新数据源部门路径索引的版本号，使已有的索引失效"""
+        _generation.bump(cls._gen_generation_cache_key(data_source_id))
+
+    @classmethod
+    def build(cls, data_source_id: int) -> "DataSourceDepartmentPathIndex":
+        """根据 DB 数据构建部门路径索引"""
+        dept_name_map = dict(
+            DataSourceDepartment.objects.filter(data_source_id=data_source_id).values_list("id", "name")
+        )
+        dept_parent_map = dict(
+            DataSourceDepartmentRelation.objects.filter(data_source_id=data_source_id).values_list(
+                "department_id", "parent_id"
+            )
+        )
+        return cls({dept_id: (name, dept_parent_map.get(dept_id)) for dept_id, name in dept_name_map.items()})
+
+    @classmethod
+    def _get_generation(cls, data_source_id: int) -> str:
+        return _generation.get(cls._gen_generation_cache_key(data_source_id))
+
+    @staticmethod
+    def _gen_generation_cache_key(data_source_id: int) -> str:
+        return f"gen:{data_source_id}"
+
+    @staticmethod
+    def _gen_index_cache_key(data_source_id: int, generation: str) -> str:
+        return f"idx:{data_source_id}:{generation}"
+
+
+class DataSourceRelationGeneration:
+    """
+    数据源关系（部门 - 用户，用户 - Leader）数据版本号，用于使基于关系数据构建的缓存失效
+
+    在关系数据变更（数据源同步 / 租户同步 / 页面编辑等）后，需要调用 bump 更新版本号
+    """
+
+    @classmethod
+    def bump(cls, data_source_id: int) -> None:
+        """更新数据源关系数据版本号"""
+        _relation_generation.bump(cls._gen_cache_key(data_source_id))
+
+    @classmethod
+    def get_many(cls, data_source_ids: Iterable[int]) -> Dict[int, str]:
+        """批量获取数据源关系数据版本号 {数据源 ID: 版本号}"""
+        key_map = {cls._gen_cache_key(data_source_id): data_source_id for data_source_id in data_source_ids}
+        generations = _relation_generation.get_many(list(key_map.keys()))
+        return {key_map[key]: generation for key, generation in generations.items()}
+
+    @staticmethod
+    def _gen_cache_key(data_source_id: int) -> str:
+        return f"gen:{data_source_id}"
+
+
+_cache = Cache(CacheEnum.REDIS, CacheKeyPrefixEnum.DEPARTMENT_PATH_INDEX)
+_generation = CacheGeneration(_cache)
+_relation_generation = CacheGeneration(Cache(CacheEnum.REDIS, CacheKeyPrefixEnum.DATA_SOURCE_RELATION_GENERATION))
+
+
+@functools.lru_cache(maxsize=settings.DEPARTMENT_PATH_INDEX_LOCAL_CACHE_SIZE)
+def _get_department_path_index(data_source_id: int, generation: str) -> DataSourceDepartmentPathIndex:
+    """
+    获取指定版本的部门路径索引（进程内 LRU 缓存 -> Redis -> DB）
+
+    Q: 为什么进程内缓存不直接使用 Django 的 LocMemCache？
+    A: LocMemCache 存取都需要 pickle 序列化，对于大型组织架构而言，每次请求都反序列化整个索引的开销不可忽视
+    """
+    cache_key = DataSourceDepartmentPathIndex._gen_index_cache_key(data_source_id, generation)
+    if dept_map := _cache.get(cache_key):
+        return DataSourceDepartmentPathIndex(dept_map)
+
+    index = DataSourceDepartmentPathIndex.build(data_source_id)
+    _cache.set(cache_key, index.dept_map, timeout=settings.DEPARTMENT_PATH_INDEX_CACHE_TIMEOUT)
+    return index
@@ -15,23 +15,35 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+# ignore custom logger must use %s string format in this file
+# ruff: noqa: G004
 import datetime
 import logging
-from typing import Dict, List, Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Tuple
 
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 
 from bkuser.apps.data_source.constants import DataSourceTypeEnum
 from bkuser.apps.data_source.models import DataSource, DataSourceUser, LocalDataSourceIdentityInfo
 from bkuser.common.constants import PERMANENT_TIME
-from bkuser.common.hashers import make_password
+from bkuser.common.hashers import is_make_password_parallelizable, make_password
 from bkuser.common.passwd import PasswordGenerator
+from bkuser.plugins.base import PluginLogger
 from bkuser.plugins.local.constants import PasswordGenerateMethod
 from bkuser.plugins.local.models import LocalDataSourcePluginConfig, PasswordInitialConfig, PasswordRuleConfig
 
 logger = logging.getLogger(__name__)
 
 
+def _make_passwords(raw_passwords: List[str]) -> List[str]:
+    """批量计算密码哈希（在线程池中执行）"""
+    return [make_password(passwd) for passwd in raw_passwords]
+
+
 class PasswordProvider:
     """本地数据源用户密码"""
 
@@ -52,8 +64,10 @@ class LocalDataSourceIdentityInfoInitializer:
 
     BATCH_SIZE = 250
 
-    def __init__(self, data_source: DataSource):
+    def __init__(self, data_source: DataSource, progress_logger: PluginLogger | None = None):
         self.data_source = data_source
+        # 初始化进度日志，若在同步任务中执行，可传入 TaskLogger 以记录到任务日志中
+        self.progress_logger = progress_logger or logger
         if not data_source.is_local:
             return
 
@@ -115,21 +129,51 @@ class LocalDataSourceIdentityInfoInitializer:
         # 由于用户密码将采用 HASH 加密，因此只有在初始化的时候才能获取到明文密码，用于后续通知
         user_password_map = {user.id: self.password_provider.generate() for user in users}
 
-        waiting_create_infos = [
-            LocalDataSourceIdentityInfo(
-                user=user,
-                password=make_password(user_password_map[user.id]),
-                password_updated_at=time_now,
-                password_expired_at=expired_at,
-                data_source=self.data_source,
-                username=user.username,
-            )
-            for user in users
-        ]
-        LocalDataSourceIdentityInfo.objects.bulk_create(waiting_create_infos, batch_size=self.BATCH_SIZE)
+        user_chunks = [users[idx : idx + self.BATCH_SIZE] for idx in range(0, len(users), self.BATCH_SIZE)]
+        passwd_chunks = [[user_password_map[user.id] for user in chunk] for chunk in user_chunks]
+
+        total_cnt, finished_cnt = len(users), 0
+        self.progress_logger.info(f"start to initialize identity infos for {total_cnt} users")
+        # 与原先单次 bulk_create 的行为保持一致：全部成功或全部回滚，避免已入库的密码无法通知到用户
+        with transaction.atomic():
+            for user_chunk, encrypted_passwords in zip(user_chunks, self._make_passwords(passwd_chunks)):
+                waiting_create_infos = [
+                    LocalDataSourceIdentityInfo(
+                        user=user,
+                        password=encrypted_passwd,
+                        password_updated_at=time_now,
+                        password_expired_at=expired_at,
+                        data_source=self.data_source,
+                        username=user.username,
+                    )
+                    for user, encrypted_passwd in zip(user_chunk, encrypted_passwords)
+                ]
+                LocalDataSourceIdentityInfo.objects.bulk_create(waiting_create_infos)
+
+                finished_cnt += len(user_chunk)
+                self.progress_logger.info(f"initialize identity infos progress: {finished_cnt}/{total_cnt}")
 
         return user_password_map
 
+    def _make_passwords(self, passwd_chunks: List[List[str]]) -> Iterator[List[str]]:
+        """
+        按批次计算密码哈希，按输入顺序逐批返回结果
+
+        make_password 是 CPU 密集的耗时操作（加盐，每个密码都需要单独计算），因此在批次较多时，使用线程池并行计算：
+        哈希计算（hashlib.pbkdf2_hmac）会释放 GIL，多线程同样可以利用多核；批次较少，或者哈希计算无法释放 GIL
+        （PBKDF2-SM3 使用 tongsuopy 实现）时，多线程并不能加速，则直接在当前线程中计算
+
+        Note: 不使用进程池，因为该方法通常在 Celery（prefork）Worker 中执行，在其中 fork 子进程并不安全
+        """
+        max_workers = min(settings.LOCAL_DATA_SOURCE_PASSWORD_HASH_WORKERS, len(passwd_chunks), os.cpu_count() or 1)
+        if max_workers <= 1 or not is_make_password_parallelizable():
+            yield from map(_make_passwords, passwd_chunks)
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # executor.map 会按提交顺序返回结果，先完成的批次可以先入库，无需等待全部计算完成
+            yield from executor.map(_make_passwords, passwd_chunks)
+
     def _get_password_expired_at(self) -> datetime.datetime:
         """获取密码过期的具体时间"""
         valid_time: int = self.plugin_cfg.password_expire.valid_time  # type: ignore
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+from django.core.management.base import BaseCommand
+
+from bkuser.apps.data_source.caches import DataSourceDepartmentPathIndex
+from bkuser.apps.data_source.models import DataSource
+
+
+class Command(BaseCommand):
+    """
+    重建数据源部门路径索引（部门组织路径，如：公司/部门A/中心AA）
+
+    - 重建所有数据源的部门路径索引
+    $ python manage.py build_department_path_index
+
+    - 重建指定数据源的部门路径索引
+    $ python manage.py build_department_path_index --data_source_id 1
+
+    执行时机：首次部署 / 版本升级后执行一次（可重复执行），用于预热索引，避免首次请求时构建索引的开销
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--data_source_id", dest="data_source_id", type=int, help="数据源 ID，不指定则为全部数据源"
+        )
+
+    def handle(self, data_source_id: int | None, *args, **options):
+        data_sources = DataSource.objects.all()
+        if data_source_id:
+            data_sources = data_sources.filter(id=data_source_id)
+
+        for data_source in data_sources:
+            # 先更新版本号，使旧索引失效，再基于 DB 最新数据构建新的索引（构建后会写入 Redis）
+            DataSourceDepartmentPathIndex.bump_generation(data_source.id)
+            index = DataSourceDepartmentPathIndex.get(data_source.id)
+            self.stdout.write(
+                f"department path index of data source {data_source.id} built, {len(index.dept_map)} departments"
+            )
+
+        self.stdout.write("build department path index success!")
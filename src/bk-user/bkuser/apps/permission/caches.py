@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+from typing import Callable, Iterable
+
+from django.conf import settings
+
+from bkuser.apps.permission.constants import UserRole
+from bkuser.common.cache import Cache, CacheEnum, CacheKeyPrefixEnum
+
+
+class UserRoleCache:
+    """
+    用户在租户下的角色缓存，避免每次鉴权都需要查询 DB
+
+    租户管理员变更（添加 / 移除）后，需要调用 invalidate 使缓存失效，
+    缓存时间较短，即使存在未覆盖到的变更场景（如：直接修改 DB），也只会短时间内不一致
+    """
+
+    @classmethod
+    def get(cls, tenant_id: str, username: str, build: Callable[[], UserRole]) -> UserRole:
+        """获取用户角色，缓存不存在时，调用 build 获取并写入缓存"""
+        cache_key = cls._gen_cache_key(tenant_id, username)
+        if role := _cache.get(cache_key):
+            return UserRole(role)
+
+        role = build()
+        _cache.set(cache_key, role.value, timeout=settings.PERMISSION_USER_ROLE_CACHE_TIMEOUT)
+        return role
+
+    @classmethod
+    def invalidate(cls, tenant_id: str, usernames: Iterable[str]) -> None:
+        """使指定租户下用户的角色缓存失效"""
+        for username in usernames:
+            _cache.delete(cls._gen_cache_key(tenant_id, username))
+
+    @staticmethod
+    def _gen_cache_key(tenant_id: str, username: str) -> str:
+        return f"{tenant_id}:{username}"
+
+
+_cache = Cache(CacheEnum.REDIS, CacheKeyPrefixEnum.PERMISSION_USER_ROLE)
@@ -16,14 +16,17 @@
 # to the current version of the project delivered to anyone in the future.
 
 import logging
+from typing import Any, Callable, Tuple, TypeVar
 
 from rest_framework.permissions import BasePermission
 
 from bkuser.apps.data_source.models import DataSource, DataSourcePlugin
 from bkuser.apps.idp.models import Idp, IdpPlugin
 from bkuser.apps.natural_user.models import DataSourceUserNaturalUserRelation
+from bkuser.apps.permission.caches import UserRoleCache
 from bkuser.apps.permission.constants import PermAction, UserRole
 from bkuser.apps.tenant.models import CollaborationStrategy, Tenant, TenantManager, TenantUser
+from bkuser.common.local import local
 
 logger = logging.getLogger(__name__)
 
@@ -97,16 +100,12 @@ def perm_class(action: PermAction):  # noqa: C901
 
 def is_super_manager(tenant_id: str, username: str) -> bool:
     """默认租户的管理员，有管理平台的权限（超级管理员）"""
-    tenant = Tenant.objects.get(id=tenant_id)
-    if not tenant.is_default:
-        return False
-
-    return TenantManager.objects.filter(tenant=tenant, tenant_user_id=username).exists()
+    return get_user_role(tenant_id, username) == UserRole.SUPER_MANAGER
 
 
 def is_tenant_manager(tenant_id: str, username: str) -> bool:
     """本租户的管理员，拥有管理当前租户配置的权限"""
-    return TenantManager.objects.filter(tenant_id=tenant_id, tenant_user_id=username).exists()
+    return get_user_role(tenant_id, username) in [UserRole.SUPER_MANAGER, UserRole.TENANT_MANAGER]
 
 
 def is_same_nature_user(req_username: str, cur_tenant_id: str, username: str) -> bool:
@@ -116,6 +115,13 @@ def is_same_nature_user(req_username: str, cur_tenant_id: str, username: str) ->
     :param cur_tenant_id: 当前用户的租户 ID
     :param username: 当前用户的用户名
     """
+    return _memoize(
+        ("is_same_nature_user", req_username, cur_tenant_id, username),
+        lambda: _is_same_nature_user(req_username, cur_tenant_id, username),
+    )
+
+
+def _is_same_nature_user(req_username: str, cur_tenant_id: str, username: str) -> bool:
     cur_tenant_user = TenantUser.objects.filter(tenant_id=cur_tenant_id, id=username).first()
     # 当前登录的，连租户用户都不是，自然不是自然人
     if not cur_tenant_user:
@@ -138,12 +144,36 @@ def is_same_nature_user(req_username: str, cur_tenant_id: str, username: str) ->
 
 def get_user_role(tenant_id: str, username: str) -> UserRole:
     """获取用户角色，因目前超级管理员必定是租户管理员，租户管理员必定是普通用户，因此返回最高级的角色即可"""
-    tenant = Tenant.objects.get(id=tenant_id)
+    # 单次请求中可能多次鉴权，优先使用请求级别的结果，其次才是（跨请求的）短时缓存
+    return _memoize(
+        ("user_role", tenant_id, username),
+        lambda: UserRoleCache.get(tenant_id, username, lambda: _get_user_role(tenant_id, username)),
+    )
+
 
-    if TenantManager.objects.filter(tenant=tenant, tenant_user_id=username).exists():
-        if tenant.is_default:
+def _get_user_role(tenant_id: str, username: str) -> UserRole:
+    if TenantManager.objects.filter(tenant_id=tenant_id, tenant_user_id=username).exists():
+        if Tenant.objects.filter(id=tenant_id, is_default=True).exists():
             return UserRole.SUPER_MANAGER
 
         return UserRole.TENANT_MANAGER
 
     return UserRole.NATURAL_USER
+
+
+T = TypeVar("T")
+
+
+def _memoize(key: Tuple[Any, ...], func: Callable[[], T]) -> T:
+    """在当前请求内缓存鉴权结果（请求结束即失效），不在请求上下文中（如：异步任务）则直接计算"""
+    request = local.request
+    if request is None:
+        return func()
+
+    if not hasattr(request, "_permission_memo"):
+        request._permission_memo = {}
+
+    if key not in request._permission_memo:
+        request._permission_memo[key] = func()
+
+    return request._permission_memo[key]
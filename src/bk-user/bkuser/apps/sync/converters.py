@@ -17,8 +17,8 @@
 
 # ignore custom logger must use %s string format in this file
 # ruff: noqa: G003, G004
-import re
-from typing import Any, Dict, List
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set, Tuple
 
 import pydantic
 from django.conf import settings
@@ -35,6 +35,35 @@ from bkuser.plugins.models import RawDataSourceUser
 from bkuser.utils.pydantic import stringify_pydantic_error
 
 
+@dataclass
+class _CustomFieldPlan:
+    """自定义字段的转换计划"""
+
+    name: str
+    source_field: str
+    data_type: str
+    required: bool
+    default: Any
+    # 可选项 ID 列表，用于错误信息展示
+    opt_ids: List[str]
+    # 可选项 ID 集合，用于快速判断
+    opt_id_set: Set[str]
+
+
+@dataclass
+class _ConversionPlan:
+    """用户转换计划，每次同步只编译一次，避免每个用户都重复计算字段映射，枚举可选项等"""
+
+    username_field: str | None
+    full_name_field: str | None
+    email_field: str | None
+    phone_field: str | None
+    phone_country_code_field: str | None
+    custom_fields: List[_CustomFieldPlan]
+    # 手机号校验结果缓存 {(phone, country_code): error_message}，error_message 为 None 表示合法
+    phone_validate_results: Dict[Tuple[str, str], str | None] = field(default_factory=dict)
+
+
 class DataSourceUserConverter:
     """数据源用户转换器"""
 
@@ -43,42 +72,38 @@ class DataSourceUserConverter:
         self.logger = logger
         self.custom_fields = TenantUserCustomField.objects.filter(tenant_id=self.data_source.owner_tenant_id)
         self.field_mapping = self._get_field_mapping()
+        # 转换计划在首次转换时编译，后续所有用户复用
+        self._plan: _ConversionPlan | None = None
 
     def convert(self, user: RawDataSourceUser) -> DataSourceUser:
-        # TODO (su) 支持复杂字段映射类型，如表达式，目前都当作直接映射处理（目前只支持直接映射）
-        mapping = {m.target_field: m.source_field for m in self.field_mapping}
+        plan = self._get_plan()
         props = user.properties
 
-        username = props.get(mapping["username"])
+        username = props.get(plan.username_field)  # type: ignore
         # 1. 用户名是必须提供的，而且需要满足正则校验规则
         if not username:
             raise ValueError("username is required")
 
-        if not re.fullmatch(DATA_SOURCE_USERNAME_REGEX, username):
+        if not DATA_SOURCE_USERNAME_REGEX.fullmatch(username):
             raise ValueError(f"username [{username}] not match pattern {DATA_SOURCE_USERNAME_REGEX.pattern}")
 
         # 2. 姓名也是必须提供的
-        full_name = props.get(mapping["full_name"])
+        full_name = props.get(plan.full_name_field)  # type: ignore
         if not full_name:
             raise ValueError(f"username {username}, full_name is required")
 
-        email = props.get(mapping.get("email")) or ""  # type: ignore
+        email = props.get(plan.email_field) or ""  # type: ignore
         # 3. 如果提供了邮箱，则必须满足正则校验规则
-        if email and not re.fullmatch(EMAIL_REGEX, email):
+        if email and not EMAIL_REGEX.fullmatch(email):
             raise ValueError(
                 f"username {username}, email [{email}] provided but not match pattern {EMAIL_REGEX.pattern}"
             )
 
-        phone = props.get(mapping.get("phone")) or ""  # type: ignore
-        country_code = (
-            props.get(
-                mapping.get("phone_country_code"),  # type: ignore
-            )
-            or settings.DEFAULT_PHONE_COUNTRY_CODE
-        )
+        phone = props.get(plan.phone_field) or ""  # type: ignore
+        country_code = props.get(plan.phone_country_code_field) or settings.DEFAULT_PHONE_COUNTRY_CODE  # type: ignore
         # 4. 如果提供了手机号，则需要通过 phonenumbers 的检查，确保手机号码合法
         if phone:
-            validate_phone_with_country_code(phone, country_code)
+            self._validate_phone(plan, phone, country_code)
 
         return DataSourceUser(
             data_source=self.data_source,
@@ -88,9 +113,63 @@ class DataSourceUserConverter:
             email=email,
             phone=phone,
             phone_country_code=country_code,
-            extras=self._build_extras(username, props, mapping),
+            extras=self._build_extras(username, props, plan),
         )
 
+    def _get_plan(self) -> _ConversionPlan:
+        if self._plan is None:
+            self._plan = self._compile_plan()
+
+        return self._plan
+
+    def _compile_plan(self) -> _ConversionPlan:
+        """根据字段映射 & 自定义字段配置，编译用户转换计划"""
+        # TODO (su) 支持复杂字段映射类型，如表达式，目前都当作直接映射处理（目前只支持直接映射）
+        mapping = {m.target_field: m.source_field for m in self.field_mapping}
+
+        custom_fields = []
+        for f in self.custom_fields:
+            # 并不是所有的自定义字段，都已经被配置到字段映射中，这里应该以字段映射为准
+            if f.name not in mapping:
+                continue
+
+            opt_ids = [opt["id"] for opt in f.options]
+            custom_fields.append(
+                _CustomFieldPlan(
+                    name=f.name,
+                    source_field=mapping[f.name],
+                    data_type=f.data_type,
+                    required=f.required,
+                    default=f.default,
+                    opt_ids=opt_ids,
+                    opt_id_set=set(opt_ids),
+                )
+            )
+
+        return _ConversionPlan(
+            username_field=mapping.get("username"),
+            full_name_field=mapping.get("full_name"),
+            email_field=mapping.get("email"),
+            phone_field=mapping.get("phone"),
+            phone_country_code_field=mapping.get("phone_country_code"),
+            custom_fields=custom_fields,
+        )
+
+    @staticmethod
+    def _validate_phone(plan: _ConversionPlan, phone: str, country_code: str) -> None:
+        """校验手机号，相同的 (手机号, 区号) 只会真正校验一次"""
+        key = (phone, country_code)
+        if key not in plan.phone_validate_results:
+            try:
+                validate_phone_with_country_code(phone, country_code)
+            except ValueError as e:
+                plan.phone_validate_results[key] = str(e)
+            else:
+                plan.phone_validate_results[key] = None
+
+        if err_msg := plan.phone_validate_results[key]:
+            raise ValueError(err_msg)
+
     def _get_field_mapping(self) -> List[DataSourceUserFieldMapping]:
         """获取字段映射配置"""
         if self.data_source.is_local:
@@ -135,17 +214,10 @@ class DataSourceUserConverter:
             for f in fields
         ]
 
-    def _build_extras(  # noqa: C901
-        self, username: str, props: Dict[str, str], mapping: Dict[str, str]
-    ) -> Dict[str, Any]:
+    def _build_extras(self, username: str, props: Dict[str, str], plan: _ConversionPlan) -> Dict[str, Any]:
         extras = {}
-        for f in self.custom_fields:
-            # 并不是所有的自定义字段，都已经被配置到字段映射中，这里应该以字段映射为准
-            if f.name not in mapping:
-                continue
-
-            opt_ids = [opt["id"] for opt in f.options]
-            value = props.get(mapping[f.name], f.default)
+        for f in plan.custom_fields:
+            value = props.get(f.source_field, f.default)
 
             # 数字类型，转换成整型不丢精度就转，不行就浮点数
             if f.data_type == UserFieldDataType.NUMBER:
@@ -158,9 +230,9 @@ class DataSourceUserConverter:
                     )
             # 枚举类型，值（id）必须是字符串，且是可选项中的一个
             elif f.data_type == UserFieldDataType.ENUM:
-                if value not in opt_ids:
+                if value not in f.opt_id_set:
                     raise ValueError(
-                        f"username: {username}, enum field {f.name} value `{value}` not in options {opt_ids}"
+                        f"username: {username}, enum field {f.name} value `{value}` not in options {f.opt_ids}"
                     )
             # 多选枚举类型，值必须是字符串列表，且是可选项的子集
             elif f.data_type == UserFieldDataType.MULTI_ENUM:
@@ -169,9 +241,9 @@ class DataSourceUserConverter:
                 if isinstance(value, str):
                     value = [v.strip() for v in value.split(",") if v.strip()]  # type: ignore
 
-                if set(value) - set(opt_ids):
+                if not f.opt_id_set.issuperset(value):
                     raise ValueError(
-                        f"username: {username}, multi enum field {f.name} value `{value}` not subset of {opt_ids}"
+                        f"username: {username}, multi enum field {f.name} value `{value}` not subset of {f.opt_ids}"
                     )
             # 必填字段检查仅适用于字符串类型字段，因为数字类型即使是 0 也不能判断是空，枚举类型都有值检查
             elif f.data_type == UserFieldDataType.STRING and f.required and not value:
@@ -30,6 +30,8 @@ class DataSourceSyncOptions(BaseModel):
     overwrite: bool = False
     # 是否使用增量同步
     incremental: bool = False
+    # 是否允许插件仅拉取变更数据（需插件支持 & 启用，仅拉取自上次同步以来有变更的用户）
+    delta: bool = False
     # 是否异步执行同步任务
     async_run: bool = True
     # 同步任务触发方式
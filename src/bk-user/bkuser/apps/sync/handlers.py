@@ -23,11 +23,13 @@ from django.dispatch import receiver
 from django_celery_beat.models import IntervalSchedule, PeriodicTask
 from pydantic import ValidationError
 
+from bkuser.apps.data_source.caches import DataSourceDepartmentPathIndex, DataSourceRelationGeneration
 from bkuser.apps.data_source.constants import DataSourceTypeEnum
 from bkuser.apps.data_source.models import DataSource
 from bkuser.apps.sync.constants import DataSourceSyncPeriod
 from bkuser.apps.sync.data_models import DataSourceSyncConfig, TenantSyncOptions
-from bkuser.apps.sync.managers import TenantSyncManager
+from bkuser.apps.sync.managers import TenantSyncFanOutManager
+from bkuser.apps.sync.models import TenantSyncTask
 from bkuser.apps.sync.names import gen_data_source_sync_periodic_task_name
 from bkuser.apps.sync.signals import post_sync_data_source, post_sync_tenant
 from bkuser.apps.sync.tasks import initialize_identity_info_and_send_notification
@@ -37,41 +39,57 @@ from bkuser.apps.tenant.models import CollaborationStrategy
 logger = logging.getLogger(__name__)
 
 
+@receiver(post_sync_data_source)
+def invalidate_department_path_index(sender, data_source: DataSource, **kwargs):
+    """数据源同步后，部门 & 部门关系可能有变化，需要使部门路径索引失效"""
+    DataSourceDepartmentPathIndex.bump_generation(data_source.id)
+
+
 @receiver(post_sync_data_source)
 def sync_tenant_departments_users(sender, data_source: DataSource, **kwargs):
     """同步租户数据（部门 & 用户）"""
-    sync_opts = TenantSyncOptions()
     # 同步到数据源所属租户
-    TenantSyncManager(data_source, data_source.owner_tenant_id, sync_opts).execute()
+    tenant_ids = [data_source.owner_tenant_id]
 
     # 虽然逻辑上只有实名数据源会同步 & 发送 post_sync_data_source 信号，但是防御一下比较好
     if data_source.type != DataSourceTypeEnum.REAL:
-        logger.warning("data source %s is not real user type, skip sync...", data_source.id)
-        return
+        logger.warning("data source %s is not real user type, skip sync collaboration tenants...", data_source.id)
+    else:
+        # 根据配置的协同策略，同步其他租户
+        for strategy in CollaborationStrategy.objects.filter(source_tenant_id=data_source.owner_tenant_id):
+            # 任意一方状态不是已启用，就不会执行协同同步
+            if strategy.source_status != CollaborationStrategyStatus.ENABLED:
+                logger.info("collaboration strategy %s is not enabled by source, skip sync...", strategy.id)
+                continue
+            if strategy.target_status != CollaborationStrategyStatus.ENABLED:
+                logger.info("collaboration strategy %s is not enabled by target, skip sync...", strategy.id)
+                continue
 
-    # 根据配置的协同策略，同步其他租户
-    for strategy in CollaborationStrategy.objects.filter(source_tenant_id=data_source.owner_tenant_id):
-        # 任意一方状态不是已启用，就不会执行协同同步
-        if strategy.source_status != CollaborationStrategyStatus.ENABLED:
-            logger.info("collaboration strategy %s is not enabled by source, skip sync...", strategy.id)
-            continue
-        if strategy.target_status != CollaborationStrategyStatus.ENABLED:
-            logger.info("collaboration strategy %s is not enabled by target, skip sync...", strategy.id)
-            continue
+            tenant_ids.append(strategy.target_tenant_id)
 
-        TenantSyncManager(data_source, strategy.target_tenant_id, sync_opts).execute()
+    # 各租户的同步任务相互独立，可以并发执行
+    TenantSyncFanOutManager(data_source, tenant_ids, TenantSyncOptions()).execute()
+
+
+@receiver(post_sync_tenant)
+def invalidate_data_source_relation_generation(sender, data_source: DataSource, **kwargs):
+    """租户同步后，租户部门可能有变化（影响关系数据中的租户部门 ID），需要使基于关系数据构建的缓存失效"""
+    DataSourceRelationGeneration.bump(data_source.id)
 
 
 @receiver(post_sync_tenant)
-def sync_identity_infos_and_notify_after_sync_tenant(sender, data_source: DataSource, **kwargs):
+def sync_identity_infos_and_notify_after_sync_tenant(
+    sender, data_source: DataSource, task: TenantSyncTask | None = None, **kwargs
+):
     """
-    在完成租户同步后，需要对本地数据源的用户账密信息做初始化
+    在完成租户同步后，需要对本地数据源的用户账密信息做初始化（初始化进度会记录到租户同步任务日志中）
 
     Q: 为什么在完成租户同步后才初始化本地数据源用户账密信息（而不是数据源同步后就整）?
     A: 1. 初始化后，通知只能发送给租户用户，因此需要等待租户同步完成后才执行
        2. 用户管理对外只有租户用户，如果租户用户未创建，则初始化也是没有意义的
     """
-    transaction.on_commit(lambda: initialize_identity_info_and_send_notification.delay(data_source.id))
+    task_id = task.id if task else None
+    transaction.on_commit(lambda: initialize_identity_info_and_send_notification.delay(data_source.id, task_id))
 
 
 @receiver(post_save, sender=DataSource)
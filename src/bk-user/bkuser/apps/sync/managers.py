@@ -15,8 +15,9 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
+from celery import chain, chord
 from django.conf import settings
 from django.utils import timezone
 
@@ -25,7 +26,12 @@ from bkuser.apps.sync.constants import SyncTaskStatus
 from bkuser.apps.sync.data_models import DataSourceSyncOptions, TenantSyncOptions
 from bkuser.apps.sync.models import DataSourceSyncTask, TenantSyncTask
 from bkuser.apps.sync.runners import DataSourceSyncTaskRunner, TenantSyncTaskRunner
-from bkuser.apps.sync.tasks import sync_data_source, sync_tenant
+from bkuser.apps.sync.tasks import (
+    summarize_tenant_sync_tasks,
+    sync_data_source,
+    sync_tenant,
+    sync_tenant_in_fan_out,
+)
 from bkuser.apps.sync.workbook_temp_store import WorkbookTempStore
 
 
@@ -50,6 +56,7 @@ class DataSourceSyncManager:
             extras={
                 "incremental": self.sync_options.incremental,
                 "overwrite": self.sync_options.overwrite,
+                "delta": self.sync_options.delta,
                 "async_run": self.sync_options.async_run,
                 "sync_timeout": self.sync_timeout,
             },
@@ -95,13 +102,24 @@ class TenantSyncManager:
 
     def execute(self) -> TenantSyncTask:
         """同步数据源用户，部门信息到租户，注意该方法不可用于 DB 事务中，可能导致异步任务获取 Task 失败"""
+        task = self.create_task()
+
+        if self.sync_options.async_run:
+            sync_tenant.apply_async(args=[task.id], soft_time_limit=self.sync_timeout)
+        else:
+            TenantSyncTaskRunner(task).run()
+
+        return task
+
+    def create_task(self) -> TenantSyncTask:
+        """创建租户同步任务（不执行）"""
 
         # Q: 为什么不是使用传入 data_source_sync_task id 信息而是直接获取最新一个？
         # A: 在创建租户同步任务时，才拿取最新的数据源同步任务，可以避免因延时获取的不是最新的
         data_source_sync_task = DataSourceSyncTask.objects.filter(data_source=self.data_source).order_by("-id").first()
         data_source_sync_task_id = data_source_sync_task.id if data_source_sync_task else 0
 
-        task = TenantSyncTask.objects.create(
+        return TenantSyncTask.objects.create(
             tenant_id=self.tenant_id,
             data_source=self.data_source,
             data_source_owner_tenant_id=self.data_source.owner_tenant_id,
@@ -116,9 +134,67 @@ class TenantSyncManager:
             },
         )
 
-        if self.sync_options.async_run:
-            sync_tenant.apply_async(args=[task.id], soft_time_limit=self.sync_timeout)
-        else:
-            TenantSyncTaskRunner(task).run()
 
-        return task
+class TenantSyncFanOutManager:
+    """
+    租户同步扇出管理器：将数据源数据同步到多个租户（数据源所属租户 & 协同租户）
+
+    各租户的同步是相互独立的 Celery 任务（由租户同步锁保证同一租户不会并发同步同一数据源），
+    任务按并发上限分为若干条链，链之间并发执行，链内串行执行，全部完成后将各租户同步任务的状态汇总到数据源同步任务中
+
+    Note: 若 Worker 异常退出导致部分任务未能完成，则汇总任务不会被触发，因此另外派发一个延时的汇总任务作为兜底，
+    超时后仍未完成的租户同步任务将被视为失败
+    """
+
+    def __init__(self, data_source: DataSource, tenant_ids: List[str], sync_options: TenantSyncOptions):
+        self.data_source = data_source
+        self.tenant_ids = tenant_ids
+        self.sync_options = sync_options
+        self.sync_timeout = settings.TENANT_SYNC_DEFAULT_TIMEOUT
+        self.fan_out_timeout = settings.TENANT_SYNC_FAN_OUT_TIMEOUT
+        self.concurrency = max(settings.TENANT_SYNC_FAN_OUT_CONCURRENCY, 1)
+        self.queue = settings.TENANT_SYNC_FAN_OUT_QUEUE
+
+    def execute(self) -> List[TenantSyncTask]:
+        """同步数据源用户，部门信息到各租户，注意该方法不可用于 DB 事务中，可能导致异步任务获取 Task 失败"""
+        tasks = [
+            TenantSyncManager(self.data_source, tenant_id, self.sync_options).create_task()
+            for tenant_id in self.tenant_ids
+        ]
+        if not tasks:
+            return tasks
+
+        data_source_sync_task_id = tasks[0].data_source_sync_task_id
+        task_ids = [task.id for task in tasks]
+        # 先记录一次汇总状态（等待中），便于在所有租户同步完成前查询进度
+        summarize_tenant_sync_tasks(data_source_sync_task_id, task_ids)
+
+        if not self.sync_options.async_run:
+            try:
+                for task in tasks:
+                    TenantSyncTaskRunner(task).run()
+            finally:
+                summarize_tenant_sync_tasks(data_source_sync_task_id, task_ids)
+
+            return tasks
+
+        # 租户同步任务按并发上限分为若干条链（chord header），某个任务完成后才会执行同一条链中的下一个任务，
+        # 因此同时执行的任务数不超过并发上限，全部完成后汇总同步结果（chord body），
+        # 若有任务异常（如超时被终止），则通过 errback 汇总同步结果
+        options = {"soft_time_limit": self.sync_timeout}
+        if self.queue:
+            options["queue"] = self.queue
+
+        lanes = [
+            chain(sync_tenant_in_fan_out.si(task_id).set(**options) for task_id in task_ids[idx :: self.concurrency])
+            for idx in range(min(self.concurrency, len(task_ids)))
+        ]
+        summary = summarize_tenant_sync_tasks.si(data_source_sync_task_id, task_ids)
+        chord(lanes, summary).on_error(
+            summarize_tenant_sync_tasks.si(data_source_sync_task_id, task_ids)
+        ).apply_async()
+        # 兜底：超时后再次汇总，仍未完成的任务视为失败
+        summarize_tenant_sync_tasks.apply_async(
+            (data_source_sync_task_id, task_ids), {"expired": True}, countdown=self.fan_out_timeout
+        )
+        return tasks
@@ -48,6 +48,8 @@ def build_and_run_data_source_sync_task(data_source_id: int):
         operator=data_source.updater,
         overwrite=True,
         incremental=False,
+        # 若数据源插件支持并启用了增量同步，则仅拉取自上次同步以来有变更的用户
+        delta=True,
         # 注：现在就在异步任务中，不需要 async_run=True
         async_run=False,
         trigger=SyncTaskTrigger.CRONTAB,
@@ -18,11 +18,12 @@
 # ignore custom logger must use %s string format in this file
 # ruff: noqa: G004
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Set
 
 from bkuser.apps.data_source.models import DataSource, DataSourceUser
-from bkuser.apps.sync.constants import DataSourceSyncObjectType
+from bkuser.apps.sync.constants import DataSourceSyncObjectType, SyncTaskStatus
 from bkuser.apps.sync.contexts import DataSourceSyncTaskContext
+from bkuser.apps.sync.converters import DataSourceUserConverter
 from bkuser.apps.sync.models import DataSourceSyncTask
 from bkuser.apps.sync.signals import post_sync_data_source
 from bkuser.apps.sync.syncers import (
@@ -35,7 +36,7 @@ from bkuser.apps.sync.syncers import (
 from bkuser.apps.sync.validators import DataSourceUserExtrasUniqueValidator
 from bkuser.apps.tenant.constants import TenantStatus
 from bkuser.apps.tenant.models import Tenant
-from bkuser.plugins.base import get_plugin_cls
+from bkuser.plugins.base import DeltaSyncPluginMixin, RequiredUserPropertiesPluginMixin, get_plugin_cls
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +57,7 @@ class DataSourceSyncTaskRunner:
             self._initial_plugin(ctx, self.plugin_init_extra_kwargs)
             self._sync_departments(ctx)
             self._sync_users(ctx)
+            self._save_delta_sync_state(ctx)
             self._validate_unique_fields(ctx)
             self._send_signal(ctx)
 
@@ -76,8 +78,36 @@ class DataSourceSyncTaskRunner:
         plugin_cfg = self.data_source.get_plugin_cfg()
 
         PluginCls = get_plugin_cls(self.data_source.plugin_id)  # noqa: N806
+        # 支持增量同步的插件，需要传入上次同步成功后记录的增量同步状态
+        if issubclass(PluginCls, DeltaSyncPluginMixin):
+            plugin_init_extra_kwargs = {
+                **plugin_init_extra_kwargs,
+                "delta_sync_state": self._get_last_delta_sync_state(),
+            }
+
+        # 支持按需生成用户属性的插件，只需要提供字段映射中使用到的属性
+        if issubclass(PluginCls, RequiredUserPropertiesPluginMixin):
+            field_mapping = DataSourceUserConverter(self.data_source, ctx.logger).field_mapping
+            plugin_init_extra_kwargs = {
+                **plugin_init_extra_kwargs,
+                "required_user_properties": [m.source_field for m in field_mapping],
+            }
+
         self.plugin = PluginCls(plugin_cfg, ctx.logger, **plugin_init_extra_kwargs)
 
+    def _get_last_delta_sync_state(self) -> Dict[str, Any] | None:
+        """获取上次同步成功后记录的增量同步状态，不允许增量拉取的任务返回 None（即全量拉取）"""
+        if not self.task.extras.get("delta", False):
+            return None
+
+        last_task = (
+            DataSourceSyncTask.objects.filter(data_source=self.data_source, status=SyncTaskStatus.SUCCESS)
+            .exclude(id=self.task.id)
+            .order_by("-id")
+            .first()
+        )
+        return last_task.extras.get("delta_sync_state") if last_task else None
+
     def _sync_departments(self, ctx: DataSourceSyncTaskContext):
         """同步部门信息"""
         raw_departments = self.plugin.fetch_departments()
@@ -104,12 +134,21 @@ class DataSourceSyncTaskRunner:
         raw_users = self.plugin.fetch_users()
         ctx.logger.info(f"receive {len(raw_users)} users from data source plugin")
 
+        overwrite = bool(self.task.extras.get("overwrite", False))
+        incremental = bool(self.task.extras.get("incremental", False))
+        alive_user_codes: Set[str] | None = None
+        # 插件仅提供了有变更的用户，需要以增量 + 覆盖的模式同步，已删除的用户以插件对账结果为准
+        if isinstance(self.plugin, DeltaSyncPluginMixin) and self.plugin.is_delta_fetch:
+            ctx.logger.info("data source plugin provides changed users only, sync users in incremental mode")
+            overwrite, incremental = True, True
+            alive_user_codes = self.plugin.alive_user_codes
+
         kwargs = {
             "ctx": ctx,
             "data_source": self.data_source,
             "raw_users": raw_users,
-            "overwrite": bool(self.task.extras.get("overwrite", False)),
-            "incremental": bool(self.task.extras.get("incremental", False)),
+            "overwrite": overwrite,
+            "incremental": incremental,
         }
 
         # Q: 为什么不能在使用的地方现查？直接 DB 查询获取 “同步前存量” 的用户 ID 集合？
@@ -121,7 +160,7 @@ class DataSourceSyncTaskRunner:
         # ref: https://github.com/TencentBlueKing/bk-user/pull/1904/files
         exists_user_ids = set(DataSourceUser.objects.filter(data_source=self.data_source).values_list("id", flat=True))
         # 用户主体
-        DataSourceUserSyncer(**kwargs).sync()  # type: ignore
+        DataSourceUserSyncer(alive_user_codes=alive_user_codes, **kwargs).sync()  # type: ignore
         ctx.synced_obj_types.add(DataSourceSyncObjectType.USER)
         # 用户 Leader 关系
         DataSourceUserLeaderRelationSyncer(exists_user_ids_before_sync=exists_user_ids, **kwargs).sync()  # type: ignore
@@ -132,6 +171,15 @@ class DataSourceSyncTaskRunner:
 
         ctx.logger.info("succeed to sync users and their leader & dept relations from data source plugin")
 
+    def _save_delta_sync_state(self, ctx: DataSourceSyncTaskContext):
+        """记录插件提供的增量同步状态，同步成功后，下次同步可基于该状态进行增量拉取"""
+        if not isinstance(self.plugin, DeltaSyncPluginMixin):
+            return
+
+        self.task.extras["delta_sync_state"] = self.plugin.delta_sync_state
+        self.task.save(update_fields=["extras", "updated_at"])
+        ctx.logger.info(f"delta sync state: {self.plugin.delta_sync_state}")
+
     def _validate_unique_fields(self, ctx: DataSourceSyncTaskContext):
         """对有唯一性要求的自定义字段的校验"""
         DataSourceUserExtrasUniqueValidator(self.data_source, ctx.logger).validate()
@@ -159,7 +207,8 @@ class DataSourceSyncTaskRunner:
                -> 会同步到租户，但用户部门关联边是老数据
                具体影响：部分用户无法获取部门信息（部门被删除，导致有边无节点）
 
-         注意：其中场景 2 出现概率极低（原因是 mptt 树是直接重建的，除非 tree_id 分配到 int 上限导致失败，需运维介入）
+         注意：其中场景 2 出现概率极低（原因是 mptt 树是在内存中计算后写入的，
+         除非 tree_id 分配到 int 上限导致失败，需运维介入）
         """
         ctx.logger.info(f"current synced object types is {[t.value for t in ctx.synced_obj_types]}")
 
@@ -76,4 +76,4 @@ class TenantSyncTaskRunner:
 
     def _send_signal(self):
         """发送租户同步完成信号，触发后续流程"""
-        post_sync_tenant.send(sender=self.__class__, tenant=self.tenant, data_source=self.data_source)
+        post_sync_tenant.send(sender=self.__class__, tenant=self.tenant, data_source=self.data_source, task=self.task)
@@ -19,5 +19,5 @@ import django.dispatch
 # post_sync_data_source has providing_args `data_source` (django db model object)
 post_sync_data_source = django.dispatch.Signal()
 
-# post_sync_tenant has providing_args `tenant` and `data_source` (django db model object)
+# post_sync_tenant has providing_args `tenant`, `data_source` and `task` (django db model object)
 post_sync_tenant = django.dispatch.Signal()
@@ -17,7 +17,9 @@
 
 # ignore custom logger must use %s string format in this file
 # ruff: noqa: G004
-from typing import Dict, List, Set
+import functools
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
 
 from django.db import transaction
 from django.db.models import QuerySet
@@ -32,7 +34,18 @@ from bkuser.apps.data_source.models import (
 from bkuser.apps.sync.constants import DataSourceSyncObjectType, SyncOperation
 from bkuser.apps.sync.contexts import DataSourceSyncTaskContext
 from bkuser.plugins.models import RawDataSourceDepartment
-from bkuser.utils.tree import bfs_traversal_tree, build_forest_with_parent_relations
+from bkuser.utils.tree import TreeNode, build_forest_with_parent_relations
+
+
+@dataclass
+class _MPTTNode:
+    """部门关系节点在 MPTT 树中的位置信息"""
+
+    parent_id: int | None
+    tree_id: int
+    lft: int
+    rght: int
+    level: int
 
 
 class DataSourceDepartmentSyncer:
@@ -174,69 +187,140 @@ class DataSourceDepartmentRelationSyncer:
 
     def _sync_department_relations(self):
         """数据源部门关系同步"""
-        # {dept_code: data_source_dept}
-        dept_code_map = {dept.code: dept for dept in DataSourceDepartment.objects.filter(data_source=self.data_source)}
+        # {dept_code: dept_id}
+        dept_code_id_map = dict(
+            DataSourceDepartment.objects.filter(data_source=self.data_source).values_list("code", "id")
+        )
+        dept_id_code_map = {dept_id: code for code, dept_id in dept_code_id_map.items()}
+        # {dept_id: 同步前的部门关系节点}
+        exists_node_map = {
+            dept_id: _MPTTNode(parent_id, tree_id, lft, rght, level)
+            for dept_id, parent_id, tree_id, lft, rght, level in DataSourceDepartmentRelation.objects.filter(
+                data_source=self.data_source
+            ).values_list("department_id", "parent_id", "tree_id", "lft", "rght", "level")
+        }
         # {dept_code: parent_dept_code}
         dept_parent_code_map = {dept.code: dept.parent for dept in self.raw_departments}
 
-        # 如果是增量同步模式，则需要将存量的部门关系捞出来，和新的合并下，再删除重建
-        # Q: 为什么不是增量模式时候，一通对比之后，直接往现有的 MPTT 森林里面塞节点？
-        # A: MPTT 树结构复杂，变更操作可能存在风险，且后台任务对性能要求不高，先用简单的删除重建方案
+        # 如果是增量同步模式，则需要将存量的部门关系捞出来，和新的合并下，再与存量数据对比
         if self.incremental:
-            for relation in DataSourceDepartmentRelation.objects.filter(data_source=self.data_source):
-                # 如果某个部门有新的父部门，则跳过
-                if relation.department.code in dept_parent_code_map:
+            for dept_id, node in exists_node_map.items():
+                dept_code = dept_id_code_map.get(dept_id)
+                # 如果某个部门有新的父部门 / 部门已经不存在，则跳过
+                if not dept_code or dept_code in dept_parent_code_map:
                     continue
 
-                dept_parent_code_map[relation.department.code] = (
-                    relation.parent.department.code if relation.parent else None
-                )
+                dept_parent_code_map[dept_code] = dept_id_code_map.get(node.parent_id) if node.parent_id else None
 
-        # {dept_code: data_source_dept_relation}
-        dept_code_rel_map: Dict[str, DataSourceDepartmentRelation] = {}
-        mptt_tree_ids: Set[int] = set()
+        # Q: 为什么不直接删除所有的部门关系再重建？
+        # A: 全量重建会导致每次同步都重写整张表，且 lft / rght 会被整体刷新，即使组织架构没有任何变化，
+        #    因此这里先在内存中计算出目标 MPTT 森林（子节点保持原有顺序，新增 / 移动的节点追加在后面），
+        #    再与存量数据逐个对比，只写入真正有变化的节点，组织架构不变的情况下不会有任何的 DB 写入
+        forest_roots = build_forest_with_parent_relations(list(dept_parent_code_map.items()))
+        # 原本就是根节点的，优先认领原来的 tree_id，避免树拆分时根节点被分配新的 tree_id
+        forest_roots.sort(key=lambda r: not self._is_exists_root(exists_node_map.get(dept_code_id_map[r.id])))
 
-        parent_relations = list(dept_parent_code_map.items())
-        # 根据部门父子关系，构建森林
-        forest_roots = build_forest_with_parent_relations(parent_relations)
-        # 逐棵树进行便利，因为需要保证一棵树的节点拥有相同的 tree_id
+        target_node_map: Dict[int, _MPTTNode] = {}
+        # 在同步后还会继续使用的 tree_id
+        claimed_tree_ids: Set[int] = set()
         for root in forest_roots:
-            tree_id = self._generate_tree_id(self.data_source)
-            mptt_tree_ids.add(tree_id)
-
-            # 通过 bfs 遍历的方式，确保父节点会先被创建
-            for node in bfs_traversal_tree(root):
-                parent_code = dept_parent_code_map.get(node.id)
-                if not parent_code:
-                    parent = None
-                else:
-                    parent = dept_code_rel_map.get(parent_code)
-
-                dept_code_rel_map[node.id] = DataSourceDepartmentRelation(
-                    data_source=self.data_source,
-                    department=dept_code_map[node.id],
-                    parent=parent,
-                    tree_id=tree_id,
-                    # NOTE：初始化时 lft, rght, level 均不能为空，
-                    # 因此先赋零值，后面 partial_rebuild 会修改
-                    lft=0,
-                    rght=0,
-                    level=0,
-                )
+            root_dept_id = dept_code_id_map[root.id]
+            exists_root = exists_node_map.get(root_dept_id)
+            if exists_root and exists_root.tree_id not in claimed_tree_ids:
+                tree_id = exists_root.tree_id
+            else:
+                tree_id = self._generate_tree_id(self.data_source)
+
+            claimed_tree_ids.add(tree_id)
+            target_node_map.update(self._build_mptt_tree(root, tree_id, dept_code_id_map, exists_node_map))
+
+        waiting_create_relations: List[DataSourceDepartmentRelation] = []
+        waiting_update_relations: List[DataSourceDepartmentRelation] = []
+        for dept_id, node in target_node_map.items():
+            exists_node = exists_node_map.get(dept_id)
+            if exists_node == node:
+                continue
+
+            relation = DataSourceDepartmentRelation(
+                department_id=dept_id,
+                parent_id=node.parent_id,
+                data_source=self.data_source,
+                tree_id=node.tree_id,
+                lft=node.lft,
+                rght=node.rght,
+                level=node.level,
+                updated_at=timezone.now(),
+            )
+            if exists_node:
+                waiting_update_relations.append(relation)
+            else:
+                waiting_create_relations.append(relation)
+
+        waiting_delete_dept_ids = exists_node_map.keys() - target_node_map.keys()
 
         with DataSourceDepartmentRelation.objects.disable_mptt_updates(), transaction.atomic():
-            # 对于部门关系边，先先全部删除
-            DataSourceDepartmentRelation.objects.filter(data_source=self.data_source).delete()
-            # 最后再全部批量创建
-            DataSourceDepartmentRelation.objects.bulk_create(
-                list(dept_code_rel_map.values()), batch_size=self.batch_size
+            # Q: 为什么这里的顺序应该是 1. 创建 2. 更新 3. 删除
+            # A: 存量节点可能被挂到新建的节点下，因此需要先创建；而待删除节点的子节点可能会被移动到其他节点下，
+            #    如果先删除，会导致这些子节点被级联删除，因此删除需要放到最后
+            DataSourceDepartmentRelation.objects.bulk_create(waiting_create_relations, batch_size=self.batch_size)
+            DataSourceDepartmentRelation.objects.bulk_update(
+                waiting_update_relations,
+                fields=["parent", "tree_id", "lft", "rght", "level", "updated_at"],
+                batch_size=self.batch_size,
             )
-            # 逐棵对当前数据源的树进行重建
-            for tree_id in mptt_tree_ids:
-                DataSourceDepartmentRelation.objects.partial_rebuild(tree_id)
+            DataSourceDepartmentRelation.objects.filter(
+                data_source=self.data_source, department_id__in=waiting_delete_dept_ids
+            ).delete()
+
+        self.ctx.logger.info(f"create {len(waiting_create_relations)} department relations")
+        self.ctx.logger.info(f"update {len(waiting_update_relations)} department relations")
+        self.ctx.logger.info(f"delete {len(waiting_delete_dept_ids)} department relations")
+        self.ctx.logger.info(f"data source has {len(claimed_tree_ids)} department tree(s) currently")
 
-        self.ctx.logger.info(f"re-create {len(dept_code_rel_map)} department relations")
-        self.ctx.logger.info(f"data source has {len(mptt_tree_ids)} department tree(s) currently")
+    @staticmethod
+    def _is_exists_root(node: _MPTTNode | None) -> bool:
+        return bool(node and node.parent_id is None)
+
+    @staticmethod
+    def _build_mptt_tree(
+        root: TreeNode,
+        tree_id: int,
+        dept_code_id_map: Dict[str, int],
+        exists_node_map: Dict[int, _MPTTNode],
+    ) -> Dict[int, _MPTTNode]:
+        """在内存中计算单棵树各节点的 MPTT 信息（lft, rght, level）
+
+        子节点排序规则：父节点未变化的子节点按原有的 lft 排序，新增或移动过来的子节点按原始顺序追加在后面，
+        这样组织架构未变化的树计算结果与存量数据完全一致，有变化的树也只会影响到变更点之后的节点
+        """
+
+        def _sort_key(node: TreeNode, parent_id: int) -> Tuple[int, int]:
+            exists_node = exists_node_map.get(dept_code_id_map[node.id])
+            if exists_node and exists_node.parent_id == parent_id:
+                return 0, exists_node.lft
+            return 1, 0
+
+        node_map: Dict[int, _MPTTNode] = {}
+        counter = 1
+        # 使用栈进行深度优先遍历，避免树过深时递归层数过多，栈元素：(节点, 父节点 ID, 层级, 是否已访问过子节点)
+        stack: List[Tuple[TreeNode, int | None, int, bool]] = [(root, None, 0, False)]
+        while stack:
+            node, parent_id, level, visited = stack.pop()
+            dept_id = dept_code_id_map[node.id]
+            if visited:
+                node_map[dept_id].rght = counter
+                counter += 1
+                continue
+
+            node_map[dept_id] = _MPTTNode(parent_id, tree_id, counter, 0, level)
+            counter += 1
+
+            stack.append((node, parent_id, level, True))
+            # 子节点逆序入栈，以确保出栈顺序与排序结果一致
+            children = sorted(node.children, key=functools.partial(_sort_key, parent_id=dept_id))
+            stack.extend((child, dept_id, level + 1, False) for child in reversed(children))
+
+        return node_map
 
     @staticmethod
     def _generate_tree_id(data_source: DataSource) -> int:
@@ -244,5 +328,11 @@ class DataSourceDepartmentRelationSyncer:
         在 MPTT 中，单个 tree_id 只能用于一棵树，因此需要为不同的树分配不同的 ID
 
         分配实现：利用 MySQL 自增 ID 分配 tree_id（不需要包含到事务中，虽然可能造成浪费）
+
+        注：增量对比模式下，存量的树会继续沿用原有的 tree_id，而这些 tree_id 可能是由 MPTT 自行分配的（如
+        通过 web 页面创建的根部门），与自增 ID 不一定一致，因此需要跳过已经被占用的 tree_id
         """
-        return DepartmentRelationMPTTTree.objects.create(data_source=data_source).id
+        while True:
+            tree_id = DepartmentRelationMPTTTree.objects.create(data_source=data_source).id
+            if not DataSourceDepartmentRelation.objects.filter(tree_id=tree_id).exists():
+                return tree_id
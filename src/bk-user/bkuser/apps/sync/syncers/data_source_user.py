@@ -20,9 +20,10 @@
 from typing import Dict, List, Set, Tuple
 
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.models import Q, QuerySet
 from django.utils import timezone
 
+from bkuser.apps.data_source.caches import DataSourceRelationGeneration
 from bkuser.apps.data_source.models import (
     DataSource,
     DataSourceDepartment,
@@ -50,6 +51,7 @@ class DataSourceUserSyncer:
         raw_users: List[RawDataSourceUser],
         overwrite: bool,
         incremental: bool,
+        alive_user_codes: Set[str] | None = None,
     ):
         # 增量模式下才可以选择覆不覆盖，全量模式下只有覆盖
         if not (incremental or overwrite):
@@ -60,6 +62,8 @@ class DataSourceUserSyncer:
         self.raw_users = raw_users
         self.overwrite = overwrite
         self.incremental = incremental
+        # 数据源中仍存在的用户 code 全集（如插件增量拉取时对账所得），增量模式下，不在其中的用户也会被删除
+        self.alive_user_codes = alive_user_codes
         self.converter = DataSourceUserConverter(data_source, ctx.logger)
         # 由于在部分老版本迁移过来的数据源中租户用户 ID 会由 username + 规则 拼接生成，
         # 该类数据源同步时候不可更新 username，而全新数据源对应租户 ID 都是 uuid 则不受影响
@@ -75,7 +79,7 @@ class DataSourceUserSyncer:
         raw_user_codes = {user.code for user in self.raw_users}
 
         waiting_create_user_codes = raw_user_codes - user_codes
-        waiting_delete_user_codes = user_codes - raw_user_codes if not self.incremental else set()
+        waiting_delete_user_codes = self._get_waiting_delete_user_codes(user_codes, raw_user_codes)
         waiting_update_user_codes = user_codes & raw_user_codes if self.overwrite else set()
 
         waiting_delete_users = self._get_waiting_delete_users(waiting_delete_user_codes)
@@ -86,7 +90,7 @@ class DataSourceUserSyncer:
             # Q: 为什么这里的顺序应该是 1. 删除 2. 更新 3. 创建
             # A: 同步操作原则是数据库尽可能 “干净” 以避免冲突，因此删除是最优先的，可以让数据更少，
             #  而更新放在第二步的原因是 “挪窝”，可以避免一些已有的数据和待创建的数据冲突导致同步失败
-            waiting_delete_users.delete()
+            self._delete_users(waiting_delete_users)
             DataSourceUser.objects.bulk_update(
                 waiting_update_users,
                 fields=["username", "full_name", "email", "phone", "phone_country_code", "extras", "updated_at"],
@@ -103,9 +107,32 @@ class DataSourceUserSyncer:
         self.ctx.logger.info(f"create {len(waiting_create_users)} users")
         self.ctx.recorder.add(SyncOperation.CREATE, DataSourceSyncObjectType.USER, waiting_create_users)
 
+    def _get_waiting_delete_user_codes(self, exists_user_codes: Set[str], raw_user_codes: Set[str]) -> Set[str]:
+        """计算待删除的用户 code：全量模式删除不在原始数据中的用户，增量模式仅删除确认已不存在于数据源中的用户"""
+        if not self.incremental:
+            return exists_user_codes - raw_user_codes
+
+        if self.alive_user_codes is not None:
+            return exists_user_codes - self.alive_user_codes - raw_user_codes
+
+        return set()
+
     def _get_waiting_delete_users(self, user_codes: Set[str]) -> QuerySet[DataSourceUser]:
         return DataSourceUser.objects.filter(data_source=self.data_source, code__in=user_codes)
 
+    def _delete_users(self, users: QuerySet[DataSourceUser]):
+        """删除用户及其关联边（部门 - 用户，用户 - 上级），需在事务中调用"""
+        # 关联边的外键均为 DO_NOTHING，需要手动删除，其中用户 - 上级关系需要同时匹配用户 & 上级
+        dept_user_relation_cnt, _ = DataSourceDepartmentUserRelation.objects.filter(user__in=users).delete()
+        user_leader_relation_cnt, _ = DataSourceUserLeaderRelation.objects.filter(
+            Q(user__in=users) | Q(leader__in=users)
+        ).delete()
+        users.delete()
+
+        if dept_user_relation_cnt or user_leader_relation_cnt:
+            # 关系数据有变更，需要使基于关系数据构建的缓存失效
+            transaction.on_commit(lambda: DataSourceRelationGeneration.bump(self.data_source.id))
+
     def _get_waiting_create_users(
         self, raw_users: List[RawDataSourceUser], waiting_create_user_codes: Set[str]
     ) -> List[DataSourceUser]:
@@ -246,6 +273,10 @@ class DataSourceUserLeaderRelationSyncer:
             if waiting_delete_user_leader_relation_ids:
                 DataSourceUserLeaderRelation.objects.filter(id__in=waiting_delete_user_leader_relation_ids).delete()
 
+        if waiting_create_user_leader_relations or waiting_delete_user_leader_relation_ids:
+            # 关系数据有变更，需要使基于关系数据构建的缓存失效
+            DataSourceRelationGeneration.bump(self.data_source.id)
+
         # 记录 用户-直接上级 关系新增日志
         self.ctx.logger.info(f"create {len(waiting_create_user_leader_relations)} user-leader relations")
         # 记录 用户-直接上级 关系删除日志
@@ -395,6 +426,10 @@ class DataSourceUserDeptRelationSyncer:
             if waiting_delete_user_dept_relation_ids:
                 DataSourceDepartmentUserRelation.objects.filter(id__in=waiting_delete_user_dept_relation_ids).delete()
 
+        if waiting_create_user_dept_relations or waiting_delete_user_dept_relation_ids:
+            # 关系数据有变更，需要使基于关系数据构建的缓存失效
+            DataSourceRelationGeneration.bump(self.data_source.id)
+
         # 记录 用户-部门 关系新增日志
         self.ctx.logger.info(f"create {len(waiting_create_user_dept_relations)} user-department relations")
         # 记录 用户-部门 关系删除日志
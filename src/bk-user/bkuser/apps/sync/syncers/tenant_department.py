@@ -17,7 +17,10 @@
 
 # ignore custom logger must use %s string format in this file
 # ruff: noqa: G004
+from typing import Dict, List
+
 from django.db import transaction
+from django.utils import timezone
 
 from bkuser.apps.data_source.models import DataSource, DataSourceDepartment
 from bkuser.apps.sync.constants import SyncOperation, TenantSyncObjectType
@@ -47,38 +50,29 @@ class TenantDepartmentSyncer:
         )
 
         # 数据源中存在，但是租户中不存在的，需要创建
-        waiting_sync_data_source_departments = data_source_departments.exclude(
-            id__in=[u.data_source_department_id for u in exists_tenant_departments]
+        waiting_sync_data_source_departments = list(
+            data_source_departments.exclude(id__in=[u.data_source_department_id for u in exists_tenant_departments])
         )
-        waiting_create_tenant_departments = [
-            TenantDepartment(
-                id=TenantDeptIDGenerator(self.tenant.id, self.data_source).gen(dept),
-                tenant=self.tenant,
-                data_source_department=dept,
-                data_source=self.data_source,
-            )
-            for dept in waiting_sync_data_source_departments
-        ]
+        generator = TenantDeptIDGenerator(self.tenant.id, self.data_source, prepare_batch=True)
 
         # 统一在事务中对租户部门进行变更，先删除再增加
         with transaction.atomic():
             waiting_delete_tenant_departments.delete()
-            TenantDepartment.objects.bulk_create(waiting_create_tenant_departments, batch_size=self.batch_size)
 
-            # 批量记录租户部门 ID（后续有复用需求）
-            records = [
-                TenantDepartmentIDRecord(
+            # 批量获取租户部门 ID（复用历史记录），没有历史记录的，由 DB 生成自增 ID
+            # Note: 需要在删除之后执行，否则历史记录中的 ID 可能会被误判为已被占用
+            tenant_dept_id_map = generator.gen_batch(waiting_sync_data_source_departments)
+            waiting_create_tenant_departments = [
+                TenantDepartment(
+                    id=tenant_dept_id_map[dept.id],
                     tenant=self.tenant,
+                    data_source_department=dept,
                     data_source=self.data_source,
-                    code=dept.data_source_department.code,
-                    tenant_department_id=dept.id,
                 )
-                for dept in TenantDepartment.objects.filter(
-                    tenant=self.tenant, data_source_department__in=waiting_sync_data_source_departments
-                ).select_related("data_source_department")
+                for dept in waiting_sync_data_source_departments
             ]
-            # 由于存量历史数据（Record）也会被下发，因此需要忽略冲突保证其他数据可以正常插入
-            TenantDepartmentIDRecord.objects.bulk_create(records, batch_size=self.batch_size, ignore_conflicts=True)
+            TenantDepartment.objects.bulk_create(waiting_create_tenant_departments, batch_size=self.batch_size)
+            self._record_tenant_department_ids(generator, waiting_sync_data_source_departments, tenant_dept_id_map)
 
         # 记录删除日志，变更记录
         self.ctx.logger.info(f"delete {len(waiting_delete_tenant_departments)} tenant departments")
@@ -87,3 +81,54 @@ class TenantDepartmentSyncer:
         # 记录创建日志，变更记录
         self.ctx.logger.info(f"create {len(waiting_create_tenant_departments)} tenant departments")
         self.ctx.recorder.add(SyncOperation.CREATE, TenantSyncObjectType.DEPARTMENT, waiting_create_tenant_departments)
+
+    def _record_tenant_department_ids(
+        self,
+        generator: TenantDeptIDGenerator,
+        data_source_departments: List[DataSourceDepartment],
+        tenant_dept_id_map: Dict[int, int | None],
+    ):
+        """批量记录新生成的租户部门 ID（后续有复用需求）"""
+        # 复用历史记录 ID 的部门，无需再次记录
+        new_id_dept_ids = [dept.id for dept in data_source_departments if not tenant_dept_id_map[dept.id]]
+        if not new_id_dept_ids:
+            return
+
+        # 由于 bulk_create 不一定会返回自增 ID，因此需要重新查询
+        tenant_depts = TenantDepartment.objects.filter(
+            tenant=self.tenant, data_source_department_id__in=new_id_dept_ids
+        ).select_related("data_source_department")
+
+        waiting_create_records = []
+        # 历史记录中的 ID 已被占用而重新生成 ID 的，需要更新历史记录 {code: 租户部门 ID}
+        waiting_update_dept_id_map: Dict[str, int] = {}
+        for dept in tenant_depts:
+            code = dept.data_source_department.code
+            if (self.tenant.id, self.data_source.id, code) in generator.tenant_dept_id_map:
+                waiting_update_dept_id_map[code] = dept.id
+            else:
+                waiting_create_records.append(
+                    TenantDepartmentIDRecord(
+                        tenant=self.tenant, data_source=self.data_source, code=code, tenant_department_id=dept.id
+                    )
+                )
+
+        # 若存在并发写入的记录，忽略冲突保证其他数据可以正常插入
+        TenantDepartmentIDRecord.objects.bulk_create(
+            waiting_create_records, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        if not waiting_update_dept_id_map:
+            return
+
+        waiting_update_records = list(
+            TenantDepartmentIDRecord.objects.filter(
+                tenant=self.tenant, data_source=self.data_source, code__in=waiting_update_dept_id_map.keys()
+            )
+        )
+        for record in waiting_update_records:
+            record.tenant_department_id = waiting_update_dept_id_map[record.code]
+            record.updated_at = timezone.now()
+
+        TenantDepartmentIDRecord.objects.bulk_update(
+            waiting_update_records, fields=["tenant_department_id", "updated_at"], batch_size=self.batch_size
+        )
@@ -50,13 +50,15 @@ class TenantUserSyncer:
         waiting_delete_tenant_users = exists_tenant_users.exclude(data_source_user__in=data_source_users)
 
         # 数据源中存在，但是租户中不存在的，需要创建
-        waiting_sync_data_source_users = data_source_users.exclude(
-            id__in=[u.data_source_user_id for u in exists_tenant_users]
+        waiting_sync_data_source_users = list(
+            data_source_users.exclude(id__in=[u.data_source_user_id for u in exists_tenant_users])
         )
+        # 批量生成租户用户 ID（新生成的 ID 记录会被批量写入 DB）
         generator = TenantUserIDGenerator(self.tenant.id, self.data_source, prepare_batch=True)
+        tenant_user_id_map = generator.gen_batch(waiting_sync_data_source_users)
         waiting_create_tenant_users = [
             TenantUser(
-                id=generator.gen(user),
+                id=tenant_user_id_map[user.id],
                 tenant=self.tenant,
                 data_source_user=user,
                 data_source=self.data_source,
@@ -16,7 +16,8 @@
 # to the current version of the project delivered to anyone in the future.
 
 import logging
-from typing import Any, Dict
+from collections import Counter
+from typing import Any, Dict, List
 
 from bkuser.apps.data_source.constants import DataSourceTypeEnum
 from bkuser.apps.data_source.initializers import LocalDataSourceIdentityInfoInitializer
@@ -24,6 +25,7 @@ from bkuser.apps.data_source.models import DataSource
 from bkuser.apps.notification.constants import NotificationScene
 from bkuser.apps.notification.notifier import TenantUserNotifier
 from bkuser.apps.sync.constants import SyncTaskStatus
+from bkuser.apps.sync.loggers import TaskLogger
 from bkuser.apps.sync.models import DataSourceSyncTask, TenantSyncTask
 from bkuser.apps.sync.runners import DataSourceSyncTaskRunner, TenantSyncTaskRunner
 from bkuser.apps.sync.workbook_temp_store import WorkbookTempStore
@@ -52,6 +54,13 @@ def sync_data_source(task_id: int, plugin_init_extra_kwargs: Dict[str, Any]):
             return
 
         plugin_init_extra_kwargs = {"workbook": workbook}
+        try:
+            DataSourceSyncTaskRunner(task, plugin_init_extra_kwargs).run()
+        finally:
+            # 只读模式加载的 Workbook 需要主动关闭
+            workbook.close()
+
+        return
 
     DataSourceSyncTaskRunner(task, plugin_init_extra_kwargs).run()
 
@@ -64,9 +73,55 @@ def sync_tenant(task_id: int):
     TenantSyncTaskRunner(task).run()
 
 
+@app.task(base=BaseTask)
+def sync_tenant_in_fan_out(task_id: int) -> str:
+    """同步数据源数据到租户（扇出同步中的单个租户）
+
+    注：同步失败的信息已记录在任务中，此处不抛出异常，避免触发扇出汇总的异常回调
+    """
+    logger.info("[celery] receive tenant sync task in fan out: %s", task_id)
+    task = TenantSyncTask.objects.get(id=task_id)
+    try:
+        TenantSyncTaskRunner(task).run()
+    except Exception:
+        logger.exception("tenant sync task %s in fan out failed", task_id)
+
+    task.refresh_from_db(fields=["status"])
+    return task.status
+
+
 @app.task(base=BaseTask, ignore_result=True)
-def initialize_identity_info_and_send_notification(data_source_id: int):
-    """初始化数据源用户账密数据（仅限于未初始化的用户）"""
+def summarize_tenant_sync_tasks(data_source_sync_task_id: int, tenant_sync_task_ids: List[int], expired: bool = False):
+    """汇总扇出的各租户同步任务状态，记录到数据源同步任务中
+
+    :param expired: 是否已超时，超时后仍未完成（等待中 / 执行中）的租户同步任务视为失败
+    """
+    data_source_sync_task = DataSourceSyncTask.objects.filter(id=data_source_sync_task_id).first()
+    if not data_source_sync_task:
+        return
+
+    status_counts = Counter(
+        TenantSyncTask.objects.filter(id__in=tenant_sync_task_ids).values_list("status", flat=True)
+    )
+    has_unfinished = status_counts[SyncTaskStatus.PENDING] or status_counts[SyncTaskStatus.RUNNING]
+    if has_unfinished and not expired:
+        status = SyncTaskStatus.RUNNING
+    elif has_unfinished or status_counts[SyncTaskStatus.FAILED]:
+        status = SyncTaskStatus.FAILED
+    else:
+        status = SyncTaskStatus.SUCCESS
+
+    data_source_sync_task.extras["tenant_sync"] = {
+        "status": status.value,
+        "task_ids": tenant_sync_task_ids,
+        "counts": {s.value: status_counts[s] for s in SyncTaskStatus},
+    }
+    data_source_sync_task.save(update_fields=["extras", "updated_at"])
+
+
+@app.task(base=BaseTask, ignore_result=True)
+def initialize_identity_info_and_send_notification(data_source_id: int, tenant_sync_task_id: int | None = None):
+    """初始化数据源用户账密数据（仅限于未初始化的用户），若由租户同步触发，则初始化进度会记录到租户同步任务日志中"""
     logger.info("[celery] receive identity info initialize task, data_source %s", data_source_id)
     data_source = DataSource.objects.get(id=data_source_id)
     # 非本地数据源直接跳过
@@ -78,9 +133,14 @@ def initialize_identity_info_and_send_notification(data_source_id: int):
         logger.debug("not real or builtin management data source, skip initialize user identity infos")
         return
 
-    initializer = LocalDataSourceIdentityInfoInitializer(data_source)
+    task_logger = TaskLogger()
+    initializer = LocalDataSourceIdentityInfoInitializer(
+        data_source, progress_logger=task_logger if tenant_sync_task_id else None
+    )
     # 批量为没有账密信息的用户进行初始化
     data_source_users, user_passwd_map = initializer.initialize()
+    if tenant_sync_task_id and task_logger.logs:
+        _append_tenant_sync_task_logs(tenant_sync_task_id, task_logger.logs)
 
     # 逐一发送通知（邮件/短信），只会通知给非协同产生的租户用户
     tenant_users = TenantUser.objects.filter(
@@ -90,3 +150,13 @@ def initialize_identity_info_and_send_notification(data_source_id: int):
         NotificationScene.USER_INITIALIZE,
         data_source_id=data_source.id,
     ).batch_send(tenant_users, user_passwd_map=user_passwd_map)
+
+
+def _append_tenant_sync_task_logs(task_id: int, logs: str):
+    """将日志追加到（已完成的）租户同步任务中"""
+    task = TenantSyncTask.objects.filter(id=task_id).first()
+    if not task:
+        return
+
+    task.logs += logs
+    task.save(update_fields=["logs", "updated_at"])
@@ -59,6 +59,7 @@ class WorkbookTempStore:
     def pop(self, temporary_storage_id: str) -> Workbook:
         """
         从临时存储中获取临时数据并转换为 Excel Workbook, 获取成功后即删除该临时存储中的临时数据
+        注：Workbook 以只读模式加载（仅用于解析），使用完毕后需要调用 close() 释放资源
         :param temporary_storage_id: 临时数据唯一标识
         :return: Excel Workbook
         """
@@ -71,4 +72,4 @@ class WorkbookTempStore:
         self.storage.delete(temporary_storage_id)
 
         data = base64.b64decode(encoded_data)
-        return load_workbook(filename=io.BytesIO(data))
+        return load_workbook(filename=io.BytesIO(data), read_only=True)
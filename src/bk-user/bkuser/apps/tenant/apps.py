@@ -20,3 +20,6 @@ from django.apps import AppConfig
 class TenantConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "bkuser.apps.tenant"
+
+    def ready(self):
+        from . import handlers  # noqa
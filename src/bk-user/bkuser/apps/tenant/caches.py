@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+from typing import Any, Callable, Dict, Tuple
+
+from django.conf import settings
+
+from bkuser.apps.tenant.models import CollaborationStrategy, TenantUserIDGenerateConfig
+from bkuser.common.cache import Cache, CacheEnum, CacheGeneration, CacheKeyPrefixEnum
+
+
+class TenantMetadataCache:
+    """
+    租户元数据缓存（协同字段映射，数据源域名映射等）
+
+    这类数据变更极少（仅在协同策略 / 租户 / 数据源 / 认证源等变更时），但是兼容 v2 的 OpenAPI 每次请求都需要使用，
+    因此数据存储在 Redis 中并通过版本号（generation）控制失效，变更后需要调用 bump_generation 更新版本号。
+
+    Redis 前面还有一层短时间的进程内缓存，因此稳定状态下获取元数据不需要查询 DB，大部分情况下也不需要访问 Redis，
+    代价是其他进程中的变更，最多会延迟 TENANT_METADATA_LOCAL_CACHE_TIMEOUT 秒才生效。
+    """
+
+    # 版本号在 Redis 中的 Key
+    _generation_cache_key = "gen"
+    # 进程内的版本号，在当前进程中更新版本号时递增，使进程内缓存立即失效
+    _local_generation = 0
+
+    @classmethod
+    def get_collaboration_field_mapping(cls, target_tenant_id: str) -> Dict[Tuple[str, str], str]:
+        """
+        获取协同到指定租户的所有协同策略的字段映射
+
+        :return: {(collaboration_tenant_id, source_field): target_field}
+        """
+        return cls._get(f"cfm:{target_tenant_id}", lambda: cls._build_collaboration_field_mapping(target_tenant_id))
+
+    @classmethod
+    def get_data_source_domain_map(cls) -> Dict[Tuple[int, str], str]:
+        """
+        获取数据源在各租户中的域名映射
+
+        :return: {(data_source_id, target_tenant_id): domain}
+        """
+        return cls._get("dsd", cls._build_data_source_domain_map)
+
+    @classmethod
+    def bump_generation(cls) -> None:
+        """更新租户元数据的版本号，使已有的缓存失效"""
+        _generation.bump(cls._generation_cache_key)
+
+    @classmethod
+    def get_generation(cls) -> str:
+        """获取租户元数据当前的版本号"""
+        return _generation.get(cls._generation_cache_key)
+
+    @staticmethod
+    def _build_collaboration_field_mapping(target_tenant_id: str) -> Dict[Tuple[str, str], str]:
+        strategies = CollaborationStrategy.objects.filter(target_tenant_id=target_tenant_id).values_list(
+            "source_tenant_id", "target_config"
+        )
+        return {
+            (source_tenant_id, mp["source_field"]): mp["target_field"]
+            for source_tenant_id, target_config in strategies
+            for mp in target_config.get("field_mapping", [])
+        }
+
+    @staticmethod
+    def _build_data_source_domain_map() -> Dict[Tuple[int, str], str]:
+        return {
+            (data_source_id, target_tenant_id): domain
+            for data_source_id, target_tenant_id, domain in TenantUserIDGenerateConfig.objects.values_list(
+                "data_source_id", "target_tenant_id", "domain"
+            )
+        }
+
+    @classmethod
+    def _get(cls, name: str, build: Callable[[], Any]) -> Any:
+        """获取元数据（进程内缓存 -> Redis -> DB）"""
+        local_cache_key = f"{name}:{cls._local_generation}"
+        if (value := _local_cache.get(local_cache_key)) is not None:
+            return value
+
+        cache_key = f"data:{name}:{cls.get_generation()}"
+        if (value := _cache.get(cache_key)) is None:
+            value = build()
+            _cache.set(cache_key, value, timeout=settings.TENANT_METADATA_CACHE_TIMEOUT)
+
+        _local_cache.set(local_cache_key, value, timeout=settings.TENANT_METADATA_LOCAL_CACHE_TIMEOUT)
+        return value
+
+    @classmethod
+    def _bump_local_generation(cls) -> None:
+        cls._local_generation += 1
+
+
+_cache = Cache(CacheEnum.REDIS, CacheKeyPrefixEnum.TENANT_METADATA)
+_local_cache = Cache(CacheEnum.DEFAULT, CacheKeyPrefixEnum.TENANT_METADATA)
+# 版本号更新时，同时使当前进程内的缓存立即失效
+_generation = CacheGeneration(_cache, on_bump=TenantMetadataCache._bump_local_generation)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bkuser.apps.data_source.models import DataSource, DataSourceUser
+from bkuser.apps.idp.models import Idp
+from bkuser.apps.tenant.caches import TenantMetadataCache
+from bkuser.apps.tenant.models import CollaborationStrategy, Tenant, TenantUser, TenantUserIDGenerateConfig
+from bkuser.apps.tenant.tasks import invalidate_login_tenant_user_cache
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+@receiver(post_save, sender=DataSource)
+@receiver(post_delete, sender=DataSource)
+@receiver(post_save, sender=CollaborationStrategy)
+@receiver(post_delete, sender=CollaborationStrategy)
+@receiver(post_save, sender=TenantUserIDGenerateConfig)
+@receiver(post_delete, sender=TenantUserIDGenerateConfig)
+@receiver(post_save, sender=Idp)
+@receiver(post_delete, sender=Idp)
+def invalidate_tenant_metadata_cache(sender, **kwargs):
+    """租户 / 数据源 / 协同策略 / 租户用户 ID 生成规则 / 认证源变更后，需要使租户元数据缓存失效"""
+    TenantMetadataCache.bump_generation()
+
+
+@receiver(post_save, sender=TenantUser)
+@receiver(post_delete, sender=TenantUser)
+@receiver(post_save, sender=DataSourceUser)
+def notify_login_tenant_user_changed(sender, instance, created=False, **kwargs):
+    """
+    租户用户 / 数据源用户信息变更，或租户用户被删除后，通知登录服务使缓存的租户用户信息失效
+    （新建的用户不存在缓存，无需通知；数据源用户被删除时，总是会一并删除其关联的租户用户，因此无需单独处理）
+    """
+    if created or not settings.ENABLE_BK_LOGIN_TENANT_USER_CACHE_INVALIDATION:
+        return
+
+    if isinstance(instance, TenantUser):
+        tenant_user_ids = [instance.id]
+    else:
+        tenant_user_ids = list(TenantUser.objects.filter(data_source_user=instance).values_list("id", flat=True))
+
+    if tenant_user_ids:
+        transaction.on_commit(lambda: invalidate_login_tenant_user_cache.delay(tenant_user_ids))
@@ -15,6 +15,7 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 import logging
+from typing import List
 
 from django.utils import timezone
 
@@ -22,6 +23,7 @@ from bkuser.apps.tenant.constants import TenantUserStatus
 from bkuser.apps.tenant.models import CollaborationStrategy, TenantUser
 from bkuser.celery import app
 from bkuser.common.task import BaseTask
+from bkuser.component import login
 
 logger = logging.getLogger(__name__)
 
@@ -72,3 +74,10 @@ def update_expired_tenant_user_status():
 
     TenantUser.objects.bulk_update(expired_users, fields=["status", "updated_at"], batch_size=500)
     logger.info("Updated %d expired users to EXPIRED status.", expired_count)
+
+
+@app.task(base=BaseTask, ignore_result=True)
+def invalidate_login_tenant_user_cache(tenant_user_ids: List[str]):
+    """通知登录服务使租户用户信息缓存失效"""
+    logger.info("[celery] receive task: invalidate_login_tenant_user_cache, tenant_user_ids: %s", tenant_user_ids)
+    login.invalidate_tenant_user_cache(tenant_user_ids)
@@ -16,11 +16,16 @@
 # to the current version of the project delivered to anyone in the future.
 
 import logging
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 from bkuser.apps.data_source.models import DataSource, DataSourceDepartment, DataSourceUser
 from bkuser.apps.tenant.constants import TenantUserIdRuleEnum
-from bkuser.apps.tenant.models import TenantDepartmentIDRecord, TenantUserIDGenerateConfig, TenantUserIDRecord
+from bkuser.apps.tenant.models import (
+    TenantDepartment,
+    TenantDepartmentIDRecord,
+    TenantUserIDGenerateConfig,
+    TenantUserIDRecord,
+)
 from bkuser.utils.uuid import generate_uuid
 
 logger = logging.getLogger(__name__)
@@ -38,6 +43,9 @@ def is_username_frozen(data_source: DataSource) -> bool:
 class TenantUserIDGenerator:
     """租户用户 ID 生成器"""
 
+    # 批量生成时，单次查询 / 创建租户用户 ID 记录的数量
+    batch_size = 250
+
     def __init__(self, target_tenant_id: str, data_source: DataSource, prepare_batch: bool = False):
         """
         :param target_tenant_id: 目标租户 ID
@@ -72,6 +80,68 @@ class TenantUserIDGenerator:
 
         return self._reuse_or_generate_uuid(user)
 
+    def gen_batch(self, users: List[DataSourceUser]) -> Dict[int, str]:
+        """
+        批量生成租户用户 ID，新生成的 ID 记录会被批量写入 DB（而不是每个用户一次 DB 写入）
+
+        :return: {data_source_user_id: tenant_user_id}
+        """
+        if self.cfg and self.cfg.rule in [TenantUserIdRuleEnum.USERNAME_WITH_DOMAIN, TenantUserIdRuleEnum.USERNAME]:
+            return {user.id: self.gen(user) for user in users}
+
+        # 有准备的，直接使用映射表，否则需要批量查询 DB 中已有的记录
+        if not self.prepare_batch:
+            self.tenant_user_id_map = self._get_tenant_user_id_map([user.code for user in users])
+
+        # 已经使用过的租户用户 ID，用于检查新生成的 uuid 是否冲突
+        used_tenant_user_ids = set(self.tenant_user_id_map.values())
+
+        user_id_map: Dict[int, str] = {}
+        waiting_create_records: List[TenantUserIDRecord] = []
+        for user in users:
+            key = (self.target_tenant_id, self.data_source.id, user.code)
+            if not (tenant_user_id := self.tenant_user_id_map.get(key)):
+                tenant_user_id = generate_uuid()
+                while tenant_user_id in used_tenant_user_ids:
+                    tenant_user_id = generate_uuid()
+
+                used_tenant_user_ids.add(tenant_user_id)
+                # 加入映射表，确保相同 code 的用户使用相同的租户用户 ID
+                self.tenant_user_id_map[key] = tenant_user_id  # type: ignore
+                waiting_create_records.append(
+                    TenantUserIDRecord(
+                        tenant_id=self.target_tenant_id,
+                        data_source_id=self.data_source.id,
+                        code=user.code,
+                        tenant_user_id=tenant_user_id,
+                    )
+                )
+
+            user_id_map[user.id] = tenant_user_id
+
+        # Note: (tenant, data_source, code) 存在唯一约束，若并发写入相同的记录，会抛出异常（与单个生成时行为一致）
+        TenantUserIDRecord.objects.bulk_create(waiting_create_records, batch_size=self.batch_size)
+
+        if not self.prepare_batch:
+            self.tenant_user_id_map = {}
+
+        return user_id_map
+
+    def _get_tenant_user_id_map(self, codes: List[str]) -> Dict[Tuple[str, int, int], str]:
+        """批量查询已有的租户用户 ID 记录"""
+        tenant_user_id_map = {}
+        for idx in range(0, len(codes), self.batch_size):
+            records = TenantUserIDRecord.objects.filter(
+                tenant_id=self.target_tenant_id,
+                data_source=self.data_source,
+                code__in=codes[idx : idx + self.batch_size],
+            )
+            tenant_user_id_map.update(
+                {(self.target_tenant_id, self.data_source.id, r.code): r.tenant_user_id for r in records}
+            )
+
+        return tenant_user_id_map  # type: ignore
+
     def _reuse_or_generate_uuid(self, user: DataSourceUser) -> str:
         if self.prepare_batch:
             # 有准备的，直接从映射表里面查询
@@ -95,6 +165,9 @@ class TenantUserIDGenerator:
 class TenantDeptIDGenerator:
     """租户部门 ID 生成器"""
 
+    # 批量生成时，单次查询的数量
+    batch_size = 1000
+
     def __init__(self, target_tenant_id: str, data_source: DataSource, prepare_batch: bool = False):
         self.target_tenant_id = target_tenant_id
         self.data_source = data_source
@@ -125,3 +198,31 @@ class TenantDeptIDGenerator:
                 return record.tenant_department_id
 
         return None
+
+    def gen_batch(self, depts: List[DataSourceDepartment]) -> Dict[int, int | None]:
+        """
+        批量生成租户部门 ID，若历史记录中的 ID 已经被其他租户部门占用，则视为没有历史记录
+
+        :return: {data_source_department_id: tenant_dept_id or None}
+        """
+        dept_id_map = {dept.id: self.gen(dept) for dept in depts}
+
+        reused_dept_ids = [dept_id for dept_id in dept_id_map.values() if dept_id]
+        used_dept_ids = set()
+        for idx in range(0, len(reused_dept_ids), self.batch_size):
+            used_dept_ids |= set(
+                TenantDepartment.objects.filter(id__in=reused_dept_ids[idx : idx + self.batch_size]).values_list(
+                    "id", flat=True
+                )
+            )
+
+        if used_dept_ids:
+            logger.warning(
+                "tenant department ids %s in records are already in use, will generate new ids", used_dept_ids
+            )
+            dept_id_map = {
+                dept_id: (tenant_dept_id if tenant_dept_id not in used_dept_ids else None)
+                for dept_id, tenant_dept_id in dept_id_map.items()
+            }
+
+        return dept_id_map
@@ -14,14 +14,18 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+from copy import copy
 from itertools import groupby
-from typing import Dict, List
+from typing import Dict, Generator, List, Set
 
 from django.conf import settings
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.reader.excel import load_workbook
 from openpyxl.styles import Alignment, Font, colors
 from openpyxl.styles.numbers import FORMAT_TEXT
+from openpyxl.utils import get_column_letter
 from openpyxl.workbook import Workbook
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 from openpyxl.worksheet.worksheet import Worksheet
 
 from bkuser.apps.data_source.models import (
@@ -45,6 +49,8 @@ class DataSourceUserExporter:
     col_name_row_idx = 2
     # 新增的列的默认宽度
     default_column_width = 40
+    # 导出时每批次获取的用户数量
+    export_batch_size = 1000
 
     def __init__(self, data_source: DataSource):
         self.data_source = data_source
@@ -61,41 +67,95 @@ class DataSourceUserExporter:
         return self.workbook
 
     def export(self) -> Workbook:
+        """
+        导出数据源用户 & 组织信息
+
+        注：返回的是只写模式（write_only）的 Workbook，数据行会被写入临时文件而非保存在内存中，
+        因此不支持读取单元格，且只能保存（save）一次，适合配合流式响应使用
+        """
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(self.sheet.title)
+        self._copy_template_to_write_only_sheet(sheet)
+
         dept_org_map = self._build_dept_org_map()
-        user_departments_map = self._build_user_departments_map()
-        user_leaders_map = self._build_user_leaders_map()
-        user_username_map = self._build_user_username_map()
-
-        for u in self.users:
-            extras = []
-            # 自定义字段的值，不一定是字符串类型，需要做下转换
-            for field in self.custom_fields:
-                # 导出数据时，若自定义字段不存在或为空值，则替换为 ""
-                value = u.extras.get(field.name) or ""
-                value = ",".join(value) if isinstance(value, list) else str(value)  # type: ignore
-                extras.append(value)
-
-            self.sheet.append(  # noqa: PERF401 sheet isn't a list
-                (
-                    # 用户名
-                    u.username,
-                    # 姓名
-                    u.full_name,
-                    # 邮箱
-                    u.email,
-                    # 手机号
-                    f"+{u.phone_country_code}{u.phone}" if u.phone else "",
-                    # 组织信息
-                    ",".join(dept_org_map.get(dept_id, "") for dept_id in user_departments_map.get(u.id, [])),
-                    # 直接上级
-                    ",".join(user_username_map.get(leader_id, "") for leader_id in user_leaders_map.get(u.id, [])),
-                    # 自定义字段
-                    *extras,
-                )
+        for users in self._iter_user_chunks():
+            user_ids = [u.id for u in users]
+            user_departments_map = self._build_user_departments_map(user_ids)
+            user_leaders_map = self._build_user_leaders_map(user_ids)
+            user_username_map = self._build_user_username_map(
+                {leader_id for leader_ids in user_leaders_map.values() for leader_id in leader_ids}
             )
 
-        self._set_all_columns_to_text_format()
-        return self.workbook
+            for u in users:
+                extras = []
+                # 自定义字段的值，不一定是字符串类型，需要做下转换
+                for field in self.custom_fields:
+                    # 导出数据时，若自定义字段不存在或为空值，则替换为 ""
+                    value = u.extras.get(field.name) or ""
+                    value = ",".join(value) if isinstance(value, list) else str(value)  # type: ignore
+                    extras.append(value)
+
+                sheet.append(  # noqa: PERF401 sheet isn't a list
+                    (
+                        # 用户名
+                        u.username,
+                        # 姓名
+                        u.full_name,
+                        # 邮箱
+                        u.email,
+                        # 手机号
+                        f"+{u.phone_country_code}{u.phone}" if u.phone else "",
+                        # 组织信息
+                        ",".join(dept_org_map.get(dept_id, "") for dept_id in user_departments_map.get(u.id, [])),
+                        # 直接上级
+                        ",".join(user_username_map.get(leader_id, "") for leader_id in user_leaders_map.get(u.id, [])),
+                        # 自定义字段
+                        *extras,
+                    )
+                )
+
+        return workbook
+
+    def _iter_user_chunks(self) -> Generator[List[DataSourceUser], None, None]:
+        """按用户 ID 分批（keyset 分页）获取用户，避免一次性加载全部用户"""
+        last_user_id = 0
+        while True:
+            users = list(self.users.filter(id__gt=last_user_id).order_by("id")[: self.export_batch_size])
+            if not users:
+                return
+
+            yield users
+            last_user_id = users[-1].id
+
+    def _copy_template_to_write_only_sheet(self, sheet: WriteOnlyWorksheet):
+        """只写模式的 Workbook 无法加载模板，需要将模板（含自定义字段列）的表头，样式等复制过去"""
+        for col_letter, dimension in self.sheet.column_dimensions.items():
+            sheet.column_dimensions[col_letter].width = dimension.width
+
+        for row_idx, dimension in self.sheet.row_dimensions.items():
+            sheet.row_dimensions[row_idx].height = dimension.height
+
+        for merged_range in self.sheet.merged_cells.ranges:
+            sheet.merged_cells.add(merged_range.coord)
+
+        # 将所有单元格设置为文本格式（注：只写模式下，列样式需要在写入数据前设置）
+        for idx in range(self.sheet.max_column):
+            sheet.column_dimensions[self._gen_sheet_col_idx(idx)].number_format = FORMAT_TEXT
+
+        for row in self.sheet.iter_rows(max_row=self.col_name_row_idx):
+            cells = []
+            for cell in row:
+                write_only_cell = WriteOnlyCell(sheet, value=cell.value)
+                if cell.has_style:
+                    write_only_cell.font = copy(cell.font)
+                    write_only_cell.fill = copy(cell.fill)
+                    write_only_cell.border = copy(cell.border)
+                    write_only_cell.alignment = copy(cell.alignment)
+                    write_only_cell.number_format = cell.number_format
+
+                cells.append(write_only_cell)
+
+            sheet.append(cells)
 
     def _load_template(self):
         self.workbook = load_workbook(settings.EXPORT_ORG_TEMPLATE)
@@ -146,10 +206,10 @@ class DataSourceUserExporter:
     @staticmethod
     def _gen_sheet_col_idx(idx: int) -> str:
         """
-        在 excel 表中，列的 index 是 A，B，C，D ...，
-        该函数可以将数字索引转换为列索引，利用的是 ascii 码顺序
+        在 excel 表中，列的 index 是 A，B，C，D ... Z，AA，AB ...，
+        该函数可以将数字索引（0-based）转换为列索引
         """
-        return chr(ord("A") + idx)
+        return get_column_letter(idx + 1)
 
     def _build_dept_org_map(self) -> Dict[int, str]:
         """
@@ -181,14 +241,14 @@ class DataSourceUserExporter:
 
         return dept_org_map
 
-    def _build_user_departments_map(self) -> Dict[int, List[int]]:
+    def _build_user_departments_map(self, user_ids: List[int]) -> Dict[int, List[int]]:
         """
         获取用户与部门关系的映射表
 
         :returns: {user_id: [dept_id1, dept_id2, ...]}
         """
         relations = (
-            DataSourceDepartmentUserRelation.objects.filter(user__in=self.users)
+            DataSourceDepartmentUserRelation.objects.filter(user_id__in=user_ids)
             .order_by("user_id")
             .values("user_id", "department_id")
         )
@@ -197,14 +257,14 @@ class DataSourceUserExporter:
             for user_id, group in groupby(relations, key=lambda r: r["user_id"])
         }
 
-    def _build_user_leaders_map(self) -> Dict[int, List[int]]:
+    def _build_user_leaders_map(self, user_ids: List[int]) -> Dict[int, List[int]]:
         """
         获取用户与 leader 关系的映射表
 
         :returns: {user_id: [leader_id1, leader_id2, ...]}
         """
         relations = (
-            DataSourceUserLeaderRelation.objects.filter(user__in=self.users)
+            DataSourceUserLeaderRelation.objects.filter(user_id__in=user_ids)
             .order_by("user_id")
             .values("user_id", "leader_id")
         )
@@ -213,6 +273,6 @@ class DataSourceUserExporter:
             for user_id, group in groupby(relations, key=lambda r: r["user_id"])
         }
 
-    def _build_user_username_map(self) -> Dict[int, str]:
+    def _build_user_username_map(self, user_ids: Set[int]) -> Dict[int, str]:
         """获取用户与用户名的映射表"""
-        return dict(self.users.values_list("id", "username"))
+        return dict(self.users.filter(id__in=user_ids).values_list("id", "username"))
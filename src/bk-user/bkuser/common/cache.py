@@ -16,17 +16,22 @@
 # to the current version of the project delivered to anyone in the future.
 
 import functools
+from typing import Callable, Dict, List
 
 from blue_krill.data_types.enum import EnumField, StrStructuredEnum
 from django.core.cache import cache as default_cache
 from django.core.cache import caches
 from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+
+from bkuser.utils.uuid import generate_uuid
 
 
 class CacheEnum(StrStructuredEnum):
     """枚举可用的 Cache，与 settings.Cache 配置的 Dict.keys 一致"""
 
     DEFAULT = EnumField("default", label="内存缓存（默认）")
+    OPEN_API_AUTH = EnumField("open_api_auth", label="开放 API 认证信息内存缓存")
     REDIS = EnumField("redis", label="Redis 缓存")
 
 
@@ -47,6 +52,16 @@ class CacheKeyPrefixEnum(StrStructuredEnum):
     RESET_PASSWORD_TOKEN = "rpt"
     # Workbook 临时存储
     WORKBOOK_TEMPORARY_STORE = "wts"
+    # 数据源部门路径索引
+    DEPARTMENT_PATH_INDEX = "dpi"
+    # 开放 API 认证信息（JWT 校验结果，Django User）
+    OPEN_API_AUTHENTICATION = "oaa"
+    # 租户元数据（协同字段映射，数据源域名映射等）
+    TENANT_METADATA = "tmd"
+    # 数据源关系（部门 - 用户，用户 - Leader）数据版本号
+    DATA_SOURCE_RELATION_GENERATION = "dsrg"
+    # 用户在租户下的角色（鉴权使用）
+    PERMISSION_USER_ROLE = "pur"
 
 
 def _default_key_function(*args, **kwargs):
@@ -137,6 +152,10 @@ class Cache:
         key = self._make_key(key)
         self.cache.set(key, value, timeout, version)
 
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._make_key(key)
+        return self.cache.add(key, value, timeout, version)
+
     def delete(self, key, version=None):
         key = self._make_key(key)
         self.cache.delete(key, version)
@@ -166,3 +185,56 @@ class Cache:
 
         key = self._make_key(key)
         return self.cache.lock(key, version, timeout, sleep, blocking_timeout, client)
+
+
+class CacheGeneration:
+    """
+    缓存版本号（generation），用于使基于 DB 数据构建的缓存失效：缓存 Key 中带上版本号，数据变更后更新版本号即可，
+    版本号永不过期，若不存在（首次使用 / 被清理）则会生成新的版本号
+
+    Q: 为什么更新版本号时，需要在事务提交后再更新一次？
+    A: 事务提交前，其他进程可能基于旧数据 + 新版本号重建缓存，提交后再次更新版本号可避免缓存长期不一致
+    """
+
+    def __init__(self, cache: Cache, on_bump: Callable[[], None] | None = None):
+        """
+        :param cache: 存储版本号的缓存（需要多进程共享）
+        :param on_bump: 版本号更新后的回调（如使进程内缓存失效）
+        """
+        self.cache = cache
+        self.on_bump = on_bump
+
+    def get(self, key: str) -> str:
+        """获取当前的版本号"""
+        if generation := self.cache.get(key):
+            return generation
+
+        return self._add_many([key])[key]
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """批量获取当前的版本号 {key: 版本号}"""
+        generations = self.cache.get_many(keys)
+        if missing_keys := [key for key in keys if key not in generations]:
+            generations.update(self._add_many(missing_keys))
+
+        return generations
+
+    def bump(self, key: str) -> None:
+        """更新版本号，若当前在事务中，则在事务提交后会再更新一次"""
+        self._bump(key)
+        transaction.on_commit(lambda: self._bump(key))
+
+    def _add_many(self, keys: List[str]) -> Dict[str, str]:
+        # 使用 add 避免并发时互相覆盖，但 add 之后版本号仍可能被清理（过期淘汰 / 缓存不可用），
+        # 此时直接使用新生成的版本号
+        generations = {key: generate_uuid() for key in keys}
+        for key, generation in generations.items():
+            self.cache.add(key, generation, timeout=None)
+
+        generations.update(self.cache.get_many(keys))
+        return generations
+
+    def _bump(self, key: str) -> None:
+        self.cache.set(key, generate_uuid(), timeout=None)
+        if self.on_bump:
+            self.on_bump()
@@ -15,66 +15,98 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 import base64
+import hashlib
 from typing import Dict
 
 from django.contrib.auth.hashers import BasePasswordHasher, mask_hash, must_update_salt
 from django.utils.crypto import constant_time_compare
 from django.utils.encoding import force_bytes
+from tongsuopy.crypto.hashes import SM3 as TongSuoSM3  # noqa: N811
+from tongsuopy.crypto.hashes import Hash
 
 from .sm3 import SM3
 
 
+def _is_openssl_sm3_pbkdf2_available() -> bool:
+    """检查 hashlib 链接的 OpenSSL 是否支持 SM3（OpenSSL >= 1.1.1 且未被裁剪的情况下支持）"""
+    try:
+        hashlib.pbkdf2_hmac("sm3", b"", b"", 1)
+    except ValueError:
+        return False
+
+    return True
+
+
+_OPENSSL_SM3_PBKDF2_AVAILABLE = _is_openssl_sm3_pbkdf2_available()
+
+_TRANS_5C = bytes((x ^ 0x5C) for x in range(256))
+_TRANS_36 = bytes((x ^ 0x36) for x in range(256))
+
+
 def _pbkdf2_hmac_sm3(password: bytes, salt: bytes, iterations: int, dk_len: int | None = None) -> bytes:
     """
     Password based key derivation function 2 (PKCS #5 v2.0)
-    实现参考自：lib/python3.10/hashlib.py L188 pbkdf2_hmac
 
-    TODO 性能优化，目前相同迭代次数条件下，pbkdf2_hmac_sm3 性能仅为 pbkdf2_hmac + sha256 的 1/70
-    原因有二：1. tongsuopy.SM3 性能约为 hashlib.sha256 的 1/15
-            2. 本函数 pbkdf2_hmac 实现性能约为标准库 pbkdf2_hmac 的 1/4
-            注：标准库 pbkdf2_hmac 为 C 实现且带缓存，但仅支持 hashlib 内置的算法（如 sha1, sha256）
+    优先使用标准库 hashlib.pbkdf2_hmac（C 实现，依赖链接的 OpenSSL 支持 SM3），
+    若 OpenSSL 不支持 SM3，则使用基于 tongsuopy 的 Python 实现，两者计算结果完全一致
     """
-    inner, outer = SM3(), SM3()
-    block_size = inner.block_size
-
     if iterations < 1:
         raise ValueError("pbkdf2 iterations must greater than 0")
-    if dk_len is None:
-        dk_len = outer.digest_size
-    if dk_len < 1:
+    if dk_len is not None and dk_len < 1:
         raise ValueError("pbkdf2 dklen must greater than 0")
 
+    if _OPENSSL_SM3_PBKDF2_AVAILABLE:
+        return hashlib.pbkdf2_hmac("sm3", password, salt, iterations, dk_len)
+
+    return _pbkdf2_hmac_sm3_fallback(password, salt, iterations, dk_len)
+
+
+def _pbkdf2_hmac_sm3_fallback(password: bytes, salt: bytes, iterations: int, dk_len: int | None = None) -> bytes:
+    """
+    Password based key derivation function 2 (PKCS #5 v2.0) 的 Python 实现
+    实现参考自：lib/python3.10/hashlib.py L188 pbkdf2_hmac
+
+    注：由于每轮迭代都需要经过 cffi 调用 tongsuopy 计算摘要，性能远低于 hashlib.pbkdf2_hmac（约 1/10），
+    因此这里预先计算好 HMAC 内外两层填充后的摘要状态，并直接复用 tongsuopy 的 Hash 对象，以减少额外的对象创建
+    """
+    algorithm = TongSuoSM3()
+    block_size, digest_size = algorithm.block_size, algorithm.digest_size
+
+    if dk_len is None:
+        dk_len = digest_size
+
     if len(password) > block_size:
         password = SM3(password).digest()
 
     password = password + b"\x00" * (block_size - len(password))
 
-    _trans_5C = bytes((x ^ 0x5C) for x in range(256))  # noqa: N806
-    _trans_36 = bytes((x ^ 0x36) for x in range(256))
-    inner.update(password.translate(_trans_36))
-    outer.update(password.translate(_trans_5C))
+    # PBKDF2_HMAC uses the password as key. We can re-use the same
+    # digest objects and just update copies to skip initialization.
+    inner, outer = Hash(algorithm), Hash(algorithm)
+    inner.update(password.translate(_TRANS_36))
+    outer.update(password.translate(_TRANS_5C))
+    inner_copy, outer_copy = inner.copy, outer.copy
 
-    def prf(msg):
-        # PBKDF2_HMAC uses the password as key. We can re-use the same
-        # digest objects and just update copies to skip initialization.
-        inner_cp = inner.copy()
-        outer_cp = outer.copy()
+    def prf(msg: bytes) -> bytes:
+        inner_cp = inner_copy()
         inner_cp.update(msg)
-        outer_cp.update(inner_cp.digest())
-        return outer_cp.digest()
+        outer_cp = outer_copy()
+        outer_cp.update(inner_cp.finalize())
+        return outer_cp.finalize()
 
+    from_bytes = int.from_bytes
     d_key = b""
     loop = 1
     while len(d_key) < dk_len:
         prev = prf(salt + loop.to_bytes(4, "big"))
-        r_key = int.from_bytes(prev, "big")
+        r_key = from_bytes(prev, "big")
         for _i in range(iterations - 1):
             prev = prf(prev)
             # r_key = r_key ^ prev
-            r_key ^= int.from_bytes(prev, "big")
+            r_key ^= from_bytes(prev, "big")
 
         loop += 1
-        d_key += r_key.to_bytes(inner.digest_size, "big")
+        d_key += r_key.to_bytes(digest_size, "big")
 
     return d_key[:dk_len]
 
@@ -87,8 +119,8 @@ class PBKDF2SM3PasswordHasher(BasePasswordHasher):
     """
 
     algorithm = "pbkdf2_sm3"
-    # PBKDF2PasswordHasher 迭代次数为 26w，由于 _pbkdf2_hmac_sm3 性能仅为 pbkdf2_hmac + sha256 的 1/70
-    # 因此此处设置迭代次数为 2.6w, 综上可得本 Hasher 性能约为 PBKDF2PasswordHasher 的 1/6 - 1/7
+    # PBKDF2PasswordHasher 迭代次数为 26w，由于早期 _pbkdf2_hmac_sm3 的实现性能仅为 pbkdf2_hmac + sha256 的 1/70
+    # 因此此处设置迭代次数为 2.6w（注：修改迭代次数会导致存量密码在校验时被判定为需要更新，不可随意调整）
     iterations = 26000
 
     def encode(self, password: str, salt: str | None = None, iterations: int | None = None) -> str:
@@ -18,6 +18,8 @@ from django.conf import settings
 from django.contrib.auth.hashers import check_password as dj_check_password
 from django.contrib.auth.hashers import make_password as dj_make_password
 
+from .pbkdf2 import _OPENSSL_SM3_PBKDF2_AVAILABLE, PBKDF2SM3PasswordHasher
+
 
 def check_password(raw_password: str, encrypted_password: str) -> bool:
     """Return a boolean of whether the raw_password was correct. Handles hashing formats behind the scenes."""
@@ -27,3 +29,14 @@ def check_password(raw_password: str, encrypted_password: str) -> bool:
 def make_password(raw_password: str, salt: str | None = None) -> str:
     """Return a securely generated hash of the given plain-text password."""
     return dj_make_password(raw_password, salt=salt, hasher=settings.PASSWORD_ENCRYPT_ALGORITHM)
+
+
+def is_make_password_parallelizable() -> bool:
+    """
+    多线程计算密码哈希能否利用多核：hashlib.pbkdf2_hmac 在计算时会释放 GIL，
+    但若 OpenSSL 不支持 SM3，PBKDF2-SM3 会使用基于 tongsuopy 的 Python 实现，计算过程中一直持有 GIL
+    """
+    if PBKDF2SM3PasswordHasher.algorithm != settings.PASSWORD_ENCRYPT_ALGORITHM:
+        return True
+
+    return _OPENSSL_SM3_PBKDF2_AVAILABLE
@@ -14,8 +14,12 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
-from django.http import HttpResponse
+import tempfile
+from typing import Any, Iterable, Iterator, List
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from openpyxl.workbook import Workbook
+from rest_framework.utils.encoders import JSONEncoder
 
 
 def convert_workbook_to_response(workbook: Workbook, filename: str) -> HttpResponse:
@@ -24,3 +28,35 @@ def convert_workbook_to_response(workbook: Workbook, filename: str) -> HttpRespo
     response["Content-Disposition"] = f"attachment;filename={filename}"
     workbook.save(response)
     return response
+
+
+def convert_workbook_to_streaming_response(workbook: Workbook, filename: str) -> StreamingHttpResponse:
+    """将工作簿转换为流式响应，工作簿先保存到临时文件中，再分块返回，避免在内存中保存完整的文件内容"""
+    # 注：临时文件会在响应结束（FileResponse 关闭文件）后自动删除
+    fp = tempfile.TemporaryFile()  # noqa: SIM115
+    try:
+        workbook.save(fp)
+    except Exception:
+        fp.close()
+        raise
+
+    fp.seek(0)
+    response = FileResponse(fp, content_type="application/ms-excel")
+    response["Content-Disposition"] = f"attachment;filename={filename}"
+    return response
+
+
+def convert_chunks_to_ndjson_streaming_response(chunks: Iterable[List[Any]]) -> StreamingHttpResponse:
+    """
+    将分批的数据转换为 NDJSON 格式（每行一个 JSON 对象）的流式响应
+
+    :param chunks: 分批的数据，每批数据会被编码后作为一个数据块写出（而不是每行一个数据块，避免过多的小块写入）
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def _iter_content() -> Iterator[str]:
+        for chunk in chunks:
+            if chunk:
+                yield "".join(encoder.encode(item) + "\n" for item in chunk)
+
+    return StreamingHttpResponse(_iter_content(), content_type="application/x-ndjson")
@@ -15,15 +15,17 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 import logging
+from typing import List
 from urllib.parse import urlparse
 
 from django.conf import settings
+from requests.auth import HTTPBasicAuth
 
 from bkuser.common.error_codes import error_codes
 from bkuser.common.local import local
 from bkuser.utils.url import urljoin
 
-from .http import http_get
+from .http import http_get, http_post
 
 logger = logging.getLogger("component")
 
@@ -93,3 +95,14 @@ def get_user_info(bk_token: str):
     """
     url_path = "/api/v2/get_user/"
     return _call_login_api(http_get, url_path, params={"bk_token": bk_token})
+
+
+def invalidate_tenant_user_cache(tenant_user_ids: List[str]):
+    """通知登录服务使租户用户信息缓存失效"""
+    url_path = "/api/v2/invalidate_user_cache/"
+    return _call_login_api(
+        http_post,
+        url_path,
+        json={"tenant_user_ids": tenant_user_ids},
+        auth=HTTPBasicAuth(settings.BK_APP_CODE, settings.BK_APP_SECRET),
+    )
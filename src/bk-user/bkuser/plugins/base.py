@@ -16,7 +16,7 @@
 # to the current version of the project delivered to anyone in the future.
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, List, Protocol, Type
+from typing import Any, Dict, List, Protocol, Set, Type
 
 from drf_yasg import openapi
 
@@ -53,6 +53,31 @@ class BaseDataSourcePlugin(ABC):
         ...
 
 
+class DeltaSyncPluginMixin:
+    """支持增量同步的数据源插件 Mixin
+
+    插件初始化时，会通过 delta_sync_state 参数传入上次同步成功后记录的增量同步状态（首次同步 / 非定时同步为 None），
+    插件根据该状态决定本次是否仅拉取有变更的用户，并在拉取完成后更新 delta_sync_state，由同步流程持久化
+
+    注：增量同步仅针对用户，部门数据仍需要全量提供
+    """
+
+    # 增量同步状态（如高水位），拉取完成后由同步流程持久化，下次同步时传入插件
+    delta_sync_state: Dict[str, Any] | None = None
+    # 本次拉取的用户是否为增量数据（即仅包含有变更的用户）
+    is_delta_fetch: bool = False
+    # 数据源中仍存在的用户 code 全集（增量拉取时通过对账扫描获得），为 None 表示本次没有进行对账
+    alive_user_codes: Set[str] | None = None
+
+
+class RequiredUserPropertiesPluginMixin:
+    """支持按需生成用户属性的数据源插件 Mixin
+
+    同步时，插件初始化会通过 required_user_properties 参数传入字段映射中实际使用到的用户属性（源字段），
+    插件可以仅生成这些属性（及插件内部需要的属性），以降低大规模数据同步时的内存占用
+    """
+
+
 _plugin_cls_map: Dict[str | DataSourcePluginEnum, Type[BaseDataSourcePlugin]] = {}
 _plugin_default_cfg_map: Dict[str | DataSourcePluginEnum, BasePluginConfig] = {}
 
@@ -38,6 +38,13 @@ MAX_RETRIES = 3
 # 默认重试次数
 DEFAULT_RETRIES = 1
 
+# 最小分页请求并发数（1 即逐页顺序请求）
+MIN_CONCURRENCY = 1
+# 最大分页请求并发数
+MAX_CONCURRENCY = 16
+# 默认分页请求并发数
+DEFAULT_CONCURRENCY = 1
+
 # 默认页码
 DEFAULT_PAGE = 1
 # 获取首条数据用的每页数量
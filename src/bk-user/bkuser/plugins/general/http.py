@@ -16,16 +16,22 @@
 # to the current version of the project delivered to anyone in the future.
 
 import base64
+import itertools
 import logging
-from typing import Any, Dict, List
+import math
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Tuple
 
 import requests
 from django.utils.translation import gettext_lazy as _
 from requests.adapters import HTTPAdapter, Retry
-from requests.exceptions import JSONDecodeError
+from requests.exceptions import ChunkedEncodingError, JSONDecodeError
 from rest_framework import status
 
 from bkuser.plugins.general.constants import (
+    DEFAULT_CONCURRENCY,
     DEFAULT_PAGE,
     MAX_TOTAL_COUNT,
     PAGE_SIZE_FOR_FETCH_FIRST,
@@ -76,80 +82,217 @@ def get_reason_from_status_code(status_code: int) -> str:
 
 
 def fetch_all_data(
-    url: str, headers: Dict[str, str], params: Dict[str, Any], page_size: PageSizeEnum, timeout: int, retries: int
-) -> List[Dict[str, Any]]:
+    url: str,
+    headers: Dict[str, str],
+    params: Dict[str, Any],
+    page_size: PageSizeEnum,
+    timeout: int,
+    retries: int,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> Iterator[Dict[str, Any]]:
     """
     根据指定配置，请求数据源 API 以获取用户 / 部门数据
 
+    注：返回的是迭代器，数据按分页顺序逐页产出，调用方可边拉取边处理，无需等待全量数据
+
     :param url: 数据源 URL，如 https://bk.example.com/apis/v1/users
     :param headers: 请求头，包含认证信息等
     :param params: 查询参数，即 url 中 ?scope=company 部分
     :param timeout: 单次请求超时时间
     :param retries: 请求失败重试次数
+    :param concurrency: 分页请求并发数，大于 1 时根据首页返回的总数量，并发请求剩余的分页
     :returns: API 返回结果，应符合通用 HTTP 数据源 API 协议
     """
     # 做强制类型转换，避免在序列化等场景中无法自动转换成 int
     page_size = int(page_size)  # type: ignore
+    max_page = math.ceil(MAX_TOTAL_COUNT / page_size)
+
+    with _SessionPool(retries) as sessions:
+        total_cnt, items = _fetch_page(sessions.get(), url, headers, params, DEFAULT_PAGE, page_size, timeout, retries)
+        yield from items
+
+        # 根据首页返回的总数量，计算需要拉取的最大页码
+        last_page = math.ceil(total_cnt / page_size)
+        if last_page > max_page:
+            # 理论拉取数量超过最大上限，只拉取到上限页
+            logger.warning("request data source api %s, exceed max page %d, force break...", url, max_page)
+            last_page = max_page
+
+        if concurrency <= 1:
+            yield from _iter_pages_sequentially(
+                sessions, url, headers, params, page_size, timeout, retries, max_page, total_cnt
+            )
+        else:
+            yield from _iter_pages_concurrently(
+                sessions, url, headers, params, page_size, timeout, retries, last_page, concurrency
+            )
+
+
+def _iter_pages_sequentially(
+    sessions: "_SessionPool",
+    url: str,
+    headers: Dict[str, str],
+    params: Dict[str, Any],
+    page_size: int,
+    timeout: int,
+    retries: int,
+    max_page: int,
+    total_cnt: int,
+) -> Iterator[Dict[str, Any]]:
+    """逐页顺序拉取（第二页起），每页都以最新返回的总数量判断是否结束"""
+    cur_page = DEFAULT_PAGE
+    while cur_page * page_size < total_cnt:
+        # 理论拉取数量超过最大上限，强制退出
+        if cur_page >= max_page:
+            break
+
+        cur_page += 1
+        total_cnt, items = _fetch_page(sessions.get(), url, headers, params, cur_page, page_size, timeout, retries)
+        yield from items
+
+
+def _iter_pages_concurrently(
+    sessions: "_SessionPool",
+    url: str,
+    headers: Dict[str, str],
+    params: Dict[str, Any],
+    page_size: int,
+    timeout: int,
+    retries: int,
+    last_page: int,
+    concurrency: int,
+) -> Iterator[Dict[str, Any]]:
+    """并发拉取（第二页起）的所有分页，按页码顺序产出数据
+
+    注：同时在途（已请求未消费）的分页数量有上限，避免调用方消费较慢时，大量分页数据堆积在内存中
+    """
+    pages = iter(range(DEFAULT_PAGE + 1, last_page + 1))
+    max_pending = concurrency * 2
+
+    def fetch(page: int) -> List[Dict[str, Any]]:
+        return _fetch_page(sessions.get(), url, headers, params, page, page_size, timeout, retries)[1]
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="general-ds-fetcher")
+    try:
+        pending: Deque[Future] = deque(executor.submit(fetch, p) for p in itertools.islice(pages, max_pending))
+        while pending:
+            items = pending.popleft().result()
+            # 消费一页，补充一页，保持在途分页数量
+            for p in itertools.islice(pages, 1):
+                pending.append(executor.submit(fetch, p))
+
+            yield from items
+    finally:
+        # 出现异常或调用方提前结束迭代时，取消尚未开始的请求
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _fetch_page(
+    session: requests.Session,
+    url: str,
+    headers: Dict[str, str],
+    params: Dict[str, Any],
+    page: int,
+    page_size: int,
+    timeout: int,
+    retries: int,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    请求数据源 API 的指定分页
+
+    注：状态码 / 连接异常由 Session 的 Retry 负责重试，响应体读取中断（如连接被重置）则由此处按页重试
+
+    :returns: (总数量, 当前页数据)
+    """
+    # 各分页可能并发请求，不能修改共享的 params
+    params = {**params, "page": page, "page_size": page_size}
+
+    for attempt in range(retries + 1):
+        try:
+            resp = session.get(url, headers=headers, params=params, timeout=timeout)
+            break
+        except ChunkedEncodingError:
+            if attempt >= retries:
+                raise
+
+            logger.warning("request data source api %s, params %s, read response failed, retrying...", url, params)
+
+    if not resp.ok:
+        raise RequestApiError(
+            _("请求数据源 API {} 参数 {} 异常，状态码：{}，可能原因是：{}，响应内容：{}").format(
+                url,
+                stringify_params(params),
+                resp.status_code,
+                get_reason_from_status_code(resp.status_code),
+                resp.content,
+            )  # noqa: E501
+        )
+
+    try:
+        resp_data = resp.json()
+    except JSONDecodeError as e:
+        raise RespDataFormatError(
+            _("数据源 API {} 参数 {} 返回非 Json 格式，响应内容 {}").format(
+                url, stringify_params(params), resp.content
+            )  # noqa: E501
+        ) from e
+
+    total_cnt = resp_data.get("count", 0)
+    results = resp_data.get("results", [])
+
+    logger.info(
+        "request data source api %s, params %s, get %d items, total count is %d",
+        url,
+        params,
+        len(results),
+        total_cnt,
+    )
+    return total_cnt, results
+
+
+class _SessionPool:
+    """线程级别的 Session 池：requests.Session 非线程安全，每个线程使用独立的 Session（复用连接）"""
+
+    def __init__(self, retries: int):
+        self.retries = retries
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._lock = threading.Lock()
 
-    with requests.Session() as session:
+    def get(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._new_session()
+            with self._lock:
+                self._sessions.append(session)
+
+        return session
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+
+            self._sessions.clear()
+
+    def __enter__(self) -> "_SessionPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
         adapter = HTTPAdapter(
             max_retries=Retry(
-                total=retries,
+                total=self.retries,
                 backoff_factor=1,
                 status_forcelist=[429, 500, 502, 503, 504],
             )
         )
         session.mount("https://", adapter)
         session.mount("http://", adapter)
-
-        cur_page, max_page = DEFAULT_PAGE, MAX_TOTAL_COUNT / page_size
-        total_cnt, items = 0, []
-        while True:
-            params.update({"page": cur_page, "page_size": page_size})
-            resp = session.get(url, headers=headers, params=params, timeout=timeout)
-            if not resp.ok:
-                raise RequestApiError(
-                    _("请求数据源 API {} 参数 {} 异常，状态码：{}，可能原因是：{}，响应内容：{}").format(
-                        url,
-                        stringify_params(params),
-                        resp.status_code,
-                        get_reason_from_status_code(resp.status_code),
-                        resp.content,
-                    )  # noqa: E501
-                )
-
-            try:
-                resp_data = resp.json()
-            except JSONDecodeError as e:  # noqa: PERF203
-                raise RespDataFormatError(
-                    _("数据源 API {} 参数 {} 返回非 Json 格式，响应内容 {}").format(
-                        url, stringify_params(params), resp.content
-                    )  # noqa: E501
-                ) from e
-
-            total_cnt = resp_data.get("count", 0)
-            cur_req_results = resp_data.get("results", [])
-            items.extend(cur_req_results)
-
-            logger.info(
-                "request data source api %s, params %s, get %d items, total count is %d",
-                url,
-                params,
-                len(cur_req_results),
-                total_cnt,
-            )
-
-            if cur_page * page_size >= total_cnt:
-                break
-
-            # 理论拉取数量超过最大上限，强制退出
-            if cur_page >= max_page:
-                logger.warning("request data source api %s, exceed max page %d, force break...", url, max_page)
-                break
-
-            cur_page += 1
-
-    return items
+        return session
 
 
 def fetch_first_item(url: str, headers: Dict[str, str], params: Dict[str, Any], timeout: int) -> Dict[str, Any] | None:
@@ -20,10 +20,13 @@ from pydantic import BaseModel, Field
 from bkuser.plugins.general.constants import (
     API_URL_PATH_REGEX,
     BASE_URL_REGEX,
+    DEFAULT_CONCURRENCY,
     DEFAULT_REQ_TIMEOUT,
     DEFAULT_RETRIES,
+    MAX_CONCURRENCY,
     MAX_REQ_TIMEOUT,
     MAX_RETRIES,
+    MIN_CONCURRENCY,
     MIN_REQ_TIMEOUT,
     MIN_RETRIES,
     AuthMethod,
@@ -58,6 +61,8 @@ class ServerConfig(BaseModel):
     request_timeout: int = Field(ge=MIN_REQ_TIMEOUT, le=MAX_REQ_TIMEOUT, default=DEFAULT_REQ_TIMEOUT)
     # 请求失败重试次数
     retries: int = Field(ge=MIN_RETRIES, le=MAX_RETRIES, default=DEFAULT_RETRIES)
+    # 分页请求并发数，大于 1 时，会根据首页返回的总数量并发请求剩余分页
+    concurrency: int = Field(ge=MIN_CONCURRENCY, le=MAX_CONCURRENCY, default=DEFAULT_CONCURRENCY)
 
 
 class AuthConfig(BaseModel):
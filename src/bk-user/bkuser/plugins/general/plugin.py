@@ -53,6 +53,7 @@ class GeneralDataSourcePlugin(BaseDataSourcePlugin):
             cfg.page_size,
             cfg.request_timeout,
             cfg.retries,
+            cfg.concurrency,
         )
         return [self._gen_raw_dept(d) for d in depts]
 
@@ -66,6 +67,7 @@ class GeneralDataSourcePlugin(BaseDataSourcePlugin):
             cfg.page_size,
             cfg.request_timeout,
             cfg.retries,
+            cfg.concurrency,
         )
         return [self._gen_raw_user(u) for u in users]
 
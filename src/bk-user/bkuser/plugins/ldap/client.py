@@ -15,10 +15,11 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
-from typing import List
+from typing import Iterator, List
 
-from ldap3 import ALL_ATTRIBUTES, DEREF_NEVER, SAFE_SYNC, Connection, Server
-from ldap3.extend.standard.PagedSearch import paged_search_accumulator
+from ldap3 import ALL_ATTRIBUTES, BASE, DEREF_NEVER, SAFE_SYNC, SUBTREE, Connection, Server
+from ldap3.core.exceptions import LDAPNoSuchObjectResult
+from ldap3.extend.standard.PagedSearch import paged_search_generator
 
 from bkuser.plugins.ldap.constants import REQUIRED_OPERATIONAL_ATTRIBUTES
 from bkuser.plugins.ldap.exceptions import DataNotFoundError
@@ -30,51 +31,142 @@ class LDAPClient:
 
     def __init__(self, server_config: ServerConfig):
         self.server_config = server_config
+        self._conn: Connection | None = None
 
     def __enter__(self):
-        self._conn = self._gen_conn(self.server_config)
-        self._conn.bind()
-        return self
+        return self.open()
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self._conn.unbind()
+        self.close()
+
+    def open(self) -> "LDAPClient":
+        """建立连接并绑定，已绑定的连接可以在多次查询中复用"""
+        if self._conn is None:
+            self._conn = self._gen_conn(self.server_config)
+            self._conn.bind()
+
+        return self
+
+    def close(self):
+        """解除绑定并关闭连接"""
+        if self._conn is not None:
+            self._conn.unbind()
+            self._conn = None
+
+    def fetch_all_objects(
+        self,
+        search_base_dn: str,
+        object_class: str,
+        extra_filter: str = "",
+        extra_attributes: List[str] | None = None,
+    ) -> List[LDAPObject]:
+        """
+        获取所有对象
+
+        :param extra_filter: 额外的过滤条件，如 (modifyTimestamp>=20240101000000Z)
+        :param extra_attributes: 额外需要获取的操作属性，如 modifyTimestamp
+        """
+        return list(self.iter_all_objects(search_base_dn, object_class, extra_filter, extra_attributes))
 
-    def fetch_all_objects(self, search_base_dn: str, object_class: str) -> List[LDAPObject]:
-        return self._fetch_objects_with_page(search_base_dn, object_class, self.server_config.page_size)
+    def iter_all_objects(
+        self,
+        search_base_dn: str,
+        object_class: str,
+        extra_filter: str = "",
+        extra_attributes: List[str] | None = None,
+    ) -> Iterator[LDAPObject]:
+        """以流式的方式获取所有对象，逐页从 LDAP 服务获取，不会一次性将所有对象加载到内存中"""
+        search_filter = f"(objectclass={object_class})"
+        if extra_filter:
+            search_filter = f"(&{search_filter}{extra_filter})"
+
+        return self._iter_objects_with_page(
+            search_base_dn,
+            search_filter,
+            self.server_config.page_size,
+            attributes=[ALL_ATTRIBUTES, *REQUIRED_OPERATIONAL_ATTRIBUTES, *(extra_attributes or [])],
+        )
+
+    def fetch_all_object_codes(self, search_base_dn: str, object_class: str) -> List[str]:
+        """获取所有对象的 Code（entryUUID），不获取其他属性，可用于低成本的对账扫描"""
+        results = self._iter_objects_with_page(
+            search_base_dn,
+            f"(objectclass={object_class})",
+            self.server_config.page_size,
+            attributes=REQUIRED_OPERATIONAL_ATTRIBUTES,
+        )
+        return [r.attrs["entryUUID"] for r in results]
+
+    def fetch_object_by_dn(
+        self, dn: str, object_class: str, extra_attributes: List[str] | None = None
+    ) -> LDAPObject | None:
+        """根据 DN 获取指定对象，对象不存在或对象类不匹配则返回 None"""
+        try:
+            results = list(
+                self._iter_objects_with_page(
+                    dn,
+                    f"(objectclass={object_class})",
+                    1,
+                    attributes=[ALL_ATTRIBUTES, *REQUIRED_OPERATIONAL_ATTRIBUTES, *(extra_attributes or [])],
+                    search_scope=BASE,
+                )
+            )
+        except LDAPNoSuchObjectResult:
+            return None
+
+        return results[0] if results else None
 
     def fetch_first_object(self, search_base_dn: str, object_class: str) -> LDAPObject:
-        results = self._fetch_objects_with_page(search_base_dn, object_class, 1)
+        results = list(
+            self._iter_objects_with_page(
+                search_base_dn,
+                f"(objectclass={object_class})",
+                1,
+                attributes=[ALL_ATTRIBUTES, *REQUIRED_OPERATIONAL_ATTRIBUTES],
+            )
+        )
         if not results:
             raise DataNotFoundError(f"no object found in {search_base_dn} (objectclass={object_class})")
 
         return results[0]
 
-    def _fetch_objects_with_page(self, search_base_dn: str, object_class: str, page_size: int) -> List[LDAPObject]:
+    def _iter_objects_with_page(
+        self,
+        search_base_dn: str,
+        search_filter: str,
+        page_size: int,
+        attributes: List[str],
+        search_scope: str = SUBTREE,
+    ) -> Iterator[LDAPObject]:
         """
-        以分页方式获取对象列表
+        以分页方式获取对象（生成器，逐页请求）
 
         :param search_base_dn: LDAP Base DN，如：ou=company,dc=bk,dc=example,dc=com
-        :param object_class: LDAP 对象类，如：inetOrgPerson
+        :param search_filter: 过滤条件，如：(objectclass=inetOrgPerson)
         :param page_size: 分页大小
-        :return: 对象列表
+        :param attributes: 需要获取的属性列表
+        :param search_scope: 搜索范围，默认为整个子树
+        :return: 对象迭代器
         """
         if page_size <= 0:
             raise ValueError("page_size must be greater than 0")
 
-        results = paged_search_accumulator(
+        if self._conn is None:
+            raise RuntimeError("ldap client not opened")
+
+        results = paged_search_generator(
             self._conn,
             search_base=search_base_dn,
-            search_filter=f"(objectclass={object_class})",
+            search_filter=search_filter,
+            search_scope=search_scope,
             dereference_aliases=DEREF_NEVER,
             get_operational_attributes=False,
-            attributes=[
-                ALL_ATTRIBUTES,
-                *REQUIRED_OPERATIONAL_ATTRIBUTES,
-            ],
+            attributes=attributes,
             paged_size=page_size,
         )
         # 丢弃多余的信息，如 type，raw_dn，raw_attributes 等
-        return [LDAPObject(dn=r["dn"], attrs=r["attributes"]) for r in results]
+        for r in results:
+            yield LDAPObject(dn=r["dn"], attrs=r["attributes"])
 
     @staticmethod
     def _gen_conn(server_config: ServerConfig) -> Connection:
@@ -15,7 +15,8 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
-from blue_krill.data_types.enum import EnumField, IntStructuredEnum
+from blue_krill.data_types.enum import EnumField, IntStructuredEnum, StrStructuredEnum
+from django.utils.translation import gettext_lazy as _
 
 # 服务 URL 正则
 SERVER_URL_REGEX = r"^ldaps?://[a-zA-Z0-9-/\.]+(:\d+)?$"
@@ -46,6 +47,14 @@ MAX_SEARCH_BASE_DN_COUNT = 10
 # 同步时只会取需要的操作属性 + 所有用户数据属性，避免浪费带宽 & 占用内存
 REQUIRED_OPERATIONAL_ATTRIBUTES = ["entryUUID"]
 
+# 增量同步对账扫描间隔（小时）
+MIN_DELTA_SYNC_RECONCILE_INTERVAL = 1
+MAX_DELTA_SYNC_RECONCILE_INTERVAL = 24 * 7
+DEFAULT_DELTA_SYNC_RECONCILE_INTERVAL = 24
+
+# 以 modifyTimestamp 作为高水位时，回溯的时间（秒），避免分页拉取期间有变更的条目被遗漏
+MODIFY_TIMESTAMP_HIGH_WATER_MARK_OVERLAP = 10 * 60
+
 
 class PageSizeEnum(IntStructuredEnum):
     """每页数量"""
@@ -56,3 +65,10 @@ class PageSizeEnum(IntStructuredEnum):
     SIZE_1000 = EnumField(1000, label="1000")
     SIZE_2000 = EnumField(2000, label="2000")
     SIZE_5000 = EnumField(5000, label="5000")
+
+
+class HighWaterMarkField(StrStructuredEnum):
+    """增量同步高水位字段"""
+
+    MODIFY_TIMESTAMP = EnumField("modifyTimestamp", label=_("修改时间（modifyTimestamp）"))
+    USN_CHANGED = EnumField("uSNChanged", label=_("更新序列号（uSNChanged，适用于 Active Directory）"))
@@ -18,6 +18,7 @@
 from bkuser.plugins.ldap.constants import PageSizeEnum
 from bkuser.plugins.ldap.models import (
     DataConfig,
+    DeltaSyncConfig,
     LDAPDataSourcePluginConfig,
     LeaderConfig,
     ServerConfig,
@@ -50,4 +51,5 @@ DEFAULT_PLUGIN_CONFIG = LDAPDataSourcePluginConfig(
         enabled=True,
         leader_field="manager",
     ),
+    delta_sync_config=DeltaSyncConfig(enabled=False),
 )
@@ -21,13 +21,17 @@ from django.utils.translation import gettext_lazy as _
 from pydantic import BaseModel, Field, model_validator
 
 from bkuser.plugins.ldap.constants import (
+    DEFAULT_DELTA_SYNC_RECONCILE_INTERVAL,
     DEFAULT_REQ_TIMEOUT,
     LDAP_BASE_DN_REGEX,
     LDAP_BIND_DN_REGEX,
+    MAX_DELTA_SYNC_RECONCILE_INTERVAL,
     MAX_REQ_TIMEOUT,
     MAX_SEARCH_BASE_DN_COUNT,
+    MIN_DELTA_SYNC_RECONCILE_INTERVAL,
     MIN_REQ_TIMEOUT,
     SERVER_URL_REGEX,
+    HighWaterMarkField,
     PageSizeEnum,
 )
 from bkuser.plugins.ldap.utils import has_parent_child_dn_relation
@@ -159,6 +163,21 @@ class LeaderConfig(BaseModel):
         return self
 
 
+class DeltaSyncConfig(BaseModel):
+    """增量同步配置（仅对定时同步生效）"""
+
+    # 是否启用增量同步
+    enabled: bool = False
+    # 高水位字段，OpenLDAP 等使用 modifyTimestamp，Active Directory 建议使用 uSNChanged
+    high_water_mark_field: HighWaterMarkField = HighWaterMarkField.MODIFY_TIMESTAMP
+    # 对账扫描间隔（小时），对账时仅扫描用户 entryUUID，用于发现已被删除的用户
+    reconcile_interval: int = Field(
+        ge=MIN_DELTA_SYNC_RECONCILE_INTERVAL,
+        le=MAX_DELTA_SYNC_RECONCILE_INTERVAL,
+        default=DEFAULT_DELTA_SYNC_RECONCILE_INTERVAL,
+    )
+
+
 class LDAPDataSourcePluginConfig(BasePluginConfig):
     """LDAP 数据源插件配置"""
 
@@ -174,6 +193,8 @@ class LDAPDataSourcePluginConfig(BasePluginConfig):
     user_group_config: UserGroupConfig
     # Leader 配置
     leader_config: LeaderConfig
+    # 增量同步配置
+    delta_sync_config: DeltaSyncConfig = DeltaSyncConfig()
 
     @model_validator(mode="after")
     def validate_attrs(self) -> "LDAPDataSourcePluginConfig":
@@ -199,3 +220,14 @@ class LDAPObject(BaseModel):
 
     dn: str
     attrs: Dict[str, Any]
+
+
+class LDAPDeltaSyncState(BaseModel):
+    """LDAP 增量同步状态"""
+
+    # 配置指纹，数据 / 用户组 / Leader / 增量同步等配置变更后，需要重新全量拉取
+    config_fingerprint: str
+    # 高水位（已拉取的用户中，高水位字段的最大值）
+    high_water_mark: str
+    # 上次对账扫描（或全量拉取）的时间戳
+    reconciled_at: int
@@ -17,59 +17,107 @@
 
 # ignore custom logger must use %s string format in this file
 # ruff: noqa: G004
+import hashlib
+import json
 import logging
+import time
 from collections import defaultdict
-from typing import DefaultDict, Dict, List
+from datetime import datetime, timedelta, timezone
+from typing import Any, DefaultDict, Dict, Iterator, List, Set
 
+import pydantic
 from django.utils.translation import gettext_lazy as _
 
-from bkuser.plugins.base import BaseDataSourcePlugin, PluginLogger
+from bkuser.plugins.base import (
+    BaseDataSourcePlugin,
+    DeltaSyncPluginMixin,
+    PluginLogger,
+    RequiredUserPropertiesPluginMixin,
+)
 from bkuser.plugins.constants import DataSourcePluginEnum
 from bkuser.plugins.ldap import utils
 from bkuser.plugins.ldap.client import LDAPClient
+from bkuser.plugins.ldap.constants import MODIFY_TIMESTAMP_HIGH_WATER_MARK_OVERLAP, HighWaterMarkField
 from bkuser.plugins.ldap.exceptions import DataNotFoundError
-from bkuser.plugins.ldap.models import LDAPDataSourcePluginConfig, LDAPObject
+from bkuser.plugins.ldap.models import LDAPDataSourcePluginConfig, LDAPDeltaSyncState, LDAPObject
 from bkuser.plugins.models import RawDataSourceDepartment, RawDataSourceUser, TestConnectionResult
 
 logger = logging.getLogger(__name__)
 
+# modifyTimestamp 高水位格式（GeneralizedTime，精确到秒）
+MODIFY_TIMESTAMP_FORMAT = "%Y%m%d%H%M%SZ"
 
-class LDAPDataSourcePlugin(BaseDataSourcePlugin):
+
+class LDAPDataSourcePlugin(DeltaSyncPluginMixin, RequiredUserPropertiesPluginMixin, BaseDataSourcePlugin):
     """LDAP 数据源插件"""
 
     id = DataSourcePluginEnum.LDAP
     config_class = LDAPDataSourcePluginConfig
 
-    def __init__(self, plugin_config: LDAPDataSourcePluginConfig, logger: PluginLogger):
+    def __init__(
+        self,
+        plugin_config: LDAPDataSourcePluginConfig,
+        logger: PluginLogger,
+        delta_sync_state: Dict[str, Any] | None = None,
+        required_user_properties: List[str] | None = None,
+    ):
         self.plugin_config = plugin_config
         self.logger = logger
+        # 各个拉取阶段（部门，用户组，用户）复用同一个已绑定的连接，用户拉取完成后关闭
+        self._ldap_client: LDAPClient | None = None
+        # 需要生成的用户属性（小写），为 None 表示生成所有属性
+        self.required_user_properties = self._get_required_user_properties(required_user_properties)
         # 缓存部门相关信息，解析用户时候需要使用，可避免重复拉取 & 计算
         self.dept_dn_code_map: Dict[str, str] = {}
         self.user_group_dns_map: DefaultDict[str, List[str]] = defaultdict(list)
+        # 增量同步相关：上次同步记录的状态，为 None 表示需要全量拉取
+        self.delta_sync_config = plugin_config.delta_sync_config
+        self.last_delta_sync_state = self._parse_delta_sync_state(delta_sync_state)
+        self.is_delta_fetch = self.last_delta_sync_state is not None
+        # 有变更的用户组中的成员 DN，用户组成员变化不会更新用户本身的高水位字段，需要额外拉取
+        self.changed_group_member_dns: Set[str] = set()
 
     def fetch_departments(self) -> List[RawDataSourceDepartment]:
         """获取部门信息"""
         cfg = self.plugin_config.data_config
-        with LDAPClient(self.plugin_config.server_config) as ldap_client:
-            depts = [
-                dept
+        ldap_client = self._get_ldap_client()
+        try:
+            # 流式拉取，逐条生成原始部门数据，不保留完整的 LDAP 对象
+            raw_depts = [
+                self._gen_raw_dept(d)
                 for dn in cfg.dept_search_base_dns
-                for dept in ldap_client.fetch_all_objects(dn, cfg.dept_object_class)
+                for d in ldap_client.iter_all_objects(dn, cfg.dept_object_class)
             ]
-            self.logger.info(f"fetch {len(depts)} departments from ldap server")
+            self.logger.info(f"fetch {len(raw_depts)} departments from ldap server")
 
-        raw_depts = [self._gen_raw_dept(d) for d in depts]
-
-        # 启用用户组的情况
-        if self.plugin_config.user_group_config.enabled:
-            self.logger.info("user group enabled...")
+            groups: List[LDAPObject] = []
+            # 启用用户组的情况
+            if self.plugin_config.user_group_config.enabled:
+                self.logger.info("user group enabled...")
 
-            with LDAPClient(self.plugin_config.server_config) as ldap_client:
                 base_dns = self.plugin_config.user_group_config.search_base_dns
                 obj_cls = self.plugin_config.user_group_config.object_class
-                groups = [g for dn in base_dns for g in ldap_client.fetch_all_objects(dn, obj_cls)]
-
+                groups = [
+                    g
+                    for dn in base_dns
+                    for g in ldap_client.iter_all_objects(
+                        dn, obj_cls, extra_attributes=self._get_high_water_mark_attributes()
+                    )
+                ]
                 self.logger.info(f"fetch {len(groups)} groups from ldap server")
+        except Exception:
+            self._close_ldap_client()
+            raise
+
+        if self.plugin_config.user_group_config.enabled:
+            if self.is_delta_fetch:
+                member_field = self.plugin_config.user_group_config.group_member_field
+                self.changed_group_member_dns = {
+                    member
+                    for g in groups
+                    if self._is_changed_since_last_sync(g)
+                    for member in g.attrs.get(member_field, [])
+                }
 
             # 提前存用户 - 用户组映射表，而不是后续依赖用户的 memberOf 属性
             # memberOf 属性需要特殊配置，ldap server 不一定会提供
@@ -106,24 +154,22 @@ class LDAPDataSourcePlugin(BaseDataSourcePlugin):
         if not self.dept_dn_code_map:
             self.logger.warning("dept cache not found, this will cause user not dept infos")
 
-        cfg = self.plugin_config.data_config
-        with LDAPClient(self.plugin_config.server_config) as ldap_client:
-            users = [
-                u for dn in cfg.user_search_base_dns for u in ldap_client.fetch_all_objects(dn, cfg.user_object_class)
-            ]
-            self.logger.info(f"fetch {len(users)} users from ldap server")
+        ldap_client = self._get_ldap_client()
+        try:
+            # 生成的原始用户数据，不含部门，leader 信息
+            raw_users = self._fetch_raw_users(ldap_client)
 
-        # 生成的原始用户数据，不含部门，leader 信息
-        raw_users = [self._gen_raw_user(u) for u in users]
+            # 检查是否有配置不当 / 数据源异常导致有 Code 重复的情况
+            self._validate_duplicate_codes(raw_users)
 
-        # 检查是否有配置不当 / 数据源异常导致有 Code 重复的情况
-        self._validate_duplicate_codes(raw_users)
+            # 给用户填充上部门信息（code）
+            self._set_raw_users_departments(raw_users)
 
-        # 给用户填充上部门信息（code）
-        self._set_raw_users_departments(raw_users)
-
-        # 给用户填充上 leader 信息（code）
-        self._set_raw_users_leaders(raw_users)
+            # 给用户填充上 leader 信息（code）
+            self._set_raw_users_leaders(raw_users, ldap_client)
+        finally:
+            # 用户是最后一个拉取阶段，完成后即可关闭连接
+            self._close_ldap_client()
 
         return raw_users
 
@@ -184,7 +230,7 @@ class LDAPDataSourcePlugin(BaseDataSourcePlugin):
                     else:
                         self.logger.warning(f"user `{user_dn}` group dn `{group_dn}` code not found, skip...")
 
-    def _set_raw_users_leaders(self, raw_users: List[RawDataSourceUser]):
+    def _set_raw_users_leaders(self, raw_users: List[RawDataSourceUser], ldap_client: LDAPClient):
         """为用户设置 leader 信息"""
         if not self.plugin_config.leader_config.enabled:
             self.logger.info("user leader not enabled, skip...")
@@ -195,6 +241,15 @@ class LDAPDataSourcePlugin(BaseDataSourcePlugin):
 
         # 用户 DN -> Code 映射表
         user_dn_code_map = {u.properties["dn"]: u.code for u in raw_users}
+        # 增量拉取时，Leader 可能不在本次拉取的用户中，需要根据 DN 从 LDAP 服务补充查询
+        if self.is_delta_fetch:
+            missing_leader_dns = {
+                leader_dn
+                for u in raw_users
+                for leader_dn in u.properties.get(leader_field, "").split(" ")
+                if leader_dn and leader_dn not in user_dn_code_map
+            }
+            user_dn_code_map.update(self._fetch_user_dn_code_map(ldap_client, missing_leader_dns))
 
         for u in raw_users:
             user_dn = u.properties["dn"]
@@ -204,6 +259,237 @@ class LDAPDataSourcePlugin(BaseDataSourcePlugin):
                 else:
                     self.logger.warning(f"user `{user_dn}` leader dn `{leader_dn}` code not found, skip...")
 
+    def _get_ldap_client(self) -> LDAPClient:
+        """获取已绑定的 LDAP 客户端，不存在则创建"""
+        if self._ldap_client is None:
+            self._ldap_client = LDAPClient(self.plugin_config.server_config).open()
+
+        return self._ldap_client
+
+    def _close_ldap_client(self):
+        if self._ldap_client is not None:
+            self._ldap_client.close()
+            self._ldap_client = None
+
+    def _fetch_raw_users(self, ldap_client: LDAPClient) -> List[RawDataSourceUser]:
+        """流式拉取用户，并逐条生成原始用户数据（不保留完整的 LDAP 对象，以降低内存占用）"""
+        cfg = self.plugin_config.data_config
+        if self.is_delta_fetch:
+            users = self._iter_changed_users(ldap_client)
+        else:
+            users = (
+                u
+                for dn in cfg.user_search_base_dns
+                for u in ldap_client.iter_all_objects(
+                    dn, cfg.user_object_class, extra_attributes=self._get_high_water_mark_attributes()
+                )
+            )
+
+        raw_users, high_water_marks = [], []
+        for u in users:
+            if mark := self._pop_high_water_mark(u):
+                high_water_marks.append(mark)
+
+            raw_users.append(self._gen_raw_user(u, self.required_user_properties))
+
+        self.logger.info(f"fetch {len(raw_users)} {'changed ' if self.is_delta_fetch else ''}users from ldap server")
+
+        if self.is_delta_fetch and self._need_reconcile():
+            self.alive_user_codes = {
+                code
+                for dn in cfg.user_search_base_dns
+                for code in ldap_client.fetch_all_object_codes(dn, cfg.user_object_class)
+            }
+            self.logger.info(f"reconcile finished, {len(self.alive_user_codes)} users in ldap server")
+
+        self.delta_sync_state = self._gen_delta_sync_state(high_water_marks)
+        return raw_users
+
+    def _iter_changed_users(self, ldap_client: LDAPClient) -> Iterator[LDAPObject]:
+        """获取自上次同步以来有变更的用户（高水位字段 >= 上次记录的高水位）"""
+        cfg = self.plugin_config.data_config
+        mark_attrs = self._get_high_water_mark_attributes()
+        search_filter = self._gen_high_water_mark_filter()
+
+        fetched_user_dns = set()
+        for dn in cfg.user_search_base_dns:
+            for u in ldap_client.iter_all_objects(dn, cfg.user_object_class, search_filter, mark_attrs):
+                fetched_user_dns.add(u.dn)
+                yield u
+
+        # 补充拉取有变更的用户组中的成员（不在用户 Base DN 中的成员会被忽略）
+        for member_dn in sorted(self.changed_group_member_dns - fetched_user_dns):
+            if not any(member_dn.endswith(dn) for dn in cfg.user_search_base_dns):
+                continue
+
+            if user := ldap_client.fetch_object_by_dn(member_dn, cfg.user_object_class, mark_attrs):
+                yield user
+
+    def _fetch_user_dn_code_map(self, ldap_client: LDAPClient, dns: Set[str]) -> Dict[str, str]:
+        """根据 DN 查询用户 Code（entryUUID）"""
+        if not dns:
+            return {}
+
+        cfg = self.plugin_config.data_config
+        dn_code_map = {}
+        for dn in sorted(dns):
+            if user := ldap_client.fetch_object_by_dn(dn, cfg.user_object_class):
+                dn_code_map[dn] = user.attrs["entryUUID"]
+
+        self.logger.info(f"query {len(dns)} leaders by dn from ldap server, {len(dn_code_map)} found")
+        return dn_code_map
+
+    def _get_required_user_properties(self, required_user_properties: List[str] | None) -> Set[str] | None:
+        """需要生成的用户属性：字段映射中使用到的属性 + Leader 字段"""
+        if required_user_properties is None:
+            return None
+
+        props = {p.lower() for p in required_user_properties}
+        if self.plugin_config.leader_config.enabled:
+            props.add(self.plugin_config.leader_config.leader_field.lower())
+
+        return props
+
+    def _parse_delta_sync_state(self, delta_sync_state: Dict[str, Any] | None) -> LDAPDeltaSyncState | None:
+        """解析上次同步记录的增量同步状态，状态无效则返回 None（即需要全量拉取）"""
+        if not (self.delta_sync_config.enabled and delta_sync_state):
+            return None
+
+        try:
+            state = LDAPDeltaSyncState(**delta_sync_state)
+        except pydantic.ValidationError:
+            self.logger.warning(f"invalid delta sync state {delta_sync_state}, fetch all users...")
+            return None
+
+        if state.config_fingerprint != self._gen_config_fingerprint():
+            self.logger.info("plugin config changed since last sync, fetch all users...")
+            return None
+
+        if self._normalize_high_water_mark(state.high_water_mark) is None:
+            self.logger.warning(f"invalid high water mark `{state.high_water_mark}`, fetch all users...")
+            return None
+
+        self.logger.info(f"delta sync enabled, fetch users changed since high water mark `{state.high_water_mark}`")
+        return state
+
+    def _gen_delta_sync_state(self, high_water_marks: List[str]) -> Dict[str, Any] | None:
+        """根据本次拉取的用户的高水位，生成新的增量同步状态"""
+        if not self.delta_sync_config.enabled:
+            return None
+
+        marks = list(high_water_marks)
+        last_state = self.last_delta_sync_state
+        if last_state:
+            marks.append(last_state.high_water_mark)
+
+        if not marks:
+            field = self.delta_sync_config.high_water_mark_field
+            self.logger.warning(f"field `{field}` not found in users, delta sync unavailable")
+            return None
+
+        # 全量拉取 / 进行了对账扫描，都需要刷新对账时间
+        reconciled_at = int(time.time())
+        if last_state and self.alive_user_codes is None:
+            reconciled_at = last_state.reconciled_at
+
+        return LDAPDeltaSyncState(
+            config_fingerprint=self._gen_config_fingerprint(),
+            high_water_mark=max(marks, key=self._high_water_mark_sort_key),
+            reconciled_at=reconciled_at,
+        ).model_dump()
+
+    def _pop_high_water_mark(self, obj: LDAPObject) -> str | None:
+        """取出对象的高水位字段值，该字段仅用于增量同步，不应作为用户属性"""
+        if not self.delta_sync_config.enabled:
+            return None
+
+        return self._normalize_high_water_mark(obj.attrs.pop(self.delta_sync_config.high_water_mark_field, None))
+
+    def _need_reconcile(self) -> bool:
+        """增量拉取时，是否需要进行对账扫描（用于发现已被删除的用户）"""
+        if not self.last_delta_sync_state:
+            return False
+
+        interval = self.delta_sync_config.reconcile_interval * 60 * 60
+        return time.time() - self.last_delta_sync_state.reconciled_at >= interval
+
+    def _is_changed_since_last_sync(self, obj: LDAPObject) -> bool:
+        """对象是否在上次同步后有变更，无法获取高水位字段的，也视为有变更"""
+        if not self.last_delta_sync_state:
+            return True
+
+        mark = self._normalize_high_water_mark(obj.attrs.get(self.delta_sync_config.high_water_mark_field))
+        if mark is None:
+            return True
+
+        return self._high_water_mark_sort_key(mark) >= self._high_water_mark_sort_key(
+            self.last_delta_sync_state.high_water_mark
+        )
+
+    def _gen_high_water_mark_filter(self) -> str:
+        """生成高水位过滤条件，如 (modifyTimestamp>=20240101000000Z)"""
+        assert self.last_delta_sync_state is not None
+
+        field = self.delta_sync_config.high_water_mark_field
+        mark = self.last_delta_sync_state.high_water_mark
+        # 分页拉取不是快照，拉取期间有变更的条目可能被遗漏，因此时间戳类型的高水位需要回溯一段时间
+        if field == HighWaterMarkField.MODIFY_TIMESTAMP:
+            mark_time = datetime.strptime(mark, MODIFY_TIMESTAMP_FORMAT)
+            mark = (mark_time - timedelta(seconds=MODIFY_TIMESTAMP_HIGH_WATER_MARK_OVERLAP)).strftime(
+                MODIFY_TIMESTAMP_FORMAT
+            )
+
+        return f"({field}>={mark})"
+
+    def _get_high_water_mark_attributes(self) -> List[str]:
+        """启用增量同步时，需要额外获取高水位字段（操作属性）"""
+        if not self.delta_sync_config.enabled:
+            return []
+
+        return [self.delta_sync_config.high_water_mark_field]
+
+    def _normalize_high_water_mark(self, value: Any) -> str | None:
+        """将高水位字段值统一为字符串格式，无法解析则返回 None"""
+        if isinstance(value, list):
+            value = value[0] if value else None
+
+        if value is None or value == "":
+            return None
+
+        try:
+            if self.delta_sync_config.high_water_mark_field == HighWaterMarkField.MODIFY_TIMESTAMP:
+                # ldap3 可能已经将时间字段解析成 datetime
+                if isinstance(value, datetime):
+                    return value.astimezone(timezone.utc).strftime(MODIFY_TIMESTAMP_FORMAT)
+
+                # 形如 20240101000000Z / 20240101000000.123Z，统一截断到秒
+                return datetime.strptime(str(value)[:14], "%Y%m%d%H%M%S").strftime(MODIFY_TIMESTAMP_FORMAT)
+
+            return str(int(value))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _high_water_mark_sort_key(mark: str) -> int:
+        """高水位比较：USN 本身是整数，时间戳（形如 20240101000000Z）去掉时区标识后也可以按整数比较"""
+        return int(mark.rstrip("Z"))
+
+    def _gen_config_fingerprint(self) -> str:
+        """生成配置指纹，影响拉取范围 / 高水位含义的配置变更后，需要重新全量拉取"""
+        cfg = self.plugin_config
+        content = json.dumps(
+            [
+                cfg.server_config.server_url,
+                cfg.server_config.base_dn,
+                cfg.data_config.model_dump(mode="json"),
+                cfg.user_group_config.model_dump(mode="json"),
+                cfg.leader_config.model_dump(mode="json"),
+                cfg.delta_sync_config.high_water_mark_field,
+            ],
+            sort_keys=True,
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
     @staticmethod
     def _gen_raw_dept(obj: LDAPObject) -> RawDataSourceDepartment:
         """生成部门信息"""
@@ -225,13 +511,17 @@ class LDAPDataSourcePlugin(BaseDataSourcePlugin):
         )
 
     @staticmethod
-    def _gen_raw_user(obj: LDAPObject) -> RawDataSourceUser:
+    def _gen_raw_user(obj: LDAPObject, required_properties: Set[str] | None = None) -> RawDataSourceUser:
         properties: Dict[str, str] = {"dn": obj.dn}
 
         for k, v in obj.attrs.items():
             if k in ["entryUUID", "objectClass"]:
                 continue
 
+            # 仅生成需要的属性，避免对大量用不到的属性（如证书，头像等）做字符串拼接
+            if required_properties is not None and k.lower() not in required_properties:
+                continue
+
             if isinstance(v, list):
                 properties[k] = " ".join(str(ele) for ele in v)
             else:
@@ -252,8 +542,8 @@ class LDAPDataSourcePlugin(BaseDataSourcePlugin):
 
     @staticmethod
     def _parse_dept_dn_from_user_dn(dn: str) -> str:
-        """从用户 DN 中获取部门信息（去除第一个层级的就是部门）"""
-        return utils.gen_dn(utils.parse_dn(dn)[1:])
+        """从用户 DN 中获取部门信息（去除第一个层级的就是部门，同一部门下的用户共享解析结果）"""
+        return utils.get_parent_dn(dn)
 
     @staticmethod
     def _validate_duplicate_codes(raw_objs: List[RawDataSourceDepartment] | List[RawDataSourceUser]) -> None:
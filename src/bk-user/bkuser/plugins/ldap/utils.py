@@ -15,6 +15,7 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+from functools import lru_cache
 from typing import List, NamedTuple
 
 import ldap3.utils.dn as dn_utils
@@ -66,6 +67,42 @@ def gen_dn(rdns: List[RDN]) -> str:
     return separator.join([f"{rdn.attr_type}={rdn.attr_value}" for rdn in rdns])
 
 
+def get_parent_dn(dn: str) -> str:
+    """获取父节点 DN（即去除第一个 RDN），效果等同于 gen_dn(parse_dn(dn)[1:])
+
+    同一个 OU 下的对象（如用户）拥有相同的父节点 DN 后缀，因此只需切分出第一个 RDN，
+    后缀部分的解析结果会被缓存，不需要对每个对象的完整 DN 都进行解析
+    """
+    idx = _find_first_rdn_separator(dn)
+    # 无法安全切分的情况（引号，多值 RDN 等），交给完整解析
+    if idx < 0:
+        return gen_dn(parse_dn(dn)[1:])
+
+    return _normalize_dn(dn[idx + 1 :])
+
+
+@lru_cache(maxsize=4096)
+def _normalize_dn(dn: str) -> str:
+    """解析并重新生成 DN（结果会被缓存）"""
+    return gen_dn(parse_dn(dn))
+
+
+def _find_first_rdn_separator(dn: str) -> int:
+    """找到第一个 RDN 后的分隔符（未转义的逗号）的位置，找不到或无法安全切分则返回 -1"""
+    escaped = False
+    for idx, char in enumerate(dn):
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == ",":
+            return idx
+        elif char in '";+':
+            return -1
+
+    return -1
+
+
 def has_parent_child_dn_relation(dns: List[str]) -> bool:
     """检查 DN 列表中，是否有某个 DN 是别人的后缀（祖先节点）"""
     for idx, dn1 in enumerate(dns):
@@ -18,7 +18,8 @@
 # ignore custom logger must use %s string format in this file
 # ruff: noqa: G004
 from collections import Counter
-from typing import List
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
 
 import phonenumbers
 from django.conf import settings
@@ -34,6 +35,7 @@ from bkuser.plugins.local.exceptions import (
     InvalidLeader,
     InvalidOrganization,
     InvalidUsername,
+    LocalDataSourcePluginError,
     RequiredFieldIsEmpty,
     SheetColumnsNotMatch,
     UserSheetNotExists,
@@ -88,6 +90,7 @@ class LocalDataSourceDataParser:
 
     def __init__(self, logger: PluginLogger, workbook: Workbook):
         self.logger = logger
+        # 注：支持以只读模式（read_only=True）加载的 Workbook，解析过程中只会按行遍历一次用户表
         self.workbook = workbook
         self.departments: List[RawDataSourceDepartment] = []
         self.users: List[RawDataSourceUser] = []
@@ -95,9 +98,9 @@ class LocalDataSourceDataParser:
 
     def parse(self):
         """预解析部门 & 用户数据"""
-        self._validate_and_prepare()
-        self._parse_departments()
-        self._parse_users()
+        self._validate_sheet()
+        self._validate_columns()
+        self._parse_rows()
         self.is_parsed = True
 
     def get_departments(self) -> List[RawDataSourceDepartment]:
@@ -106,12 +109,6 @@ class LocalDataSourceDataParser:
     def get_users(self) -> List[RawDataSourceUser]:
         return self.users
 
-    def _validate_and_prepare(self):
-        """检查表格格式，确保后续可正常解析"""
-        self._validate_sheet()
-        self._validate_columns()
-        self._validate_users()
-
     def _validate_sheet(self):
         # 确保用户表确实存在
         if self.user_sheet_name not in self.workbook.sheetnames:
@@ -120,8 +117,13 @@ class LocalDataSourceDataParser:
         self.sheet = self.workbook[self.user_sheet_name]
 
     def _validate_columns(self):
-        # 1. 检查表头是否正确
-        sheet_col_names = [cell.value for cell in self.sheet[self.col_name_row_idx]]
+        # 1. 检查表头是否正确（只读模式下不支持按行号取值，需通过 iter_rows 获取）
+        sheet_col_names = list(
+            next(
+                self.sheet.iter_rows(min_row=self.col_name_row_idx, max_row=self.col_name_row_idx, values_only=True),
+                (),
+            )
+        )
         # 前 N 个是内建字段，必须存在
         builtin_col_length = len(self.builtin_col_names)
         if sheet_col_names[:builtin_col_length] != self.builtin_col_names:
@@ -150,7 +152,9 @@ class LocalDataSourceDataParser:
         if duplicate_col_names := [n for n, cnt in Counter(sheet_col_names).items() if cnt > 1]:
             raise DuplicateColumnName(_("待导入文件中存在重复列名：{}").format(", ".join(duplicate_col_names)))
 
-    def _validate_users(self):
+    def _parse_rows(self):
+        """单次遍历用户表：逐行校验数据，将组织路径收集到部门前缀树中，同时生成用户数据"""
+        dept_trie = _DepartmentTrie()
         all_usernames = []
         for idx, cell_values in enumerate(
             self.sheet.iter_rows(min_row=self.user_data_min_row_idx, max_col=self.valid_col_length, values_only=True),
@@ -160,28 +164,16 @@ class LocalDataSourceDataParser:
                 self.logger.warning(f"empty row found at line {idx} in sheet, skip...")
                 continue
 
-            info = dict(zip(self.all_field_names, cell_values, strict=True))
-            # 1. 检查所有必填字段是否有值（注：自定义字段必填在后续的流程中检查）
-            for field_name in self.required_field_names:
-                if not info.get(field_name):
-                    raise RequiredFieldIsEmpty(_("待导入文件中必填字段 {} 存在空值").format(field_name))
-
-            username = info["username"]
-            # 2. 检查用户名是否合法
-            if not USERNAME_REGEX.fullmatch(username):
-                raise InvalidUsername(
-                    _(
-                        "用户名 {} 不符合命名规范: 由3-32位字母、数字、下划线(_)、点(.)、连接符(-)字符组成，以字母或数字开头及结尾",  # noqa: E501
-                    ).format(username)
-                )
+            try:
+                user = self._parse_user(cell_values, dept_trie)
+            except LocalDataSourcePluginError as e:
+                self.logger.error(f"invalid data found at line {idx} in sheet: {e}")  # noqa: TRY400
+                raise
 
-            # 3. 检查用户不能是自己的 leader
-            if (leaders := info.get("leaders")) and username in [ld.strip() for ld in leaders.split(",")]:
-                raise InvalidLeader(_("待导入文件中用户 {} 不能是自己的直接上级").format(username))
-
-            all_usernames.append(username.lower())
+            all_usernames.append(user.code.lower())
+            self.users.append(user)
 
-        # 4. 检查用户名是否有重复的（以大小写不敏感的方式检查）
+        # 检查用户名是否有重复的（以大小写不敏感的方式检查）
         if duplicate_usernames := [n for n, cnt in Counter(all_usernames).items() if cnt > 1]:
             raise DuplicateUsername(
                 _(
@@ -189,21 +181,37 @@ class LocalDataSourceDataParser:
                 ).format(", ".join(duplicate_usernames))
             )
 
-    def _parse_departments(self):
-        organizations = set()
-        for cell_values in self.sheet.iter_rows(
-            min_row=self.user_data_min_row_idx, max_col=self.valid_col_length, values_only=True
-        ):
-            if not any(cell_values):
-                continue
+        self.departments = dept_trie.gen_raw_departments()
 
-            username, user_orgs = cell_values[self.username_idx_in_row], cell_values[self.organization_idx_in_row]
-            if not user_orgs:
-                self.logger.info(f"username {username} not provide organization, skip...")
-                continue
+    def _parse_user(self, cell_values: Tuple[Any, ...], dept_trie: "_DepartmentTrie") -> RawDataSourceUser:
+        properties = dict(zip(self.all_field_names, cell_values, strict=True))
+        # 1. 检查所有必填字段是否有值（注：自定义字段必填在后续的流程中检查）
+        for field_name in self.required_field_names:
+            if not properties.get(field_name):
+                raise RequiredFieldIsEmpty(_("待导入文件中必填字段 {} 存在空值").format(field_name))
+
+        username = properties["username"]
+        # 2. 检查用户名是否合法
+        if not USERNAME_REGEX.fullmatch(username):
+            raise InvalidUsername(
+                _(
+                    "用户名 {} 不符合命名规范: 由3-32位字母、数字、下划线(_)、点(.)、连接符(-)字符组成，以字母或数字开头及结尾",  # noqa: E501
+                ).format(username)
+            )
+
+        leaders = []
+        if leader_names := properties.pop("leaders"):
+            # xlsx 中填写的是 leader 的 username，但在本地数据源中，username 就是 code
+            leaders = [ld.strip() for ld in leader_names.split(",") if ld.strip()]
+            # 3. 检查用户不能是自己的 leader
+            if username in leaders:
+                raise InvalidLeader(_("待导入文件中用户 {} 不能是自己的直接上级").format(username))
 
-            for org in user_orgs.split(","):
+        departments = []
+        if organizations := properties.pop("organizations"):
+            for org in organizations.split(","):
                 cur_org = org.strip()
+                # 4. 检查组织路径是否合法
                 if not all(cur_org.split("/")):
                     raise InvalidOrganization(
                         _(
@@ -211,60 +219,78 @@ class LocalDataSourceDataParser:
                         ).format(username, cur_org)
                     )
 
-                organizations.add(cur_org)
-                # 所有的父部门都要被添加进来
-                while "/" in cur_org:
-                    cur_org, __, __ = cur_org.rpartition("/")
-                    organizations.add(cur_org.strip())
-
-        # 组织路径：本数据源部门 Code 映射表
-        org_code_map = {org: gen_dept_code(org) for org in organizations}
-        for org in organizations:
-            parent_org, __, dept_name = org.rpartition("/")
-            self.departments.append(
+                departments.append(dept_trie.insert(cur_org))
+        else:
+            self.logger.info(f"username {username} not provide organization, skip...")
+
+        phone_number = str(properties.pop("phone_number"))
+        # 默认认为是不带国际代码的
+        phone, country_code = phone_number, settings.DEFAULT_PHONE_COUNTRY_CODE
+        if phone_number.startswith("+"):
+            ret = phonenumbers.parse(phone_number)
+            phone, country_code = str(ret.national_number), str(ret.country_code)
+
+        properties.update({"phone": phone, "phone_country_code": country_code})
+
+        # 格式化，将所有非 None 字段都转成 str 类型
+        properties = {k: str(v) for k, v in properties.items() if v is not None}
+        return RawDataSourceUser(
+            # 本地数据源用户，code 就是 username
+            code=properties["username"],
+            properties=properties,
+            leaders=leaders,
+            departments=departments,
+        )
+
+
+class _DepartmentTrie:
+    """组织路径前缀树，相同前缀的组织路径共享节点，部门 Code 只需要计算一次"""
+
+    def __init__(self):
+        # 根节点不对应任何部门，其子节点为各个顶级部门
+        self.root = _DepartmentTrieNode(code="", name="", parent=None)
+
+    def insert(self, org: str) -> str:
+        """插入组织路径（包括其所有的父部门），返回该组织对应的部门 Code"""
+        node, path = self.root, ""
+        for segment in org.split("/"):
+            path = f"{path}/{segment}" if path else segment
+            # 注：部门 Code 由去除首尾空白字符的原始路径计算，以保证与历史导入生成的 Code 一致，
+            # 因此 "A/X" 与 "A /Y" 共享父部门 A，而 "A / B" 与 "A/B" 则是不同的部门
+            code = gen_dept_code(path.strip())
+            child = node.children.get(code)
+            if child is None:
+                # 部门名称需要去除首尾空白字符
+                child = _DepartmentTrieNode(code=code, name=segment.strip(), parent=node.code or None)
+                node.children[code] = child
+
+            node = child
+
+        return node.code
+
+    def gen_raw_departments(self) -> List[RawDataSourceDepartment]:
+        """以深度优先的方式生成部门数据，父部门总是在子部门之前"""
+        departments = []
+        nodes = list(reversed(self.root.children.values()))
+        while nodes:
+            node = nodes.pop()
+            departments.append(
                 RawDataSourceDepartment(
-                    code=org_code_map[org],
-                    name=dept_name,
-                    parent=org_code_map.get(parent_org),
+                    code=node.code,
+                    name=node.name,
+                    parent=node.parent,
                     # 注：本地数据源导入，不支持设置部门的 extras 信息
                     extras={},
                 )
             )
+            nodes.extend(reversed(node.children.values()))
 
-    def _parse_users(self):
-        for cell_values in self.sheet.iter_rows(
-            min_row=self.user_data_min_row_idx, max_col=self.valid_col_length, values_only=True
-        ):
-            if not any(cell_values):
-                continue
+        return departments
 
-            properties = dict(zip(self.all_field_names, cell_values, strict=True))
-
-            departments, leaders = [], []
-            if organizations := properties.pop("organizations"):
-                departments = [gen_dept_code(org.strip()) for org in organizations.split(",") if org.strip()]
-
-            if leader_names := properties.pop("leaders"):
-                # xlsx 中填写的是 leader 的 username，但在本地数据源中，username 就是 code
-                leaders = [ld.strip() for ld in leader_names.split(",") if ld.strip()]
-
-            phone_number = str(properties.pop("phone_number"))
-            # 默认认为是不带国际代码的
-            phone, country_code = phone_number, settings.DEFAULT_PHONE_COUNTRY_CODE
-            if phone_number.startswith("+"):
-                ret = phonenumbers.parse(phone_number)
-                phone, country_code = str(ret.national_number), str(ret.country_code)
-
-            properties.update({"phone": phone, "phone_country_code": country_code})
-
-            # 格式化，将所有非 None 字段都转成 str 类型
-            properties = {k: str(v) for k, v in properties.items() if v is not None}
-            self.users.append(
-                RawDataSourceUser(
-                    # 本地数据源用户，code 就是 username
-                    code=properties["username"],
-                    properties=properties,
-                    leaders=leaders,
-                    departments=departments,
-                )
-            )
+
+@dataclass
+class _DepartmentTrieNode:
+    code: str
+    name: str
+    parent: str | None
+    children: Dict[str, "_DepartmentTrieNode"] = field(default_factory=dict)
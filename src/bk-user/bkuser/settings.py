@@ -227,6 +227,8 @@ BK_LOGIN_PLAIN_WINDOW_HEIGHT = env.int("BK_LOGIN_PLAIN_WINDOW_HEIGHT", default=5
 BK_LOGIN_CALLBACK_URL_PARAM_KEY = env.str("BK_LOGIN_CALLBACK_URL_PARAM_KEY", default="c_url")
 # 登录API URL
 BK_LOGIN_API_URL = env.str("BK_LOGIN_API_URL", default="http://bk-login/login/")
+# 租户用户信息变更后，是否通知登录服务使其缓存的用户信息失效（未启用则等待登录服务的缓存自然过期）
+ENABLE_BK_LOGIN_TENANT_USER_CACHE_INVALIDATION = env.bool("ENABLE_BK_LOGIN_TENANT_USER_CACHE_INVALIDATION", False)
 
 # bk esb api url
 BK_COMPONENT_API_URL = env.str("BK_COMPONENT_API_URL")
@@ -312,6 +314,9 @@ REDIS_SENTINEL_PASSWORD = env.str("REDIS_SENTINEL_PASSWORD", "")
 # REDIS_SENTINEL_ADDR value: ["host1:port1", "host2:port2"]
 REDIS_SENTINEL_ADDR = env.list("REDIS_SENTINEL_ADDR", default=[])
 
+# 开放 API 认证信息（JWT 校验结果，Django User）进程内缓存的 key 最多数量
+OPEN_API_AUTH_CACHE_MAX_ENTRIES = env.int("OPEN_API_AUTH_CACHE_MAX_ENTRIES", 1000)
+
 CACHES: Dict[str, Any] = {
     # 默认缓存是本地内存，使用最近最少使用（LRU）的淘汰策略，使用 pickle 序列化数据
     "default": {
@@ -330,6 +335,18 @@ CACHES: Dict[str, Any] = {
             "CULL_FREQUENCY": 3,
         },
     },
+    # 开放 API 认证信息的本地内存缓存，网关签发的 JWT 基本每个请求都不同，淘汰会很频繁，
+    # 因此需要与默认缓存隔离，避免其他场景的缓存被淘汰
+    "open_api_auth": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "open_api_auth",
+        "TIMEOUT": 60 * 5,
+        "KEY_PREFIX": "bkuser",
+        "OPTIONS": {
+            "MAX_ENTRIES": OPEN_API_AUTH_CACHE_MAX_ENTRIES,
+            "CULL_FREQUENCY": 3,
+        },
+    },
     "redis": {
         "BACKEND": "django_redis.cache.RedisCache",
         # 若需要支持主从配置，则 LOCATION 为 List[master_url, slave_url]
@@ -670,9 +687,43 @@ EXPORT_ORG_TEMPLATE = MEDIA_ROOT / "excel/export_org_tmpl.xlsx"
 DATA_SOURCE_SYNC_DEFAULT_TIMEOUT = env.int("DATA_SOURCE_SYNC_DEFAULT_TIMEOUT", 60 * 60)
 # 租户同步默认超时时间（秒）
 TENANT_SYNC_DEFAULT_TIMEOUT = env.int("TENANT_SYNC_DEFAULT_TIMEOUT", 15 * 60)
+# 数据源同步完成后，同步到各租户（所属租户 & 协同租户）的任务最大并发数（单个数据源），超过的部分会排队执行
+TENANT_SYNC_FAN_OUT_CONCURRENCY = env.int("TENANT_SYNC_FAN_OUT_CONCURRENCY", 10)
+# 同步到各租户的任务所使用的队列，为空则使用默认队列，可指定独立的队列以避免占用其他任务的 Worker
+TENANT_SYNC_FAN_OUT_QUEUE = env.str("TENANT_SYNC_FAN_OUT_QUEUE", "")
+# 同步到各租户的任务汇总超时时间（秒），超时后仍未完成的租户同步任务在汇总时视为失败
+TENANT_SYNC_FAN_OUT_TIMEOUT = env.int("TENANT_SYNC_FAN_OUT_TIMEOUT", 2 * 60 * 60)
 
 # 限制组织架构页面用户/部门搜索 API 返回的最大条数
 # 由于需要计算组织路径导致性能不佳，建议不要太高，而是让用户细化搜索条件
 ORGANIZATION_SEARCH_API_LIMIT = env.int("ORGANIZATION_SEARCH_API_LIMIT", 20)
 # 限制批量操作数量上限，避免性能问题 / 误操作（目前不支持跨页全选，最大单页 100 条数据）
 ORGANIZATION_BATCH_OPERATION_API_LIMIT = env.int("ORGANIZATION_BATCH_OPERATION_API_LIMIT", 100)
+
+# 数据源部门路径索引（用于计算部门完整路径），在数据源同步 / 部门变更后失效
+# 单个进程内最多缓存的部门路径索引数量（LRU 淘汰）
+DEPARTMENT_PATH_INDEX_LOCAL_CACHE_SIZE = env.int("DEPARTMENT_PATH_INDEX_LOCAL_CACHE_SIZE", 32)
+# 部门路径索引在 Redis 中的过期时间（秒），索引会随版本号变更而失效，过期时间仅用于兜底清理
+DEPARTMENT_PATH_INDEX_CACHE_TIMEOUT = env.int("DEPARTMENT_PATH_INDEX_CACHE_TIMEOUT", 60 * 60 * 24)
+
+# 租户元数据（协同字段映射，数据源域名映射等）缓存，在协同策略 / 租户 / 数据源等变更后失效
+# 进程内缓存时间（秒），其他进程中的变更最多会延迟该时长才生效
+TENANT_METADATA_LOCAL_CACHE_TIMEOUT = env.int("TENANT_METADATA_LOCAL_CACHE_TIMEOUT", 30)
+# 在 Redis 中的缓存时间（秒），缓存会随版本号变更而失效，过期时间仅用于兜底清理
+TENANT_METADATA_CACHE_TIMEOUT = env.int("TENANT_METADATA_CACHE_TIMEOUT", 60 * 60 * 24)
+
+# 兼容 v2 OpenAPI 全量（no_page）关系数据缓存，在关系数据同步 / 编辑后失效
+# 缓存刷新间隔（秒），到期后由单个请求负责重建，其他请求继续使用旧数据
+OPEN_V2_RELATION_CACHE_REFRESH_INTERVAL = env.int("OPEN_V2_RELATION_CACHE_REFRESH_INTERVAL", 60 * 10)
+# 在 Redis 中的缓存时间（秒），需大于刷新间隔，缓存会随版本号变更而失效，过期时间仅用于兜底清理
+OPEN_V2_RELATION_CACHE_TIMEOUT = env.int("OPEN_V2_RELATION_CACHE_TIMEOUT", 60 * 60)
+# 缓存数据分块存储时，每块的数据条数
+OPEN_V2_RELATION_CACHE_CHUNK_SIZE = env.int("OPEN_V2_RELATION_CACHE_CHUNK_SIZE", 5000)
+
+# 用户在租户下的角色（鉴权使用）缓存时间（秒），租户管理员变更后会主动失效
+PERMISSION_USER_ROLE_CACHE_TIMEOUT = env.int("PERMISSION_USER_ROLE_CACHE_TIMEOUT", 60)
+
+# 本地数据源批量初始化用户密码时，用于计算密码哈希的线程数（不超过 CPU 核数，小于等于 1 则在当前线程内计算）
+# 注：仅当哈希计算会释放 GIL 时多线程才能加速，若使用 PBKDF2-SM3 且 OpenSSL 不支持 SM3（回退到 tongsuopy 实现），
+# 计算过程中会一直持有 GIL，此时总是在当前线程内计算
+LOCAL_DATA_SOURCE_PASSWORD_HASH_WORKERS = env.int("LOCAL_DATA_SOURCE_PASSWORD_HASH_WORKERS", 4)
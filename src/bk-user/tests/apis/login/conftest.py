@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import base64
+
+import pytest
+from bkuser.apps.data_source.constants import DataSourceTypeEnum
+from bkuser.apps.data_source.models import DataSource
+from bkuser.apps.idp.models import Idp
+from bkuser.idp_plugins.constants import BuiltinIdpPluginEnum
+from bkuser.idp_plugins.local.plugin import LocalIdpPluginConfig
+from bkuser.plugins.constants import DataSourcePluginEnum
+from django.conf import settings
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def login_api_client() -> APIClient:
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=_gen_basic_auth(settings.BK_APP_CODE, settings.BK_APP_SECRET))
+    return client
+
+
+@pytest.fixture
+def local_idp(default_tenant) -> Idp:
+    """默认租户内置管理数据源的账密认证源"""
+    data_source = DataSource.objects.get(
+        owner_tenant_id=default_tenant.id,
+        plugin_id=DataSourcePluginEnum.LOCAL,
+        type=DataSourceTypeEnum.BUILTIN_MANAGEMENT,
+    )
+    idp, _ = Idp.objects.get_or_create(
+        data_source_id=data_source.id,
+        owner_tenant_id=default_tenant.id,
+        plugin_id=BuiltinIdpPluginEnum.LOCAL,
+        defaults={"name": "local", "plugin_config": LocalIdpPluginConfig(data_source_ids=[data_source.id])},
+    )
+    return idp
+
+
+def _gen_basic_auth(username: str, password: str) -> str:
+    return "Basic " + base64.b64encode(f"{username}:{password}".encode()).decode()
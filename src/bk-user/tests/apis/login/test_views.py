@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import pytest
+from bkuser.apps.data_source.constants import DataSourceTypeEnum
+from bkuser.apps.idp.constants import IdpStatus
+from rest_framework import status
+
+pytestmark = pytest.mark.django_db
+
+
+class TestLoginMetadataETag:
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "/api/v3/login/global-settings/",
+            "/api/v3/login/tenants/",
+            "/api/v3/login/tenants/default/idp-owner-tenants/default/idps/",
+        ],
+    )
+    def test_not_modified(self, login_api_client, local_idp, url):
+        resp = login_api_client.get(url)
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["ETag"]
+
+        resp = login_api_client.get(url, HTTP_IF_NONE_MATCH=resp["ETag"])
+        assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not resp.content
+
+    def test_modified_after_tenant_changed(self, login_api_client, default_tenant):
+        url = "/api/v3/login/tenants/"
+        etag = login_api_client.get(url)["ETag"]
+
+        default_tenant.name = "new_name"
+        default_tenant.save()
+
+        resp = login_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["ETag"] != etag
+        assert resp.data[0]["name"] == "new_name"
+
+    def test_modified_after_idp_changed(self, login_api_client, local_idp):
+        url = f"/api/v3/login/idps/{local_idp.id}/"
+        etag = login_api_client.get(url)["ETag"]
+
+        local_idp.status = IdpStatus.DISABLED
+        local_idp.save()
+
+        resp = login_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data["status"] == IdpStatus.DISABLED
+
+    def test_different_url_with_different_etag(self, login_api_client, default_tenant):
+        etag = login_api_client.get("/api/v3/login/tenants/")["ETag"]
+        resp = login_api_client.get(f"/api/v3/login/tenants/?tenant_ids={default_tenant.id}", HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == status.HTTP_200_OK
+
+
+class TestIdpList:
+    def test_standard(self, login_api_client, local_idp):
+        resp = login_api_client.get("/api/v3/login/tenants/default/idp-owner-tenants/default/idps/")
+        assert resp.status_code == status.HTTP_200_OK
+        assert [(idp["id"], idp["data_source_type"]) for idp in resp.data] == [
+            (local_idp.id, DataSourceTypeEnum.BUILTIN_MANAGEMENT)
+        ]
+
+    def test_without_collaboration(self, login_api_client, local_idp, random_tenant):
+        resp = login_api_client.get(f"/api/v3/login/tenants/{random_tenant.id}/idp-owner-tenants/default/idps/")
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data == []
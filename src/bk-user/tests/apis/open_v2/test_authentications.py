@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+import time
+from unittest import mock
+
+import jwt
+import pytest
+from bkuser.apis.open_v2.authentications import ESBAuthentication
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.core.cache import caches
+from prometheus_client import REGISTRY
+from rest_framework.test import APIRequestFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(scope="module")
+def rsa_key_pair():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_key = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM, format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_key, public_key.decode()
+
+
+@pytest.fixture(autouse=True)
+def _mock_jwt_public_key(rsa_key_pair):
+    caches["default"].clear()
+    caches["open_api_auth"].clear()
+    with mock.patch.object(ESBAuthentication, "_get_jwt_public_key", return_value=rsa_key_pair[1]):
+        yield
+
+
+def _make_request(private_key, username: str = "admin", exp: int | None = None):
+    payload = {
+        "app": {"bk_app_code": "bk_paas", "verified": True},
+        "user": {"bk_username": username, "verified": True},
+        "exp": exp or int(time.time()) + 60,
+    }
+    token = jwt.encode(payload, private_key, algorithm="RS512")
+    return APIRequestFactory().get("/", HTTP_X_BKAPI_JWT=token, HTTP_X_BKAPI_FROM="esb")
+
+
+def _get_cache_count(cache: str, result: str) -> float:
+    return REGISTRY.get_sample_value("bkuser_open_api_auth_cache_total", {"cache": cache, "result": result}) or 0
+
+
+class TestESBAuthentication:
+    def test_authenticate(self, rsa_key_pair, django_assert_num_queries):
+        request = _make_request(rsa_key_pair[0])
+
+        user, _ = ESBAuthentication().authenticate(request)
+        assert user.username == "admin"
+        assert request.bk_app_code == "bk_paas"
+
+        jwt_hit_cnt, user_hit_cnt = _get_cache_count("jwt", "hit"), _get_cache_count("user", "hit")
+        # 命中缓存后，不再需要校验 JWT 以及查询 DB
+        with mock.patch("jwt.decode") as decode, django_assert_num_queries(0):
+            cached_user, _ = ESBAuthentication().authenticate(request)
+
+        decode.assert_not_called()
+        assert cached_user.username == "admin"
+        assert _get_cache_count("jwt", "hit") == jwt_hit_cnt + 1
+        assert _get_cache_count("user", "hit") == user_hit_cnt + 1
+
+    def test_authenticate_with_dedicated_cache(self, rsa_key_pair):
+        ESBAuthentication().authenticate(_make_request(rsa_key_pair[0]))
+
+        # JWT 校验结果 & Django User 仅缓存在独立的内存缓存中，不会占用默认缓存的容量
+        assert len(caches["open_api_auth"]._cache) == 2
+        assert not caches["default"]._cache
+
+    def test_authenticate_invalid_jwt(self, rsa_key_pair):
+        request = _make_request(rsa_key_pair[0])
+        request.META["HTTP_X_BKAPI_JWT"] += "invalid"
+
+        assert ESBAuthentication().authenticate(request) is None
+        # 校验失败的结果不会被缓存
+        assert ESBAuthentication().authenticate(request) is None
+
+    def test_not_cache_expired_jwt(self, rsa_key_pair):
+        auth = ESBAuthentication()
+        assert auth._get_jwt_cache_timeout({"exp": int(time.time()) + 10}) <= 10  # noqa: PLR2004
+        assert auth._get_jwt_cache_timeout({"exp": int(time.time()) + 3600}) == auth.jwt_cache_max_timeout
+        assert auth._get_jwt_cache_timeout({"exp": int(time.time()) - 10}) < 0
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import time
+from unittest import mock
+
+import pytest
+from bkuser.apis.open_v2.caches import RelationListCache
+from bkuser.apps.data_source.caches import DataSourceRelationGeneration
+from bkuser.utils.uuid import generate_uuid
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def relations():
+    return [{"id": idx, "from_profile_id": idx, "to_profile_id": idx + 1} for idx in range(10)]
+
+
+@pytest.fixture
+def cache_name() -> str:
+    # 单元测试中数据源 ID 可能被复用，使用随机的名称避免命中其他用例的缓存
+    return generate_uuid()
+
+
+class TestRelationListCache:
+    def test_get_or_build(self, cache_name, relations):
+        build = mock.Mock(return_value=relations)
+
+        assert RelationListCache(cache_name, "default", [1, 2]).get_or_build(build) == relations
+        assert RelationListCache(cache_name, "default", [2, 1]).get_or_build(build) == relations
+        # 缓存命中，只构建一次
+        assert build.call_count == 1
+
+        # 不同租户 / 数据源的缓存相互独立
+        RelationListCache(cache_name, "another", [1, 2]).get_or_build(build)
+        RelationListCache(cache_name, "default", [1]).get_or_build(build)
+        assert build.call_count == 3  # noqa: PLR2004
+
+    def test_empty_relations(self, cache_name):
+        build = mock.Mock(return_value=[])
+
+        assert RelationListCache(cache_name, "default", [1]).get_or_build(build) == []
+        assert RelationListCache(cache_name, "default", [1]).get_or_build(build) == []
+        assert build.call_count == 1
+
+    def test_chunked(self, cache_name, relations, settings):
+        settings.OPEN_V2_RELATION_CACHE_CHUNK_SIZE = 3
+
+        RelationListCache(cache_name, "default", [1]).get_or_build(lambda: relations)
+        assert RelationListCache(cache_name, "default", [1]).get_or_build(mock.Mock()) == relations
+
+    def test_invalidate_by_generation(self, cache_name, relations):
+        RelationListCache(cache_name, "default", [1, 2]).get_or_build(lambda: relations)
+
+        DataSourceRelationGeneration.bump(2)
+        # 任意一个数据源的关系数据版本号变化，缓存都会失效
+        assert RelationListCache(cache_name, "default", [1, 2]).get_or_build(lambda: relations[:1]) == relations[:1]
+
+    def test_refresh(self, cache_name, relations, settings):
+        settings.OPEN_V2_RELATION_CACHE_REFRESH_INTERVAL = 0
+        RelationListCache(cache_name, "default", [1]).get_or_build(lambda: relations)
+        time.sleep(0.01)
+
+        # 到达刷新时间后，获取到锁的请求负责刷新缓存
+        assert RelationListCache(cache_name, "default", [1]).get_or_build(lambda: relations[:1]) == relations[:1]
+
+    def test_refresh_by_others(self, cache_name, relations, settings):
+        settings.OPEN_V2_RELATION_CACHE_REFRESH_INTERVAL = 0
+        cache = RelationListCache(cache_name, "default", [1])
+        cache.get_or_build(lambda: relations)
+        time.sleep(0.01)
+
+        build = mock.Mock(return_value=relations[:1])
+        with mock.patch("redis.lock.Lock.acquire", return_value=False):
+            # 其他请求正在刷新（未获取到锁），继续使用旧数据
+            assert cache.get_or_build(build) == relations
+            assert build.call_count == 0
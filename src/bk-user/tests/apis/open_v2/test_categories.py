@@ -30,3 +30,21 @@ class TestListCategories:
         assert {c["id"] for c in resp.data["results"]} == {local_data_source.id, collaboration_data_source.id}
         assert {c["display_name"] for c in resp.data["results"]} == {default_tenant.name, random_tenant.name}
         assert {c["default"] for c in resp.data["results"]} == {True, False}
+
+    def test_cursor(self, api_client, local_data_source, collaboration_data_source):
+        url = reverse("open_v2.list_categories")
+        first_id, second_id = sorted([local_data_source.id, collaboration_data_source.id])
+        resp = api_client.get(url, data={"cursor": "", "page_size": 1})
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert [c["id"] for c in resp.data["results"]] == [first_id]
+        assert resp.data["next_cursor"]
+
+        next_resp = api_client.get(url, data={"cursor": resp.data["next_cursor"], "page_size": 1})
+        assert next_resp.status_code == status.HTTP_200_OK
+        assert [c["id"] for c in next_resp.data["results"]] == [second_id]
+        assert next_resp.data["next_cursor"] is None
+
+    def test_invalid_cursor(self, api_client, local_data_source, collaboration_data_source):
+        resp = api_client.get(reverse("open_v2.list_categories"), data={"cursor": "fake_cursor"})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
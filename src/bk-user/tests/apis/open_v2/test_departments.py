@@ -14,6 +14,8 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+import json
+
 import pytest
 from bkuser.apps.tenant.models import TenantDepartment, TenantUser
 from django.urls import reverse
@@ -88,6 +90,17 @@ class TestListDepartments:
         assert resp.status_code == status.HTTP_200_OK
         assert len(resp.data) == 9  # noqa: PLR2004
 
+    def test_no_page_with_ndjson(self, api_client, local_data_source):
+        url = reverse("open_v2.list_departments")
+        resp = api_client.get(url, data={"no_page": True, "with_ancestors": True, "format": "ndjson"})
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["Content-Type"] == "application/x-ndjson"
+
+        depts = [json.loads(line) for line in b"".join(resp.streaming_content).decode().splitlines()]
+        # 流式返回的数据与一次性返回的一致
+        json_resp = api_client.get(url, data={"no_page": True, "with_ancestors": True})
+        assert sorted(depts, key=lambda d: d["id"]) == sorted(json_resp.data, key=lambda d: d["id"])
+
 
 class TestRetrieveDepartment:
     def test_retrieve(self, api_client, default_tenant, local_data_source):
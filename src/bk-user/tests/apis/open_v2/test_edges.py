@@ -14,8 +14,11 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+import json
+
 import pytest
-from bkuser.apps.data_source.models import DataSourceUser
+from bkuser.apps.data_source.caches import DataSourceRelationGeneration
+from bkuser.apps.data_source.models import DataSourceDepartmentUserRelation, DataSourceUser
 from bkuser.apps.tenant.models import TenantDepartment
 from django.urls import reverse
 from rest_framework import status
@@ -38,6 +41,21 @@ class TestListDeptProfileRelations:
         assert TenantDepartment.objects.filter(id__in=dept_ids).count() == len(dept_ids)
         assert DataSourceUser.objects.filter(id__in=profile_ids).count() == len(profile_ids)
 
+    def test_cursor(self, api_client, default_tenant, local_data_source):
+        url = reverse("open_v2.list_department_profile_relations")
+        resp = api_client.get(url, data={"cursor": "", "page_size": 10})
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(resp.data["results"]) == 10  # noqa: PLR2004
+        assert resp.data["next_cursor"]
+
+        next_resp = api_client.get(url, data={"cursor": resp.data["next_cursor"], "page_size": 10})
+        assert next_resp.status_code == status.HTTP_200_OK
+        assert len(next_resp.data["results"]) == 3  # noqa: PLR2004
+        assert next_resp.data["next_cursor"] is None
+        # 游标分页的两页数据无重叠
+        assert not {d["id"] for d in resp.data["results"]} & {d["id"] for d in next_resp.data["results"]}
+
     def test_no_page(self, api_client, default_tenant, local_data_source, collaboration_data_source):
         resp = api_client.get(
             reverse("open_v2.list_department_profile_relations"),
@@ -48,6 +66,30 @@ class TestListDeptProfileRelations:
         # 不分页模式下，没有 count, results 结构
         assert len(resp.data) == 26  # noqa: PLR2004
 
+    def test_no_page_with_ndjson(self, api_client, default_tenant, local_data_source, collaboration_data_source):
+        resp = api_client.get(
+            reverse("open_v2.list_department_profile_relations"),
+            data={"no_page": True},
+            HTTP_ACCEPT="application/x-ndjson",
+        )
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["Content-Type"] == "application/x-ndjson"
+        relations = [json.loads(line) for line in b"".join(resp.streaming_content).decode().splitlines()]
+        assert len(relations) == 26  # noqa: PLR2004
+        assert set(relations[0].keys()) == {"id", "department_id", "profile_id"}
+
+    def test_no_page_invalidated(self, api_client, default_tenant, local_data_source):
+        url = reverse("open_v2.list_department_profile_relations")
+        assert len(api_client.get(url, data={"no_page": True}).data) == 13  # noqa: PLR2004
+
+        DataSourceDepartmentUserRelation.objects.filter(data_source=local_data_source).first().delete()
+        # 版本号未更新前，使用的还是缓存数据
+        assert len(api_client.get(url, data={"no_page": True}).data) == 13  # noqa: PLR2004
+
+        DataSourceRelationGeneration.bump(local_data_source.id)
+        assert len(api_client.get(url, data={"no_page": True}).data) == 12  # noqa: PLR2004
+
 
 class TestListProfileLeaderRelations:
     def test_standard(self, api_client, default_tenant, local_data_source):
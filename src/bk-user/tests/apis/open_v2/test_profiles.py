@@ -15,6 +15,8 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import json
+
 import pytest
 from bkuser.apps.tenant.models import TenantDepartment
 from django.urls import reverse
@@ -30,6 +32,43 @@ class TestListProfiles:
         assert resp.data["count"] == 22
         assert len(resp.data["results"]) == 10
 
+    def test_no_page_with_ndjson(self, api_client, local_data_source, collaboration_data_source):
+        resp = api_client.get(reverse("open_v2.list_profiles"), data={"no_page": True, "format": "ndjson"})
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["Content-Type"] == "application/x-ndjson"
+
+        users = [json.loads(line) for line in b"".join(resp.streaming_content).decode().splitlines()]
+        assert len(users) == 22
+        assert len({u["username"] for u in users}) == 22
+        assert {"username", "leader", "departments"} <= users[0].keys()
+
+    def test_no_page_with_ndjson_invalid_params(self, api_client, local_data_source):
+        resp = api_client.get(
+            reverse("open_v2.list_profiles"),
+            data={"no_page": True, "lookup_field": "invalid"},
+            HTTP_ACCEPT="application/x-ndjson",
+        )
+        # 参数错误等异常情况，以单行 JSON 的方式返回
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert json.loads(resp.content)["result"] is False
+
+    def test_list_with_cursor(self, api_client, local_data_source, collaboration_data_source):
+        usernames, cursor, page_count = [], "", 0
+        while cursor is not None:
+            resp = api_client.get(reverse("open_v2.list_profiles"), data={"cursor": cursor, "page_size": 10})
+            assert resp.status_code == status.HTTP_200_OK
+            usernames.extend(u["username"] for u in resp.data["results"])
+            cursor, page_count = resp.data["next_cursor"], page_count + 1
+
+        # 游标分页按主键排序，全量拉取的结果与页码分页一致且无重复
+        assert page_count == 3
+        assert len(usernames) == len(set(usernames)) == 22
+        assert usernames == sorted(usernames)
+
+    def test_list_with_invalid_cursor(self, api_client, local_data_source, collaboration_data_source):
+        resp = api_client.get(reverse("open_v2.list_profiles"), data={"cursor": "fake_cursor"})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
     def test_list_with_exist_departments(self, api_client, local_data_source, collaboration_data_source):
         department_ids = TenantDepartment.objects.values_list("id", flat=True)
         resp = api_client.get(
@@ -15,6 +15,7 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import io
 from urllib.parse import urlencode
 
 import pytest
@@ -30,6 +31,7 @@ from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test.utils import override_settings
 from django.urls import reverse
+from openpyxl.reader.excel import load_workbook
 from rest_framework import status
 
 from tests.test_utils.tenant import sync_users_depts_to_tenant
@@ -418,6 +420,19 @@ class TestDataSourceRelatedResourceStatsApi:
         }
 
 
+class TestDataSourceExportApi:
+    def test_export(self, api_client, full_local_data_source):
+        resp = api_client.get(reverse("data_source.export_data", kwargs={"id": full_local_data_source.id}))
+        assert resp.status_code == status.HTTP_200_OK
+        # 导出文件以流式响应返回
+        assert resp.streaming
+        assert resp["Content-Disposition"].endswith("_org_data.xlsx")
+
+        sheet = load_workbook(io.BytesIO(b"".join(resp.streaming_content)))["users"]
+        # 前两行是表头，之后每行一个用户
+        assert sheet.max_row == 2 + DataSourceUser.objects.filter(data_source=full_local_data_source).count()
+
+
 class TestDataSourceSyncRecordApi:
     def test_list(self, api_client, data_source, data_source_sync_tasks):
         resp = api_client.get(reverse("data_source.sync_record.list", kwargs={"id": data_source.id}))
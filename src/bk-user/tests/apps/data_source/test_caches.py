@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+from io import StringIO
+
+import pytest
+from bkuser.apps.data_source.caches import DataSourceDepartmentPathIndex, DataSourceRelationGeneration
+from bkuser.apps.data_source.models import DataSource, DataSourceDepartment
+from django.core.management import call_command
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def data_source(full_local_data_source) -> DataSource:
+    # 单元测试中数据源 ID 可能被复用，因此先刷新版本号，避免命中其他用例的缓存
+    DataSourceDepartmentPathIndex.bump_generation(full_local_data_source.id)
+    return full_local_data_source
+
+
+class TestDataSourceDepartmentPathIndex:
+    def test_get_full_name(self, data_source):
+        index = DataSourceDepartmentPathIndex.get(data_source.id)
+
+        dept_id_map = dict(DataSourceDepartment.objects.filter(data_source=data_source).values_list("code", "id"))
+        assert index.get_full_name(dept_id_map["company"]) == "公司"
+        assert index.get_full_name(dept_id_map["center_ab"]) == "公司/部门A/中心AB"
+        assert index.get_full_name(dept_id_map["group_baa"]) == "公司/部门B/中心BA/小组BAA"
+        # 不存在的部门
+        assert index.get_full_name(-1) == ""
+
+    def test_get_ancestor_ids(self, data_source):
+        index = DataSourceDepartmentPathIndex.get(data_source.id)
+
+        dept_id_map = dict(DataSourceDepartment.objects.filter(data_source=data_source).values_list("code", "id"))
+        assert index.get_ancestor_ids(dept_id_map["company"]) == []
+        assert index.get_ancestor_ids(dept_id_map["company"], include_self=True) == [dept_id_map["company"]]
+        assert index.get_ancestor_ids(dept_id_map["group_baa"]) == [
+            dept_id_map["company"],
+            dept_id_map["dept_b"],
+            dept_id_map["center_ba"],
+        ]
+        assert index.get_name(dept_id_map["center_ba"]) == "中心BA"
+        # 不存在的部门
+        assert index.get_ancestor_ids(-1, include_self=True) == []
+        assert index.get_name(-1) == ""
+
+    def test_get_with_cache(self, data_source, django_assert_num_queries):
+        DataSourceDepartmentPathIndex.get(data_source.id)
+
+        # 版本号不变的情况下，不会再查询 DB
+        with django_assert_num_queries(0):
+            DataSourceDepartmentPathIndex.get(data_source.id)
+
+    def test_bump_generation(self, data_source):
+        dept = DataSourceDepartment.objects.get(data_source=data_source, code="center_aa")
+        assert DataSourceDepartmentPathIndex.get(data_source.id).get_full_name(dept.id) == "公司/部门A/中心AA"
+
+        dept.name = "中心AA2"
+        dept.save()
+        # 版本号未更新，还是旧的索引
+        assert DataSourceDepartmentPathIndex.get(data_source.id).get_full_name(dept.id) == "公司/部门A/中心AA"
+
+        DataSourceDepartmentPathIndex.bump_generation(data_source.id)
+        assert DataSourceDepartmentPathIndex.get(data_source.id).get_full_name(dept.id) == "公司/部门A/中心AA2"
+
+    def test_build_command(self, data_source, django_assert_num_queries):
+        dept = DataSourceDepartment.objects.get(data_source=data_source, code="center_aa")
+        assert DataSourceDepartmentPathIndex.get(data_source.id).get_full_name(dept.id) == "公司/部门A/中心AA"
+
+        dept.name = "中心AA2"
+        dept.save()
+        call_command("build_department_path_index", data_source_id=data_source.id, stdout=StringIO())
+
+        # 命令执行后，索引已经基于最新数据完成重建 & 预热
+        with django_assert_num_queries(0):
+            assert DataSourceDepartmentPathIndex.get(data_source.id).get_full_name(dept.id) == "公司/部门A/中心AA2"
+
+
+class TestDataSourceRelationGeneration:
+    def test_get_many(self, data_source):
+        generations = DataSourceRelationGeneration.get_many([data_source.id, -1])
+        assert set(generations.keys()) == {data_source.id, -1}
+        # 版本号不变的情况下，多次获取的结果一致
+        assert DataSourceRelationGeneration.get_many([data_source.id, -1]) == generations
+
+    def test_bump(self, data_source):
+        generations = DataSourceRelationGeneration.get_many([data_source.id, -1])
+
+        DataSourceRelationGeneration.bump(data_source.id)
+        new_generations = DataSourceRelationGeneration.get_many([data_source.id, -1])
+        assert new_generations[data_source.id] != generations[data_source.id]
+        assert new_generations[-1] == generations[-1]
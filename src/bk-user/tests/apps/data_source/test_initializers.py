@@ -14,9 +14,13 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+from unittest import mock
+
 import pytest
 from bkuser.apps.data_source.initializers import LocalDataSourceIdentityInfoInitializer
 from bkuser.apps.data_source.models import DataSourceUser, LocalDataSourceIdentityInfo
+from bkuser.common.hashers import check_password
+from django.test.utils import override_settings
 
 pytestmark = pytest.mark.django_db
 
@@ -32,6 +36,32 @@ class TestLocalDataSourceIdentityInfoInitializer:
             == DataSourceUser.objects.filter(data_source=full_local_data_source).count()
         )
 
+    @override_settings(LOCAL_DATA_SOURCE_PASSWORD_HASH_WORKERS=2)
+    def test_sync_with_thread_pool(self, full_local_data_source, monkeypatch):
+        """分多个批次，使用线程池计算密码哈希的情况"""
+        monkeypatch.setattr(LocalDataSourceIdentityInfoInitializer, "BATCH_SIZE", 3)
+
+        users, user_passwd_map = LocalDataSourceIdentityInfoInitializer(full_local_data_source).initialize()
+
+        infos = LocalDataSourceIdentityInfo.objects.filter(data_source=full_local_data_source)
+        assert infos.count() == len(users) == len(user_passwd_map) > LocalDataSourceIdentityInfoInitializer.BATCH_SIZE
+        for info in infos:
+            assert check_password(user_passwd_map[info.user_id], info.password)
+
+    @override_settings(LOCAL_DATA_SOURCE_PASSWORD_HASH_WORKERS=2)
+    def test_sync_without_thread_pool_when_not_parallelizable(self, full_local_data_source, monkeypatch):
+        """哈希计算无法释放 GIL 时（如 PBKDF2-SM3 使用 tongsuopy 实现），不使用线程池"""
+        monkeypatch.setattr(LocalDataSourceIdentityInfoInitializer, "BATCH_SIZE", 3)
+
+        with mock.patch(
+            "bkuser.apps.data_source.initializers.is_make_password_parallelizable", return_value=False
+        ), mock.patch("bkuser.apps.data_source.initializers.ThreadPoolExecutor") as executor:
+            users, user_passwd_map = LocalDataSourceIdentityInfoInitializer(full_local_data_source).initialize()
+
+        executor.assert_not_called()
+        infos = LocalDataSourceIdentityInfo.objects.filter(data_source=full_local_data_source)
+        assert infos.count() == len(users) == len(user_passwd_map)
+
     def test_skip_not_local_data_source(self, full_general_data_source):
         """不是本地数据源的，同步不会生效"""
         LocalDataSourceIdentityInfoInitializer(full_general_data_source).initialize()
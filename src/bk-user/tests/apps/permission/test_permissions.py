@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+from types import SimpleNamespace
+
+import pytest
+from bkuser.apps.permission.caches import UserRoleCache
+from bkuser.apps.permission.constants import UserRole
+from bkuser.apps.permission.permissions import get_user_role, is_super_manager, is_tenant_manager
+from bkuser.apps.tenant.models import TenantManager
+from bkuser.common.local import local
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def fake_request():
+    local.request = SimpleNamespace()
+    yield local.request
+    local.release()
+
+
+class TestGetUserRole:
+    def test_roles(self, default_tenant, random_tenant, bk_user):
+        # bk_user 为 random_tenant 的管理员
+        assert get_user_role(random_tenant.id, bk_user.username) == UserRole.TENANT_MANAGER
+        assert is_tenant_manager(random_tenant.id, bk_user.username)
+        assert not is_super_manager(random_tenant.id, bk_user.username)
+        # 非默认租户的管理员，在默认租户下只是普通用户
+        assert get_user_role(default_tenant.id, bk_user.username) == UserRole.NATURAL_USER
+
+    def test_super_manager(self, default_tenant, bk_user):
+        assert get_user_role(default_tenant.id, bk_user.username) == UserRole.SUPER_MANAGER
+        assert is_super_manager(default_tenant.id, bk_user.username)
+        assert is_tenant_manager(default_tenant.id, bk_user.username)
+
+    def test_get_with_cache(self, random_tenant, bk_user, django_assert_num_queries):
+        get_user_role(random_tenant.id, bk_user.username)
+
+        # 缓存未失效的情况下，不会再查询 DB
+        with django_assert_num_queries(0):
+            assert get_user_role(random_tenant.id, bk_user.username) == UserRole.TENANT_MANAGER
+
+    def test_invalidate(self, random_tenant, bk_user):
+        assert get_user_role(random_tenant.id, bk_user.username) == UserRole.TENANT_MANAGER
+
+        TenantManager.objects.filter(tenant=random_tenant, tenant_user_id=bk_user.username).delete()
+        # 主动失效前，仍使用缓存中的角色
+        assert get_user_role(random_tenant.id, bk_user.username) == UserRole.TENANT_MANAGER
+
+        UserRoleCache.invalidate(random_tenant.id, [bk_user.username])
+        assert get_user_role(random_tenant.id, bk_user.username) == UserRole.NATURAL_USER
+
+    def test_memoize_in_request(self, random_tenant, bk_user, fake_request, django_assert_num_queries):
+        get_user_role(random_tenant.id, bk_user.username)
+        UserRoleCache.invalidate(random_tenant.id, [bk_user.username])
+
+        # 同一请求内，即使跨请求缓存失效，也不会再次查询 DB / Redis
+        with django_assert_num_queries(0):
+            assert get_user_role(random_tenant.id, bk_user.username) == UserRole.TENANT_MANAGER
+            assert is_tenant_manager(random_tenant.id, bk_user.username)
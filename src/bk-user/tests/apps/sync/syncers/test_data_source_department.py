@@ -144,3 +144,144 @@ class TestSyncDataSourceDepartment:
     def _gen_parent_relations_from_db(data_source: DataSource) -> Set[Tuple[str, str | None]]:
         dept_relations = DataSourceDepartmentRelation.objects.filter(data_source=data_source)
         return {(rel.department.code, rel.parent.department.code if rel.parent else None) for rel in dept_relations}
+
+
+class TestSyncDataSourceDepartmentRelation:
+    """数据源部门关系同步测试"""
+
+    @pytest.fixture
+    def exists_raw_departments(self, full_local_data_source) -> List[RawDataSourceDepartment]:
+        """与数据源中存量部门 & 部门关系一致的原始部门信息"""
+        return [
+            RawDataSourceDepartment(
+                code=rel.department.code,
+                name=rel.department.name,
+                parent=rel.parent.department.code if rel.parent else None,
+            )
+            for rel in DataSourceDepartmentRelation.objects.filter(data_source=full_local_data_source)
+        ]
+
+    def test_sync_without_changes(self, data_source_sync_task_ctx, full_local_data_source, exists_raw_departments):
+        mptt_fields = ["department_id", "parent_id", "tree_id", "lft", "rght", "level", "updated_at"]
+        relations = DataSourceDepartmentRelation.objects.filter(data_source=full_local_data_source)
+        relations_before_sync = set(relations.values_list(*mptt_fields))
+
+        self._sync_department_relations(data_source_sync_task_ctx, full_local_data_source, exists_raw_departments)
+
+        # 组织架构没有变化，不应该有任何的数据变更（包括 updated_at）
+        assert set(relations.values_list(*mptt_fields)) == relations_before_sync
+
+    def test_sync_with_reparent(self, data_source_sync_task_ctx, full_local_data_source, exists_raw_departments):
+        for dept in exists_raw_departments:
+            # 中心BA 挪到 部门A 下面
+            if dept.code == "center_ba":
+                dept.parent = "dept_a"
+
+        self._sync_department_relations(data_source_sync_task_ctx, full_local_data_source, exists_raw_departments)
+
+        self._assert_mptt_tree_valid(full_local_data_source, exists_raw_departments)
+        dept_a_rel = DataSourceDepartmentRelation.objects.get(department__code="dept_a")
+        assert set(dept_a_rel.get_descendants().values_list("department__code", flat=True)) == {
+            "center_aa",
+            "center_ab",
+            "center_ba",
+            "group_aaa",
+            "group_aba",
+            "group_baa",
+        }
+
+    def test_sync_with_create_and_delete(
+        self, data_source_sync_task_ctx, full_local_data_source, exists_raw_departments
+    ):
+        # 删除 中心AB（其子部门 小组ABA 挂到 部门B 下），新增 中心AC，并新增一棵独立的树
+        raw_departments = [dept for dept in exists_raw_departments if dept.code != "center_ab"]
+        for dept in raw_departments:
+            if dept.code == "group_aba":
+                dept.parent = "dept_b"
+
+        raw_departments += [
+            RawDataSourceDepartment(code="center_ac", name="中心AC", parent="dept_a"),
+            RawDataSourceDepartment(code="another_company", name="另一个公司", parent=None),
+            RawDataSourceDepartment(code="another_dept", name="另一个部门", parent="another_company"),
+        ]
+        company_tree_id = DataSourceDepartmentRelation.objects.get(department__code="company").tree_id
+
+        self._sync_data_source_departments(data_source_sync_task_ctx, full_local_data_source, raw_departments)
+
+        self._assert_mptt_tree_valid(full_local_data_source, raw_departments)
+        relations = DataSourceDepartmentRelation.objects.filter(data_source=full_local_data_source)
+        assert not relations.filter(department__code="center_ab").exists()
+        # 存量的树会继续使用原来的 tree_id，新的树会分配新的 tree_id
+        assert relations.get(department__code="company").tree_id == company_tree_id
+        assert relations.get(department__code="another_company").tree_id != company_tree_id
+
+    def test_sync_with_split_tree(self, data_source_sync_task_ctx, full_local_data_source, exists_raw_departments):
+        for dept in exists_raw_departments:
+            # 部门B 独立成一棵新的树
+            if dept.code == "dept_b":
+                dept.parent = None
+
+        company_tree_id = DataSourceDepartmentRelation.objects.get(department__code="company").tree_id
+
+        self._sync_department_relations(data_source_sync_task_ctx, full_local_data_source, exists_raw_departments)
+
+        self._assert_mptt_tree_valid(full_local_data_source, exists_raw_departments)
+        relations = DataSourceDepartmentRelation.objects.filter(data_source=full_local_data_source)
+        assert relations.get(department__code="company").tree_id == company_tree_id
+        dept_b_rel = relations.get(department__code="dept_b")
+        assert dept_b_rel.tree_id != company_tree_id
+        assert dept_b_rel.is_root_node()
+        assert set(dept_b_rel.get_descendants().values_list("department__code", flat=True)) == {
+            "center_ba",
+            "group_baa",
+        }
+
+    @staticmethod
+    def _sync_department_relations(
+        data_source_sync_task_ctx: DataSourceSyncTaskContext,
+        data_source: DataSource,
+        raw_departments: List[RawDataSourceDepartment],
+    ):
+        DataSourceDepartmentRelationSyncer(
+            ctx=data_source_sync_task_ctx,
+            data_source=data_source,
+            raw_departments=raw_departments,
+            overwrite=True,
+            incremental=False,
+        ).sync()
+
+    @staticmethod
+    def _sync_data_source_departments(
+        data_source_sync_task_ctx: DataSourceSyncTaskContext,
+        data_source: DataSource,
+        raw_departments: List[RawDataSourceDepartment],
+    ):
+        kwargs = {
+            "ctx": data_source_sync_task_ctx,
+            "data_source": data_source,
+            "raw_departments": raw_departments,
+            "overwrite": True,
+            "incremental": False,
+        }
+        DataSourceDepartmentSyncer(**kwargs).sync()  # type: ignore
+        DataSourceDepartmentRelationSyncer(**kwargs).sync()  # type: ignore
+
+    @staticmethod
+    def _assert_mptt_tree_valid(data_source: DataSource, raw_departments: List[RawDataSourceDepartment]):
+        """检查 MPTT 树中每个节点的子孙节点，与原始部门父子关系计算出来的一致"""
+        parent_map = {dept.code: dept.parent for dept in raw_departments}
+
+        def _get_ancestors(code: str) -> Set[str]:
+            ancestors = set()
+            while parent_map.get(code):
+                code = parent_map[code]  # type: ignore
+                ancestors.add(code)
+            return ancestors
+
+        relations = DataSourceDepartmentRelation.objects.filter(data_source=data_source)
+        assert set(relations.values_list("department__code", flat=True)) == set(parent_map.keys())
+
+        for rel in relations:
+            expected_descendants = {code for code in parent_map if rel.department.code in _get_ancestors(code)}
+            assert set(rel.get_descendants().values_list("department__code", flat=True)) == expected_descendants
+            assert rel.level == len(_get_ancestors(rel.department.code))
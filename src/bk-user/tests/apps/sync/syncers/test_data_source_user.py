@@ -36,6 +36,7 @@ from bkuser.apps.sync.syncers import (
 from bkuser.apps.tenant.constants import TenantUserIdRuleEnum
 from bkuser.apps.tenant.models import TenantUserIDGenerateConfig
 from bkuser.plugins.models import RawDataSourceDepartment, RawDataSourceUser
+from django.db.models import Q
 
 pytestmark = pytest.mark.django_db
 
@@ -124,7 +125,7 @@ class TestSyncDataSourceUser:
         assert zhangsan.email == "zhangsan_rename@m.com"
         assert zhangsan.phone == "13512345655"
         assert zhangsan.phone_country_code == "63"
-        assert zhangsan.extras.get("age") == 30  # noqa: PLR2004
+        assert zhangsan.extras.get("age") == 30
 
         # 覆盖模式下，会追加关联边
         assert {"linshiyi", "baishier"} == set(
@@ -217,6 +218,58 @@ class TestSyncDataSourceUser:
             user_leader_relation_cnt_before_sync + 1
         )
 
+    def test_update_with_incremental_and_alive_user_codes(
+        self, data_source_sync_task_ctx, full_local_data_source, random_raw_user
+    ):
+        user_codes = set(
+            DataSourceUser.objects.filter(data_source=full_local_data_source).values_list("code", flat=True)
+        )
+        # 数据源中已经不存在 lisi，增量同步时也需要被删除
+        alive_user_codes = user_codes - {"lisi"}
+
+        DataSourceUserSyncer(
+            data_source_sync_task_ctx,
+            full_local_data_source,
+            [random_raw_user],
+            overwrite=True,
+            incremental=True,
+            alive_user_codes=alive_user_codes,
+        ).sync()
+
+        users = DataSourceUser.objects.filter(data_source=full_local_data_source)
+        assert set(users.values_list("code", flat=True)) == alive_user_codes | {random_raw_user.code}
+
+    def test_delete_relations_with_incremental_and_alive_user_codes(
+        self, data_source_sync_task_ctx, full_local_data_source, random_raw_user
+    ):
+        """对账删除的用户，其部门关系 & 上级关系（作为用户或作为上级）都需要被删除"""
+        lisi = DataSourceUser.objects.get(data_source=full_local_data_source, code="lisi")
+        dept_user_relations = DataSourceDepartmentUserRelation.objects.filter(data_source=full_local_data_source)
+        user_leader_relations = DataSourceUserLeaderRelation.objects.filter(data_source=full_local_data_source)
+        dept_user_relation_cnt_before_sync = dept_user_relations.count()
+        user_leader_relation_cnt_before_sync = user_leader_relations.count()
+        # lisi 属于 部门 A & 中心 AA，上级为 zhangsan，同时是 zhaoliu & maiba 的上级
+        assert dept_user_relations.filter(user=lisi).count() == 2
+        assert user_leader_relations.filter(Q(user=lisi) | Q(leader=lisi)).count() == 3
+
+        user_codes = set(
+            DataSourceUser.objects.filter(data_source=full_local_data_source).values_list("code", flat=True)
+        )
+        DataSourceUserSyncer(
+            data_source_sync_task_ctx,
+            full_local_data_source,
+            [random_raw_user],
+            overwrite=True,
+            incremental=True,
+            alive_user_codes=user_codes - {"lisi"},
+        ).sync()
+
+        assert not DataSourceUser.objects.filter(id=lisi.id).exists()
+        assert dept_user_relations.count() == dept_user_relation_cnt_before_sync - 2
+        assert user_leader_relations.count() == user_leader_relation_cnt_before_sync - 3
+        assert not dept_user_relations.filter(user_id=lisi.id).exists()
+        assert not user_leader_relations.filter(Q(user_id=lisi.id) | Q(leader_id=lisi.id)).exists()
+
     def test_update_without_incremental_and_overwrite(
         self, data_source_sync_task_ctx, full_local_data_source, raw_users
     ):
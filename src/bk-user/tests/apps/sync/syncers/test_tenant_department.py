@@ -16,6 +16,7 @@
 # to the current version of the project delivered to anyone in the future.
 
 from typing import Set
+from unittest import mock
 
 import pytest
 from bkuser.apps.data_source.models import (
@@ -59,6 +60,88 @@ class TestTenantDepartmentSyncer:
             data_source=full_local_data_source,
         ).exists()
 
+    def test_reuse_tenant_department_id(self, tenant_sync_task_ctx, full_local_data_source, random_tenant):
+        """数据源部门被删除后重建，会复用历史记录中的租户部门 ID"""
+        TenantDepartmentSyncer(tenant_sync_task_ctx, full_local_data_source, random_tenant).sync()
+        dept_id_map = dict(
+            TenantDepartment.objects.filter(tenant=random_tenant, data_source=full_local_data_source).values_list(
+                "data_source_department__code", "id"
+            )
+        )
+
+        DataSourceDepartment.objects.filter(data_source=full_local_data_source, code="center_ba").delete()
+        TenantDepartmentSyncer(tenant_sync_task_ctx, full_local_data_source, random_tenant).sync()
+        DataSourceDepartment.objects.create(data_source=full_local_data_source, code="center_ba", name="中心BA")
+        TenantDepartmentSyncer(tenant_sync_task_ctx, full_local_data_source, random_tenant).sync()
+
+        center_ba = TenantDepartment.objects.get(
+            tenant=random_tenant,
+            data_source_department__data_source=full_local_data_source,
+            data_source_department__code="center_ba",
+        )
+        assert center_ba.id == dept_id_map["center_ba"]
+
+    def test_tenant_department_id_in_use(
+        self, tenant_sync_task_ctx, full_local_data_source, default_tenant, random_tenant
+    ):
+        """历史记录中的租户部门 ID 已被占用，则重新生成并更新记录"""
+        TenantDepartmentSyncer(tenant_sync_task_ctx, full_local_data_source, default_tenant).sync()
+        in_use_dept = TenantDepartment.objects.filter(
+            tenant=default_tenant, data_source=full_local_data_source
+        ).first()
+
+        TenantDepartmentIDRecord.objects.create(
+            tenant=random_tenant,
+            data_source=full_local_data_source,
+            code="company",
+            tenant_department_id=in_use_dept.id,
+        )
+        TenantDepartmentSyncer(tenant_sync_task_ctx, full_local_data_source, random_tenant).sync()
+
+        company = TenantDepartment.objects.get(
+            tenant=random_tenant, data_source=full_local_data_source, data_source_department__code="company"
+        )
+        assert company.id != in_use_dept.id
+        assert (
+            TenantDepartmentIDRecord.objects.get(
+                tenant=random_tenant, data_source=full_local_data_source, code="company"
+            ).tenant_department_id
+            == company.id
+        )
+
+    def test_multiple_tenant_department_ids_in_use(
+        self, tenant_sync_task_ctx, full_local_data_source, default_tenant, random_tenant
+    ):
+        """多个历史记录中的租户部门 ID 已被占用，重新生成后批量更新记录"""
+        TenantDepartmentSyncer(tenant_sync_task_ctx, full_local_data_source, default_tenant).sync()
+        in_use_dept_ids = list(
+            TenantDepartment.objects.filter(tenant=default_tenant, data_source=full_local_data_source).values_list(
+                "id", flat=True
+            )[:2]
+        )
+
+        codes = ["company", "dept_a"]
+        for code, dept_id in zip(codes, in_use_dept_ids):
+            TenantDepartmentIDRecord.objects.create(
+                tenant=random_tenant, data_source=full_local_data_source, code=code, tenant_department_id=dept_id
+            )
+
+        with mock.patch.object(
+            TenantDepartmentIDRecord.objects, "bulk_update", wraps=TenantDepartmentIDRecord.objects.bulk_update
+        ) as bulk_update:
+            TenantDepartmentSyncer(tenant_sync_task_ctx, full_local_data_source, random_tenant).sync()
+
+        bulk_update.assert_called_once()
+        for code in codes:
+            dept = TenantDepartment.objects.get(
+                tenant=random_tenant, data_source=full_local_data_source, data_source_department__code=code
+            )
+            record = TenantDepartmentIDRecord.objects.get(
+                tenant=random_tenant, data_source=full_local_data_source, code=code
+            )
+            assert record.tenant_department_id == dept.id
+            assert dept.id not in in_use_dept_ids
+
     @staticmethod
     def _gen_ds_dept_ids_with_tenant(tenant: Tenant, data_source: DataSource) -> Set[int]:
         return set(
@@ -15,11 +15,16 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import os
+import time
+from unittest import mock
+
 import pytest
 from bkuser.apps.data_source.constants import FieldMappingOperation
 from bkuser.apps.data_source.data_models import DataSourceUserFieldMapping
 from bkuser.apps.sync.converters import DataSourceUserConverter
 from bkuser.apps.sync.loggers import TaskLogger
+from bkuser.common.validators import validate_phone_with_country_code
 from bkuser.plugins.models import RawDataSourceUser
 
 pytestmark = pytest.mark.django_db
@@ -254,3 +259,88 @@ class TestDataSourceUserConverter:
 
         with pytest.raises(ValueError, match="not subset of"):
             DataSourceUserConverter(bare_local_data_source, logger).convert(raw_zhangsan)
+
+    def test_convert_with_compiled_plan(self, bare_local_data_source, tenant_user_custom_fields, logger):
+        converter = DataSourceUserConverter(bare_local_data_source, logger)
+        raw_users = [
+            RawDataSourceUser(
+                code=f"user-{idx}",
+                properties={
+                    "username": f"user-{idx}",
+                    "full_name": f"用户-{idx}",
+                    # 相同的手机号 & 区号，只会真正校验一次
+                    "phone": "13512345671",
+                    "age": "18",
+                    "gender": "male",
+                    "sport_hobby": "golf",
+                },
+                leaders=[],
+                departments=[],
+            )
+            for idx in range(3)
+        ]
+
+        with mock.patch(
+            "bkuser.apps.sync.converters.validate_phone_with_country_code",
+            wraps=validate_phone_with_country_code,
+        ) as validate_phone:
+            users = [converter.convert(u) for u in raw_users]
+
+        assert validate_phone.call_count == 1
+        assert [u.username for u in users] == ["user-0", "user-1", "user-2"]
+        assert all(
+            u.extras == {"age": 18, "gender": "male", "region": "china", "sport_hobby": ["golf"]} for u in users
+        )
+
+    def test_convert_with_invalid_phone_number_cached(self, bare_local_data_source, logger):
+        converter = DataSourceUserConverter(bare_local_data_source, logger)
+        raw_user = RawDataSourceUser(
+            code="test",
+            properties={"username": "test", "full_name": "test", "phone": "1", "phone_country_code": "44"},
+            leaders=[],
+            departments=[],
+        )
+        # 校验失败的结果也会被缓存，再次转换仍然会抛出相同的异常
+        for _ in range(2):
+            with pytest.raises(ValueError, match="phone number"):
+                converter.convert(raw_user)
+
+
+@pytest.mark.skipif(not os.getenv("BKUSER_RUN_BENCHMARK"), reason="set env BKUSER_RUN_BENCHMARK=1 to run benchmark")
+class TestDataSourceUserConverterBenchmark:
+    """数据源用户转换性能基准测试，用户量：10w"""
+
+    user_count = 100000
+    max_elapsed_seconds = 10
+
+    def test_convert(self, bare_local_data_source, tenant_user_custom_fields):
+        raw_users = [
+            RawDataSourceUser(
+                code=f"user-{idx}",
+                properties={
+                    "username": f"user-{idx}",
+                    "full_name": f"用户-{idx}",
+                    "email": f"user-{idx}@m.com",
+                    "phone": f"135{idx % 10000:08d}",
+                    "age": str(idx % 100),
+                    "gender": ["male", "female"][idx % 2],
+                    "region": "beijing",
+                    "sport_hobby": "running, golf",
+                },
+                leaders=[],
+                departments=[],
+            )
+            for idx in range(self.user_count)
+        ]
+
+        converter = DataSourceUserConverter(bare_local_data_source, TaskLogger())
+        with mock.patch.object(converter, "_compile_plan", wraps=converter._compile_plan) as compile_plan:
+            start = time.perf_counter()
+            users = [converter.convert(u) for u in raw_users]
+            elapsed = time.perf_counter() - start
+
+        assert len(users) == self.user_count
+        # 转换规则只需要编译一次
+        assert compile_plan.call_count == 1
+        # 本地实测约 4.4s（优化前约 8.4s），这里只约束一个宽松的上限，避免因机器性能差异导致测试不稳定
+        assert elapsed < self.max_elapsed_seconds
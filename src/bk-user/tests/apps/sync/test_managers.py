@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+from unittest import mock
+
+import pytest
+from bkuser.apps.sync.constants import SyncTaskStatus, SyncTaskTrigger
+from bkuser.apps.sync.data_models import TenantSyncOptions
+from bkuser.apps.sync.managers import TenantSyncFanOutManager
+from bkuser.apps.sync.models import DataSourceSyncTask, TenantSyncTask
+from django.test import override_settings
+from django.utils import timezone
+
+from tests.test_utils.helpers import generate_random_string
+from tests.test_utils.tenant import create_tenant
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def full_data_source_sync_task(full_local_data_source) -> DataSourceSyncTask:
+    return DataSourceSyncTask.objects.create(
+        data_source=full_local_data_source,
+        status=SyncTaskStatus.SUCCESS,
+        trigger=SyncTaskTrigger.MANUAL,
+        operator="admin",
+        start_at=timezone.now(),
+        extras={"overwrite": True, "incremental": False, "async_run": False},
+    )
+
+
+class TestTenantSyncFanOutManager:
+    def test_execute(self, full_local_data_source, full_data_source_sync_task):
+        tenant_ids = [full_local_data_source.owner_tenant_id, create_tenant(generate_random_string()).id]
+        sync_opts = TenantSyncOptions(operator="admin", async_run=False, trigger=SyncTaskTrigger.MANUAL)
+
+        tasks = TenantSyncFanOutManager(full_local_data_source, tenant_ids, sync_opts).execute()
+
+        assert [t.tenant_id for t in tasks] == tenant_ids
+        assert all(t.data_source_sync_task_id == full_data_source_sync_task.id for t in tasks)
+        assert set(TenantSyncTask.objects.filter(id__in=[t.id for t in tasks]).values_list("status", flat=True)) == {
+            SyncTaskStatus.SUCCESS
+        }
+
+        full_data_source_sync_task.refresh_from_db()
+        summary = full_data_source_sync_task.extras["tenant_sync"]
+        assert summary["status"] == SyncTaskStatus.SUCCESS
+        assert summary["task_ids"] == [t.id for t in tasks]
+        assert summary["counts"][SyncTaskStatus.SUCCESS] == len(tenant_ids)
+
+    @override_settings(
+        TENANT_SYNC_FAN_OUT_CONCURRENCY=2, TENANT_SYNC_FAN_OUT_QUEUE="tenant_sync", TENANT_SYNC_FAN_OUT_TIMEOUT=600
+    )
+    def test_execute_async(self, full_local_data_source, full_data_source_sync_task):
+        tenant_ids = [full_local_data_source.owner_tenant_id] + [
+            create_tenant(generate_random_string()).id for _ in range(2)
+        ]
+
+        with mock.patch("bkuser.apps.sync.managers.chord") as mocked_chord, mock.patch(
+            "bkuser.apps.sync.managers.summarize_tenant_sync_tasks.apply_async"
+        ) as mocked_expire_summary:
+            tasks = TenantSyncFanOutManager(full_local_data_source, tenant_ids, TenantSyncOptions()).execute()
+
+        # 租户同步任务按并发上限分为 2 条链，派发到指定队列，全部完成（或异常）后汇总同步结果
+        header, body = mocked_chord.call_args.args
+        assert [[sig.args[0] for sig in lane.tasks] for lane in header] == [
+            [tasks[0].id, tasks[2].id],
+            [tasks[1].id],
+        ]
+        assert all(sig.options["queue"] == "tenant_sync" for lane in header for sig in lane.tasks)
+        assert body.args == (full_data_source_sync_task.id, [t.id for t in tasks])
+        errback = mocked_chord.return_value.on_error.call_args.args[0]
+        assert errback.args == (full_data_source_sync_task.id, [t.id for t in tasks])
+        mocked_chord.return_value.on_error.return_value.apply_async.assert_called_once()
+        # 超时兜底汇总
+        mocked_expire_summary.assert_called_once_with(
+            (full_data_source_sync_task.id, [t.id for t in tasks]), {"expired": True}, countdown=600
+        )
+
+        # 任务派发后，汇总状态为执行中
+        full_data_source_sync_task.refresh_from_db()
+        assert full_data_source_sync_task.extras["tenant_sync"]["status"] == SyncTaskStatus.RUNNING
+        assert full_data_source_sync_task.extras["tenant_sync"]["counts"][SyncTaskStatus.PENDING] == len(tenant_ids)
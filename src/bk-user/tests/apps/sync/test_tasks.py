@@ -15,9 +15,17 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+from unittest import mock
+
 import pytest
 from bkuser.apps.sync.constants import SyncTaskStatus
-from bkuser.apps.sync.tasks import sync_data_source
+from bkuser.apps.sync.locks import TenantSyncTaskLock
+from bkuser.apps.sync.tasks import (
+    initialize_identity_info_and_send_notification,
+    summarize_tenant_sync_tasks,
+    sync_data_source,
+    sync_tenant_in_fan_out,
+)
 from bkuser.apps.sync.workbook_temp_store import WorkbookTempStore
 
 pytestmark = pytest.mark.django_db
@@ -64,3 +72,51 @@ class TestSyncDataSource:
             f"data source sync task {task_id} require raw data in temporary storage, but not found"
             in data_source_sync_task.logs
         )
+
+
+class TestSyncTenantInFanOut:
+    def test_failed_without_raise(self, tenant_sync_task):
+        # 租户同步锁被占用，同步任务失败，但不会抛出异常（避免触发扇出汇总的异常回调）
+        lock = TenantSyncTaskLock(tenant_sync_task.tenant_id, tenant_sync_task.data_source_id)
+        assert lock.acquire()
+        try:
+            assert sync_tenant_in_fan_out(tenant_sync_task.id) == SyncTaskStatus.FAILED
+        finally:
+            lock.release()
+
+    def test_success(self, tenant_sync_task):
+        assert sync_tenant_in_fan_out(tenant_sync_task.id) == SyncTaskStatus.SUCCESS
+
+
+class TestSummarizeTenantSyncTasks:
+    @pytest.mark.parametrize(("expired", "status"), [(False, SyncTaskStatus.RUNNING), (True, SyncTaskStatus.FAILED)])
+    def test_unfinished(self, data_source_sync_task, tenant_sync_task, expired, status):
+        tenant_sync_task.data_source_sync_task_id = data_source_sync_task.id
+        tenant_sync_task.status = SyncTaskStatus.RUNNING
+        tenant_sync_task.save(update_fields=["data_source_sync_task_id", "status"])
+
+        # 超时后仍未完成（如 Worker 异常退出）的租户同步任务视为失败
+        summarize_tenant_sync_tasks(data_source_sync_task.id, [tenant_sync_task.id], expired=expired)
+
+        data_source_sync_task.refresh_from_db()
+        assert data_source_sync_task.extras["tenant_sync"]["status"] == status
+        assert data_source_sync_task.extras["tenant_sync"]["counts"][SyncTaskStatus.RUNNING] == 1
+
+
+class TestInitializeIdentityInfoAndSendNotification:
+    @pytest.fixture(autouse=True)
+    def _mock_notifier(self):
+        with mock.patch("bkuser.apps.sync.tasks.TenantUserNotifier"):
+            yield
+
+    def test_progress_logged_to_tenant_sync_task(self, tenant_sync_task):
+        initialize_identity_info_and_send_notification(tenant_sync_task.data_source_id, tenant_sync_task.id)
+
+        tenant_sync_task.refresh_from_db()
+        assert "initialize identity infos progress" in tenant_sync_task.logs
+
+    def test_without_tenant_sync_task(self, tenant_sync_task):
+        initialize_identity_info_and_send_notification(tenant_sync_task.data_source_id)
+
+        tenant_sync_task.refresh_from_db()
+        assert "initialize identity infos" not in tenant_sync_task.logs
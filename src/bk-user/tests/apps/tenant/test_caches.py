@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import pytest
+from bkuser.apps.tenant.caches import TenantMetadataCache
+from bkuser.apps.tenant.constants import CollaborationStrategyStatus
+from bkuser.apps.tenant.models import CollaborationStrategy, TenantUserIDGenerateConfig
+
+from tests.test_utils.helpers import generate_random_string
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def collaboration_strategy(default_tenant, random_tenant) -> CollaborationStrategy:
+    return CollaborationStrategy.objects.create(
+        name=generate_random_string(),
+        source_tenant=random_tenant,
+        target_tenant=default_tenant,
+        source_status=CollaborationStrategyStatus.ENABLED,
+        target_status=CollaborationStrategyStatus.ENABLED,
+        target_config={"field_mapping": [{"source_field": "age", "target_field": "years_old"}]},
+    )
+
+
+class TestTenantMetadataCache:
+    def test_get_collaboration_field_mapping(self, default_tenant, random_tenant, collaboration_strategy):
+        assert TenantMetadataCache.get_collaboration_field_mapping(default_tenant.id) == {
+            (random_tenant.id, "age"): "years_old"
+        }
+        # 没有协同到该租户的策略
+        assert TenantMetadataCache.get_collaboration_field_mapping(random_tenant.id) == {}
+
+    def test_get_with_cache(self, default_tenant, collaboration_strategy, django_assert_num_queries):
+        TenantMetadataCache.get_collaboration_field_mapping(default_tenant.id)
+        TenantMetadataCache.get_data_source_domain_map()
+
+        # 版本号不变的情况下，不会再查询 DB
+        with django_assert_num_queries(0):
+            TenantMetadataCache.get_collaboration_field_mapping(default_tenant.id)
+            TenantMetadataCache.get_data_source_domain_map()
+
+    def test_invalidate_after_strategy_changed(self, default_tenant, random_tenant, collaboration_strategy):
+        TenantMetadataCache.get_collaboration_field_mapping(default_tenant.id)
+
+        collaboration_strategy.target_config = {"field_mapping": [{"source_field": "age", "target_field": "age"}]}
+        collaboration_strategy.save()
+        assert TenantMetadataCache.get_collaboration_field_mapping(default_tenant.id) == {
+            (random_tenant.id, "age"): "age"
+        }
+
+        collaboration_strategy.delete()
+        assert TenantMetadataCache.get_collaboration_field_mapping(default_tenant.id) == {}
+
+    def test_invalidate_after_id_generate_config_changed(self, default_tenant, bare_local_data_source):
+        assert (bare_local_data_source.id, default_tenant.id) not in TenantMetadataCache.get_data_source_domain_map()
+
+        TenantUserIDGenerateConfig.objects.create(
+            data_source=bare_local_data_source, target_tenant=default_tenant, domain="example.com"
+        )
+        domain_map = TenantMetadataCache.get_data_source_domain_map()
+        assert domain_map[(bare_local_data_source.id, default_tenant.id)] == "example.com"
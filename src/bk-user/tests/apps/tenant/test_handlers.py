@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+from unittest import mock
+
+import pytest
+from django.test.utils import override_settings
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def mocked_invalidate_task():
+    with mock.patch("bkuser.apps.tenant.handlers.invalidate_login_tenant_user_cache") as mocked:
+        yield mocked
+
+
+class TestNotifyLoginTenantUserChanged:
+    @override_settings(ENABLE_BK_LOGIN_TENANT_USER_CACHE_INVALIDATION=True)
+    def test_tenant_user_changed(
+        self, not_expired_tenant_user, mocked_invalidate_task, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            not_expired_tenant_user.language = "en"
+            not_expired_tenant_user.save()
+
+        mocked_invalidate_task.delay.assert_called_once_with([not_expired_tenant_user.id])
+
+    @override_settings(ENABLE_BK_LOGIN_TENANT_USER_CACHE_INVALIDATION=True)
+    def test_data_source_user_changed(
+        self, not_expired_tenant_user, mocked_invalidate_task, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            data_source_user = not_expired_tenant_user.data_source_user
+            data_source_user.full_name = "new_name"
+            data_source_user.save()
+
+        mocked_invalidate_task.delay.assert_called_once_with([not_expired_tenant_user.id])
+
+    @override_settings(ENABLE_BK_LOGIN_TENANT_USER_CACHE_INVALIDATION=True)
+    def test_tenant_user_deleted(
+        self, not_expired_tenant_user, mocked_invalidate_task, django_capture_on_commit_callbacks
+    ):
+        tenant_user_id = not_expired_tenant_user.id
+        with django_capture_on_commit_callbacks(execute=True):
+            not_expired_tenant_user.delete()
+
+        mocked_invalidate_task.delay.assert_called_once_with([tenant_user_id])
+
+    def test_disabled(self, not_expired_tenant_user, mocked_invalidate_task, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            not_expired_tenant_user.language = "en"
+            not_expired_tenant_user.save()
+
+        mocked_invalidate_task.delay.assert_not_called()
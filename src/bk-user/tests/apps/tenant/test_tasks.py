@@ -14,9 +14,11 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+from unittest import mock
+
 import pytest
 from bkuser.apps.tenant.constants import TenantUserStatus
-from bkuser.apps.tenant.tasks import update_expired_tenant_user_status
+from bkuser.apps.tenant.tasks import invalidate_login_tenant_user_cache, update_expired_tenant_user_status
 
 pytestmark = pytest.mark.django_db
 
@@ -29,3 +31,12 @@ class TestUpdateExpiredTenantUserStatus:
 
         assert not_expired_tenant_user.status == TenantUserStatus.ENABLED
         assert expired_tenant_user.status == TenantUserStatus.EXPIRED
+
+
+class TestInvalidateLoginTenantUserCache:
+    def test_success(self):
+        with mock.patch("bkuser.component.login._call_login_api") as mocked:
+            invalidate_login_tenant_user_cache(["zhangsan"])
+
+        assert mocked.call_args.args[1] == "/api/v2/invalidate_user_cache/"
+        assert mocked.call_args.kwargs["json"] == {"tenant_user_ids": ["zhangsan"]}
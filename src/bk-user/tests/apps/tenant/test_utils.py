@@ -89,6 +89,36 @@ class TestTenantUserIdGenerator:
         assert len(generator.tenant_user_id_map) == 0
         assert TenantUserIDRecord.objects.filter(data_source=full_local_data_source).count() == 2
 
+    def test_gen_batch_uuid(self, random_tenant, full_local_data_source, zhangsan, lisi, django_assert_num_queries):
+        uuid = generate_uuid()
+        TenantUserIDRecord.objects.create(
+            tenant_id=random_tenant.id, data_source=full_local_data_source, code=zhangsan.code, tenant_user_id=uuid
+        )
+
+        generator = TenantUserIDGenerator(random_tenant.id, full_local_data_source, prepare_batch=True)
+        # 新生成的记录只需要一次批量写入
+        with django_assert_num_queries(1):
+            user_id_map = generator.gen_batch([zhangsan, lisi, lisi])
+
+        assert user_id_map[zhangsan.id] == uuid
+        assert len(user_id_map[lisi.id]) == 32
+        assert (
+            TenantUserIDRecord.objects.get(data_source=full_local_data_source, code=lisi.code).tenant_user_id
+            == (user_id_map[lisi.id])
+        )
+        # 再次生成，复用已有的记录
+        assert (
+            TenantUserIDGenerator(random_tenant.id, full_local_data_source).gen_batch([zhangsan, lisi]) == user_id_map
+        )
+
+    def test_gen_batch_by_username(self, random_tenant, full_local_data_source, zhangsan, lisi):
+        TenantUserIDGenerateConfig.objects.create(
+            data_source=full_local_data_source, target_tenant=random_tenant, rule=TenantUserIdRuleEnum.USERNAME
+        )
+        generator = TenantUserIDGenerator(random_tenant.id, full_local_data_source, prepare_batch=True)
+        assert generator.gen_batch([zhangsan, lisi]) == {zhangsan.id: "zhangsan", lisi.id: "lisi"}
+        assert not TenantUserIDRecord.objects.filter(data_source=full_local_data_source).exists()
+
 
 @pytest.fixture
 def company(full_local_data_source) -> DataSourceDepartment:
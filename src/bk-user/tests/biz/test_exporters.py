@@ -14,9 +14,13 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+import io
+
 import pytest
 from bkuser.apps.data_source.models import DataSourceUser
 from bkuser.biz.exporters import DataSourceUserExporter
+from openpyxl.reader.excel import load_workbook
+from openpyxl.workbook import Workbook
 
 pytestmark = pytest.mark.django_db
 
@@ -50,7 +54,7 @@ class TestDataSourceExporter:
             user.save()
 
         # 导出数据，确认数据准确性，特别是自定义字段
-        wk = DataSourceUserExporter(full_local_data_source).export()
+        wk = self._reload(DataSourceUserExporter(full_local_data_source).export())
         assert "users" in wk.sheetnames
 
         # 表格中第三行开始才是数据
@@ -64,10 +68,11 @@ class TestDataSourceExporter:
             assert row[6].value == str(20 + idx)
             assert row[7].value == "male"
             assert row[8].value == "region-" + str(idx)
-            assert row[9].value == ""
+            # 注：空字符串在保存到文件后，重新加载会变成 None
+            assert not row[9].value
 
         # 检查组织信息
-        assert [cell.value for cell in wk["users"]["E"][2:]] == [
+        assert [cell.value or "" for cell in wk["users"]["E"][2:]] == [
             "公司",
             "公司/部门A,公司/部门A/中心AA",
             "公司/部门A,公司/部门B",
@@ -82,7 +87,7 @@ class TestDataSourceExporter:
         ]
 
         # 检查 leader 信息
-        assert [cell.value for cell in wk["users"]["F"][2:]] == [
+        assert [cell.value or "" for cell in wk["users"]["F"][2:]] == [
             "",
             "zhangsan",
             "zhangsan",
@@ -95,3 +100,43 @@ class TestDataSourceExporter:
             "lushi",
             "",
         ]
+
+    def test_export_in_batches(self, full_local_data_source, tenant_user_custom_fields):
+        exporter = DataSourceUserExporter(full_local_data_source)
+        wk = self._reload(exporter.export())
+
+        batch_exporter = DataSourceUserExporter(full_local_data_source)
+        # 每批次只获取 3 个用户，确保分批导出的结果与一次性导出的一致
+        batch_exporter.export_batch_size = 3
+        batch_wk = self._reload(batch_exporter.export())
+
+        assert [[c.value for c in row] for row in batch_wk["users"].iter_rows()] == [
+            [c.value for c in row] for row in wk["users"].iter_rows()
+        ]
+
+    def test_export_keep_template_header(self, full_local_data_source, tenant_user_custom_fields):
+        exporter = DataSourceUserExporter(full_local_data_source)
+        tmpl_sheet = exporter.get_template()["users"]
+        sheet = self._reload(DataSourceUserExporter(full_local_data_source).export())["users"]
+
+        for row_idx in [1, exporter.col_name_row_idx]:
+            assert [c.value for c in sheet[row_idx]] == [c.value for c in tmpl_sheet[row_idx]]
+            assert sheet.row_dimensions[row_idx].height == tmpl_sheet.row_dimensions[row_idx].height
+
+        assert sheet.merged_cells.ranges == tmpl_sheet.merged_cells.ranges
+        assert sheet.column_dimensions["J"].width == exporter.default_column_width
+
+    @pytest.mark.parametrize(
+        ("idx", "expected"),
+        [(0, "A"), (25, "Z"), (26, "AA"), (27, "AB"), (51, "AZ"), (52, "BA"), (701, "ZZ"), (702, "AAA")],
+    )
+    def test_gen_sheet_col_idx(self, idx, expected):
+        assert DataSourceUserExporter._gen_sheet_col_idx(idx) == expected
+
+    @staticmethod
+    def _reload(workbook: Workbook) -> Workbook:
+        """只写模式的 Workbook 无法读取，需要保存后重新加载"""
+        with io.BytesIO() as buffer:
+            workbook.save(buffer)
+            buffer.seek(0)
+            return load_workbook(buffer)
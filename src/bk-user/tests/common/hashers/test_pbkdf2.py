@@ -14,8 +14,19 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+import os
+import time
 
+import pytest
 from bkuser.common.hashers import PBKDF2SM3PasswordHasher
+from bkuser.common.hashers.pbkdf2 import (
+    _OPENSSL_SM3_PBKDF2_AVAILABLE,
+    _TRANS_5C,
+    _TRANS_36,
+    _pbkdf2_hmac_sm3,
+    _pbkdf2_hmac_sm3_fallback,
+)
+from bkuser.common.hashers.sm3 import SM3
 
 SMALL_ITERATIONS = 3000
 
@@ -77,3 +88,113 @@ class TestPBKDF2SM3PasswordHasher:
 
         assert hasher.must_update(encrypted)
         hasher.harden_runtime(raw_password, encrypted)
+
+
+# 兼容性测试数据，由早期纯 Python 实现的 _pbkdf2_hmac_sm3 计算得出，
+# 任何实现上的优化都必须保证计算结果与之完全一致，否则存量密码将无法通过校验
+PBKDF2_HMAC_SM3_VECTORS = [
+    (b"", b"salt", 1, None, "8388dd3999fb0cde4064a6a3f5c1a5963bf4e2cd3dddc8b982503f8f004bca0a"),
+    (b"password", b"salt", 1, None, "4612f922a1fdcefaf4312fc6f8f3322b489cbf24f2ea361b44c2bd8fa2c6dcb0"),
+    (b"password", b"salt", 2, None, "fee723a2bc966e11dffb66133f4e8df577383c78ade30e3298edbd3e54ed85b7"),
+    (b"password", b"salt", 4096, None, "b6e8f2074c87432b78f62e5ced980fdff89e86af2f693dab1638e2b3683045dd"),
+    (
+        "pass-@-123456".encode(),
+        b"this-is-a-salt",
+        1000,
+        None,
+        "f398a94e1cb9db327bcb51bb8522e03dc3b8c47f48ad2c1eba17eaf197c6ab93",
+    ),
+    (
+        "密码-国密-SM3".encode(),
+        "盐值".encode(),
+        100,
+        None,
+        "59686828f01c1d2b5c72bb8387c2cdcb8e6e8391af1b8ba745d8aa207a090ac9",
+    ),
+    # 密码长度等于 / 超过 SM3 block_size（64）
+    (b"p" * 64, b"salt", 10, None, "79aad8fc2773e6a2e4683784c56ac80fc604ccfa87a3b74d0472ee30df1b989d"),
+    (b"p" * 65, b"salt", 10, None, "948d92ee9e17a99be9542625cb356c090ddd792ba8f1f685068d2df13154ccb1"),
+    (b"p" * 200, b"s" * 100, 10, None, "bb50c25359903f219b16714ee255c50184c8ff1ac896a81dd58529f6a79c9b34"),
+    # 指定派生密钥长度（含小于 / 超过 digest_size 的情况）
+    (b"password", b"salt", 10, 16, "77ed5215a60ee621ea1c56575ac3831c"),
+    (b"password", b"salt", 10, 33, "77ed5215a60ee621ea1c56575ac3831ccfa9e2f176e6c1a8fd54837de45b16d376"),
+    (
+        b"password",
+        b"salt",
+        10,
+        100,
+        "77ed5215a60ee621ea1c56575ac3831ccfa9e2f176e6c1a8fd54837de45b16d376e87a1d8a624aa0286c9aaa1b5d1a74b2f908c4ea6"
+        "f480bf570c3c2690f0e3529048f90bfa6c1ac8f0c3d7bb5209b47487360afaa0d7e9b7e6b934a2971e9d9d944b823",
+    ),
+]
+
+
+class TestPBKDF2HmacSM3:
+    """测试 pbkdf2 + hmac + sm3 的各实现计算结果一致"""
+
+    @pytest.mark.parametrize(("password", "salt", "iterations", "dk_len", "excepted"), PBKDF2_HMAC_SM3_VECTORS)
+    def test_compatibility(self, password, salt, iterations, dk_len, excepted):
+        assert _pbkdf2_hmac_sm3(password, salt, iterations, dk_len).hex() == excepted
+
+    @pytest.mark.parametrize(("password", "salt", "iterations", "dk_len", "excepted"), PBKDF2_HMAC_SM3_VECTORS)
+    def test_fallback_compatibility(self, password, salt, iterations, dk_len, excepted):
+        assert _pbkdf2_hmac_sm3_fallback(password, salt, iterations, dk_len).hex() == excepted
+
+    @pytest.mark.parametrize(("iterations", "dk_len"), [(0, None), (1, 0)])
+    def test_invalid_params(self, iterations, dk_len):
+        with pytest.raises(ValueError, match="must greater than 0"):
+            _pbkdf2_hmac_sm3(b"password", b"salt", iterations, dk_len)
+
+
+def _pbkdf2_hmac_sm3_reference(password: bytes, salt: bytes, iterations: int) -> bytes:
+    """优化前的纯 Python 实现（每轮迭代都通过 SM3 对象复制计算摘要），仅用于基准测试对比"""
+    inner, outer = SM3(), SM3()
+    block_size = inner.block_size
+    if len(password) > block_size:
+        password = SM3(password).digest()
+
+    password = password + b"\x00" * (block_size - len(password))
+    inner.update(password.translate(_TRANS_36))
+    outer.update(password.translate(_TRANS_5C))
+
+    def prf(msg: bytes) -> bytes:
+        inner_cp, outer_cp = inner.copy(), outer.copy()
+        inner_cp.update(msg)
+        outer_cp.update(inner_cp.digest())
+        return outer_cp.digest()
+
+    prev = prf(salt + (1).to_bytes(4, "big"))
+    r_key = int.from_bytes(prev, "big")
+    for _i in range(iterations - 1):
+        prev = prf(prev)
+        r_key ^= int.from_bytes(prev, "big")
+
+    return r_key.to_bytes(inner.digest_size, "big")
+
+
+def _timeit(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+@pytest.mark.skipif(not os.getenv("BKUSER_RUN_BENCHMARK"), reason="set env BKUSER_RUN_BENCHMARK=1 to run benchmark")
+class TestPBKDF2HmacSM3Benchmark:
+    """
+    pbkdf2 + hmac + sm3 性能基准测试，与优化前的实现对比
+
+    本地实测（20000 次迭代）：优化前约 0.58s，Python 实现约 0.33s（1.7 倍），OpenSSL 实现约 0.03s（20 倍）
+    """
+
+    iterations = 20000
+
+    def test_fallback(self):
+        args = (b"password", b"salt", self.iterations)
+        assert _pbkdf2_hmac_sm3_fallback(*args) == _pbkdf2_hmac_sm3_reference(*args)
+        assert _timeit(_pbkdf2_hmac_sm3_fallback, *args) < _timeit(_pbkdf2_hmac_sm3_reference, *args)
+
+    @pytest.mark.skipif(not _OPENSSL_SM3_PBKDF2_AVAILABLE, reason="openssl not support sm3")
+    def test_openssl(self):
+        args = (b"password", b"salt", self.iterations)
+        assert _pbkdf2_hmac_sm3(*args) == _pbkdf2_hmac_sm3_reference(*args)
+        assert _timeit(_pbkdf2_hmac_sm3, *args) * 5 < _timeit(_pbkdf2_hmac_sm3_reference, *args)
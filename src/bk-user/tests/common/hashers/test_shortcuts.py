@@ -14,7 +14,10 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
-from bkuser.common.hashers import check_password, make_password
+from unittest import mock
+
+import pytest
+from bkuser.common.hashers import check_password, is_make_password_parallelizable, make_password
 from django.conf import settings
 from django.test.utils import override_settings
 
@@ -63,3 +66,19 @@ def test_check_password_encrypt_by_other_algo_case_2(raw_password):
     with override_settings(PASSWORD_ENCRYPT_ALGORITHM="pbkdf2_sm3"):
         assert settings.PASSWORD_ENCRYPT_ALGORITHM == "pbkdf2_sm3"
         assert check_password(raw_password, encrypted)
+
+
+@pytest.mark.parametrize(
+    ("algorithm", "openssl_sm3_available", "expected"),
+    [
+        ("pbkdf2_sha256", False, True),
+        ("pbkdf2_sm3", True, True),
+        # 回退到 tongsuopy 实现时，计算过程中一直持有 GIL，多线程无法加速
+        ("pbkdf2_sm3", False, False),
+    ],
+)
+def test_is_make_password_parallelizable(algorithm, openssl_sm3_available, expected):
+    with override_settings(PASSWORD_ENCRYPT_ALGORITHM=algorithm), mock.patch(
+        "bkuser.common.hashers.shortcuts._OPENSSL_SM3_PBKDF2_AVAILABLE", openssl_sm3_available
+    ):
+        assert is_make_password_parallelizable() is expected
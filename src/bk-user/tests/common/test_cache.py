@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+from unittest import mock
+
+import pytest
+from bkuser.common.cache import Cache, CacheEnum, CacheGeneration, CacheKeyPrefixEnum
+
+pytestmark = pytest.mark.django_db
+
+
+class TestCacheGeneration:
+    @pytest.fixture
+    def generation(self) -> CacheGeneration:
+        cache = Cache(CacheEnum.REDIS, CacheKeyPrefixEnum.TENANT_METADATA)
+        cache.delete("test_gen")
+        cache.delete("test_gen2")
+        return CacheGeneration(cache)
+
+    def test_get(self, generation):
+        current = generation.get("test_gen")
+        assert current
+        # 版本号不变的情况下，多次获取的结果一致
+        assert generation.get("test_gen") == current
+        assert generation.get_many(["test_gen", "test_gen2"])["test_gen"] == current
+
+    def test_get_when_cache_unavailable(self, generation):
+        # add 之后版本号仍可能被清理（过期淘汰 / 缓存不可用），此时使用新生成的版本号
+        with mock.patch.object(generation.cache, "get", return_value=None), mock.patch.object(
+            generation.cache, "get_many", return_value={}
+        ):
+            assert generation.get("test_gen")
+            assert set(generation.get_many(["test_gen", "test_gen2"]).keys()) == {"test_gen", "test_gen2"}
+
+    def test_bump(self, generation):
+        generations = generation.get_many(["test_gen", "test_gen2"])
+
+        generation.bump("test_gen")
+        new_generations = generation.get_many(["test_gen", "test_gen2"])
+        assert new_generations["test_gen"] != generations["test_gen"]
+        assert new_generations["test_gen2"] == generations["test_gen2"]
+
+    def test_bump_on_commit(self, generation, django_capture_on_commit_callbacks):
+        on_bump = mock.Mock()
+        generation.on_bump = on_bump
+
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            generation.bump("test_gen")
+
+        current = generation.get("test_gen")
+        assert len(callbacks) == 1
+        assert on_bump.call_count == 1
+
+        # 事务提交后，版本号会再次更新
+        callbacks[0]()
+        assert generation.get("test_gen") != current
+        assert on_bump.call_count == 2
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - 用户管理 (bk-user) available.
+# Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from bkuser.plugins.general.exceptions import RequestApiError, RespDataFormatError
+from bkuser.plugins.general.http import fetch_all_data
+
+# 桩服务提供的数据总数
+TOTAL_COUNT = 2345
+
+
+class _StubState:
+    def __init__(self):
+        self.requested_pages: List[int] = []
+        # 指定页码需要先返回的异常状态码，如 {3: [500]} 表示第 3 页首次请求返回 500
+        self.failures: Dict[int, List[int]] = {}
+        self.non_json_pages: List[int] = []
+        self.lock = threading.Lock()
+
+
+@pytest.fixture
+def stub_server():
+    """本地桩 HTTP 服务，按通用 HTTP 数据源 API 协议返回分页数据"""
+    state = _StubState()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            query = parse_qs(urlparse(self.path).query)
+            page, page_size = int(query["page"][0]), int(query["page_size"][0])
+            with state.lock:
+                state.requested_pages.append(page)
+                failures = state.failures.get(page)
+                status_code = failures.pop(0) if failures else 200
+
+            if status_code != 200:  # noqa: PLR2004
+                self._send(status_code, b"error")
+            elif page in state.non_json_pages:
+                self._send(200, b"<html></html>")
+            else:
+                start = (page - 1) * page_size
+                results = [{"id": str(idx)} for idx in range(start, min(start + page_size, TOTAL_COUNT))]
+                self._send(200, json.dumps({"count": TOTAL_COUNT, "results": results}).encode())
+
+        def _send(self, status_code: int, body: bytes):
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args, **kwargs):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_port}/api/v1/users", state
+
+    server.shutdown()
+    server.server_close()
+
+
+class TestFetchAllData:
+    @pytest.mark.parametrize("concurrency", [1, 4])
+    def test_fetch_all_data(self, stub_server, concurrency):
+        url, state = stub_server
+        items = fetch_all_data(url, {}, {"scope": "company"}, 100, 5, 0, concurrency)  # type: ignore
+
+        # 结果按分页顺序产出
+        assert [item["id"] for item in items] == [str(idx) for idx in range(TOTAL_COUNT)]
+        assert sorted(state.requested_pages) == list(range(1, 25))
+
+    def test_fetch_all_data_lazily(self, stub_server):
+        url, state = stub_server
+        items = fetch_all_data(url, {}, {}, 100, 5, 0, 4)  # type: ignore
+
+        # 迭代器在消费前不会发起请求
+        assert state.requested_pages == []
+        assert next(items) == {"id": "0"}
+        assert state.requested_pages == [1]
+
+        # 提前结束迭代，在途的请求数量是有上限的
+        items.close()
+        assert len(state.requested_pages) <= 1 + 4 * 2  # noqa: PLR2004
+
+    def test_fetch_all_data_with_retry(self, stub_server):
+        url, state = stub_server
+        state.failures = {3: [500], 7: [502]}
+
+        items = list(fetch_all_data(url, {}, {}, 100, 5, 1, 4))  # type: ignore
+
+        assert len(items) == TOTAL_COUNT
+        assert state.requested_pages.count(3) == 2  # noqa: PLR2004
+        assert state.requested_pages.count(7) == 2  # noqa: PLR2004
+
+    def test_fetch_all_data_with_error_status(self, stub_server):
+        url, state = stub_server
+        state.failures = {5: [404]}
+
+        with pytest.raises(RequestApiError):
+            list(fetch_all_data(url, {}, {}, 100, 5, 0, 4))  # type: ignore
+
+    def test_fetch_all_data_with_non_json(self, stub_server):
+        url, state = stub_server
+        state.non_json_pages = [2]
+
+        with pytest.raises(RespDataFormatError):
+            list(fetch_all_data(url, {}, {}, 100, 5, 0, 4))  # type: ignore
@@ -15,11 +15,13 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import re
 from typing import Dict, List
 from unittest import mock
 
 import pytest
 from bkuser.plugins.ldap.models import LDAPDataSourcePluginConfig
+from ldap3 import BASE
 
 # 部门数据
 organizational_unit_data = [
@@ -260,22 +262,48 @@ inet_org_person_data = [
 ]
 
 
-def _mocked_paged_search_accumulator(*args, **kwargs) -> List[Dict]:
+# 条目修改时间（modifyTimestamp），未指定的条目默认为 DEFAULT_MODIFY_TIMESTAMP
+DEFAULT_MODIFY_TIMESTAMP = "20240101000000Z"
+modify_timestamps: Dict[str, str] = {}
+
+
+def _mocked_paged_search_generator(*args, **kwargs) -> List[Dict]:
     """测试用函数，用于屏蔽 LDAP 服务"""
 
     search_base = kwargs["search_base"]
     search_filter = kwargs["search_filter"]
 
     if "inetOrgPerson" in search_filter:
-        return [p for p in inet_org_person_data if p["dn"].endswith(search_base)]  # type: ignore
+        objs = inet_org_person_data
+    elif "organizationalUnit" in search_filter:
+        objs = organizational_unit_data
+    elif "groupOfNames" in search_filter:
+        objs = group_of_names_data
+    else:
+        return []
 
-    if "organizationalUnit" in search_filter:
-        return [ou for ou in organizational_unit_data if ou["dn"].endswith(search_base)]  # type: ignore
+    if kwargs.get("search_scope") == BASE:
+        objs = [o for o in objs if o["dn"] == search_base]
+    else:
+        objs = [o for o in objs if o["dn"].endswith(search_base)]  # type: ignore
 
-    if "groupOfNames" in search_filter:
-        return [g for g in group_of_names_data if g["dn"].endswith(search_base)]  # type: ignore
+    # 模拟高水位过滤 & 获取操作属性
+    if match := re.search(r"\(modifyTimestamp>=(\d{14}Z)\)", search_filter):
+        objs = [o for o in objs if modify_timestamps.get(o["dn"], DEFAULT_MODIFY_TIMESTAMP) >= match.group(1)]
 
-    return []
+    if "modifyTimestamp" in kwargs.get("attributes", []):
+        return [
+            {
+                "dn": o["dn"],
+                "attributes": {
+                    **o["attributes"],
+                    "modifyTimestamp": modify_timestamps.get(o["dn"], DEFAULT_MODIFY_TIMESTAMP),  # type: ignore
+                },
+            }
+            for o in objs
+        ]
+
+    return objs  # type: ignore
 
 
 class MockedLDAPConnection:
@@ -292,14 +320,16 @@ class MockedLDAPConnection:
 @pytest.fixture
 def _mock_ldap_client():
     with mock.patch(
-        "bkuser.plugins.ldap.client.paged_search_accumulator",
-        new=_mocked_paged_search_accumulator,
+        "bkuser.plugins.ldap.client.paged_search_generator",
+        new=_mocked_paged_search_generator,
     ), mock.patch(
         "bkuser.plugins.ldap.client.LDAPClient._gen_conn",
         return_value=MockedLDAPConnection(),
     ):
         yield
 
+    modify_timestamps.clear()
+
 
 @pytest.fixture
 def ldap_ds_cfg(ldap_ds_plugin_cfg) -> LDAPDataSourcePluginConfig:
@@ -14,11 +14,16 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+import time
+from unittest import mock
 
 import pytest
+from bkuser.plugins.ldap.models import LDAPDeltaSyncState
 from bkuser.plugins.ldap.plugin import LDAPDataSourcePlugin
 from bkuser.plugins.models import RawDataSourceDepartment, RawDataSourceUser
 
+from tests.plugins.ldap.conftest import modify_timestamps
+
 
 class TestLDAPDataSourcePlugin:
     @pytest.mark.usefixtures("_mock_ldap_client")
@@ -92,6 +97,32 @@ class TestLDAPDataSourcePlugin:
             departments=["97a93076-0e9d-103f-8e7d-fb1e46baa127", "97b93908-0e9d-103f-8e8b-fb1e46baa127"],
         )
 
+    @pytest.mark.usefixtures("_mock_ldap_client")
+    def test_reuse_connection(self, ldap_ds_cfg, logger):
+        plugin = LDAPDataSourcePlugin(ldap_ds_cfg, logger)
+        with mock.patch("bkuser.plugins.ldap.client.LDAPClient._gen_conn") as gen_conn:
+            plugin.fetch_departments()
+            plugin.fetch_users()
+
+        # 部门，用户组，用户拉取复用同一个连接，拉取完用户后关闭
+        assert gen_conn.call_count == 1
+        assert gen_conn.return_value.unbind.call_count == 1
+
+    @pytest.mark.usefixtures("_mock_ldap_client")
+    def test_get_users_with_required_properties(self, ldap_ds_cfg, logger):
+        plugin = LDAPDataSourcePlugin(ldap_ds_cfg, logger, required_user_properties=["uid", "CN"])
+        plugin.fetch_departments()
+        users = plugin.fetch_users()
+
+        # 只生成需要的属性（含 Leader 字段），Leader 信息不受影响
+        assert users[0].properties == {
+            "dn": "cn=baishier,ou=group_baa,ou=center_ba,ou=dept_b,ou=company,dc=bk,dc=example,dc=com",
+            "cn": "baishier",
+            "uid": "baishier",
+            "manager": "cn=lushi,ou=group_aba,ou=center_ab,ou=dept_a,ou=company,dc=bk,dc=example,dc=com",
+        }
+        assert users[0].leaders == ["97b65b84-0e9d-103f-8e88-fb1e46baa127"]
+
 
 class TestLDAPDataSourcePluginMultipleBaseDNs:
     @pytest.mark.usefixtures("_mock_ldap_client")
@@ -128,3 +159,98 @@ class TestLDAPDataSourcePluginMultipleBaseDNs:
         plugin.fetch_departments()
         users = plugin.fetch_users()
         assert len(users) == 5  # noqa: PLR2004
+
+
+@pytest.mark.usefixtures("_mock_ldap_client")
+class TestLDAPDataSourcePluginDeltaSync:
+    @pytest.fixture
+    def delta_sync_cfg(self, ldap_ds_cfg):
+        ldap_ds_cfg.delta_sync_config.enabled = True
+        return ldap_ds_cfg
+
+    @staticmethod
+    def _gen_delta_sync_state(plugin_cfg, logger, high_water_mark: str, reconciled_at: int | None = None):
+        return LDAPDeltaSyncState(
+            config_fingerprint=LDAPDataSourcePlugin(plugin_cfg, logger)._gen_config_fingerprint(),
+            high_water_mark=high_water_mark,
+            reconciled_at=int(time.time()) if reconciled_at is None else reconciled_at,
+        ).model_dump()
+
+    def test_fetch_all(self, delta_sync_cfg, logger):
+        plugin = LDAPDataSourcePlugin(delta_sync_cfg, logger)
+        plugin.fetch_departments()
+        users = plugin.fetch_users()
+
+        assert not plugin.is_delta_fetch
+        assert len(users) == 10  # noqa: PLR2004
+        # 高水位字段不应该出现在用户属性中
+        assert all("modifyTimestamp" not in u.properties for u in users)
+        assert plugin.delta_sync_state
+        assert plugin.delta_sync_state["high_water_mark"] == "20240101000000Z"
+
+    def test_fetch_all_without_delta_sync_enabled(self, ldap_ds_cfg, logger):
+        state = self._gen_delta_sync_state(ldap_ds_cfg, logger, "20240101000000Z")
+        plugin = LDAPDataSourcePlugin(ldap_ds_cfg, logger, delta_sync_state=state)
+        plugin.fetch_departments()
+
+        assert not plugin.is_delta_fetch
+        assert len(plugin.fetch_users()) == 10  # noqa: PLR2004
+        assert plugin.delta_sync_state is None
+
+    def test_fetch_changed_users(self, delta_sync_cfg, logger):
+        lushi_dn = "cn=lushi,ou=group_aba,ou=center_ab,ou=dept_a,ou=company,dc=bk,dc=example,dc=com"
+        modify_timestamps[lushi_dn] = "20240301000000Z"
+        state = self._gen_delta_sync_state(delta_sync_cfg, logger, "20240201000000Z")
+
+        plugin = LDAPDataSourcePlugin(delta_sync_cfg, logger, delta_sync_state=state)
+        plugin.fetch_departments()
+        users = plugin.fetch_users()
+
+        assert plugin.is_delta_fetch
+        # 仅拉取有变更的用户，且没有到对账时间
+        assert [u.properties["dn"] for u in users] == [lushi_dn]
+        assert plugin.alive_user_codes is None
+        # Leader 不在本次拉取的用户中，需要根据 DN 补充查询
+        assert users[0].leaders == ["97b534de-0e9d-103f-8e86-fb1e46baa127", "97b33a9e-0e9d-103f-8e84-fb1e46baa127"]
+        assert users[0].departments == ["97a93076-0e9d-103f-8e7d-fb1e46baa127", "97b93908-0e9d-103f-8e8b-fb1e46baa127"]
+
+        assert plugin.delta_sync_state
+        assert plugin.delta_sync_state["high_water_mark"] == "20240301000000Z"
+        assert plugin.delta_sync_state["reconciled_at"] == state["reconciled_at"]
+
+    def test_fetch_changed_group_members(self, delta_sync_cfg, logger):
+        modify_timestamps["cn=center_aa,ou=dept_a,ou=company,dc=bk,dc=example,dc=com"] = "20240301000000Z"
+        state = self._gen_delta_sync_state(delta_sync_cfg, logger, "20240201000000Z")
+
+        plugin = LDAPDataSourcePlugin(delta_sync_cfg, logger, delta_sync_state=state)
+        plugin.fetch_departments()
+        users = plugin.fetch_users()
+
+        # 用户组有变更，用户组中的成员也需要被拉取
+        assert [u.code for u in users] == ["97b11232-0e9d-103f-8e82-fb1e46baa127"]
+        assert "97b2869e-0e9d-103f-8e83-fb1e46baa127" in users[0].departments
+        # 用户本身没有变更，高水位保持不变
+        assert plugin.delta_sync_state
+        assert plugin.delta_sync_state["high_water_mark"] == "20240201000000Z"
+
+    def test_fetch_changed_users_with_reconcile(self, delta_sync_cfg, logger):
+        state = self._gen_delta_sync_state(delta_sync_cfg, logger, "20240201000000Z", reconciled_at=0)
+
+        plugin = LDAPDataSourcePlugin(delta_sync_cfg, logger, delta_sync_state=state)
+        plugin.fetch_departments()
+
+        assert plugin.fetch_users() == []
+        assert plugin.alive_user_codes is not None
+        assert len(plugin.alive_user_codes) == 10  # noqa: PLR2004
+        assert plugin.delta_sync_state
+        assert plugin.delta_sync_state["reconciled_at"] > 0
+
+    def test_fetch_all_with_config_changed(self, delta_sync_cfg, logger):
+        state = self._gen_delta_sync_state(delta_sync_cfg, logger, "20240201000000Z")
+        delta_sync_cfg.data_config.user_search_base_dns = ["ou=dept_a,ou=company,dc=bk,dc=example,dc=com"]
+
+        plugin = LDAPDataSourcePlugin(delta_sync_cfg, logger, delta_sync_state=state)
+        plugin.fetch_departments()
+
+        assert not plugin.is_delta_fetch
+        assert len(plugin.fetch_users()) == 8  # noqa: PLR2004
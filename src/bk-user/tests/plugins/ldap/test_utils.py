@@ -16,7 +16,7 @@
 # to the current version of the project delivered to anyone in the future.
 
 import pytest
-from bkuser.plugins.ldap.utils import has_parent_child_dn_relation
+from bkuser.plugins.ldap.utils import gen_dn, get_parent_dn, has_parent_child_dn_relation, parse_dn
 
 
 @pytest.mark.parametrize(
@@ -61,3 +61,22 @@ from bkuser.plugins.ldap.utils import has_parent_child_dn_relation
 )
 def test_has_parent_child_dn_relation(dns, expected):
     assert has_parent_child_dn_relation(dns) == expected
+
+
+@pytest.mark.parametrize(
+    ("dn", "expected"),
+    [
+        ("cn=zhangsan,ou=company,dc=bk,dc=example,dc=com", "ou=company,dc=bk,dc=example,dc=com"),
+        # 转义的逗号不是分隔符
+        ("cn=Li\\, Si,ou=company,dc=com", "ou=company,dc=com"),
+        ("cn=lisi,ou=dept\\,a,dc=com", "ou=dept\\,a,dc=com"),
+        # 引号 & 多值 RDN，使用完整解析
+        ('cn="li,si",ou=company,dc=com', "ou=company,dc=com"),
+        ("cn=lisi+uid=lisi,ou=company,dc=com", "uid=lisi,ou=company,dc=com"),
+        # 没有父节点
+        ("dc=com", ""),
+    ],
+)
+def test_get_parent_dn(dn, expected):
+    assert get_parent_dn(dn) == expected
+    assert get_parent_dn(dn) == gen_dn(parse_dn(dn)[1:])
@@ -32,6 +32,8 @@ from bkuser.plugins.local.exceptions import (
 from bkuser.plugins.local.parser import LocalDataSourceDataParser
 from bkuser.plugins.local.utils import gen_dept_code
 from bkuser.plugins.models import RawDataSourceDepartment, RawDataSourceUser
+from django.conf import settings
+from openpyxl.reader.excel import load_workbook
 
 
 class TestLocalDataSourceDataParser:
@@ -340,3 +342,58 @@ class TestLocalDataSourceDataParser:
                 departments=[],
             ),
         ]
+
+    def test_parse_read_only_workbook(self, logger, user_workbook):
+        parser = LocalDataSourceDataParser(logger, user_workbook)
+        parser.parse()
+
+        read_only_workbook = load_workbook(settings.BASE_DIR / "tests/assets/fake_users.xlsx", read_only=True)
+        read_only_parser = LocalDataSourceDataParser(logger, read_only_workbook)
+        read_only_parser.parse()
+        read_only_workbook.close()
+
+        assert read_only_parser.get_users() == parser.get_users()
+        assert read_only_parser.get_departments() == parser.get_departments()
+
+    def test_parse_departments_parent_before_children(self, logger, user_workbook):
+        parser = LocalDataSourceDataParser(logger, user_workbook)
+        parser.parse()
+
+        parsed_codes = set()
+        for dept in parser.get_departments():
+            assert dept.parent is None or dept.parent in parsed_codes
+            parsed_codes.add(dept.code)
+
+    def test_invalid_row_logged_with_line_number(self, logger, user_workbook):
+        user_workbook["users"]["A4"].value = "张三"
+        with pytest.raises(InvalidUsername):
+            LocalDataSourceDataParser(logger, user_workbook).parse()
+
+        assert "invalid data found at line 4 in sheet" in logger.logs
+
+    def test_parse_organization_with_padded_segments(self, logger, user_workbook):
+        """部门 Code 需与历史导入保持一致（由去除首尾空白字符的原始路径计算），部门名称则需去除首尾空白字符"""
+        user_workbook["users"]["E4"].value = "公司 /部门A, 公司/ 部门A /中心AA"
+        parser = LocalDataSourceDataParser(logger, user_workbook)
+        parser.parse()
+
+        departments = parser.get_departments()
+        dept_codes = [dept.code for dept in departments]
+        assert len(dept_codes) == len(set(dept_codes))
+        assert all(dept.name == dept.name.strip() for dept in departments)
+
+        # 部门 Code 与历史版本的计算结果保持一致
+        dept_code = "44c6b6755fa668acbc59ae560f8d116e756d75966a86b449b80ee194f736382d"
+        assert gen_dept_code("公司 /部门A") == dept_code
+
+        lisi = next(u for u in parser.get_users() if u.code == "lisi")
+        assert lisi.departments == [dept_code, gen_dept_code("公司/ 部门A /中心AA")]
+
+        dept_map = {dept.code: dept for dept in departments}
+        assert dept_map[dept_code].name == "部门A"
+        assert dept_map[dept_code].parent == gen_dept_code("公司")
+
+        center = dept_map[gen_dept_code("公司/ 部门A /中心AA")]
+        assert center.name == "中心AA"
+        assert center.parent == gen_dept_code("公司/ 部门A")
+        assert dept_map[gen_dept_code("公司/ 部门A")].name == "部门A"
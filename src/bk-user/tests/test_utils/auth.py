@@ -19,6 +19,7 @@ from typing import Optional
 
 from bkuser.apps.data_source.constants import DataSourceTypeEnum
 from bkuser.apps.data_source.models import DataSource, DataSourceUser
+from bkuser.apps.permission.caches import UserRoleCache
 from bkuser.apps.tenant.models import Tenant, TenantManager, TenantUser
 from bkuser.auth.models import User
 from bkuser.plugins.constants import DataSourcePluginEnum
@@ -57,5 +58,6 @@ def create_user(tenant: Tenant, username: Optional[str] = None) -> User:
     )
 
     TenantManager.objects.get_or_create(tenant=tenant, tenant_user=tenant_user)
+    UserRoleCache.invalidate(tenant.id, [tenant_user.id])
 
     return user
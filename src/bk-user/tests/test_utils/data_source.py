@@ -14,6 +14,7 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+from bkuser.apps.data_source.caches import DataSourceDepartmentPathIndex, DataSourceRelationGeneration
 from bkuser.apps.data_source.models import (
     DataSource,
     DataSourceDepartment,
@@ -211,6 +212,10 @@ def init_data_source_users_depts_and_relations(ds: DataSource) -> None:
     ]
     DataSourceUserLeaderRelation.objects.bulk_create(user_leader_relations)
 
+    # 部门 & 关系数据已变更（单元测试中数据源 ID 可能被复用），需要使已有的部门路径索引 & 关系数据缓存失效
+    DataSourceDepartmentPathIndex.bump_generation(ds.id)
+    DataSourceRelationGeneration.bump(ds.id)
+
 
 def init_local_data_source_identity_infos(ds: DataSource) -> None:
     """初始化本地数据源身份信息"""
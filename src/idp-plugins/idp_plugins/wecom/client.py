@@ -14,18 +14,34 @@
 #
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
+import hashlib
 import logging
+import time
 from typing import Any, Dict, Tuple
 
+from django.core.cache import DEFAULT_CACHE_ALIAS, BaseCache, caches
 from django.utils.translation import gettext_lazy as _
 
-from .settings import WECOM_API_BASE_URL
+from .settings import (
+    WECOM_ACCESS_TOKEN_CACHE_ALIAS,
+    WECOM_ACCESS_TOKEN_EXPIRES_MARGIN,
+    WECOM_ACCESS_TOKEN_REFRESH_LOCK_TIMEOUT,
+    WECOM_API_BASE_URL,
+)
 from ..exceptions import RequestAPIError, UnexpectedDataError
 from ..http import http_get_20x
 from ..utils import urljoin
 
 logger = logging.getLogger(__name__)
 
+# AccessToken 无效 / 已过期的错误码
+# docs: https://developer.work.weixin.qq.com/document/path/90313
+INVALID_ACCESS_TOKEN_ERRCODES = {40014, 42001}
+
+
+class InvalidAccessTokenError(RequestAPIError):
+    """AccessToken 无效或已过期"""
+
 
 class WeComAPIClient:
     """请求企微接口的Client"""
@@ -59,6 +75,19 @@ class WeComAPIClient:
             return resp_data
 
         errmsg = resp_data.get("errmsg", "unknown")
+        # AccessToken 无效（如：被提前刷新），由调用方刷新 AccessToken 后重试
+        if errcode in INVALID_ACCESS_TOKEN_ERRCODES:
+            logger.warning(
+                "wecom access token invalid, [corp_id=%s, agent_id=%s]! %s %s, errcode: %s, errmsg: %s",
+                self.corp_id,
+                self.agent_id,
+                http_func.__name__,
+                url,
+                errcode,
+                errmsg,
+            )
+            raise InvalidAccessTokenError(f"wecom access token invalid! code={errcode}, message={errmsg}")
+
         logger.error(
             "wecom api error, [corp_id=%s, agent_id=%s]! %s %s, data: %s, errcode: %s, errmsg: %s",
             self.corp_id,
@@ -86,18 +115,101 @@ class WeComAPIClient:
 
     @property
     def access_token(self) -> str:
-        # TODO: 先从缓存获取，获取不到再调用接口查询
-        # FIXME: 如何引入外部存储共享缓存呢？比如Redis如何支持多种部署方式(单实例、集群、Sentinel)
-        access_token, expires_in = self._get_access_token()
-        return access_token
+        """
+        获取 AccessToken，优先从缓存中获取，缓存不存在时才调用接口获取
+
+        Note: 缓存使用接入方（登录 / 用户管理）配置的 Django 缓存（Redis），因此多进程共享，
+        且 Redis 的部署方式（单实例、Sentinel 等）由接入方配置决定；缓存不可用时，降级为直接调用接口获取
+        """
+        if access_token := self._get_cached_access_token():
+            return access_token
+
+        return self._refresh_access_token()
+
+    def _refresh_access_token(self, invalid_access_token: str = "") -> str:
+        """
+        刷新 AccessToken 并写入缓存，缓存过期时间比 AccessToken 有效期提前 WECOM_ACCESS_TOKEN_EXPIRES_MARGIN 秒
+
+        企业微信对 gettoken 接口有频率限制，因此同一应用的并发刷新，只有抢到刷新锁的请求会调用接口，
+        其他请求等待刷新结果（等待超时则直接调用接口获取）
+
+        :param invalid_access_token: 已知无效的 AccessToken，缓存中的 AccessToken 与其相同时需要重新获取
+        """
+        lock_key = f"{self._access_token_cache_key}:refresh_lock"
+        try:
+            locked = self._cache.add(lock_key, 1, timeout=WECOM_ACCESS_TOKEN_REFRESH_LOCK_TIMEOUT)
+        except Exception:
+            logger.exception("failed to acquire wecom access token refresh lock from cache, fetch it directly")
+            return self._get_access_token()[0]
+
+        if not locked:
+            deadline = time.time() + WECOM_ACCESS_TOKEN_REFRESH_LOCK_TIMEOUT
+            while time.time() < deadline:
+                time.sleep(0.1)
+                access_token = self._get_cached_access_token()
+                if access_token and access_token != invalid_access_token:
+                    return access_token
+
+        try:
+            # 抢到锁之前，AccessToken 可能已经被其他请求刷新
+            access_token = self._get_cached_access_token()
+            if access_token and access_token != invalid_access_token:
+                return access_token
+
+            access_token, expires_in = self._get_access_token()
+            try:
+                self._cache.set(
+                    self._access_token_cache_key,
+                    access_token,
+                    timeout=max(expires_in - WECOM_ACCESS_TOKEN_EXPIRES_MARGIN, 1),
+                )
+            except Exception:
+                logger.exception("failed to set wecom access token to cache")
+
+            return access_token
+        finally:
+            if locked:
+                try:
+                    self._cache.delete(lock_key)
+                except Exception:
+                    logger.exception("failed to release wecom access token refresh lock from cache")
+
+    def _get_cached_access_token(self) -> str | None:
+        """从缓存中获取 AccessToken，缓存不可用时返回 None"""
+        try:
+            return self._cache.get(self._access_token_cache_key)
+        except Exception:
+            logger.exception("failed to get wecom access token from cache")
+            return None
+
+    @property
+    def _cache(self) -> BaseCache:
+        if WECOM_ACCESS_TOKEN_CACHE_ALIAS in caches.settings:
+            return caches[WECOM_ACCESS_TOKEN_CACHE_ALIAS]
+
+        return caches[DEFAULT_CACHE_ALIAS]
+
+    @property
+    def _access_token_cache_key(self) -> str:
+        # Secret 变更后，需要使用新的 AccessToken
+        secret_digest = hashlib.md5(self.secret.encode("utf-8")).hexdigest()[:8]
+        return f"idp_plugins:wecom:access_token:{self.corp_id}:{self.agent_id}:{secret_digest}"
+
+    def _call_with_access_token(self, http_func, url_path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """调用需要 AccessToken 的企业微信接口，若 AccessToken 无效（如：被提前刷新），则刷新后重试一次"""
+        access_token = self.access_token
+        try:
+            return self._call(http_func, url_path, params={**params, "access_token": access_token})
+        except InvalidAccessTokenError:
+            access_token = self._refresh_access_token(invalid_access_token=access_token)
+            return self._call(http_func, url_path, params={**params, "access_token": access_token})
 
     def get_user_id_by_code(self, code: str) -> str:
         """
         通过OAuth授权码获取用户ID
         docs: https://developer.work.weixin.qq.com/document/path/98176
         """
-        params = {"access_token": self.access_token, "code": code}
-        resp_data = self._call(http_get_20x, "/auth/getuserinfo", params=params)
+        resp_data = self._call_with_access_token(http_get_20x, "/auth/getuserinfo", params={"code": code})
         userid = resp_data.get("userid")
         if userid:
             return userid
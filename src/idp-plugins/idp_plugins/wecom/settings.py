@@ -18,3 +18,9 @@
 WECOM_OAUTH_URL = "https://login.work.weixin.qq.com/wwlogin/sso/login"
 # 企业微信API基础URL
 WECOM_API_BASE_URL = "https://qyapi.weixin.qq.com/cgi-bin"
+# 企业微信 AccessToken 缓存使用的 Django 缓存（需为多进程共享的缓存，如 Redis），不存在则使用默认缓存
+WECOM_ACCESS_TOKEN_CACHE_ALIAS = "redis"
+# 企业微信 AccessToken 提前过期的安全时间（秒），避免使用临近过期的 AccessToken
+WECOM_ACCESS_TOKEN_EXPIRES_MARGIN = 300
+# 企业微信 AccessToken 刷新锁的过期时间（秒），也是未抢到锁的请求等待刷新结果的最长时间
+WECOM_ACCESS_TOKEN_REFRESH_LOCK_TIMEOUT = 5